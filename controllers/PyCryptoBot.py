@@ -6,6 +6,7 @@ import random
 import sched
 import signal
 import functools
+import threading
 import pandas as pd
 import numpy as np
 from regex import R
@@ -20,24 +21,38 @@ from urllib3.exceptions import ReadTimeoutError
 from models.BotConfig import BotConfig
 from models.exchange.ExchangesEnum import Exchange
 from models.exchange.Granularity import Granularity
-from models.exchange.binance import WebSocketClient as BWebSocketClient
-from models.exchange.coinbase_pro import WebSocketClient as CWebSocketClient
-from models.exchange.kucoin import WebSocketClient as KWebSocketClient
-from models.exchange.binance import AuthAPI as BAuthAPI, PublicAPI as BPublicAPI
-from models.exchange.coinbase_pro import AuthAPI as CBAuthAPI, PublicAPI as CBPublicAPI
-from models.exchange.kucoin import AuthAPI as KAuthAPI, PublicAPI as KPublicAPI
+from models.exchange.LazyImport import LazyExchangeAPI
 from models.helper.TelegramBotHelper import TelegramBotHelper
+from models.helper.ColumnBufferHelper import ColumnBuffer
+from models.helper.CompactFrameHelper import compact_candles, compact_indicators
+from models.helper.ConfigReloadHelper import ConfigReloader
 from models.helper.MarginHelper import calculate_margin
+from models.helper.MetricsHelper import metrics
+from models.helper.ProfileHelper import SamplingProfiler
+from models.helper.SimulationHelper import SimulationWindow
+from models.helper.StreamRecordHelper import FrameRecorder
 from models.TradingAccount import TradingAccount
 from models.Stats import Stats
 from models.AppState import AppState
 from models.helper.TextBoxHelper import TextBox
 from models.Strategy import Strategy
-from views.TradingGraphs import TradingGraphs
-from views.PyCryptoBot import RichText
+from views.ChartRenderer import ChartRenderer
+from views.PyCryptoBot import ConsoleOutput, RichText
 from utils.PyCryptoBot import truncate as _truncate
 from utils.PyCryptoBot import compare as _compare
 
+# exchange modules are only imported once the selected exchange first uses them
+BWebSocketClient = LazyExchangeAPI("binance", "WebSocketClient")
+CWebSocketClient = LazyExchangeAPI("coinbase_pro", "WebSocketClient")
+KWebSocketClient = LazyExchangeAPI("kucoin", "WebSocketClient")
+BAuthAPI = LazyExchangeAPI("binance", "AuthAPI")
+BPublicAPI = LazyExchangeAPI("binance", "PublicAPI")
+BUserDataStream = LazyExchangeAPI("binance", "UserDataStream")
+CBAuthAPI = LazyExchangeAPI("coinbase_pro", "AuthAPI")
+CBPublicAPI = LazyExchangeAPI("coinbase_pro", "PublicAPI")
+KAuthAPI = LazyExchangeAPI("kucoin", "AuthAPI")
+KPublicAPI = LazyExchangeAPI("kucoin", "PublicAPI")
+
 try:
     # pyright: reportMissingImports=false
     if file_exists("models/Trading_myPta.py"):
@@ -63,6 +78,9 @@ except ImportError:
 
 pd.set_option("display.float_format", "{:.8f}".format)
 
+METRICS_INTERVAL = 60  # seconds between metrics JSON dumps
+PROFILE_DURATION = 60  # seconds profiled when requested over Telegram without --profile
+
 
 def signal_handler(signum):
     if signum == 2:
@@ -78,37 +96,45 @@ class PyCryptoBot(BotConfig):
 
         self.console_term = Console(no_color=(not self.term_color), width=self.term_width)  # logs to the screen
         self.console_log = Console(file=open(self.logfile, "w"), no_color=True, width=self.log_width)  # logs to file
-
-        self.table_console = Table(title=None, box=None, show_header=False, show_footer=False)
+        self.output = ConsoleOutput(self.console_term, None if self.disablelog else self.console_log, self.logformat)
 
         self.s = sched.scheduler(time.time, time.sleep)
 
         self.price = 0
         self.takerfee = -1.0
-        self.makerfee = 0.0
+        self.makerfee = -1.0
         self.account = None
         self.state = None
         self.technical_analysis = None
         self.websocket_connection = None
+        self.websocket_recorder = None
+        self.custom_strategy = None
+        self.strategy_scores = None
+        self.config_reloader = None
         self.ticker_self = None
         self.df_last = pd.DataFrame()
         self.trading_data = pd.DataFrame()
+        self.sim_windows = []
+        self.user_data_stream = None
+        self.metrics_dumped = -METRICS_INTERVAL
+        self.profiler = SamplingProfiler()
+        self.chart_renderer = None
         self.telegram_bot = TelegramBotHelper(self)
 
-        self.trade_tracker = pd.DataFrame(
-            columns=[
-                "Datetime",
-                "Market",
-                "Action",
-                "Price",
-                "Base",
-                "Quote",
-                "Margin",
-                "Profit",
-                "Fee",
-                "DF_High",
-                "DF_Low",
-            ]
+        self.trade_tracker = ColumnBuffer(
+            {
+                "Datetime": object,
+                "Market": object,
+                "Action": object,
+                "Price": float,
+                "Base": float,
+                "Quote": float,
+                "Margin": float,
+                "Profit": float,
+                "Fee": float,
+                "DF_High": float,
+                "DF_Low": float,
+            }
         )
 
         if trading_myPta is True and pandas_ta_enabled is True:
@@ -116,9 +142,16 @@ class PyCryptoBot(BotConfig):
         else:
             self.enable_pandas_ta = False
 
+    @metrics.timed("pycryptobot_tick_seconds")
     def execute_job(self):
         """Trading bot job which runs at a scheduled interval"""
 
+        self.dump_metrics()
+
+        # config changes from SIGHUP or the watched config file, applied between ticks
+        if self.config_reloader is not None:
+            self.config_reloader.check()
+
         if self.is_live:
             self.state.account.mode = "live"
         else:
@@ -141,6 +174,7 @@ class PyCryptoBot(BotConfig):
                     if self.websocket:
                         RichText.notify("Closing websocket...", self, "normal")
                         self.websocket_connection.close()
+                    self.close_user_data_stream()
 
                 time.sleep(30)
                 control_status = self.telegram_bot.check_bot_control_status()
@@ -153,25 +187,24 @@ class PyCryptoBot(BotConfig):
                 if self.websocket:
                     RichText.notify("Starting websocket...", self, "normal")
                     self.websocket_connection.start()
+                if self.is_live and self.userdatastream and self.exchange == Exchange.BINANCE:
+                    self.start_user_data_stream()
 
             if control_status == "exit":
                 RichText.notify("Closing Bot {self.market}", self, "normal")
                 self.notify_telegram(f"{self.market} bot is stopping")
                 self.telegram_bot.remove_active_bot()
+                self.close_user_data_stream()
                 sys.exit(0)
 
+            if control_status == "profile":
+                self.start_profiler()
+                self.telegram_bot.update_bot_status("active")
+
             if control_status == "reload":
                 RichText.notify(f"Reloading config parameters {self.market}", self, "normal")
-                self.read_config(self.exchange)
-                if self.websocket:
-                    self.websocket_connection.close()
-                    if self.exchange == Exchange.BINANCE:
-                        self.websocket_connection = BWebSocketClient([self.market], self.granularity, app=self)
-                    elif self.exchange == Exchange.COINBASEPRO:
-                        self.websocket_connection = CWebSocketClient([self.market], self.granularity, app=self)
-                    elif self.exchange == Exchange.KUCOIN:
-                        self.websocket_connection = KWebSocketClient([self.market], self.granularity, app=self)
-                    self.websocket_connection.start()
+                # in place, the candles and the websocket are kept
+                self.config_reloader.reload()
 
                 list(map(self.s.cancel, self.s.queue))
                 self.s.enter(
@@ -202,6 +235,9 @@ class PyCryptoBot(BotConfig):
                 self.websocket_connection.close()
                 RichText.notify("Starting websocket...", self, "normal")
                 self.websocket_connection.start()
+                if self.user_data_stream is not None:
+                    # Binance drops stream connections after 24 hours too
+                    self.start_user_data_stream()
                 RichText.notify("Restarting job in 30 seconds...", self, "normal")
                 self.s.enter(
                     30,
@@ -345,9 +381,12 @@ class PyCryptoBot(BotConfig):
                     _technical_analysis = TechnicalAnalysis(trading_dataCopy, self.adjusttotalperiods, app=self)
 
                     # if 'bool(self.df_last["morning_star"].values[0])' not in df:
-                    _technical_analysis.add_all()
+                    with metrics.time("pycryptobot_phase_seconds", phase="indicators"):
+                        _technical_analysis.add_all()
 
                     df = _technical_analysis.get_df()
+                    if self.compactframes:
+                        compact_indicators(df)
 
                     self.sim_smartswitch = False
 
@@ -356,14 +395,21 @@ class PyCryptoBot(BotConfig):
                 _technical_analysis = TechnicalAnalysis(trading_dataCopy, self.adjusttotalperiods, app=self)
 
                 if "morning_star" not in df:
-                    _technical_analysis.add_all()
+                    with metrics.time("pycryptobot_phase_seconds", phase="indicators"):
+                        _technical_analysis.add_all()
 
                 df = _technical_analysis.get_df()
+                if self.compactframes:
+                    compact_indicators(df)
 
         else:
             _technical_analysis = TechnicalAnalysis(self.trading_data, len(self.trading_data), app=self)
-            _technical_analysis.add_all()
+            with metrics.time("pycryptobot_phase_seconds", phase="indicators"):
+                _technical_analysis.add_all()
             df = _technical_analysis.get_df()
+            # compacted where the indicators are added, a simulation reuses this frame on every later tick
+            if self.compactframes:
+                compact_indicators(df)
 
         if self.is_sim:
             self.df_last = self.get_interval(df, self.state.iterations)
@@ -636,18 +682,23 @@ class PyCryptoBot(BotConfig):
             if not self.disablebuyobv:
                 self.telegram_bot.add_indicators("OBV", float(obv_pc) > 0)
 
+            # candles up to the current (sim) date, used for the strategy and the DF high/low of tracked trades
+            sim_window = self.get_sim_window(df)
+            sim_window.seek(current_sim_date, self.state.iterations)
+
             if self.is_sim:
                 # Reset the Strategy so that the last record is the current sim date
                 # To allow for calculations to be done on the sim date being processed
-                sdf = df[df["date"] <= current_sim_date].tail(self.adjusttotalperiods)
-                strategy = Strategy(self, self.state, sdf, sdf.index.get_loc(str(current_sim_date)) + 1)
+                sdf = sim_window.window(self.adjusttotalperiods)
+                strategy = Strategy(self, self.state, sdf, len(sdf), history=df)
             else:
                 strategy = Strategy(self, self.state, df)
 
             trailing_action_logtext = ""
 
             # determine current action, indicatorvalues will be empty if custom Strategy are disabled or it's debug is False
-            self.state.action, indicatorvalues = strategy.get_action(self.state, self.price, current_sim_date, self.websocket_connection)
+            with metrics.time("pycryptobot_phase_seconds", phase="strategy"):
+                self.state.action, indicatorvalues = strategy.get_action(self.state, self.price, current_sim_date, self.websocket_connection)
 
             immediate_action = False
             margin, profit, sell_fee, change_pcnt_high = 0, 0, 0, 0
@@ -655,7 +706,9 @@ class PyCryptoBot(BotConfig):
             # Reset the TA so that the last record is the current sim date
             # To allow for calculations to be done on the sim date being processed
             if self.is_sim:
-                trading_dataCopy = self.trading_data[self.trading_data["date"] <= current_sim_date].tail(self.adjusttotalperiods).copy()
+                trading_window = self.get_sim_window(self.trading_data)
+                trading_window.seek(current_sim_date, self.state.iterations)
+                trading_dataCopy = trading_window.window(self.adjusttotalperiods).copy()
                 _technical_analysis = TechnicalAnalysis(trading_dataCopy, self.adjusttotalperiods, app=self)
 
             if self.state.last_buy_size > 0 and self.state.last_buy_price > 0 and self.price > 0 and self.state.last_action == "BUY":
@@ -760,18 +813,15 @@ class PyCryptoBot(BotConfig):
                     if candlestick_status == "":
                         return
 
-                    self.table_console = Table(title=None, box=None, show_header=False, show_footer=False)
-                    self.table_console.add_row(
-                        RichText.styled_text("Bot1", "magenta"),
-                        RichText.styled_text(formatted_current_df_index, "white"),
-                        RichText.styled_text(self.market, "yellow"),
-                        RichText.styled_text(self.print_granularity(), "yellow"),
-                        RichText.styled_text(candlestick_status, "violet"),
+                    self.output.row(
+                        [
+                            RichText.styled_text("Bot1", "magenta"),
+                            RichText.styled_text(formatted_current_df_index, "white"),
+                            RichText.styled_text(self.market, "yellow"),
+                            RichText.styled_text(self.print_granularity(), "yellow"),
+                            RichText.styled_text(candlestick_status, "violet"),
+                        ]
                     )
-                    self.console_term.print(self.table_console)
-                    if self.disablelog is False:
-                        self.console_log.print(self.table_console)
-                    self.table_console = Table(title=None, box=None, show_header=False, show_footer=False)  # clear table
 
                 def _notify(notification: str = "", level: str = "normal") -> None:
                     if notification == "":
@@ -788,22 +838,20 @@ class PyCryptoBot(BotConfig):
                     else:
                         color = "violet"
 
-                    self.table_console = Table(title=None, box=None, show_header=False, show_footer=False)
-                    self.table_console.add_row(
-                        RichText.styled_text("Bot1", "magenta"),
-                        RichText.styled_text(formatted_current_df_index, "white"),
-                        RichText.styled_text(self.market, "yellow"),
-                        RichText.styled_text(self.print_granularity(), "yellow"),
-                        RichText.styled_text(notification, color),
+                    self.output.row(
+                        [
+                            RichText.styled_text("Bot1", "magenta"),
+                            RichText.styled_text(formatted_current_df_index, "white"),
+                            RichText.styled_text(self.market, "yellow"),
+                            RichText.styled_text(self.print_granularity(), "yellow"),
+                            RichText.styled_text(notification, color),
+                        ],
+                        level,
                     )
-                    self.console_term.print(self.table_console)
-                    if self.disablelog is False:
-                        self.console_log.print(self.table_console)
-                    self.table_console = Table(title=None, box=None, show_header=False, show_footer=False)  # clear table
 
                 if not self.is_sim:
-                    df_high = df[df["date"] <= current_sim_date]["close"].max()
-                    df_low = df[df["date"] <= current_sim_date]["close"].min()
+                    df_high = sim_window.high()
+                    df_low = sim_window.low()
                     range_start = str(df.iloc[0, 0])
                     range_end = str(df.iloc[len(df) - 1, 0])
                 else:
@@ -899,20 +947,28 @@ class PyCryptoBot(BotConfig):
                 ]
 
                 if not self.is_sim or (self.is_sim and not self.simresultonly):
-                    self.table_console.add_row(*args)
-                    self.console_term.print(self.table_console)
-                    if self.disablelog is False:
-                        self.console_log.print(self.table_console)
-                    self.table_console = Table(title=None, box=None, show_header=False, show_footer=False)  # clear table
+                    self.output.row(
+                        args,
+                        price=self.price,
+                        action=self.state.action,
+                        last_action=self.state.last_action,
+                        margin=margin_text,
+                        df_high=df_high,
+                        df_low=df_low,
+                    )
 
                     if self.enableml:
                         # Seasonal Autoregressive Integrated Moving Average (ARIMA) model (ML prediction for 3 intervals from now)
                         if not self.is_sim:
                             try:
-                                prediction = _technical_analysis.arima_model_prediction(int(self.granularity.to_integer / 60) * 3)  # 3 intervals from now
-                                _notify(
-                                    f"Seasonal ARIMA model predicts the closing self.price will be {str(round(prediction[1], 2))} at {prediction[0]} (delta: {round(prediction[1] - self.price, 2)})"
-                                )
+                                # fitted in the background once per candle, nothing is shown until the first fit is ready
+                                prediction = _technical_analysis.seasonal_arima_model_prediction(
+                                    int(self.granularity.to_integer / 60) * 3, wait=False
+                                )  # 3 intervals from now
+                                if prediction is not None:
+                                    _notify(
+                                        f"Seasonal ARIMA model predicts the closing self.price will be {str(round(prediction[1], 2))} at {prediction[0]} (delta: {round(prediction[1] - self.price, 2)})"
+                                    )
                             except Exception:
                                 pass
 
@@ -1115,23 +1171,15 @@ class PyCryptoBot(BotConfig):
                                 self.state.fib_low = bands[first_key]
                                 self.state.fib_high = bands[second_key]
 
-                        self.trade_tracker = pd.concat(
-                            [
-                                self.trade_tracker,
-                                pd.DataFrame(
-                                    {
-                                        "Datetime": str(current_sim_date),
-                                        "Market": self.market,
-                                        "Action": "BUY",
-                                        "Price": self.price,
-                                        "Quote": self.state.last_buy_size,
-                                        "Base": float(self.state.last_buy_size) / float(self.price),
-                                        "DF_High": df[df["date"] <= current_sim_date]["close"].max(),
-                                        "DF_Low": df[df["date"] <= current_sim_date]["close"].min(),
-                                    },
-                                    index=[0],
-                                ),
-                            ],
+                        self.trade_tracker.append(
+                            Datetime=str(current_sim_date),
+                            Market=self.market,
+                            Action="BUY",
+                            Price=self.price,
+                            Quote=self.state.last_buy_size,
+                            Base=float(self.state.last_buy_size) / float(self.price),
+                            DF_High=sim_window.high(),
+                            DF_Low=sim_window.low(),
                         )
 
                         self.state.in_open_trade = True
@@ -1142,14 +1190,8 @@ class PyCryptoBot(BotConfig):
                         if self.adjusttotalperiods < 200:
                             _notify("Trading Graphs can only be generated when dataframe has more than 200 periods.")
                         else:
-                            tradinggraphs = TradingGraphs(_technical_analysis, self)
-                            ts = datetime.now().timestamp()
-                            filename = f"{self.market}_{self.print_granularity()}_buy_{str(ts)}.png"
                             # This allows graphs to be used in sim mode using the correct DF
-                            if self.is_sim:
-                                tradinggraphs.render_ema_and_macd(len(trading_dataCopy), "graphs/" + filename, True)
-                            else:
-                                tradinggraphs.render_ema_and_macd(len(trading_data), "graphs/" + filename, True)
+                            self.save_trade_graph(_technical_analysis, "buy", len(trading_dataCopy) if self.is_sim else len(trading_data))
 
                 # if a sell signal
                 elif self.state.action == "SELL":
@@ -1348,26 +1390,18 @@ class PyCryptoBot(BotConfig):
                                 "info",
                             )
 
-                        self.trade_tracker = pd.concat(
-                            [
-                                self.trade_tracker,
-                                pd.DataFrame(
-                                    {
-                                        "Datetime": str(current_sim_date),
-                                        "Market": self.market,
-                                        "Action": "SELL",
-                                        "Price": self.price,
-                                        "Quote": self.state.last_sell_size,
-                                        "Base": self.state.last_buy_filled,
-                                        "Margin": margin,
-                                        "Profit": profit,
-                                        "Fee": sell_fee,
-                                        "DF_High": df[df["date"] <= current_sim_date]["close"].max(),
-                                        "DF_Low": df[df["date"] <= current_sim_date]["close"].min(),
-                                    },
-                                    index=[0],
-                                ),
-                            ],
+                        self.trade_tracker.append(
+                            Datetime=str(current_sim_date),
+                            Market=self.market,
+                            Action="SELL",
+                            Price=self.price,
+                            Quote=self.state.last_sell_size,
+                            Base=self.state.last_buy_filled,
+                            Margin=margin,
+                            Profit=profit,
+                            Fee=sell_fee,
+                            DF_High=sim_window.high(),
+                            DF_Low=sim_window.low(),
                         )
 
                         self.state.in_open_trade = False
@@ -1391,14 +1425,8 @@ class PyCryptoBot(BotConfig):
                         self.state.action = "DONE"
 
                     if self.save_graphs:
-                        tradinggraphs = TradingGraphs(_technical_analysis, self)
-                        ts = datetime.now().timestamp()
-                        filename = f"{self.market}_{self.print_granularity()}_sell_{str(ts)}.png"
                         # This allows graphs to be used in sim mode using the correct DF
-                        if self.is_sim:
-                            tradinggraphs.render_ema_and_macd(len(trading_dataCopy), "graphs/" + filename, True)
-                        else:
-                            tradinggraphs.render_ema_and_macd(len(trading_data), "graphs/" + filename, True)
+                        self.save_trade_graph(_technical_analysis, "sell", len(trading_dataCopy) if self.is_sim else len(trading_data))
 
                     if self.exitaftersell:
                         RichText.notify("Exit after sell! (\"exitaftersell\" is enabled)", self, "warning")
@@ -1407,7 +1435,7 @@ class PyCryptoBot(BotConfig):
             self.state.last_df_index = str(self.df_last.index.format()[0])
 
             if self.logbuysellinjson is True and self.state.action == "DONE" and len(self.trade_tracker) > 0:
-                _notify(self.trade_tracker.loc[len(self.trade_tracker) - 1].to_json())
+                _notify(self.trade_tracker.row(-1).to_json())
 
             if self.state.action == "DONE" and indicatorvalues != "" and not self.disabletelegram:
                 self.notify_telegram(indicatorvalues)
@@ -1416,6 +1444,8 @@ class PyCryptoBot(BotConfig):
             if self.is_sim and self.state.iterations == len(df):
                 self._simulation_summary()
                 self._simulation_save_orders()
+                if self.chart_renderer is not None:
+                    self.chart_renderer.flush()
 
         if self.state.last_buy_size <= 0 and self.state.last_buy_price <= 0 and self.price <= 0 and self.state.last_action != "BUY":
             self.telegram_bot.add_info(
@@ -1520,21 +1550,21 @@ class PyCryptoBot(BotConfig):
                     RichText.notify("Opening websocket to Coinbase Pro", self, "normal")
                     print("")
                     self.websocket_connection = CWebSocketClient([self.market], self.granularity, app=self)
-                    self.websocket_connection.start()
+                    self.start_websocket()
             elif self.exchange == Exchange.BINANCE:
                 message += "Binance bot"
                 if self.websocket and not self.is_sim:
                     RichText.notify("Opening websocket to Binance", self, "normal")
                     print("")
                     self.websocket_connection = BWebSocketClient([self.market], self.granularity, app=self)
-                    self.websocket_connection.start()
+                    self.start_websocket()
             elif self.exchange == Exchange.KUCOIN:
                 message += "Kucoin bot"
                 if self.websocket and not self.is_sim:
                     RichText.notify("Opening websocket to Kucoin", self, "normal")
                     print("")
                     self.websocket_connection = KWebSocketClient([self.market], self.granularit, app=self)
-                    self.websocket_connection.start()
+                    self.start_websocket()
 
             smartswitchstatus = "enabled" if self.smart_switch else "disabled"
             message += f" for {self.market} using granularity {self.print_granularity()}. Smartswitch {smartswitchstatus}"
@@ -1545,6 +1575,9 @@ class PyCryptoBot(BotConfig):
             # initialise and start application
             self.initialise()
 
+            if not self.is_sim:
+                self.config_reloader = ConfigReloader(self)
+
             if self.is_sim and self.simenddate:
                 try:
                     # if simenddate is set, then remove trailing data points
@@ -1595,6 +1628,10 @@ class PyCryptoBot(BotConfig):
                         self.websocket_connection.close()
                     except Exception:
                         pass
+                try:
+                    self.close_user_data_stream()
+                except Exception:
+                    pass
                 sys.exit(0)
             except SystemExit:
                 # pylint: disable=protected-access
@@ -1612,8 +1649,11 @@ class PyCryptoBot(BotConfig):
             os._exit(0)
             # raise
 
+    @metrics.timed("pycryptobot_phase_seconds", phase="orders")
     def market_buy(self, market, quote_currency, buy_percent=100):
         if self.is_live is True:
+            self.account.cache.invalidate()
+
             if isinstance(buy_percent, int):
                 if buy_percent > 0 and buy_percent < 100:
                     quote_currency = (buy_percent / 100) * quote_currency
@@ -1630,8 +1670,11 @@ class PyCryptoBot(BotConfig):
             else:
                 return None
 
+    @metrics.timed("pycryptobot_phase_seconds", phase="orders")
     def market_sell(self, market, base_currency, sell_percent=100):
         if self.is_live is True:
+            self.account.cache.invalidate()
+
             if isinstance(sell_percent, int):
                 if sell_percent > 0 and sell_percent < 100:
                     base_currency = (sell_percent / 100) * base_currency
@@ -1647,6 +1690,71 @@ class PyCryptoBot(BotConfig):
             else:
                 return None
 
+    def save_trade_graph(self, technical_analysis, action: str, period: int) -> None:
+        """Queues the EMA and MACD chart of a trade, simulations render all of theirs when they finish"""
+
+        if self.chart_renderer is None:
+            self.chart_renderer = ChartRenderer(background=not self.is_sim)
+
+        filename = f"{self.market}_{self.print_granularity()}_{action}_{str(datetime.now().timestamp())}.png"
+        self.chart_renderer.submit_ema_and_macd(technical_analysis.get_df(), period, "graphs/" + filename)
+
+    def start_websocket(self) -> None:
+        """Starts the websocket, appending its raw frames to the --websocketrecord recording if one was given"""
+
+        if self.websocketrecord:
+            if self.websocket_recorder is None:
+                if os.path.dirname(self.websocketrecord):
+                    os.makedirs(os.path.dirname(self.websocketrecord), exist_ok=True)
+                self.websocket_recorder = FrameRecorder(self.websocketrecord)
+            self.websocket_connection.recorder = self.websocket_recorder
+
+        self.websocket_connection.start()
+
+    def start_user_data_stream(self) -> None:
+        """(Re)starts streaming Binance balance and order events into the account cache, the cache polls the exchange if it can't start"""
+
+        self.close_user_data_stream()
+        try:
+            self.user_data_stream = BUserDataStream(self.api_key, self.account.cache, self.api_url, app=self)
+            self.user_data_stream.start()
+        except Exception as err:  # pylint: disable=broad-except
+            self.user_data_stream = None
+            RichText.notify(f"Unable to start the user data stream, polling the exchange instead: {err}", self, "warning")
+
+    def close_user_data_stream(self) -> None:
+        if self.user_data_stream is not None:
+            self.user_data_stream.close()
+            self.user_data_stream = None
+
+    def dump_metrics(self) -> None:
+        """Writes the metrics to metrics/<market>.json, at most once every metrics interval"""
+
+        if not self.metricsjson:
+            return
+
+        now = time.monotonic()
+        if now - self.metrics_dumped < METRICS_INTERVAL:
+            return
+
+        self.metrics_dumped = now
+        metrics.dump_json(os.path.join("metrics", f"{self.market}.json"))
+
+    def start_profiler(self, duration: int = 0) -> None:
+        """Samples the running bot and writes profiles/<market>-<time>.collapsed when done"""
+
+        duration = duration or self.profile or PROFILE_DURATION
+
+        def on_complete(filepath: str) -> None:
+            RichText.notify(f"Profile written to {filepath}", self, "normal")
+            self.notify_telegram(f"{self.market} profile written to {filepath}")
+
+        if self.profiler.start(self.market, duration, on_complete):
+            RichText.notify(f"Profiling {self.market} for {duration} seconds", self, "normal")
+        else:
+            RichText.notify(f"Profiler already running for {self.market}", self, "warning")
+
+    @metrics.timed("pycryptobot_phase_seconds", phase="notifications")
     def notify_telegram(self, msg: str) -> None:
         """
         Send a given message to preconfigured Telegram. If the telegram isn't enabled, e.g. via `--disabletelegram`,
@@ -1661,10 +1769,25 @@ class PyCryptoBot(BotConfig):
         self._chat_client.send(msg)
 
     def initialise(self, banner=True):
+        if self.is_live:
+            self.prefetch_exchange_metadata()
+
+        if self.metricsport > 0:
+            try:
+                metrics.serve(self.metricsport)
+            except OSError as err:
+                RichText.notify(f"Unable to serve metrics on port {self.metricsport}: {err}", self, "warning")
+
+        if self.profile > 0:
+            self.start_profiler(self.profile)
+
         self.account = TradingAccount(self)
         Stats(self, self.account).show()
         self.state = AppState(self, self.account)
 
+        if self.is_live and self.userdatastream and self.exchange == Exchange.BINANCE:
+            self.start_user_data_stream()
+
         self.state.init_last_action()
 
         if self.is_sim:
@@ -1983,10 +2106,9 @@ class PyCryptoBot(BotConfig):
         if self.simresultonly:
             print(json.dumps(simulation, sort_keys=True, indent=4))
         else:
+            self.output.flush()
             print("")  # blank line above table
-            self.console_term.print(table)
-            if self.disablelog is False:
-                self.console_log.print(table)
+            self.output.print(table)
             print("")  # blank line below table
 
         return simulation
@@ -2547,9 +2669,7 @@ class PyCryptoBot(BotConfig):
             arg_name="bbands_s2",
         )
 
-        self.console_term.print(table)
-        if self.disablelog is False:
-            self.console_log.print(table)
+        self.output.print(table)
 
     def get_date_from_iso8601_str(self, date: str):
         # if date passed from datetime.now() remove milliseconds
@@ -2606,18 +2726,16 @@ class PyCryptoBot(BotConfig):
             else:
                 color = "violet"
 
-            self.table_console = Table(title=None, box=None, show_header=False, show_footer=False)
-            self.table_console.add_row(
-                RichText.styled_text("Bot1", "magenta"),
-                RichText.styled_text(datetime.today().strftime("%Y-%m-%d %H:%M:%S"), "white"),
-                RichText.styled_text(self.market, "yellow"),
-                RichText.styled_text(self.print_granularity(), "yellow"),
-                RichText.styled_text(notification, color),
+            self.output.row(
+                [
+                    RichText.styled_text("Bot1", "magenta"),
+                    RichText.styled_text(datetime.today().strftime("%Y-%m-%d %H:%M:%S"), "white"),
+                    RichText.styled_text(self.market, "yellow"),
+                    RichText.styled_text(self.print_granularity(), "yellow"),
+                    RichText.styled_text(notification, color),
+                ],
+                level,
             )
-            self.console_term.print(self.table_console)
-            if self.disablelog is False:
-                self.console_log.print(self.table_console)
-            self.table_console = Table(title=None, box=None, show_header=False, show_footer=False)  # clear table
 
         if self.is_sim:
             df_first = None
@@ -2787,6 +2905,7 @@ class PyCryptoBot(BotConfig):
 
         return result_df
 
+    @metrics.timed("pycryptobot_phase_seconds", phase="data")
     def get_historical_data(
         self,
         market,
@@ -2810,14 +2929,14 @@ class PyCryptoBot(BotConfig):
             api = CBPublicAPI(app=self)
 
         if iso8601start != "" and iso8601end == "" and self.exchange != Exchange.BINANCE:
-            return api.get_historical_data(
+            df = api.get_historical_data(
                 market,
                 granularity,
                 None,
                 iso8601start,
             )
         elif iso8601start != "" and iso8601end != "":
-            return api.get_historical_data(
+            df = api.get_historical_data(
                 market,
                 granularity,
                 None,
@@ -2825,8 +2944,13 @@ class PyCryptoBot(BotConfig):
                 iso8601end,
             )
         else:
-            return api.get_historical_data(market, granularity, websocket)
+            df = api.get_historical_data(market, granularity, websocket)
+
+        if self.compactframes and isinstance(df, pd.DataFrame):
+            compact_candles(df)
+        return df
 
+    @metrics.timed("pycryptobot_phase_seconds", phase="data")
     def get_ticker(self, market, websocket):
         if self.exchange == Exchange.BINANCE:
             api = BPublicAPI(api_url=self.api_url, app=self)
@@ -2852,6 +2976,16 @@ class PyCryptoBot(BotConfig):
         else:
             return ""
 
+    def get_sim_window(self, df: pd.DataFrame) -> SimulationWindow:
+        # reuse the cursor and precomputed highs/lows until the simulation data is replaced (e.g. smart switch)
+        for sim_window in self.sim_windows:
+            if sim_window.df is df:
+                return sim_window
+
+        sim_window = SimulationWindow(df)
+        self.sim_windows = [sim_window] + self.sim_windows[:1]
+        return sim_window
+
     def get_interval(self, df: pd.DataFrame = pd.DataFrame(), iterations: int = 0) -> pd.DataFrame:
         if len(df) == 0:
             return df
@@ -2973,7 +3107,7 @@ class PyCryptoBot(BotConfig):
                     datetime.timestamp(datetime.utcnow()) - granularity.to_integer >= datetime.timestamp(df["date"].iloc[row])
                 )
             ):
-                df = self.get_historical_data(self.market, self.granularity, self.websocket_connection)
+                df = self.get_historical_data(self.market, granularity, self.websocket_connection)
                 row = -1
             else:
                 # if ticker hasn't run yet or hasn't updated, return the original df
@@ -3036,69 +3170,35 @@ class PyCryptoBot(BotConfig):
             # not live, return None
             return None
 
+        if self.exchange not in [Exchange.COINBASEPRO, Exchange.KUCOIN, Exchange.BINANCE]:
+            return None
+
         try:
-            if self.exchange == Exchange.COINBASEPRO:
-                api = CBAuthAPI(self.api_key, self.api_secret, self.api_passphrase, self.api_url, app=self)
-                orders = api.get_orders(self.market, "", "done")
-
-                if len(orders) == 0:
-                    return None
-
-                last_order = orders.tail(1)
-                if last_order["action"].values[0] != "buy":
-                    return None
-
-                return {
-                    "side": "buy",
-                    "market": self.market,
-                    "size": float(last_order["size"]),
-                    "filled": float(last_order["filled"]),
-                    "price": float(last_order["price"]),
-                    "fee": float(last_order["fees"]),
-                    "date": str(pd.DatetimeIndex(pd.to_datetime(last_order["created_at"]).dt.strftime("%Y-%m-%dT%H:%M:%S.%Z"))[0]),
-                }
-            elif self.exchange == Exchange.KUCOIN:
-                api = KAuthAPI(self.api_key, self.api_secret, self.api_passphrase, self.api_url, use_cache=self.usekucoincache, app=self)
-                orders = api.get_orders(self.market, "", "done")
-
-                if len(orders) == 0:
-                    return None
-
-                last_order = orders.tail(1)
-                if last_order["action"].values[0] != "buy":
-                    return None
-
-                return {
-                    "side": "buy",
-                    "market": self.market,
-                    "size": float(last_order["size"]),
-                    "filled": float(last_order["filled"]),
-                    "price": float(last_order["price"]),
-                    "fee": float(last_order["fees"]),
-                    "date": str(pd.DatetimeIndex(pd.to_datetime(last_order["created_at"]).dt.strftime("%Y-%m-%dT%H:%M:%S.%Z"))[0]),
-                }
-            elif self.exchange == Exchange.BINANCE:
-                api = BAuthAPI(self.api_key, self.api_secret, self.api_url, recv_window=self.recv_window, app=self)
-                orders = api.get_orders(self.market)
-
-                if len(orders) == 0:
-                    return None
-
-                last_order = orders.tail(1)
-                if last_order["action"].values[0] != "buy":
-                    return None
-
-                return {
-                    "side": "buy",
-                    "market": self.market,
-                    "size": float(last_order["size"]),
-                    "filled": float(last_order["filled"]),
-                    "price": float(last_order["price"]),
-                    "fees": float(last_order["size"] * 0.001),
-                    "date": str(pd.DatetimeIndex(pd.to_datetime(last_order["created_at"]).dt.strftime("%Y-%m-%dT%H:%M:%S.%Z"))[0]),
-                }
-            else:
+            # served from the account cache, only refreshed from the exchange when it can have changed
+            orders = self.account.cache.get_orders(self.market)
+
+            if len(orders) == 0:
+                return None
+
+            last_order = orders.tail(1)
+            if last_order["action"].values[0] != "buy":
                 return None
+
+            last_buy = {
+                "side": "buy",
+                "market": self.market,
+                "size": float(last_order["size"]),
+                "filled": float(last_order["filled"]),
+                "price": float(last_order["price"]),
+            }
+
+            if self.exchange == Exchange.BINANCE:
+                last_buy["fees"] = float(last_order["size"].astype(float) * 0.001)
+            else:
+                last_buy["fee"] = float(last_order["fees"])
+
+            last_buy["date"] = str(pd.DatetimeIndex(pd.to_datetime(last_order["created_at"]).dt.strftime("%Y-%m-%dT%H:%M:%S.%Z"))[0])
+            return last_buy
         except Exception:
             return None
 
@@ -3160,16 +3260,45 @@ class PyCryptoBot(BotConfig):
             return self.makerfee
         elif self.exchange == Exchange.COINBASEPRO:
             api = CBAuthAPI(self.api_key, self.api_secret, self.api_passphrase, self.api_url, app=self)
-            return api.get_maker_fee()
+            self.makerfee = api.get_maker_fee()
+            return self.makerfee
         elif self.exchange == Exchange.BINANCE:
             api = BAuthAPI(self.api_key, self.api_secret, self.api_url, recv_window=self.recv_window, app=self)
-            return api.get_maker_fee(self.get_market())
+            self.makerfee = api.get_maker_fee(self.get_market())
+            return self.makerfee
         elif self.exchange == Exchange.KUCOIN:
             api = KAuthAPI(self.api_key, self.api_secret, self.api_passphrase, self.api_url, use_cache=self.usekucoincache, app=self)
-            return api.get_maker_fee()
+            self.makerfee = api.get_maker_fee()
+            return self.makerfee
         else:
             return 0.005
 
+    def prefetch_exchange_metadata(self) -> threading.Thread:
+        """Warms the exchange metadata cache (fees, filters, increments) in the background so orders don't wait on it"""
+
+        def _prefetch():
+            try:
+                if self.exchange == Exchange.COINBASEPRO:
+                    api = CBAuthAPI(self.api_key, self.api_secret, self.api_passphrase, self.api_url, app=self)
+                    api.get_fees(self.market)
+                    api.get_market_increments(self.market)
+                elif self.exchange == Exchange.BINANCE:
+                    api = BAuthAPI(self.api_key, self.api_secret, self.api_url, recv_window=self.recv_window, app=self)
+                    api.get_fees(self.market)
+                    api.get_market_info_filters(self.market)
+                    api.get_trade_fee(self.market)
+                elif self.exchange == Exchange.KUCOIN:
+                    api = KAuthAPI(self.api_key, self.api_secret, self.api_passphrase, self.api_url, use_cache=self.usekucoincache, app=self)
+                    api.get_fees(self.market)
+                    api.get_symbols()
+                    api.get_trade_fee(self.market)
+            except Exception:  # pylint: disable=broad-except
+                pass
+
+        thread = threading.Thread(target=_prefetch, daemon=True)
+        thread.start()
+        return thread
+
     def get_buy_percent(self):
         try:
             return int(self.buypercent)
@@ -0,0 +1,49 @@
+"""Ticks per second of the status line in each console output format"""
+
+import os
+import sys
+import time
+
+from rich.console import Console
+
+sys.path.append(".")
+# pylint: disable=import-error
+from views.PyCryptoBot import ConsoleOutput, RichText  # noqa: E402
+
+TICKS = 2000
+
+
+def status_row(tick: int) -> list:
+    price = 20000 + tick % 100
+    return [
+        RichText.styled_text("Bot1", "magenta"),
+        RichText.styled_text("2022-01-01 00:00:00", "white"),
+        RichText.styled_text("BTC-USDT", "yellow"),
+        RichText.styled_text("1h", "yellow"),
+        RichText.styled_text(str(price), "white"),
+        RichText.bull_bear(True),
+        RichText.number_comparison("EMA12/26:", 20010.5, 20002.25),
+        RichText.number_comparison("MACD:", 12.5, 10.25),
+        RichText.on_balance_volume(1234.5, 2),
+        RichText.action_text("WAIT"),
+        RichText.last_action_text("BUY"),
+        RichText.styled_label_text("DF-H/L", "white", "20500 / 19500 (5.13%)", "cyan"),
+        RichText.styled_label_text("Near-High", "white", "-2.4%", "cyan"),
+        RichText.margin_text("1.25%", "BUY"),
+        RichText.delta_text(price, 19800.0, 2, "BUY"),
+    ]
+
+
+def ticks_per_second(log_format: str) -> float:
+    with open(os.devnull, "w") as term, open(os.devnull, "w") as log:
+        output = ConsoleOutput(Console(file=term, width=180), Console(file=log, no_color=True, width=180), log_format)
+        start = time.perf_counter()
+        for tick in range(TICKS):
+            output.row(status_row(tick), price=20000 + tick % 100, action="WAIT")
+        output.flush()
+        return TICKS / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    for log_format in ["rich", "plain", "json"]:
+        print(f"{log_format:>6}: {ticks_per_second(log_format):10.0f} ticks/sec")
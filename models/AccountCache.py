@@ -0,0 +1,125 @@
+"""Live account balances and orders kept current between ticks"""
+
+import threading
+import time
+
+import pandas as pd
+
+ORDER_COLUMNS = ["created_at", "market", "action", "type", "size", "filled", "fees", "price", "status"]
+
+
+class AccountCache:
+    def __init__(self, fetch_balance, fetch_orders, resync_interval: float = 900, settle_time: float = 60, clock=time.monotonic) -> None:
+        """Balances and done orders fetched once, then updated from events instead of polled every tick
+
+        Parameters
+        ----------
+        fetch_balance : callable
+            Returns all balances as a DataFrame (currency, balance, hold, available)
+        fetch_orders : callable
+            Takes a market and returns its done orders as a DataFrame
+        resync_interval : float
+            Seconds between safety net refreshes from the exchange
+        settle_time : float
+            Seconds after placing an order during which reads go to the exchange, until the order settles
+        clock : callable
+            Time source, replaceable in tests
+        """
+
+        self.fetch_balance = fetch_balance
+        self.fetch_orders = fetch_orders
+        self.resync_interval = resync_interval
+        self.settle_time = settle_time
+        self.clock = clock
+        self.streaming = False
+
+        self._balance = None
+        self._balance_time = None
+        self._orders = {}  # market -> (fetched, DataFrame)
+        self._settle_until = None
+        self._lock = threading.RLock()
+
+    def _is_stale(self, fetched) -> bool:
+        if fetched is None:
+            return True
+
+        # a user data stream keeps the cache current, otherwise fall back to refreshing from the exchange
+        if self.streaming:
+            return False
+
+        now = self.clock()
+        if self._settle_until is not None and now < self._settle_until:
+            return True
+        return now - fetched >= self.resync_interval
+
+    def get_balance(self) -> pd.DataFrame:
+        """All balances, from the exchange only when missing or stale"""
+
+        with self._lock:
+            if self._is_stale(self._balance_time):
+                balance = self.fetch_balance()
+                if isinstance(balance, pd.DataFrame) and len(balance) > 0:
+                    self._balance = balance.reset_index(drop=True)
+                    self._balance_time = self.clock()
+                elif self._balance is None:
+                    return balance
+
+            return self._balance
+
+    def get_orders(self, market: str) -> pd.DataFrame:
+        """Done orders for a market, oldest first"""
+
+        with self._lock:
+            fetched, orders = self._orders.get(market, (None, None))
+            if self._is_stale(fetched):
+                latest = self.fetch_orders(market)
+                if isinstance(latest, pd.DataFrame):
+                    orders = latest.reset_index(drop=True)
+                    self._orders[market] = (self.clock(), orders)
+                elif orders is None:
+                    return latest
+
+            return orders
+
+    def invalidate(self) -> None:
+        """Called when we place an order, without a stream reads go to the exchange until it has settled"""
+
+        with self._lock:
+            if self.streaming:
+                return
+
+            self._settle_until = self.clock() + self.settle_time
+            self._balance_time = None
+            self._orders = {market: (None, orders) for market, (_, orders) in self._orders.items()}
+
+    def apply_balances(self, balances: dict) -> None:
+        """Updates balances from an account event, `balances` maps currency to (free, locked)"""
+
+        with self._lock:
+            if self._balance is None:
+                return
+
+            rows = {row["currency"]: row for row in self._balance.to_dict("records")}
+            for currency, (free, locked) in balances.items():
+                rows[currency] = {
+                    **rows.get(currency, {}),
+                    "currency": currency,
+                    "balance": float(free) + float(locked),
+                    "hold": float(locked),
+                    "available": float(free),
+                }
+            self._balance = pd.DataFrame(list(rows.values()))
+
+    def apply_order(self, order: dict) -> None:
+        """Appends a done order from an order event to its market's history"""
+
+        with self._lock:
+            fetched, orders = self._orders.get(order["market"], (None, None))
+            if orders is None:
+                return
+
+            row = pd.DataFrame([{column: order.get(column) for column in ORDER_COLUMNS}])
+            if len(orders) > 0 and "created_at" in orders and (orders["created_at"] == row["created_at"][0]).any():
+                return
+
+            self._orders[order["market"]] = (fetched, pd.concat([orders, row], ignore_index=True) if len(orders) else row)
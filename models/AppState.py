@@ -5,11 +5,13 @@ from numpy import array as np_array, min as np_min, ptp as np_ptp
 
 from models.TradingAccount import TradingAccount
 from models.exchange.ExchangesEnum import Exchange
-from models.exchange.binance import AuthAPI as BAuthAPI
-from models.exchange.coinbase_pro import AuthAPI as CAuthAPI
-from models.exchange.kucoin import AuthAPI as KAuthAPI
+from models.exchange.LazyImport import LazyExchangeAPI
 from views.PyCryptoBot import RichText
 
+BAuthAPI = LazyExchangeAPI("binance", "AuthAPI")
+CAuthAPI = LazyExchangeAPI("coinbase_pro", "AuthAPI")
+KAuthAPI = LazyExchangeAPI("kucoin", "AuthAPI")
+
 
 class AppState:
     def __init__(self, app, account: TradingAccount) -> None:
@@ -237,7 +239,7 @@ class AppState:
         base = 0.0
         quote = 0.0
 
-        ac = self.account.get_balance()
+        ac = self.account.cache.get_balance()
         try:
             df_base = ac[ac["currency"] == self.app.base_currency]["available"]
             base = 0.0 if len(df_base) == 0 else float(df_base.values[0])
@@ -246,7 +248,7 @@ class AppState:
             quote = 0.0 if len(df_quote) == 0 else float(df_quote.values[0])
         except Exception:
             pass
-        orders = self.account.get_orders(self.app.market, "", "done")
+        orders = self.account.cache.get_orders(self.app.market)
         if len(orders) > 0:
             last_order = orders[-1:]
 
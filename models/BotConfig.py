@@ -47,6 +47,7 @@ class BotConfig:
             self.term_width = 180
 
         self.log_width = 180
+        self.logformat = "auto"
 
         self.granularity = Granularity.ONE_HOUR
         self.base_currency = "BTC"
@@ -157,6 +158,12 @@ class BotConfig:
         self.sim_smartswitch = False
 
         self.usekucoincache = False
+        self.userdatastream = False
+        self.metricsport = 0
+        self.metricsjson = False
+        self.compactframes = False
+        self.watchconfig = False
+        self.profile = 0
         self.adjusttotalperiods = 300
         self.manual_trades_only = False
 
@@ -165,6 +172,7 @@ class BotConfig:
         self.config_file = kwargs.get("config_file", "config.json")
 
         self.tradesfile = self.cli_args["tradesfile"] if self.cli_args["tradesfile"] else "trades.csv"
+        self.websocketrecord = self.cli_args["websocketrecord"] if self.cli_args["websocketrecord"] else ""
 
         self.config_provided = False
         self.config = {}
@@ -379,6 +387,7 @@ class BotConfig:
         parser.add_argument("--termcolor", type=int, help="Enable terminal UI color")
         parser.add_argument("--termwidth", type=int, help="Set terminal UI width ")
         parser.add_argument("--logwidth", type=int, help="Set terminal log width")
+        parser.add_argument("--logformat", type=str, help="Console and log output: 'auto', 'rich', 'plain' or 'json'")
 
         parser.add_argument("--live", type=int, help="Live order execution")
         parser.add_argument("--graphs", type=int, help="Save graph images of trades")
@@ -396,6 +405,7 @@ class BotConfig:
         parser.add_argument("--api_key_file", type=str, help="Use the API key file at the given location. e.g 'myapi.key'")
         parser.add_argument("--logfile", type=str, help="Use the log file at the given location. e.g 'mymarket.log'")
         parser.add_argument("--tradesfile", type=str, help="Path to file to log trades done during simulation. eg './trades/BTCBUSD-trades.csv")
+        parser.add_argument("--websocketrecord", type=str, help="Append the raw websocket frames to a recording for replay. e.g './recordings/BTCGBP.frames'")
 
         parser.add_argument("--sim", type=str, help="Simulation modes: fast, fast-sample, slow-sample")
         parser.add_argument("--simstartdate", type=str, help="Start date for sample simulation e.g '2021-01-15'")
@@ -425,6 +435,12 @@ class BotConfig:
         parser.add_argument("--recvwindow", type=int, help="Binance exchange API recvwindow, integer between 5000 and 60000")
         parser.add_argument("--lastaction", type=str, help="Manually set the last action performed by the bot (BUY, SELL)")
         parser.add_argument("--kucoincache", type=int, help="Enable the Kucoin cache")
+        parser.add_argument("--userdatastream", type=int, help="Keep balances and orders current from the Binance user data stream")
+        parser.add_argument("--metricsport", type=int, help="Serve Prometheus metrics on this local port, 0 to disable")
+        parser.add_argument("--metricsjson", type=int, help="Write metrics to metrics/<market>.json every minute")
+        parser.add_argument("--compactframes", type=int, help="Keep candles and indicators in categorical, float32 and bool columns to use less memory")
+        parser.add_argument("--watchconfig", type=int, help="Reload the config file when it changes, as well as on SIGHUP")
+        parser.add_argument("--profile", type=int, help="Sample the bot for this many seconds and write profiles/<market>-<time>.collapsed, 0 to disable")
         parser.add_argument("--exitaftersell", type=int, help="Exit the bot after a sell order")
 
         parser.add_argument("--adjusttotalperiods", type=int, help="Adjust data points in historical trading data")
@@ -0,0 +1,350 @@
+"""Technical analysis across many markets at once on markets x time NumPy arrays"""
+
+import warnings
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from pandas import DataFrame
+
+
+class CrossSectionalAnalysis:
+    def __init__(
+        self,
+        markets: list,
+        close: np.ndarray,
+        high: np.ndarray = None,
+        low: np.ndarray = None,
+        open: np.ndarray = None,
+        volume: np.ndarray = None,
+        total_periods: int = 300,
+        index: dict = None,
+    ) -> None:
+        """Cross-sectional Technical Analysis object model
+
+        Indicators are stored per name as (markets, periods) arrays using the TechnicalAnalysis
+        column names (ema12, sma50, rsi14, atr72, macd, signal, bb20_upper, adx14, ...).
+
+        Parameters
+        ----------
+        markets : list
+            Market names, one per row of the arrays
+        close, high, low, open, volume : numpy.ndarray
+            2D float arrays shaped (markets, periods), right-aligned so the last column is the latest
+            candle for every market. Markets with a shorter history are padded on the left with NaN.
+        index : dict
+            Optional market -> DataFrame index of the unpadded candles, used by get_df
+        """
+
+        close = np.asarray(close, dtype="float64")
+        if close.ndim != 2:
+            raise ValueError("close must be a 2D array shaped (markets, periods).")
+
+        if len(markets) != close.shape[0]:
+            raise ValueError("markets must have one entry per row of close.")
+
+        self.markets = list(markets)
+        self.total_periods = total_periods
+        self.ohlcv = {"close": close}
+        self.index = index if index is not None else {}
+
+        for name, values in (("high", high), ("low", low), ("open", open), ("volume", volume)):
+            if values is not None:
+                values = np.asarray(values, dtype="float64")
+                if values.shape != close.shape:
+                    raise ValueError(f"{name} must have the same shape as close.")
+                self.ohlcv[name] = values
+
+        # index of the first valid candle per market
+        self.first_valid = self._first_valid(close)
+
+        self.indicators = {}
+
+    @classmethod
+    def from_dataframes(cls, data: dict, total_periods: int = 300):
+        """Builds the arrays from a dict of market -> TechnicalAnalysis style DataFrame"""
+
+        markets = [market for market, df in data.items() if df is not None and len(df) > 0]
+        width = min(total_periods, max((len(data[market]) for market in markets), default=0))
+
+        arrays = {}
+        for name in ("close", "high", "low", "open", "volume"):
+            if not all(name in data[market] for market in markets):
+                continue
+
+            values = np.full((len(markets), width), np.nan)
+            for row, market in enumerate(markets):
+                column = data[market][name].to_numpy(dtype="float64")[-width:]
+                values[row, width - len(column):] = column
+            arrays[name] = values
+
+        if "close" not in arrays:
+            arrays["close"] = np.empty((len(markets), width))
+
+        index = {market: data[market].index[-width:] for market in markets}
+
+        return cls(markets, total_periods=total_periods, index=index, **arrays)
+
+    @staticmethod
+    def _first_valid(values: np.ndarray) -> np.ndarray:
+        valid = ~np.isnan(values)
+        return np.where(valid.any(axis=1), valid.argmax(axis=1), values.shape[1])
+
+    def _require(self, name: str) -> np.ndarray:
+        if name not in self.ohlcv:
+            raise AttributeError(f"'{name}' array required.")
+        return self.ohlcv[name]
+
+    def _check_period(self, period: int) -> None:
+        if not isinstance(period, int):
+            raise TypeError("Period parameter is not perioderic.")
+
+        if period > self.total_periods or period < 5 or period > 200:
+            raise ValueError("Period is out of range")
+
+    def _has_data(self) -> np.ndarray:
+        """Mask of the candles that are not left padding"""
+
+        return np.arange(self.ohlcv["close"].shape[1]) >= self.first_valid[:, None]
+
+    def _fill(self, values: np.ndarray, fill) -> np.ndarray:
+        """Fills warm-up NaNs on real candles, like Series.fillna, leaving the padding as NaN"""
+
+        if isinstance(fill, np.ndarray) and fill.ndim == 1:
+            fill = fill[:, None]
+        return np.where(np.isnan(values) & self._has_data(), fill, values)
+
+    def _fill_mean(self, values: np.ndarray) -> np.ndarray:
+        """Fills warm-up NaNs with the market's mean, like Series.fillna(Series.mean())"""
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            mean = np.nanmean(values, axis=1) if values.size else np.full(len(self.markets), np.nan)
+        return self._fill(values, mean)
+
+    @staticmethod
+    def _shift(values: np.ndarray, periods: int = 1) -> np.ndarray:
+        shifted = np.full(values.shape, np.nan)
+        shifted[:, periods:] = values[:, :-periods]
+        return shifted
+
+    @staticmethod
+    def _rolling(values: np.ndarray, window: int, func) -> np.ndarray:
+        """Trailing window aggregate per market, NaN until a full window of valid values exists"""
+
+        result = np.full(values.shape, np.nan)
+        if values.shape[1] >= window:
+            result[:, window - 1:] = func(sliding_window_view(values, window, axis=1), axis=-1)
+        return result
+
+    def _ewm(self, values: np.ndarray, alpha: float, min_periods: int = 1) -> np.ndarray:
+        """Recursive EWM started at each market's first valid value, like ewm(adjust=False)"""
+
+        periods = values.shape[1]
+        first_valid = self._first_valid(values)
+
+        ewm = np.full(values.shape, np.nan)
+        rows = np.nonzero(first_valid < periods)[0]
+        ewm[rows, first_valid[rows]] = values[rows, first_valid[rows]]
+
+        for col in range(1, periods):
+            ready = col > first_valid
+            if ready.any():
+                ewm[ready, col] = alpha * values[ready, col] + (1 - alpha) * ewm[ready, col - 1]
+
+        ewm[np.arange(periods) < (first_valid + min_periods - 1)[:, None]] = np.nan
+        return ewm
+
+    def exponential_moving_average(self, period: int, values: np.ndarray = None) -> np.ndarray:
+        """Exponential Moving Average seeded with the SMA of the first period, as pandas_ta"""
+
+        if values is None:
+            values = self._require("close")
+
+        alpha = 2 / (period + 1)
+        periods = values.shape[1]
+        valid = ~np.isnan(values)
+        first_valid = self._first_valid(values)
+        seed_col = first_valid + period - 1
+
+        # NaN until the seed, which is the SMA of the first period values
+        ema = np.full(values.shape, np.nan)
+        rows = np.nonzero(seed_col < periods)[0]
+        if len(rows):
+            csum = np.cumsum(np.where(valid, values, 0.0), axis=1)
+            before = np.where(first_valid[rows] > 0, csum[rows, first_valid[rows] - 1], 0.0)
+            ema[rows, seed_col[rows]] = (csum[rows, seed_col[rows]] - before) / period
+
+        for col in range(1, periods):
+            ready = col > seed_col
+            if ready.any():
+                ema[ready, col] = alpha * values[ready, col] + (1 - alpha) * ema[ready, col - 1]
+
+        return ema
+
+    def add_ema(self, period: int) -> None:
+        """Adds the Exponential Moving Average (EMA) for all markets"""
+
+        self._check_period(period)
+
+        close = self._require("close")
+        self.indicators["ema" + str(period)] = self._fill(self.exponential_moving_average(period), close)
+
+    def add_sma(self, period: int) -> None:
+        """Adds the Simple Moving Average (SMA) for all markets"""
+
+        self._check_period(period)
+
+        close = self._require("close")
+        self.indicators["sma" + str(period)] = self._fill(self._rolling(close, period, np.mean), close)
+
+    def add_rsi(self, period: int = 14) -> None:
+        """Adds the Relative Strength Index (RSI) for all markets"""
+
+        if not isinstance(period, int):
+            raise TypeError("Period parameter is not perioderic.")
+
+        if period < 7 or period > 21:
+            raise ValueError("Period is out of range")
+
+        close = self._require("close")
+        change = close - self._shift(close)
+        gain = np.where(np.isnan(change), np.nan, np.where(change > 0, change, 0.0))
+        loss = np.where(np.isnan(change), np.nan, np.where(change < 0, -change, 0.0))
+
+        # Wilder's smoothing (RMA)
+        avg_gain = self._ewm(gain, 1 / period, period)
+        avg_loss = self._ewm(loss, 1 / period, period)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rsi = 100 * avg_gain / (avg_gain + avg_loss)
+
+        self.indicators["rsi" + str(period)] = self._fill(rsi, 50.0)
+
+    def _true_range(self) -> np.ndarray:
+        high = self._require("high")
+        low = self._require("low")
+        prev_close = self._shift(self._require("close"))
+
+        # fmax skips the missing previous close on the first candle, like DataFrame.max(axis=1)
+        return np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+
+    def add_atr(self, interval: int = 14) -> None:
+        """Adds Average True Range (ATR) for all markets"""
+
+        self._check_period(interval)
+
+        atr = self._rolling(self._true_range(), interval, np.sum) / interval
+        self.indicators["atr" + str(interval)] = self._fill_mean(atr)
+
+    def add_macd(self, slow: int = 12, fast: int = 26) -> None:
+        """Adds the Moving Average Convergence Divergence (MACD) for all markets"""
+
+        # pandas_ta swaps the lengths when called the way TechnicalAnalysis.add_macd does
+        fast, slow = min(slow, fast), max(slow, fast)
+
+        macd = self.exponential_moving_average(fast) - self.exponential_moving_average(slow)
+        signal = self.exponential_moving_average(9, macd)
+
+        self.indicators["macd"] = self._fill(macd, 0.0)
+        self.indicators["signal"] = self._fill(signal, 0.0)
+
+    def add_bollinger_bands(self, period: int = 20, std: int = 2) -> None:
+        """Adds the Bollinger Bands for all markets"""
+
+        self._check_period(period)
+
+        close = self._require("close")
+        mid = self._rolling(close, period, np.mean)
+        deviation = self._rolling(close, period, np.std)
+
+        self.indicators["bb" + str(period) + "_upper"] = self._fill(mid + std * deviation, close)
+        self.indicators["bb" + str(period) + "_mid"] = self._fill(mid, close)
+        self.indicators["bb" + str(period) + "_lower"] = self._fill(mid - std * deviation, close)
+
+    def add_adx(self, interval: int = 14) -> None:
+        """Adds Average Directional Index (ADX) for all markets"""
+
+        self._check_period(interval)
+
+        high = self._require("high")
+        low = self._require("low")
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            minus_dm = self._shift(low) - low
+            plus_dm = high - self._shift(high)
+            plus_dm = np.where((plus_dm > minus_dm) & (plus_dm > 0), plus_dm, 0.0)
+            minus_dm = np.where((minus_dm > plus_dm) & (minus_dm > 0), minus_dm, 0.0)
+
+            # the padding stays NaN so windows never reach into it
+            padding = ~self._has_data()
+            plus_dm[padding] = np.nan
+            minus_dm[padding] = np.nan
+
+            tr_sum = self._rolling(self._true_range(), interval, np.sum)
+            plus_di = self._rolling(plus_dm, interval, np.sum) / tr_sum * 100
+            minus_di = self._rolling(minus_dm, interval, np.sum) / tr_sum * 100
+            dx = np.abs(plus_di - minus_di) / (plus_di + minus_di) * 100
+
+        adx = self._rolling(dx, interval, np.mean)
+
+        minus_di = self._fill_mean(minus_di)
+        plus_di = self._fill_mean(plus_di)
+        adx = self._fill_mean(adx)
+
+        self.indicators["-di" + str(interval)] = minus_di
+        self.indicators["+di" + str(interval)] = plus_di
+        self.indicators["adx" + str(interval)] = adx
+        self.indicators["adx" + str(interval) + "_trend"] = np.where(plus_di > minus_di, "bull", "bear").astype(object)
+        self.indicators["adx" + str(interval) + "_strength"] = np.where(adx > 25, "strong", np.where(adx < 20, "weak", "normal")).astype(object)
+
+    def add_all(self) -> None:
+        """Adds the indicators used for ranking markets"""
+
+        self.add_sma(20)
+        if self.total_periods >= 50:
+            self.add_sma(50)
+        if self.total_periods >= 200:
+            self.add_sma(200)
+        self.add_ema(8)
+        self.add_ema(12)
+        self.add_ema(26)
+        self.add_rsi(14)
+        self.add_macd()
+        self.add_bollinger_bands(20)
+
+        if "high" in self.ohlcv and "low" in self.ohlcv:
+            self.add_atr(14)
+            self.add_adx(14)
+
+    def _column(self, name: str) -> np.ndarray:
+        return self.indicators[name] if name in self.indicators else self._require(name)
+
+    def get_last(self, name: str) -> np.ndarray:
+        """Returns the latest value of an indicator or price column for every market"""
+
+        values = self._column(name)
+        if values.shape[1] == 0:
+            return np.full(len(self.markets), np.nan)
+        return values[:, -1]
+
+    def get_last_df(self, names: list = None) -> DataFrame:
+        """Returns the latest values of the named columns indexed by market"""
+
+        if names is None:
+            names = list(self.ohlcv) + list(self.indicators)
+        return DataFrame({name: self.get_last(name) for name in names}, index=self.markets)
+
+    def get_df(self, market: str) -> DataFrame:
+        """Returns one market's prices and indicators with the TechnicalAnalysis column names"""
+
+        if market not in self.markets:
+            raise KeyError(f"Market not found! ({market})")
+
+        row = self.markets.index(market)
+        start = self.first_valid[row]
+        columns = {name: values[row, start:] for name, values in {**self.ohlcv, **self.indicators}.items()}
+
+        index = self.index.get(market)
+        if index is not None and len(index) == len(columns["close"]):
+            return DataFrame(columns, index=index)
+        return DataFrame(columns)
@@ -0,0 +1,457 @@
+"""Walk-forward search over the bot's signal and sell settings"""
+
+import itertools
+import json
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from models.exchange.ExchangesEnum import Exchange
+from models.exchange.Granularity import Granularity
+
+SIGNAL_COLUMNS = [
+    "ema12gtema26co",
+    "ema12ltema26co",
+    "macdgtsignal",
+    "macdltsignal",
+    "goldencross",
+    "closegtbb20_upperco",
+    "closeltbb20_lowerco",
+    "closeltbb20_midco",
+]
+
+# the settings a trial can change, with the bot's own defaults for anything left out of the space
+DEFAULTS = {
+    "disablebuyema": False,
+    "disablebuymacd": False,
+    "disablebullonly": False,
+    "disablebuybbands_s1": True,
+    "disablebuybbands_s2": True,
+    "sellatloss": 1,
+    "sell_upper_pcnt": None,
+    "sell_lower_pcnt": None,
+    "trailing_stop_loss": None,
+    "trailing_stop_loss_trigger": 0.0,
+}
+BUY_SETTINGS = ["disablebuyema", "disablebuymacd", "disablebullonly", "disablebuybbands_s1", "disablebuybbands_s2"]
+
+DEFAULT_FEE = 0.005
+OBJECTIVES = ["profit", "win_rate", "calmar"]
+SEARCHES = ["grid", "random", "halving"]
+HALVING_ETA = 3
+CANDLES_PER_REQUEST = 300
+
+
+class Signals:
+    def __init__(self, df: pd.DataFrame) -> None:
+        """Closing prices and indicator crossovers as numpy arrays, extracted once and shared by every trial
+
+        The buy and sell signals follow Strategy.is_buy_signal() and is_sell_signal() with OBV and
+        Elder-Ray left disabled, as they are by default.
+
+        Parameters
+        ----------
+        df : Pandas DataFrame
+            Candles with the indicators added by TechnicalAnalysis.add_all()
+        """
+
+        missing = [column for column in ["close"] + SIGNAL_COLUMNS if column not in df]
+        if missing:
+            raise ValueError(f"Missing indicators: {', '.join(missing)}")
+
+        self.dates = pd.DatetimeIndex(df["date"] if "date" in df else df.index)
+        self.close = df["close"].to_numpy(dtype=float)
+        self.columns = {name: df[name].fillna(False).to_numpy(dtype=bool) for name in SIGNAL_COLUMNS}
+        self._masks = {}
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    def entries(self, params: dict) -> np.ndarray:
+        """Positions of the buy signals for the settings"""
+
+        key = ("buy",) + tuple(params[name] for name in BUY_SETTINGS)
+        if key not in self._masks:
+            if self._no_strategy(params):
+                mask = np.zeros(len(self), dtype=bool)
+            else:
+                # criteria 1, the crossovers, with the upper band crossover for either bollinger band strategy
+                mask = self._signal(
+                    ("ema12gtema26co", params["disablebuyema"]),
+                    ("macdgtsignal", params["disablebuymacd"]),
+                    ("closegtbb20_upperco", params["disablebuybbands_s1"]),
+                    ("closegtbb20_upperco", params["disablebuybbands_s2"]),
+                )
+                # criteria 2, met on every candle while bbands_s2 is disabled (the default)
+                mask |= self._signal(("closegtbb20_upperco", params["disablebuybbands_s2"]))
+            if not params["disablebullonly"]:
+                mask &= self.columns["goldencross"]
+            self._masks[key] = np.flatnonzero(mask)
+        return self._masks[key]
+
+    def exits(self, params: dict) -> np.ndarray:
+        """Sell signal of every candle for the settings"""
+
+        key = ("sell",) + tuple(params[name] for name in BUY_SETTINGS)
+        if key not in self._masks:
+            if self._no_strategy(params):
+                self._masks[key] = np.zeros(len(self), dtype=bool)
+            else:
+                self._masks[key] = self._signal(
+                    ("ema12ltema26co", params["disablebuyema"]),
+                    ("macdltsignal", params["disablebuymacd"]),
+                    ("closeltbb20_lowerco", params["disablebuybbands_s1"]),
+                    ("closeltbb20_midco", params["disablebuybbands_s2"]),
+                )
+        return self._masks[key]
+
+    @staticmethod
+    def _no_strategy(params: dict) -> bool:
+        # the bot never trades either
+        return all(params[name] for name in ["disablebuyema", "disablebuymacd", "disablebuybbands_s1", "disablebuybbands_s2"])
+
+    def _signal(self, *conditions) -> np.ndarray:
+        mask = np.ones(len(self), dtype=bool)
+        for column, disabled in conditions:
+            if not disabled:
+                mask &= self.columns[column]
+        return mask
+
+
+def backtest(signals: Signals, params: dict, start: int = 0, end: int = None, fee: float = DEFAULT_FEE) -> dict:
+    """Trades the candles in [start, end) with the bot's buy signals and sell triggers
+
+    An open position is closed on the last candle, so every window is judged on its own.
+    """
+
+    params = {**DEFAULTS, **params}
+    end = len(signals) if end is None else end
+    close = signals.close
+    entries = signals.entries(params)
+    exits = signals.exits(params)
+
+    upper = params["sell_upper_pcnt"]
+    lower = params["sell_lower_pcnt"]
+    tsl = params["trailing_stop_loss"] or None
+    tsl_trigger = params["trailing_stop_loss_trigger"] or 0.0
+    sellatloss = bool(params["sellatloss"])
+    net = (1 - fee) ** 2
+
+    equity, peak, max_drawdown, trades, wins = 1.0, 1.0, 0.0, 0, 0
+    position = start
+    while True:
+        # jump straight to the next buy signal instead of walking the flat candles
+        k = np.searchsorted(entries, position)
+        if k == len(entries) or entries[k] >= end - 1:
+            break
+
+        bought = entries[k]
+        buy_price = high = close[bought]
+        tsl_triggered = False
+        sold = end - 1
+        for i in range(bought + 1, end):
+            price = close[i]
+            if price > high:
+                high = price
+
+            margin = (price / buy_price * net - 1) * 100
+            if not sellatloss and margin <= 0:
+                continue
+
+            if tsl is not None:
+                if margin > tsl_trigger:
+                    tsl_triggered = True
+                if tsl_triggered and (price - high) / high * 100 < tsl:
+                    sold = i
+                    break
+
+            if (sellatloss and lower is not None and margin < lower) or (upper is not None and margin > upper) or exits[i]:
+                sold = i
+                break
+
+        change = close[sold] / buy_price * net
+        equity *= change
+        trades += 1
+        wins += change > 1
+        peak = max(peak, equity)
+        max_drawdown = max(max_drawdown, (peak - equity) / peak * 100)
+        position = sold + 1
+
+    profit = (equity - 1) * 100
+    return {
+        "profit": profit,
+        "trades": trades,
+        "win_rate": wins / trades * 100 if trades else 0.0,
+        "max_drawdown": max_drawdown,
+        "calmar": profit / max(max_drawdown, 1.0),
+    }
+
+
+def parameter_space(space: dict) -> dict:
+    """Expands {"min", "max", "step"} ranges into value lists and checks the names"""
+
+    expanded = {}
+    for name, values in space.items():
+        if name not in DEFAULTS:
+            raise ValueError(f"Unknown optimizer parameter: {name} (expected one of {', '.join(DEFAULTS)})")
+
+        if isinstance(values, dict):
+            count = int(round((values["max"] - values["min"]) / values["step"])) + 1
+            values = [round(values["min"] + values["step"] * i, 8) for i in range(count)]
+        elif not isinstance(values, list):
+            values = [values]
+
+        if len(values) == 0:
+            raise ValueError(f"Optimizer parameter {name} has no values")
+        expanded[name] = values
+    return expanded
+
+
+def grid(space: dict) -> list:
+    return [dict(zip(space, values)) for values in itertools.product(*space.values())]
+
+
+def sample(space: dict, trials: int, rng: random.Random) -> list:
+    """Distinct random settings, the whole grid when it is smaller than the number of trials"""
+
+    size = math.prod(len(values) for values in space.values())
+    if trials >= size:
+        return grid(space)
+
+    seen = set()
+    candidates = []
+    while len(candidates) < trials:
+        values = tuple(rng.randrange(len(options)) for options in space.values())
+        if values not in seen:
+            seen.add(values)
+            candidates.append({name: space[name][index] for name, index in zip(space, values)})
+    return candidates
+
+
+_worker_signals = None
+_worker_fee = DEFAULT_FEE
+
+
+def _init_worker(signals: Signals, fee: float) -> None:
+    global _worker_signals, _worker_fee
+    _worker_signals, _worker_fee = signals, fee
+
+
+def _run_chunk(chunk: list, start: int, end: int) -> list:
+    return [backtest(_worker_signals, params, start, end, _worker_fee) for params in chunk]
+
+
+class Evaluator:
+    def __init__(self, signals: Signals, fee: float = DEFAULT_FEE, max_workers: int = 1) -> None:
+        """Runs backtests serially or on worker processes, each worker receives the signals once
+
+        Parameters
+        ----------
+        signals : Signals
+            Indicators shared by every trial
+        fee : float
+            Fee rate paid on each buy and sell
+        max_workers : int
+            Worker processes, 1 runs the trials in this process
+        """
+
+        self.signals = signals
+        self.fee = fee
+        self.max_workers = max_workers
+        self.trials = 0
+        self._pool = None
+
+    def run(self, candidates: list, start: int, end: int) -> list:
+        self.trials += len(candidates)
+        if self.max_workers <= 1 or len(candidates) < self.max_workers * 8:
+            return [backtest(self.signals, params, start, end, self.fee) for params in candidates]
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.max_workers, initializer=_init_worker, initargs=(self.signals, self.fee))
+
+        size = math.ceil(len(candidates) / (self.max_workers * 4))
+        chunks = [candidates[i : i + size] for i in range(0, len(candidates), size)]
+        return [result for results in self._pool.map(_run_chunk, chunks, [start] * len(chunks), [end] * len(chunks)) for result in results]
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+def successive_halving(evaluator: Evaluator, candidates: list, start: int, end: int, objective: str, eta: int = HALVING_ETA) -> tuple:
+    """Scores every candidate on the most recent part of the window, and only the best third on a longer part, until one is left
+
+    Returns the best settings with their result over the whole window.
+    """
+
+    rounds = max(0, int(math.log(len(candidates), eta))) if len(candidates) > 1 else 0
+    for level in range(rounds, -1, -1):
+        periods = max(2, (end - start) // eta**level)
+        results = evaluator.run(candidates, end - periods, end)
+        ranked = sorted(range(len(candidates)), key=lambda i: results[i][objective], reverse=True)
+        if level == 0:
+            return candidates[ranked[0]], results[ranked[0]]
+        candidates = [candidates[i] for i in ranked[: max(1, len(candidates) // eta)]]
+
+
+def search(evaluator: Evaluator, space: dict, method: str, start: int, end: int, objective: str, trials: int, rng: random.Random) -> tuple:
+    """Best settings and their result on the candles in [start, end)"""
+
+    if method == "grid":
+        candidates = grid(space)
+    elif method in ["random", "halving"]:
+        candidates = sample(space, trials, rng)
+    else:
+        raise ValueError(f"Unknown search: {method} (expected one of {', '.join(SEARCHES)})")
+
+    if method == "halving":
+        return successive_halving(evaluator, candidates, start, end, objective)
+
+    results = evaluator.run(candidates, start, end)
+    best = max(range(len(candidates)), key=lambda i: results[i][objective])
+    return candidates[best], results[best]
+
+
+def walk_forward(
+    signals: Signals,
+    space: dict,
+    train_periods: int,
+    test_periods: int,
+    method: str = "grid",
+    objective: str = "profit",
+    trials: int = 500,
+    fee: float = DEFAULT_FEE,
+    seed: int = None,
+    max_workers: int = 1,
+) -> pd.DataFrame:
+    """Tunes the settings on each training window and trades them on the window that follows
+
+    The windows roll forward by test_periods, so every test window is out of sample and
+    the test windows together cover the candles after the first training window.
+    """
+
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective: {objective} (expected one of {', '.join(OBJECTIVES)})")
+    if train_periods < 2 or test_periods < 2 or train_periods + test_periods > len(signals):
+        raise ValueError(f"Need {train_periods + test_periods} candles for one walk-forward window, got {len(signals)}")
+
+    space = parameter_space(space)
+    rng = random.Random(seed)
+    evaluator = Evaluator(signals, fee, max_workers)
+
+    rows = []
+    try:
+        for train_start in range(0, len(signals) - train_periods - test_periods + 1, test_periods):
+            train_end = train_start + train_periods
+            test_end = train_end + test_periods
+
+            params, in_sample = search(evaluator, space, method, train_start, train_end, objective, trials, rng)
+            out_of_sample = backtest(signals, params, train_end, test_end, fee)
+            baseline = backtest(signals, {}, train_end, test_end, fee)
+
+            rows.append(
+                {
+                    "train_start": signals.dates[train_start],
+                    "test_start": signals.dates[train_end],
+                    "test_end": signals.dates[test_end - 1],
+                    **{name: params[name] for name in space},
+                    "in_sample_profit": in_sample["profit"],
+                    "profit": out_of_sample["profit"],
+                    "trades": out_of_sample["trades"],
+                    "win_rate": out_of_sample["win_rate"],
+                    "max_drawdown": out_of_sample["max_drawdown"],
+                    "baseline_profit": baseline["profit"],
+                }
+            )
+    finally:
+        evaluator.close()
+
+    df = pd.DataFrame(rows)
+    df.attrs["trials"] = evaluator.trials
+    return df
+
+
+def summarise(df: pd.DataFrame) -> dict:
+    """Out of sample totals of a walk-forward run, compounded over the test windows"""
+
+    if len(df) == 0:
+        return {"windows": 0, "profit": 0.0, "baseline_profit": 0.0, "trades": 0, "trials": df.attrs.get("trials", 0)}
+
+    return {
+        "windows": len(df),
+        "profit": (np.prod(1 + df["profit"] / 100) - 1) * 100,
+        "baseline_profit": (np.prod(1 + df["baseline_profit"] / 100) - 1) * 100,
+        "trades": int(df["trades"].sum()),
+        "trials": df.attrs.get("trials", 0),
+    }
+
+
+def fetch_candles(app, market: str, granularity: Granularity, start: datetime, end: datetime) -> pd.DataFrame:
+    """Downloads [start, end) a page of candles at a time"""
+
+    step = timedelta(seconds=granularity.to_integer * CANDLES_PER_REQUEST)
+    pages = []
+    while start < end:
+        page_end = min(start + step, end)
+        df = app.get_historical_data(market, granularity, None, start.isoformat(timespec="seconds"), page_end.isoformat(timespec="seconds"))
+        if isinstance(df, pd.DataFrame) and len(df) > 0:
+            pages.append(df)
+        start = page_end
+
+    if len(pages) == 0:
+        return pd.DataFrame()
+
+    return pd.concat(pages).drop_duplicates(subset="date", keep="last").sort_values(by="date")
+
+
+def run_optimizer(config_file: str = "optimizer.json", bot_config_file: str = "config.json") -> pd.DataFrame:
+    """Fetches the candles once, adds the indicators once and runs the walk-forward search in the optimizer config"""
+
+    from controllers.PyCryptoBot import PyCryptoBot
+    from models.Trading import TechnicalAnalysis
+
+    with open(config_file, encoding="utf8") as stream:
+        config = json.load(stream)
+
+    app = PyCryptoBot(config_file=bot_config_file, exchange=Exchange(config.get("exchange", "coinbasepro")))
+    market = config.get("market", app.market)
+    granularity = Granularity.convert_to_enum(config.get("granularity", app.granularity.to_integer))
+    end = datetime.fromisoformat(config["end"]) if "end" in config else datetime.now().replace(microsecond=0)
+    start = datetime.fromisoformat(config["start"]) if "start" in config else end - timedelta(days=90)
+
+    candles = fetch_candles(app, market, granularity, start, end)
+    technical_analysis = TechnicalAnalysis(candles, len(candles))
+    technical_analysis.add_all()
+    signals = Signals(technical_analysis.get_df())
+
+    df = walk_forward(
+        signals,
+        config["parameters"],
+        config.get("train_periods", 720),
+        config.get("test_periods", 168),
+        method=config.get("search", "grid"),
+        objective=config.get("objective", "profit"),
+        trials=config.get("trials", 500),
+        fee=config.get("fee", DEFAULT_FEE),
+        seed=config.get("seed"),
+        max_workers=config.get("workers", os.cpu_count() or 1),
+    )
+
+    summary = summarise(df)
+    print(df.to_string(index=False))
+    print(
+        f"\n{market} {granularity.to_short}: {summary['trials']} trials over {summary['windows']} windows, "
+        f"out of sample profit {summary['profit']:.2f}% from {summary['trades']} trades "
+        f"(bot defaults {summary['baseline_profit']:.2f}%)"
+    )
+
+    if not os.path.exists("csv"):
+        os.makedirs("csv")
+    df.to_csv(os.path.join("csv", f"optimizer {market} {granularity.to_integer} {start:%Y-%m-%d} - {end:%Y-%m-%d}.csv"), index=False)
+    return df
@@ -0,0 +1,205 @@
+"""Market scanner ranking exchange markets by EMA12/EMA26 trend and ATR72 volatility"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from models.CrossSectionalAnalysis import CrossSectionalAnalysis
+from models.exchange.ExchangesEnum import Exchange
+from models.exchange.Granularity import Granularity
+from models.exchange.LazyImport import LazyExchangeAPI
+from models.helper.RateLimitHelper import RateLimiter
+
+BPublicAPI = LazyExchangeAPI("binance", "PublicAPI")
+CPublicAPI = LazyExchangeAPI("coinbase_pro", "PublicAPI")
+KPublicAPI = LazyExchangeAPI("kucoin", "PublicAPI")
+
+GRANULARITY = Granularity(Granularity.ONE_HOUR)
+
+# sustained public REST requests per second, well inside each exchange's published limits
+RATE_LIMITS = {
+    Exchange.BINANCE: 10,
+    Exchange.COINBASEPRO: 5,
+    Exchange.KUCOIN: 5,
+}
+MAX_WORKERS = 8
+
+# ATR72 needs 72 candles, EMA26 fewer
+MIN_CANDLES = 72
+
+
+def get_public_api(exchange: Exchange, bot_config: dict = None):
+    """Returns the public API client for the exchange"""
+
+    bot_config = bot_config or {}
+    if exchange == Exchange.BINANCE:
+        return BPublicAPI(bot_config[exchange.value]["api_url"])
+    elif exchange == Exchange.COINBASEPRO:
+        return CPublicAPI()
+    elif exchange == Exchange.KUCOIN:
+        return KPublicAPI(bot_config[exchange.value]["api_url"])
+    else:
+        raise ValueError(f"Invalid exchange: {exchange}")
+
+
+def get_markets(api, exchange: Exchange, quote: str) -> pd.DataFrame:
+    """Returns price and volume for the exchange markets in the quote currency"""
+
+    markets = []
+    resp = api.get_markets_24hr_stats()
+    if exchange == Exchange.BINANCE:
+        for row in resp:
+            if row["symbol"].endswith(quote):
+                markets.append(row)
+    elif exchange == Exchange.COINBASEPRO:
+        for market in resp:
+            if market.endswith(f"-{quote}"):
+                resp[market]["stats_24hour"]["market"] = market
+                markets.append(resp[market]["stats_24hour"])
+    elif exchange == Exchange.KUCOIN:
+        results = resp["data"]["ticker"]
+        for result in results:
+            if result["symbol"].endswith(f"-{quote}"):
+                markets.append(result)
+
+    df_markets = pd.DataFrame(markets)
+
+    if exchange == Exchange.BINANCE:
+        df_markets = df_markets[["symbol", "lastPrice", "quoteVolume"]]
+    elif exchange == Exchange.COINBASEPRO:
+        df_markets = df_markets[["market", "last", "volume"]]
+    elif exchange == Exchange.KUCOIN:
+        df_markets = df_markets[["symbol", "last", "volValue"]]
+
+    df_markets.columns = ["market", "price", "volume"]
+    df_markets["price"] = df_markets["price"].astype(float)
+    df_markets["volume"] = df_markets["volume"].astype(float).round(0).astype(int)
+    df_markets.sort_values(by=["market"], ascending=True, inplace=True)
+    df_markets.set_index("market", inplace=True)
+
+    return df_markets
+
+
+def fetch_candles(
+    api,
+    markets: list,
+    granularity: Granularity = GRANULARITY,
+    limiter: RateLimiter = None,
+    max_workers: int = MAX_WORKERS,
+    progress: bool = False,
+) -> dict:
+    """Fetches historical candles for many markets concurrently, returns market -> DataFrame"""
+
+    def _fetch(market: str):
+        if limiter is not None:
+            limiter.acquire()
+
+        try:
+            return api.get_historical_data(market, granularity, None)
+        except Exception as err:
+            print(f"{market}: {err}")
+            return None
+
+    candles = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_fetch, market): market for market in markets}
+        for row, future in enumerate(as_completed(futures), start=1):
+            market = futures[future]
+            candles[market] = future.result()
+            if progress:
+                print(f"[{row}/{len(markets)}] {market} {round((row / len(markets)) * 100, 2)}%")
+
+    return candles
+
+
+def rank_markets(df_markets: pd.DataFrame, candles: dict) -> pd.DataFrame:
+    """Adds atr72, atr72_pcnt and buy_next columns computed across all markets at once"""
+
+    df_markets = df_markets.copy()
+    df_markets["atr72"] = np.nan
+    df_markets["buy_next"] = np.nan
+
+    usable = {
+        market: df
+        for market, df in candles.items()
+        if isinstance(df, pd.DataFrame) and len(df) >= MIN_CANDLES and market in df_markets.index
+    }
+
+    if len(usable) > 0:
+        analysis = CrossSectionalAnalysis.from_dataframes(usable)
+        analysis.add_ema(12)
+        analysis.add_ema(26)
+        analysis.add_atr(72)
+
+        df_last = analysis.get_last_df(["ema12", "ema26", "atr72"])
+        df_markets.loc[df_last.index, "atr72"] = df_last["atr72"]
+        df_markets["buy_next"] = df_markets["buy_next"].astype(object)
+        df_markets.loc[df_last.index, "buy_next"] = df_last["ema12"] < df_last["ema26"]
+
+    # volatility over the last 72 hours
+    df_markets["atr72_pcnt"] = (df_markets["atr72"] / df_markets["price"] * 100).round(2)
+
+    return df_markets
+
+
+def scan_markets(
+    exchange: Exchange,
+    quote: str,
+    bot_config: dict = None,
+    api=None,
+    granularity: Granularity = GRANULARITY,
+    max_workers: int = MAX_WORKERS,
+    limiter: RateLimiter = None,
+    progress: bool = False,
+) -> pd.DataFrame:
+    """Scans the exchange markets for the quote currency and returns them ranked"""
+
+    if api is None:
+        api = get_public_api(exchange, bot_config)
+
+    if limiter is None:
+        limiter = RateLimiter(RATE_LIMITS.get(exchange, 5))
+
+    df_markets = get_markets(api, exchange, quote)
+    markets = df_markets[df_markets["volume"] > 0].index.tolist()
+
+    candles = fetch_candles(api, markets, granularity, limiter, max_workers, progress)
+
+    return rank_markets(df_markets, candles)
+
+
+def run_scanner(config_file: str = "scanner.json", bot_config_file: str = "config.json", verbose: bool = False) -> dict:
+    """Scans every exchange and quote in the scanner config and saves the output for the Telegram bot"""
+
+    from controllers.PyCryptoBot import PyCryptoBot
+    from models.helper.TelegramBotHelper import TelegramBotHelper as TGBot
+
+    with open(config_file, encoding="utf8") as json_file:
+        config = json.load(json_file)
+
+    with open(bot_config_file, encoding="utf8") as json_file:
+        bot_config = json.load(json_file)
+
+    results = {}
+    for exchange in config:
+        ex = Exchange(exchange)
+        app = PyCryptoBot(exchange=ex)
+        # one limiter per exchange, shared by all of its quote currencies
+        limiter = RateLimiter(config[ex.value].get("rate_limit", RATE_LIMITS.get(ex, 5)))
+
+        for quote in config[ex.value]["quote_currency"]:
+            if verbose:
+                print("Processing, please wait...")
+
+            df_markets = scan_markets(ex, quote, bot_config, limiter=limiter, progress=verbose)
+
+            if verbose:
+                # markets sorted by next buy action, then by most volatile
+                print(df_markets.sort_values(by=["buy_next", "atr72_pcnt"], ascending=[False, False], inplace=False))
+
+            TGBot(app, scanner=True).save_scanner_output(ex.value, quote, df_markets)
+            results[(ex.value, quote)] = df_markets
+
+    return results
@@ -0,0 +1,375 @@
+"""Market screener scoring exchange markets with TradingView technical analysis"""
+
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+from tradingview_ta import get_multiple_analysis
+
+from models.exchange.ExchangesEnum import Exchange as CryptoExchange
+from models.exchange.Granularity import Granularity
+from models.exchange.LazyImport import LazyExchangeAPI
+from models.helper.CacheHelper import TTLCache
+
+BPublicAPI = LazyExchangeAPI("binance", "PublicAPI")
+CPublicAPI = LazyExchangeAPI("coinbase_pro", "PublicAPI")
+KPublicAPI = LazyExchangeAPI("kucoin", "PublicAPI")
+
+# TradingView accepts up to 100 symbols per scan request
+CHUNK_SIZE = 100
+MAX_WORKERS = 6
+
+ADDITIONAL_INDICATORS = ["ATR", "KltChnl.upper", "KltChnl.lower"]
+
+OUTPUT_COLUMNS = [
+    "market",
+    "score",
+    "recommend",
+    "volume",
+    "volatility",
+    "adx",
+    "adx+di",
+    "adx-di",
+    "macd",
+    "macd.signal",
+    "bollinger_upper",
+    "bollinger_lower",
+    "rsi",
+    "stoch_d",
+    "stoch_k",
+    "williamsr",
+    "rating",
+    "buy_next",
+    "atr72_pcnt",
+]
+
+RATING_SCORES = {"SELL": -2.5, "STRONG_SELL": -5, "NEUTRAL": 0, "BUY": 2.5, "STRONG_BUY": 5}
+
+# raw TradingView analysis per (symbol, interval), kept for one candle so repeated scans don't refetch
+analysis_cache = TTLCache()
+
+
+class ScreenerConfig:
+    def __init__(self, exchange: CryptoExchange, exchange_config: dict, bot_config: dict = None) -> None:
+        """Thresholds and public API for screening one exchange"""
+
+        bot_config = bot_config or {}
+        self.exchange = exchange
+        if exchange == CryptoExchange.BINANCE:
+            self.public_api = BPublicAPI(bot_config[exchange.value]["api_url"])
+            self.granularity = Granularity(Granularity.convert_to_enum(exchange_config.get("granularity", "1h")))
+        elif exchange == CryptoExchange.COINBASEPRO:
+            self.public_api = CPublicAPI()
+            self.granularity = Granularity(Granularity.convert_to_enum(int(exchange_config.get("granularity", "3600"))))
+        elif exchange == CryptoExchange.KUCOIN:
+            self.public_api = KPublicAPI(bot_config[exchange.value]["api_url"])
+            self.granularity = Granularity(Granularity.convert_to_enum(exchange_config.get("granularity", "1h")))
+        else:
+            raise ValueError(f"Invalid exchange found in config: {exchange}")
+
+        self.scanner_quote_currencies = exchange_config.get("quote_currency", ["USDT"])
+        self.adx_threshold = exchange_config.get("adx_threshold", 25)
+        self.volatility_threshold = exchange_config.get("volatility_threshold", 9)
+        self.minimum_volatility = exchange_config.get("minimum_volatility", 5)
+        self.minimum_volume = exchange_config.get("minimum_volume", 20000)
+        self.volume_threshold = exchange_config.get("volume_threshold", 20000)
+        self.minimum_quote_price = exchange_config.get("minimum_quote_price", 0.0000001)
+        self.selection_score = exchange_config.get("selection_score", 10)
+        self.tv_screener_ratings = [rating.upper() for rating in exchange_config.get("tv_screener_ratings", ["STRONG_BUY"])]
+
+
+def load_configs(config_file: str = "screener.json", bot_config_file: str = "config.json") -> list:
+    """Returns a ScreenerConfig for every valid exchange in the screener config"""
+
+    exchanges_loaded = []
+    with open(config_file, encoding="utf8") as json_file:
+        config = json.load(json_file)
+
+    bot_config = {}
+    try:
+        with open(bot_config_file, encoding="utf8") as json_file:
+            bot_config = json.load(json_file)
+    except IOError as err:
+        print(err)
+
+    for exchange in config:
+        try:
+            exchanges_loaded.append(ScreenerConfig(CryptoExchange(exchange), config[exchange], bot_config))
+        except (AttributeError, ValueError) as err:
+            print(f"Invalid exchange: {err}...ignoring.")
+
+    return exchanges_loaded
+
+
+def chunker(market_list, chunk_size):
+    markets = iter(market_list)
+    market_chunk = list(islice(markets, chunk_size))
+    while market_chunk:
+        yield market_chunk
+        market_chunk = list(islice(markets, chunk_size))
+
+
+def get_markets(app, quote_currency):
+    markets = []
+    quote_currency = quote_currency.upper()
+    api = app.public_api
+    resp = api.get_markets_24hr_stats()
+    if app.exchange == CryptoExchange.BINANCE:
+        for row in resp:
+            if row["symbol"].endswith(quote_currency):
+                markets.append(row["symbol"])
+    elif app.exchange == CryptoExchange.COINBASEPRO:
+        for market in resp:
+            market = str(market)
+            if market.endswith(f"-{quote_currency}"):
+                markets.append(market)
+    elif app.exchange == CryptoExchange.KUCOIN:
+        results = resp["data"]["ticker"]
+        for result in results:
+            if result["symbol"].endswith(f"-{quote_currency}"):
+                markets.append(result["symbol"])
+
+    return markets
+
+
+def screener_symbols(app, markets: list) -> list:
+    """TradingView EXCHANGE:SYMBOL names for the markets"""
+
+    return [f"{re.sub('PRO', '', app.exchange.name, re.IGNORECASE)}:{re.sub('-', '', market)}" for market in markets]
+
+
+def fetch_analysis(requests: list, max_workers: int = MAX_WORKERS, cache: TTLCache = analysis_cache) -> dict:
+    """Fetches TradingView analysis for (symbols, interval_short, interval_seconds) requests
+
+    Cached symbols are served from the cache, the rest are requested in chunks of CHUNK_SIZE
+    through one bounded pool. Returns (symbol, interval_short) -> Analysis.
+    """
+
+    results = {}
+    jobs = []
+    for symbols, interval, ttl in requests:
+        missing = {}
+        for symbol in symbols:
+            analysis = cache.get((symbol, interval))
+            if analysis is not None:
+                results[(symbol, interval)] = analysis
+            else:
+                missing[symbol] = None
+
+        jobs.extend((chunk, interval, ttl) for chunk in chunker(missing, CHUNK_SIZE))
+
+    lock = threading.Lock()
+
+    def _fetch(job):
+        chunk, interval, ttl = job
+        try:
+            resp = get_multiple_analysis(screener="crypto", interval=interval, symbols=chunk, additional_indicators=ADDITIONAL_INDICATORS)
+        except Exception as err:
+            print(err)
+            return
+
+        with lock:
+            for symbol, analysis in resp.items():
+                if analysis is not None:
+                    cache.set((symbol, interval), analysis, ttl)
+                    results[(symbol, interval)] = analysis
+
+    if jobs:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(_fetch, jobs))
+
+    return results
+
+
+def volatility_calculator(bollinger_band_upper, bollinger_band_lower, keltner_upper, keltner_lower, high, low):
+    """
+    A break away from traditional volatility calculations. Based entirely
+    on the proportionate self.price gap between keltner channels, bolinger, and high / low averaged out
+
+    Accepts floats or NumPy arrays / Pandas Series.
+    """
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        b_pcnt = np.abs((bollinger_band_upper - bollinger_band_lower) / bollinger_band_lower) * 100
+        k_pcnt = np.abs((keltner_upper - keltner_lower) / keltner_lower) * 100
+        p_pcnt = np.abs((high - low) / low) * 100
+
+    chan_20_pcnt = (b_pcnt + k_pcnt) / 2
+
+    return np.abs((chan_20_pcnt + p_pcnt) / 2)
+
+
+def analysis_frame(analyses: list) -> pd.DataFrame:
+    """Flattens TradingView analyses into one float DataFrame, dropping incomplete symbols"""
+
+    rows = []
+    for ta in analyses:
+        indicators = ta.indicators
+        rows.append(
+            {
+                "symbol": ta.symbol,
+                "rating": ta.summary.get("RECOMMENDATION"),
+                "recommend": indicators.get("Recommend.All"),
+                "adx": indicators.get("ADX"),
+                "adx+di": indicators.get("ADX+DI"),
+                "adx-di": indicators.get("ADX-DI"),
+                "high": indicators.get("high"),
+                "low": indicators.get("low"),
+                "close": indicators.get("close"),
+                "atr": indicators.get("ATR", 0),
+                "has_atr": "ATR" in indicators,
+                "volume": indicators.get("volume"),
+                "macd": indicators.get("MACD.macd"),
+                "macd.signal": indicators.get("MACD.signal"),
+                "bollinger_upper": indicators.get("BB.upper"),
+                "bollinger_lower": indicators.get("BB.lower"),
+                "kelt_upper": indicators.get("KltChnl.upper"),
+                "kelt_lower": indicators.get("KltChnl.lower"),
+                "rsi": indicators.get("RSI", 0),
+                "stoch_d": indicators.get("Stoch.D", 0),
+                "stoch_k": indicators.get("Stoch.K", 0),
+                "williamsr": indicators.get("W.R", 0),
+            }
+        )
+
+    df = pd.DataFrame(rows)
+    if len(df) == 0:
+        return df
+
+    numeric = [column for column in df.columns if column not in ("symbol", "rating", "has_atr")]
+    df[numeric] = df[numeric].apply(pd.to_numeric, errors="coerce").astype(float)
+
+    # symbols with missing values or a zero close can't be scored
+    df = df.dropna(subset=numeric)
+    df = df[df["close"].round(8) != 0]
+
+    return df.reset_index(drop=True)
+
+
+def score_markets(app, df: pd.DataFrame) -> pd.DataFrame:
+    """Adds volatility, atr72_pcnt and score columns for all symbols at once"""
+
+    df = df.copy()
+    close = df["close"].round(8)
+
+    df["adx"] = df["adx"].abs()
+    df["volatility"] = volatility_calculator(
+        df["bollinger_upper"], df["bollinger_lower"], df["kelt_upper"], df["kelt_lower"], df["high"], df["low"]
+    )
+    # ATR normalised
+    df["atr72_pcnt"] = np.where(df["has_atr"], (df["atr"] / close * 100).round(2), 0.0)
+    df["atr72_pcnt"] = df["atr72_pcnt"].clip(lower=0)
+
+    score = df["rating"].map(RATING_SCORES).fillna(0)
+    score += ((df["adx"] >= app.adx_threshold) & (df["adx+di"] > df["adx-di"]) & (df["adx+di"] > df["adx"])).astype(int)
+    score += (df["volume"] >= app.volume_threshold).astype(int)
+    score += (df["macd"].abs() > df["macd.signal"].abs()).astype(int)
+    score += (df["volatility"] >= app.volatility_threshold).astype(int)
+    score -= (df["volatility"] < app.minimum_volatility).astype(int) * 100
+    score -= (df["volume"] < app.minimum_volume).astype(int) * 100
+    score -= (close < app.minimum_quote_price).astype(int) * 100
+    score += ((df["rsi"] <= 30) & (df["rsi"] > 20)).astype(int)
+    score += ((df["stoch_d"] > 20) & (df["stoch_d"] <= 30)).astype(int)
+    score += (df["stoch_k"] > df["stoch_d"]).astype(int)
+    score += (df["williamsr"] <= -30).astype(int)
+    df["score"] = score
+
+    # a zero band or low can't be scored
+    return df[np.isfinite(df["volatility"])]
+
+
+def process_screener_data(app, markets, quote_currency, exchange_name, analysis: dict = None, output_app=None, save: bool = True) -> pd.DataFrame:
+    """
+    Hit TradingView up for the goods so we don't waste unnecessary time/compute resources (brandon's top picks)
+    """
+
+    interval = app.granularity.short
+    symbols = screener_symbols(app, markets)
+
+    if analysis is None:
+        analysis = fetch_analysis([(symbols, interval, app.granularity.to_integer)])
+
+    # Take what we need and do magic, ditch the rest.
+    df = analysis_frame([analysis[(symbol, interval)] for symbol in symbols if (symbol, interval) in analysis])
+
+    debug = output_app is not None and output_app.debug
+    if len(df) > 0:
+        df = score_markets(app, df)
+        if debug:
+            print(f"Checking {exchange_name}\n{df[['symbol', 'score', 'rating']]}")
+        df = df[(df["score"] >= app.selection_score) & df["rating"].isin(app.tv_screener_ratings)]
+
+    if len(df) > 0:
+        # Stick it in a DF for the bots
+        df_markets = df.copy()
+        if app.exchange == CryptoExchange.COINBASEPRO or app.exchange == CryptoExchange.KUCOIN:
+            df_markets["market"] = df_markets["symbol"].str.replace(rf"(.*){quote_currency}", rf"\1-{quote_currency}", regex=True)
+        else:
+            df_markets["market"] = df_markets["symbol"]
+        df_markets["buy_next"] = df_markets["rating"].str.contains("BUY").map({True: "SEND IT!", False: False})
+
+        df_markets = df_markets[OUTPUT_COLUMNS]
+        df_markets["score"] = df_markets["score"].astype(float).round(0).astype(int)
+        df_markets["volume"] = df_markets["volume"].astype(float).round(0).astype(int)
+
+        df_markets.sort_values(by=["market"], ascending=True, inplace=True)
+        df_markets.set_index("market", inplace=True)
+
+        print(df_markets.sort_values(by=["buy_next", "atr72_pcnt"], ascending=[False, False], inplace=False))
+    else:
+        df_markets = pd.DataFrame([{"buy_next": False, "atr72_pcnt": 0, "volume": 0}])
+        print("No pairs found!")
+
+    if save and output_app is not None:
+        from models.helper.TelegramBotHelper import TelegramBotHelper as TGBot
+
+        TGBot(output_app, scanner=True).save_scanner_output(app.exchange.value, quote_currency, df_markets)
+
+    return df_markets
+
+
+def run_screener(config_file: str = "screener.json", bot_config_file: str = "config.json", max_workers: int = MAX_WORKERS) -> dict:
+    """Screens every exchange and quote currency in the screener config concurrently"""
+
+    from controllers.PyCryptoBot import PyCryptoBot
+
+    configs = load_configs(config_file, bot_config_file)
+    if len(configs) == 0:
+        return {}
+
+    # one bot config is enough to locate the telegram data folder and output settings
+    output_app = PyCryptoBot(exchange=configs[0].exchange)
+
+    pairs = [(app, quote_currency) for app in configs for quote_currency in app.scanner_quote_currencies]
+
+    def _markets(pair):
+        app, quote_currency = pair
+        try:
+            return get_markets(app, quote_currency)
+        except Exception as err:
+            print(err)
+            return []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        markets = list(executor.map(_markets, pairs))
+
+    analysis = fetch_analysis(
+        [(screener_symbols(app, pair_markets), app.granularity.short, app.granularity.to_integer) for (app, _), pair_markets in zip(pairs, markets)],
+        max_workers,
+    )
+
+    results = {}
+    for (app, quote_currency), pair_markets in zip(pairs, markets):
+        print(f"\n\n{app.exchange.name} {quote_currency}")
+        try:
+            results[(app.exchange.value, quote_currency)] = process_screener_data(
+                app, pair_markets, quote_currency, app.exchange.name, analysis=analysis, output_app=output_app
+            )
+        except Exception as err:
+            print(err)
+
+    return results
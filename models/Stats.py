@@ -1,7 +1,7 @@
 import sys
-from time import sleep
 from datetime import datetime, timedelta
 from models.TradingAccount import TradingAccount
+from models.helper.OrderPairHelper import pair_orders
 from models.exchange.ExchangesEnum import Exchange
 from views.PyCryptoBot import RichText
 
@@ -24,62 +24,43 @@ class Stats:
         else:
             self.fiat_currency = self.app.quote_currency
 
-        # get buy/sell pairs (merge as necessary)
-        last_order = None
-        # pylint: disable=unused-variable
-        for index, row in self.orders.iterrows():
-            time = row["created_at"].to_pydatetime()
+        if len(self.orders) == 0:
+            return
 
-            if row["action"] == "buy":
-                if self.app.exchange == Exchange.COINBASEPRO:
-                    amount = row["filled"] * row["price"] + row["fees"]
-                else:
-                    amount = row["size"]
-                if last_order in ["sell", None]:
-                    last_order = "buy"
-                    self.order_pairs.append(
-                        {
-                            "buy": {"time": time, "size": float(amount)},
-                            "sell": None,
-                            "market": self.app.market,
-                        }
-                    )
-                else:
-                    self.order_pairs[-1]["buy"]["size"] += float(amount)
-            else:
-                if self.app.exchange == Exchange.COINBASEPRO:
-                    amount = (row["filled"] * row["price"]) - row["fees"]
-                else:
-                    amount = (float(row["filled"]) * float(row["price"])) - row["fees"]
-                if last_order is None:  # first order is a sell (no pair)
-                    continue
-                if last_order == "buy":
-                    last_order = "sell"
-                    if float(amount) > 0:
-                        self.order_pairs[-1]["sell"] = {
-                            "time": time,
-                            "size": float(amount),
-                        }
-                else:
-                    if float(amount) > 0:
-                        self.order_pairs[-1]["sell"]["size"] += float(amount)
-        # remove open trade
-        if len(self.order_pairs) > 0:
-            if self.order_pairs[-1]["sell"] is None:
-                s = []
-                for order in self.order_pairs:
-                    if order["sell"] is not None:
-                        s.append(order)
-                self.order_pairs = s
-
-        # return [x.replace(".json", "") if x.__contains__(".json") else x for x in jsonfiles]
+        # get buy/sell pairs, consecutive buys or sells are merged
+        orders = self.orders.copy()
+        orders["market"] = self.app.market
+        is_buy = orders["action"] == "buy"
+        if self.app.exchange == Exchange.COINBASEPRO:
+            buy_amount = orders["filled"] * orders["price"] + orders["fees"]
+        else:
+            buy_amount = orders["size"].astype(float)
+        sell_amount = orders["filled"].astype(float) * orders["price"].astype(float) - orders["fees"]
+        # sells without proceeds are left out of the total
+        orders["amount"] = buy_amount.where(is_buy, sell_amount.clip(lower=0)).astype(float)
+
+        pairs = pair_orders(orders, sums=["amount"])
+        if len(pairs) == 0:
+            return
+
+        # a sell run without proceeds leaves the trade open
+        pairs = pairs[pairs["sell_amount"] > 0]
+        self.order_pairs.extend(
+            {
+                "buy": {"time": buy_time.to_pydatetime(), "size": float(buy_size)},
+                "sell": {"time": sell_time.to_pydatetime(), "size": float(sell_size)},
+                "market": market,
+            }
+            for market, buy_time, buy_size, sell_time, sell_size in zip(
+                pairs["market"], pairs["buy_created_at"], pairs["buy_amount"], pairs["sell_created_at"], pairs["sell_amount"]
+            )
+        )
 
     def show(self):
         if self.app.stats:
             if self.app.statgroup:
                 for currency in self.app.statgroup:
                     self.get_data(currency)
-                    sleep(5)
             else:
                 self.get_data(self.app.market)
             self.data_display()
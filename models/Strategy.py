@@ -2,6 +2,7 @@ from datetime import datetime
 from pandas import DataFrame
 from utils.PyCryptoBot import truncate as _truncate
 from models.AppState import AppState
+from models.helper.StrategyScoreHelper import StrategyScores
 from views.PyCryptoBot import RichText
 from os.path import exists as file_exists
 
@@ -28,6 +29,7 @@ class Strategy:
         state: AppState = AppState,
         df: DataFrame = DataFrame,
         iterations: int = 0,
+        history: DataFrame = None,
     ) -> None:
         if not isinstance(df, DataFrame):
             raise TypeError("'df' not a Pandas dataframe")
@@ -38,15 +40,20 @@ class Strategy:
         self.app = app
         self.state = state
         self._df = df
+        # the whole indicator frame a simulation window was cut from, scored at once by vectorized custom strategies
+        self._history = df if history is None else history
 
         if app.enable_custom_strategy:
             if strategy_myCS is False and file_exists("models/Strategy_myCS.py"):
                 raise ImportError(f"Custom Strategy Error: {myCS_error}")
             else:
-                if strategy_myCS is True:
-                    self.CS = myCS(self.app, self.state)
-                else:
-                    self.CS = CS(self.app, self.state)
+                # one custom strategy for the life of the bot, it keeps its scores and extra timeframes between ticks
+                custom_strategy = myCS if strategy_myCS is True else CS
+                if not isinstance(getattr(app, "custom_strategy", None), custom_strategy):
+                    app.custom_strategy = custom_strategy(self.app, self.state)
+                    app.strategy_scores = StrategyScores(app.custom_strategy) if hasattr(app.custom_strategy, "score") else None
+                self.CS = app.custom_strategy
+                self.CS.state = self.state
                 self.CS_ready = True
         else:
             self.CS_ready = False
@@ -606,8 +613,15 @@ class Strategy:
         if self.CS_ready is True:
             # use try/except since this is a customizable file
             try:
-                # indicatorvalues displays indicators in log and telegram if debug is True in CS.tradeSignals
-                indicatorvalues = self.CS.tradeSignals(self._df_last, self._df, current_sim_date, websocket)
+                if self.app.strategy_scores is not None:
+                    # vectorized custom strategy, every row is scored at once and looked up here
+                    scores = self.app.strategy_scores.apply(self.app, self._history, self._df_last.index[-1], websocket)
+                    indicatorvalues = " ".join(f"{name}: {value}" for name, value in scores.items()) if self.app.debug else ""
+                    if indicatorvalues:
+                        RichText.notify(indicatorvalues, self.app, "info")
+                else:
+                    # indicatorvalues displays indicators in log and telegram if debug is True in CS.tradeSignals
+                    indicatorvalues = self.CS.tradeSignals(self._df_last, self._df, current_sim_date, websocket)
             except Exception as err:
                 self.CS_ready = False
                 RichText.notify(f"Custom Strategy Error: {err}", self.app, "warning")
@@ -1,4 +1,6 @@
 from datetime import date, datetime, timedelta
+import numpy as np
+import pandas as pd
 from models.AppState import AppState
 from utils.PyCryptoBot import truncate as _truncate
 from views.PyCryptoBot import RichText
@@ -51,7 +53,7 @@ class Strategy_CS:
         # EMA6hBull = self.app.is6hEMA1226Bull(current_sim_date, websocket)
 
         # name and add the dataframe
-        df_1h = self.app.getAdditionalDf("1h", websocket).copy()
+        df_1h = self.app.get_additional_df("1h", websocket).copy()
         # set variable to call technical analysis in Trading_Pta (or myPta)
         ta_1h = self.TA(df_1h)
         # add any individual signals/inicators or add_all()
@@ -63,7 +65,7 @@ class Strategy_CS:
         data_1h = self.app.get_interval(df_1h)
 
         # repeat for any additional, don't recommend more than 1 or 2 additional, adds overhead and API calls
-        df_6h = self.app.getAdditionalDf("6h", websocket).copy()
+        df_6h = self.app.get_additional_df("6h", websocket).copy()
         ta_6h = self.TA(df_6h, self.app.adjusttotalperiods)
         ta_6h.add_ema(5, True)
         ta_6h.add_ema(10, True)
@@ -420,6 +422,129 @@ class Strategy_CS:
 
         return indicatorvalues
 
+    # extra granularities passed to score(), comment out to score with tradeSignals() instead
+    timeframes = ["1h", "6h"]
+
+    def prepare_timeframe(self, short_granularity, df):
+
+        # indicators of an extra granularity, added once per candle close instead of every tick
+        ta = self.TA(df) if short_granularity == "1h" else self.TA(df, self.app.adjusttotalperiods)
+        ta.add_ema(5, True)
+        ta.add_ema(10, True)
+        return ta.get_df()
+
+    def score(self, df, timeframes):
+
+        """
+        The points of tradeSignals() as whole column operations, scoring every row of the
+        indicator frame at once. timeframes holds the extra granularities listed above, each
+        row being the last candle closed by that row's date. Returns a DataFrame indexed like
+        df, each column is copied to the attribute of the same name for the row being traded.
+        If customizing tradeSignals() in Strategy_myCS.py, customize this the same way or
+        remove it (and timeframes) to keep using tradeSignals().
+        """
+
+        def diff(first, second):
+            return ((df[first] - df[second]) / df[first].abs() * 100).round(2)
+
+        def points(signal, strong):
+            return np.where(signal, np.where(strong, 2, 1), 0)
+
+        data_1h, data_6h = timeframes["1h"], timeframes["6h"]
+        EMA1hBull = data_1h["ema5"] > data_1h["ema10"]
+        EMA6hBull = data_6h["ema5"] > data_6h["ema10"]
+
+        rsi_ma_diff = diff("rsi14", "rsima14")
+        di_diff = diff("+di14", "-di14")
+        macd_sg_diff = diff("macd", "signal")
+        obv_sm_diff = diff("obv", "obvsm")
+        macdl_sg_diff = diff("macdlead", "macdl_sig")
+
+        self.max_pts = 12
+        self.use_adjusted_buy_pts = True
+        self.use_adjusted_sell_pts = False
+
+        # market trend, see tradeSignals() for each level
+        high_risk = (df["sma5"] < df["sma10"]) & (df["sma5_pc"] < 0) & (df["sma10_pc"] < 0)
+        improving = (df["sma5"] > df["sma10"]) & (df["sma5_pc"] > 0.1) & (df["sma10_pc"] > 0.1) & (data_1h["ema5_pc"] > 0)
+        less_risk = (
+            improving
+            & (df["sma10"] > df["sma50"])
+            & (df["sma50_pc"] > 0)
+            & EMA1hBull
+            & (data_1h["ema5_pc"] > 0)
+            & (data_6h["ema5_pc"] > 0)
+        )
+        low_risk = less_risk & (df["sma50"] > df["sma100"]) & (df["sma100_pc"] > 0) & EMA6hBull & (data_6h["ema5_pc"] > 0)
+
+        trends = [high_risk, low_risk, less_risk, improving]
+        scores = pd.DataFrame(index=df.index)
+        scores["market_trend"] = np.select(
+            trends,
+            ["High risk, no buying, Sell NOW!", "Low risk, buy! buy! buy!", "Less risk, buy medium points", "Risky, don't buy yet"],
+            "Too risky, don't buy yet",
+        )
+        scores["pts_to_buy"] = np.select(trends, [100, 8, 9, 100], 100)
+        scores["immed_buy_pts"] = np.select(trends, [11, 9, 10, 11], 11)
+        scores["pts_to_sell"] = np.select(trends, [3, 5, 4, 3], 3)
+        scores["immed_sell_pts"] = np.select(trends, [5, 8, 7, 5], 5)
+        scores["sell_override_pts"] = np.select(trends, [100, 10, 10, 100], 100)
+
+        # RSI with SMMA
+        rsi_buy = (rsi_ma_diff >= 3) & (df["rsima14_pc"] > 0) & (df["rsi14_pc"] > 0)
+        rsi_sell = ~rsi_buy & (df["rsi14_pc"] < 0) & ((rsi_ma_diff < 0) | (df["rsima14_pc"] < 0))
+        # ADX with DI+ and DI-
+        adx_buy = (df["+di14"] > df["-di14"]) & (di_diff > 20) & (df["adx14"] > 20)
+        adx_sell = ~adx_buy & (df["+di14"] < df["-di14"])
+        # MACD and signal
+        macd_buy = (macd_sg_diff > 15) & (df["macd_pc"] > 0)
+        macd_sell = ~macd_buy & (df["macd_pc"] < 0)
+        # OBV and SMA8
+        obv_buy = (obv_sm_diff > 0.5) & (df["obvsm_pc"] > 0)
+        obv_sell = ~obv_buy & ((obv_sm_diff < 0) | (df["obvsm_pc"] < 0))
+        # MACD leader
+        macdl_buy = (macdl_sg_diff > 1) & (df["macdlead_pc"] > 3)
+        macdl_sell = ~macdl_buy & (df["macdlead_pc"] < 0)
+        # EMA5/WMA5 crossover
+        emawma_buy = (df["ema5"] > df["ema5_wma5"]) & (df["ema5_pc"] > 0.1)
+        emawma_sell = ~emawma_buy & (df["ema5_pc"] < 0)
+
+        buy_pts = (
+            points(rsi_buy, (rsi_ma_diff > 10) | (df["rsi14_pc"] >= 3))
+            + points(adx_buy, (df["adx14"] > 30) & (di_diff > 30))
+            + points(macd_buy, (macd_sg_diff > 30) | (df["macd_pc"] > 8))
+            + points(obv_buy, False)
+            + points(macdl_buy, (macdl_sg_diff > 30) | (df["macdlead_pc"] > 10))
+            + points(emawma_buy, df["ema5_pc"] > 5)
+        )
+        sell_pts = (
+            points(rsi_sell, (rsi_ma_diff < -8) | (df["rsima14_pc"] < -3))
+            + points(adx_sell, (di_diff < -10) | (df["+di_pc"] < 0))
+            + points(macd_sell, (macd_sg_diff < 0) | (df["macd_pc"] < -8))
+            + points(obv_sell, False)
+            + points(macdl_sell, (macdl_sg_diff < 1) | (df["macdlead_pc"] < -5))
+            + points(emawma_sell, df["ema5"] < df["ema5_wma5"])
+        )
+
+        # adjusted buy pts - subtract any sell pts from buy pts
+        if self.use_adjusted_buy_pts is True:
+            buy_pts = buy_pts - sell_pts
+
+        # adjusted sell pts - subtract any buy pts from sell pts
+        if self.use_adjusted_sell_pts is True:
+            sell_pts = sell_pts - buy_pts
+
+        scores["buy_pts"] = buy_pts
+        scores["sell_pts"] = sell_pts
+
+        # required buy signals are MACD, RSI and OBV
+        scores["pts_sig_required_buy"] = rsi_buy.astype(int) + macd_buy.astype(int) + obv_buy.astype(int)
+        scores["sig_required_buy"] = 3
+        scores["pts_sig_required_sell"] = 0
+        scores["sig_required_sell"] = 0
+
+        return scores
+
     def buySignal(self) -> bool:
 
         # non-Traditional buy signal criteria
@@ -1,6 +1,5 @@
 """Technical analysis on a trading Pandas DataFrame"""
 
-import warnings
 import pandas_ta as ta
 
 from re import compile
@@ -19,11 +18,12 @@ from numpy import (
 )
 from pandas import concat, DataFrame, Series
 from datetime import datetime, timedelta
-from statsmodels.tsa.statespace.sarimax import SARIMAX, SARIMAXResultsWrapper
-from statsmodels.tools.sm_exceptions import ConvergenceWarning
+from typing import TYPE_CHECKING
+from models.helper.ForecastHelper import forecaster
 from views.PyCryptoBot import RichText
 
-warnings.simplefilter("ignore", ConvergenceWarning)
+if TYPE_CHECKING:
+    from statsmodels.tsa.statespace.sarimax import SARIMAXResultsWrapper
 
 
 class TechnicalAnalysis:
@@ -772,30 +772,47 @@ class TechnicalAnalysis:
         # self.df["williamsr" + str(period)] = self.df["williamsr" + str(period)].replace(nan, -50)
         self.df["williamsr" + str(period)] = ta.willr(high=self.df["high"], close=self.df["close"], low=self.df["low"], interval=period, fillna=self.df.close)
 
-    def seasonal_arima_model(self) -> SARIMAXResultsWrapper:
-        """Returns the Seasonal ARIMA Model for price predictions"""
+    def seasonal_arima_model(self, wait: bool = True) -> "SARIMAXResultsWrapper":
+        """Returns the Seasonal ARIMA Model for price predictions
+
+        The fit is cached per market and granularity and only redone when a new candle closes,
+        with wait=False the refit runs in the background and None is returned until the first fit is ready.
+        """
+
+        close = self._arima_close()
+        if "market" not in self.df or "granularity" not in self.df:
+            return forecaster.fit(close)
 
-        # hyperparameters for SARIMAX
+        return forecaster.results(close, self.df["market"].iloc[-1], self.df["granularity"].iloc[-1], wait)
+
+    def _arima_close(self) -> Series:
+        """Closing prices on a regular index, the bot's own DataFrame is left untouched"""
+
+        close = self.df["close"]
         if not self.df.index.freq:
             freq = str(self.df["granularity"].iloc[-1]).replace("m", "T").replace("h", "H").replace("d", "D")
             if freq.isdigit():
                 freq += "S"
-            self.df.index = self.df.index.to_period(freq)
-        model = SARIMAX(self.df["close"], trend="n", order=(0, 1, 0), seasonal_order=(1, 1, 1, 12))
-        return model.fit(disp=-1)
+            close = close.copy()
+            close.index = close.index.to_period(freq)
+        return close
 
     def seasonal_arima_model_fitted_values(self):  # TODO: annotate return type
         """Returns the Seasonal ARIMA Model for price predictions"""
 
-        return self.seasonal_arima_model().fittedvalues
+        fitted = self.seasonal_arima_model().fittedvalues.copy()
+        fitted.index = self.df.index
+        return fitted
 
-    def seasonal_arima_model_prediction(self, minutes: int = 180) -> tuple:
+    def seasonal_arima_model_prediction(self, minutes: int = 180, wait: bool = True) -> tuple:
         """Returns seasonal ARIMA model prediction
 
         Parameters
         ----------
         minutes     : int
             Number of minutes to predict
+        wait        : bool
+            Wait for the model to be fitted, otherwise None is returned until it is
         """
 
         if not isinstance(minutes, int):
@@ -804,9 +821,11 @@ class TechnicalAnalysis:
         if minutes < 1 or minutes > 4320:
             raise ValueError("Predication minutes is out of range")
 
-        results_ARIMA = self.seasonal_arima_model()
+        results_ARIMA = self.seasonal_arima_model(wait)
+        if results_ARIMA is None:
+            return None
 
-        start_ts = self.df.last_valid_index()
+        start_ts = self._arima_close().last_valid_index()
         end_ts = start_ts + timedelta(minutes=minutes)
         pred = results_ARIMA.predict(start=str(start_ts), end=str(end_ts), dynamic=True)
 
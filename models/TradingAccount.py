@@ -1,5 +1,6 @@
 """Live or test trading account"""
 
+import os
 import re
 from datetime import datetime
 import time
@@ -8,10 +9,15 @@ import numpy as np
 import pandas as pd
 
 from utils.PyCryptoBot import truncate
+from models.AccountCache import AccountCache
+from models.helper.ColumnBufferHelper import ColumnBuffer
+from models.helper.OrderPairHelper import pair_orders
 from models.exchange.ExchangesEnum import Exchange
-from models.exchange.binance import AuthAPI as BAuthAPI
-from models.exchange.coinbase_pro import AuthAPI as CBAuthAPI
-from models.exchange.kucoin import AuthAPI as KAuthAPI
+from models.exchange.LazyImport import LazyExchangeAPI
+
+BAuthAPI = LazyExchangeAPI("binance", "AuthAPI")
+CBAuthAPI = LazyExchangeAPI("coinbase_pro", "AuthAPI")
+KAuthAPI = LazyExchangeAPI("kucoin", "AuthAPI")
 
 
 class TradingAccount:
@@ -29,10 +35,8 @@ class TradingAccount:
             raise TypeError("App is not a PyCryptoBot object.")
 
         # if trading account is for testing it will be instantiated with a balance of 1000
-        self.balance = pd.DataFrame(
-            [[app.quote_currency, 0, 0, 0], [app.base_currency, 0, 0, 0]],
-            columns=["currency", "balance", "hold", "available"],
-        )
+        # test balances are plain floats per currency, nothing is ever held so all of it is available
+        self._balances = {app.quote_currency: 0.0, app.base_currency: 0.0}
 
         self.app = app
 
@@ -47,7 +51,54 @@ class TradingAccount:
         self.base_balance_before = 0.0
         self.quote_balance_before = 0.0
 
-        self.orders = pd.DataFrame()
+        # test orders are appended to column buffers and only built into a DataFrame when read
+        self._orders = pd.DataFrame()
+        self._dummy_orders = ColumnBuffer(
+            {
+                "created_at": object,
+                "market": object,
+                "action": object,
+                "type": object,
+                "size": float,
+                "filled": float,
+                "fees": float,
+                "price": float,
+                "status": object,
+            }
+        )
+
+        # balances and done orders for last action polling, refreshed only when they can have changed
+        self.cache = AccountCache(lambda: self.get_balance(), lambda market: self.get_orders(market, "", "done"))
+        self._tracker_signatures = {}
+
+    @property
+    def balance(self) -> pd.DataFrame:
+        """Test balances as a DataFrame"""
+
+        return pd.DataFrame(
+            [[currency, amount, 0.0, amount] for currency, amount in self._balances.items()],
+            columns=["currency", "balance", "hold", "available"],
+        )
+
+    @property
+    def orders(self) -> pd.DataFrame:
+        if len(self._dummy_orders) > 0:
+            new_orders = self._dummy_orders.to_frame()
+            self._orders = pd.concat([self._orders, new_orders], ignore_index=True) if len(self._orders) > 0 else new_orders
+            self._dummy_orders.clear()
+        return self._orders
+
+    @orders.setter
+    def orders(self, orders: pd.DataFrame) -> None:
+        self._orders = orders
+        self._dummy_orders.clear()
+
+    def _rename_dummy_currency(self, placeholder: str, currency: str) -> None:
+        if placeholder in self._balances and currency not in self._balances:
+            self._balances = {currency if name == placeholder else name: amount for name, amount in self._balances.items()}
+
+    def _dummy_available(self, currency: str, precision: int) -> float:
+        return float(truncate(self._balances.setdefault(currency, 0.0), precision))
 
     def _convert_status(self, val):
         if val == "filled":
@@ -251,44 +302,10 @@ class TradingAccount:
                     # retrieve all balances
                     return self.balance
                 else:
-                    self.balance = self.balance.replace("QUOTE", currency)
-
-                    if self.balance.currency[
-                        self.balance.currency.isin([currency])
-                    ].empty:
-                        self.balance.loc[len(self.balance)] = [currency, 0, 0, 0]
+                    self._rename_dummy_currency("QUOTE", currency)
 
                     # retrieve balance of specified currency
-                    df = self.balance
-                    df_filtered = df[df["currency"] == currency]["available"]
-
-                    if len(df_filtered) == 0:
-                        # return nil balance if no positive balance was found
-                        return 0.0
-                    else:
-                        # return balance of specified currency (if positive)
-                        if currency in ["EUR", "GBP", "USD"]:
-                            return float(
-                                truncate(
-                                    float(
-                                        df[df["currency"] == currency][
-                                            "available"
-                                        ].values[0]
-                                    ),
-                                    2,
-                                )
-                            )
-                        else:
-                            return float(
-                                truncate(
-                                    float(
-                                        df[df["currency"] == currency][
-                                            "available"
-                                        ].values[0]
-                                    ),
-                                    4,
-                                )
-                            )
+                    return self._dummy_available(currency, 2 if currency in ["EUR", "GBP", "USD"] else 4)
 
         elif self.app.exchange == Exchange.BINANCE:
             if self.mode == "live":
@@ -347,50 +364,16 @@ class TradingAccount:
                     return self.balance
                 else:
                     if self.app.exchange == Exchange.BINANCE:
-                        self.balance = self.balance.replace("QUOTE", currency)
+                        self._rename_dummy_currency("QUOTE", currency)
                     else:
                         # replace QUOTE and BASE placeholders
                         if currency in ["EUR", "GBP", "USD"]:
-                            self.balance = self.balance.replace("QUOTE", currency)
+                            self._rename_dummy_currency("QUOTE", currency)
                         else:
-                            self.balance = self.balance.replace("BASE", currency)
-
-                    if self.balance.currency[
-                        self.balance.currency.isin([currency])
-                    ].empty:
-                        self.balance.loc[len(self.balance)] = [currency, 0, 0, 0]
+                            self._rename_dummy_currency("BASE", currency)
 
                     # retrieve balance of specified currency
-                    df = self.balance
-                    df_filtered = df[df["currency"] == currency]["available"]
-
-                    if len(df_filtered) == 0:
-                        # return nil balance if no positive balance was found
-                        return 0.0
-                    else:
-                        # return balance of specified currency (if positive)
-                        if currency in ["EUR", "GBP", "USD"]:
-                            return float(
-                                truncate(
-                                    float(
-                                        df[df["currency"] == currency][
-                                            "available"
-                                        ].values[0]
-                                    ),
-                                    2,
-                                )
-                            )
-                        else:
-                            return float(
-                                truncate(
-                                    float(
-                                        df[df["currency"] == currency][
-                                            "available"
-                                        ].values[0]
-                                    ),
-                                    4,
-                                )
-                            )
+                    return self._dummy_available(currency, 2 if currency in ["EUR", "GBP", "USD"] else 4)
 
         elif self.app.exchange == Exchange.COINBASEPRO:
             if self.mode == "live":
@@ -462,49 +445,12 @@ class TradingAccount:
                 else:
                     # replace QUOTE and BASE placeholders
                     if currency in ["EUR", "GBP", "USD"]:
-                        self.balance = self.balance.replace("QUOTE", currency)
+                        self._rename_dummy_currency("QUOTE", currency)
                     elif currency in ["BCH", "BTC", "ETH", "LTC", "XLM"]:
-                        self.balance = self.balance.replace("BASE", currency)
-
-                    if (
-                        self.balance.currency[
-                            self.balance.currency.isin([currency])
-                        ].empty
-                        is True
-                    ):
-                        self.balance.loc[len(self.balance)] = [currency, 0, 0, 0]
+                        self._rename_dummy_currency("BASE", currency)
 
                     # retrieve balance of specified currency
-                    df = self.balance
-                    df_filtered = df[df["currency"] == currency]["available"]
-
-                    if len(df_filtered) == 0:
-                        # return nil balance if no positive balance was found
-                        return 0.0
-                    else:
-                        # return balance of specified currency (if positive)
-                        if currency in ["EUR", "GBP", "USD"]:
-                            return float(
-                                truncate(
-                                    float(
-                                        df[df["currency"] == currency][
-                                            "available"
-                                        ].values[0]
-                                    ),
-                                    2,
-                                )
-                            )
-                        else:
-                            return float(
-                                truncate(
-                                    float(
-                                        df[df["currency"] == currency][
-                                            "available"
-                                        ].values[0]
-                                    ),
-                                    4,
-                                )
-                            )
+                    return self._dummy_available(currency, 2 if currency in ["EUR", "GBP", "USD"] else 4)
         else:
             # dummy account
 
@@ -513,15 +459,7 @@ class TradingAccount:
                 return self.balance
             else:
                 # retrieve balance of specified currency
-                df = self.balance
-                df_filtered = df[df["currency"] == currency]["available"]
-
-                if len(df_filtered) == 0:
-                    # return nil balance if no positive balance was found
-                    return 0.0
-                else:
-                    # return balance of specified currency (if positive)
-                    return float(df[df["currency"] == currency]["available"].values[0])
+                return self._balances.get(currency, 0.0)
 
     def deposit_base_currency(self, base_currency: float) -> pd.DataFrame():
         if self.app.exchange != "dummy":
@@ -530,19 +468,7 @@ class TradingAccount:
         if base_currency <= 0:
             raise ValueError(f"Invalid base currency: {str(base_currency)}")
 
-        self.balance.loc[
-            self.balance["currency"] == self.app.base_currency, "balance"
-        ] = (
-            self.balance.loc[
-                self.balance["currency"] == self.app.base_currency, "balance"
-            ]
-            + base_currency
-        )
-        self.balance.loc[
-            self.balance["currency"] == self.app.base_currency, "available"
-        ] = self.balance.loc[
-            self.balance["currency"] == self.app.base_currency, "balance"
-        ]
+        self._balances[self.app.base_currency] = self._balances.get(self.app.base_currency, 0.0) + base_currency
         return self.balance
 
     def deposit_quote_currency(self, quote_currency: float) -> pd.DataFrame():
@@ -552,19 +478,7 @@ class TradingAccount:
         if quote_currency <= 0:
             raise ValueError(f"Invalid quote currency: {str(quote_currency)}")
 
-        self.balance.loc[
-            self.balance["currency"] == self.app.quote_currency, "balance"
-        ] = (
-            self.balance.loc[
-                self.balance["currency"] == self.app.quote_currency, "balance"
-            ]
-            + quote_currency
-        )
-        self.balance.loc[
-            self.balance["currency"] == self.app.quote_currency, "available"
-        ] = self.balance.loc[
-            self.balance["currency"] == self.app.quote_currency, "balance"
-        ]
+        self._balances[self.app.quote_currency] = self._balances.get(self.app.quote_currency, 0.0) + quote_currency
         return self.balance
 
     def withdraw_base_currency(self, base_currency: float) -> pd.DataFrame():
@@ -574,30 +488,10 @@ class TradingAccount:
         if base_currency <= 0:
             raise ValueError(f"Invalid base currency: {str(base_currency)}")
 
-        if (
-            float(
-                self.balance.loc[
-                    self.balance["currency"] == self.app.base_currency, "balance"
-                ]
-                - base_currency
-            )
-            < 0
-        ):
+        if self._balances.get(self.app.base_currency, 0.0) - base_currency < 0:
             raise ValueError("Insufficient funds!")
 
-        self.balance.loc[
-            self.balance["currency"] == self.app.base_currency, "balance"
-        ] = (
-            self.balance.loc[
-                self.balance["currency"] == self.app.base_currency, "balance"
-            ]
-            - base_currency
-        )
-        self.balance.loc[
-            self.balance["currency"] == self.app.base_currency, "available"
-        ] = self.balance.loc[
-            self.balance["currency"] == self.app.base_currency, "balance"
-        ]
+        self._balances[self.app.base_currency] -= base_currency
         return self.balance
 
     def withdraw_quote_currency(self, quote_currency: float) -> pd.DataFrame():
@@ -607,30 +501,10 @@ class TradingAccount:
         if quote_currency <= 0:
             raise ValueError(f"Invalid quote currency: {str(quote_currency)}")
 
-        if (
-            float(
-                self.balance.loc[
-                    self.balance["currency"] == self.app.quote_currency, "balance"
-                ]
-                - quote_currency
-            )
-            < 0
-        ):
+        if self._balances.get(self.app.quote_currency, 0.0) - quote_currency < 0:
             raise ValueError("Insufficient funds!")
 
-        self.balance.loc[
-            self.balance["currency"] == self.app.quote_currency, "balance"
-        ] = (
-            self.balance.loc[
-                self.balance["currency"] == self.app.quote_currency, "balance"
-            ]
-            - quote_currency
-        )
-        self.balance.loc[
-            self.balance["currency"] == self.app.quote_currency, "available"
-        ] = self.balance.loc[
-            self.balance["currency"] == self.app.quote_currency, "balance"
-        ]
+        self._balances[self.app.quote_currency] -= quote_currency
         return self.balance
 
     def market_buy(
@@ -655,68 +529,29 @@ class TradingAccount:
 
         market_base_currency, market_quote_currency = market.split("-")
 
-        if quote_currency > float(
-            self.balance.loc[
-                self.balance["currency"] == market_quote_currency, "balance"
-            ]
-        ):
+        if quote_currency > self._balances.get(market_quote_currency, 0.0):
             raise ValueError("Insufficient funds!")
 
         # update balances
-        self.balance.loc[
-            self.balance["currency"] == market_quote_currency, "balance"
-        ] = (
-            self.balance.loc[
-                self.balance["currency"] == market_quote_currency, "balance"
-            ]
-            - quote_currency
-        )
-        self.balance.loc[
-            self.balance["currency"] == market_quote_currency, "available"
-        ] = self.balance.loc[
-            self.balance["currency"] == market_quote_currency, "balance"
-        ]
         fees = quote_currency * 0.001
-        self.balance.loc[
-            self.balance["currency"] == market_base_currency, "balance"
-        ] = (
-            self.balance.loc[
-                self.balance["currency"] == market_base_currency, "balance"
-            ]
+        self._balances[market_quote_currency] = self._balances.get(market_quote_currency, 0.0) - quote_currency
+        self._balances[market_base_currency] = (
+            self._balances.get(market_base_currency, 0.0)
             + (quote_currency / price)
             - (fees / price)
         )
-        self.balance.loc[
-            self.balance["currency"] == market_base_currency, "available"
-        ] = self.balance.loc[
-            self.balance["currency"] == market_base_currency, "balance"
-        ]
 
         # update orders
-        self.orders = pd.concat(
-            [
-                self.orders,
-                pd.DataFrame(
-                    {
-                        "created_at": str(datetime.now()),
-                        "market": market,
-                        "action": "buy",
-                        "type": "market",
-                        "size": quote_currency,
-                        "filled": float(
-                            self.balance.loc[
-                                self.balance["currency"] == market_base_currency,
-                                "balance",
-                            ]
-                        ),
-                        "fees": fees,
-                        "price": price,
-                        "status": "done",
-                    },
-                    index={0},
-                ),
-            ],
-            ignore_index=True,
+        self._dummy_orders.append(
+            created_at=str(datetime.now()),
+            market=market,
+            action="buy",
+            type="market",
+            size=quote_currency,
+            filled=self._balances[market_base_currency],
+            fees=fees,
+            price=price,
+            status="done",
         )
 
         return True
@@ -742,63 +577,29 @@ class TradingAccount:
 
         market_base_currency, market_quote_currency = market.split("-")
 
-        if base_currency > float(
-            self.balance.loc[
-                self.balance["currency"] == market_base_currency, "balance"
-            ]
-        ):
+        if base_currency > self._balances.get(market_base_currency, 0.0):
             raise ValueError("Insufficient funds!")
 
         # update balances
-        self.balance.loc[
-            self.balance["currency"] == market_base_currency, "balance"
-        ] = (
-            self.balance.loc[
-                self.balance["currency"] == market_base_currency, "balance"
-            ]
-            - base_currency
-        )
-        self.balance.loc[
-            self.balance["currency"] == market_base_currency, "available"
-        ] = self.balance.loc[
-            self.balance["currency"] == market_base_currency, "balance"
-        ]
         fees = (base_currency * price) * 0.001
-        self.balance.loc[
-            self.balance["currency"] == market_quote_currency, "balance"
-        ] = (
-            self.balance.loc[
-                self.balance["currency"] == market_quote_currency, "balance"
-            ]
+        self._balances[market_base_currency] = self._balances.get(market_base_currency, 0.0) - base_currency
+        self._balances[market_quote_currency] = (
+            self._balances.get(market_quote_currency, 0.0)
             + (base_currency * price)
             - fees
         )
-        self.balance.loc[
-            self.balance["currency"] == market_quote_currency, "available"
-        ] = self.balance.loc[
-            self.balance["currency"] == market_quote_currency, "balance"
-        ]
 
         # update orders
-        self.orders = pd.concat(
-            [
-                self.orders,
-                pd.DataFrame(
-                    {
-                        "created_at": str(datetime.now()),
-                        "market": market,
-                        "action": "sell",
-                        "type": "market",
-                        "size": base_currency,
-                        "filled": base_currency,
-                        "fees": fees,
-                        "price": price,
-                        "status": "done",
-                    },
-                    index={0},
-                ),
-            ],
-            ignore_index=True,
+        self._dummy_orders.append(
+            created_at=str(datetime.now()),
+            market=market,
+            action="sell",
+            type="market",
+            size=base_currency,
+            filled=base_currency,
+            fees=fees,
+            price=price,
+            status="done",
         )
 
         return True
@@ -818,15 +619,9 @@ class TradingAccount:
         self._check_market_syntax(market)
 
         if self.mode == "live":
-            if self.app.exchange == Exchange.COINBASEPRO:
-                # retrieve orders from live Coinbase Pro account portfolio
-                df = self.get_orders(market, "", "done")
-            elif self.app.exchange == Exchange.BINANCE:
-                # retrieve orders from live Binance account portfolio
-                df = self.get_orders(market, "", "done")
-            elif self.app.exchange == Exchange.KUCOIN:
-                # retrieve orders from live Kucoin account portfolio
-                df = self.get_orders(market, "", "done")
+            if self.app.exchange in [Exchange.COINBASEPRO, Exchange.BINANCE, Exchange.KUCOIN]:
+                # retrieve done orders from the live account portfolio, refreshed only when stale or after our own orders
+                df = self.cache.get_orders(market)
             else:
                 df = pd.DataFrame()
         else:
@@ -853,88 +648,34 @@ class TradingAccount:
             # no data, return early
             return False
 
-        df_tracker = pd.DataFrame()
-
-        last_action = ""
-        for market in df["market"].sort_values().unique():
-            df_market = df[df["market"] == market]
-
-            df_buy = pd.DataFrame()
-            df_sell = pd.DataFrame()
-
-            pair = 0
-            # pylint: disable=unused-variable
-            for index, row in df_market.iterrows():
-                if row["action"] == "buy":
-                    pair = 1
-
-                if pair == 1 and (row["action"] != last_action):
-                    if row["action"] == "buy":
-                        df_buy = row
-                    elif row["action"] == "sell":
-                        df_sell = row
-
-                if row["action"] == "sell" and len(df_buy) != 0:
-                    df_pair = pd.DataFrame(
-                        [
-                            [
-                                df_sell["status"],
-                                df_buy["market"],
-                                df_buy["created_at"],
-                                df_buy["type"],
-                                df_buy["size"],
-                                df_buy["value"],
-                                df_buy["fees"],
-                                df_buy["price"],
-                                df_sell["created_at"],
-                                df_sell["type"],
-                                df_sell["size"],
-                                df_sell["value"],
-                                df_sell["fees"],
-                                df_sell["price"],
-                            ]
-                        ],
-                        columns=[
-                            "status",
-                            "market",
-                            "buy_at",
-                            "buy_type",
-                            "buy_size",
-                            "buy_value",
-                            "buy_fees",
-                            "buy_price",
-                            "sell_at",
-                            "sell_type",
-                            "sell_size",
-                            "sell_value",
-                            "sell_fees",
-                            "sell_price",
-                        ],
-                    )
-                    df_tracker = pd.concat([df_tracker, df_pair])
-                    pair = 0
-
-                last_action = row["action"]
-
-        if list(df_tracker.keys()) != [
-            "status",
-            "market",
-            "buy_at",
-            "buy_type",
-            "buy_size",
-            "buy_value",
-            "buy_fees",
-            "buy_price",
-            "sell_at",
-            "sell_type",
-            "sell_size",
-            "sell_value",
-            "sell_fees",
-            "sell_price",
-        ]:
-            # no data, return early
+        # the tracker only changes when orders are added
+        signature = (len(df), str(df["created_at"].max()) if len(df) > 0 else "")
+        if self._tracker_signatures.get((market, save_file)) == signature and os.path.exists(save_file):
+            return True
+
+        pairs = pair_orders(df)
+        if len(pairs) == 0:
             return False
 
+        df_tracker = pd.DataFrame(
+            {
+                "status": pairs["sell_status"],
+                "market": pairs["market"],
+                "buy_at": pairs["buy_created_at"],
+                "buy_type": pairs["buy_type"],
+                "buy_size": pairs["buy_size"],
+                "buy_value": pairs["buy_value"],
+                "buy_fees": pairs["buy_fees"],
+                "buy_price": pairs["buy_price"],
+                "sell_at": pairs["sell_created_at"],
+                "sell_type": pairs["sell_type"],
+                "sell_size": pairs["sell_size"],
+                "sell_value": pairs["sell_value"],
+                "sell_fees": pairs["sell_fees"],
+                "sell_price": pairs["sell_price"],
+            }
+        )
+
         df_tracker["profit"] = np.subtract(
             np.subtract(df_tracker["sell_value"], df_tracker["buy_value"]),
             np.add(df_tracker["buy_fees"], df_tracker["sell_fees"]),
@@ -948,3 +689,6 @@ class TradingAccount:
             df_sincebot.to_csv(save_file, index=False)
         except OSError:
             raise SystemExit(f"Unable to save: {save_file}")
+
+        self._tracker_signatures[(market, save_file)] = signature
+        return True
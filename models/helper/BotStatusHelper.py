@@ -0,0 +1,178 @@
+"""Incrementally maintained status table of running bots for the web dashboard"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from json.decoder import JSONDecodeError
+
+RED = "#99413d"
+GREEN = "#3D9970"
+
+
+def get_date_from_iso8601_str(date: str, now: datetime = None) -> str:
+    """Bot instance uptime as hours and minutes"""
+
+    started = datetime.fromisoformat(date.split(".")[0].replace("T", " "))
+    duration = (now or datetime.now()).replace(microsecond=0) - started
+    hours, remainder = divmod(duration.total_seconds(), 3600)
+    return f"{round(hours)}h {round(remainder // 60)}m"
+
+
+def _percent(value):
+    """'5.8735%' -> 0.058735, blanks become NaN and anything else is left alone"""
+
+    if not isinstance(value, str):
+        return value
+
+    if value.strip() == "":
+        return float("nan")
+
+    try:
+        return float(value.rstrip("%")) * 0.01
+    except ValueError:
+        return value
+
+
+def _margin_color(margin, from_df_high):
+    for value in (margin, from_df_high):
+        if isinstance(value, str) and "%" in value:
+            return RED if "-" in value else GREEN
+    return None
+
+
+def status_row(pair: str, data: dict) -> dict:
+    """Dashboard row for one bot, everything but the uptime which is time dependent"""
+
+    indicators = data.get("indicators", {})
+    margin = data["margin"]
+    from_df_high = data.get("from_df_high", " ")
+
+    return {
+        "Trading Pair": pair,
+        "Exchange": data["exchange"],
+        "Action": data.get("signal"),
+        "Current self.price": data["price"],
+        "Margin": _percent(margin),
+        "TSLT": str(data.get("trailingstoplosstriggered", "")),
+        "PVLT": str(data.get("preventlosstriggered", "")),
+        "From DF High": _percent(from_df_high),
+        "DF High": data.get("df_high", ""),
+        "BULL": str(indicators.get("BULL", "")),
+        "ERI": str(indicators.get("ERI", "")),
+        "EMA": str(indicators.get("EMA", "")),
+        "MACD": str(indicators.get("MACD", "")),
+        "OBV": str(indicators.get("OBV", "")),
+        "Margincolor": _margin_color(margin, from_df_high),
+    }
+
+
+class BotStatusSnapshot:
+    def __init__(self, datafolder: str, state: str = "active", min_interval: float = 1.0) -> None:
+        """Status of every bot in telegram_data, re-reading only files that changed
+
+        Parameters
+        ----------
+        datafolder : str
+            Folder holding the telegram_data directory
+        state : str
+            Bot control status to show
+        min_interval : float
+            Refreshes closer together than this (e.g. several browser tabs) share one scan
+        """
+
+        self.folder = os.path.join(datafolder, "telegram_data")
+        self.state = state
+        self.min_interval = min_interval
+        self.version = 0
+        self._files = {}  # pair -> ((mtime_ns, size), started, row or None)
+        self._records = []
+        self._scanned = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _is_bot_file(name: str) -> bool:
+        return name.endswith(".json") and name not in ("data.json", "settings.json") and not name.endswith("output.json")
+
+    def _load(self, path: str, pair: str):
+        """Returns (started, row), row is None for bots not shown, raises if the file is unreadable"""
+
+        with open(path, "r", encoding="utf8") as json_file:
+            data = json.load(json_file)
+
+        botcontrol = data.get("botcontrol", {})
+        if botcontrol.get("status", self.state) != self.state:
+            return None, None
+
+        try:
+            return botcontrol.get("started"), status_row(pair, data)
+        except KeyError:
+            return None, None
+
+    def refresh(self) -> bool:
+        """Stat the data folder and re-read changed bot files, returns True if the table changed"""
+
+        with self._lock:
+            now = time.monotonic()
+            if self._scanned is not None and now - self._scanned < self.min_interval:
+                return False
+            self._scanned = now
+
+            try:
+                entries = [entry for entry in os.scandir(self.folder) if self._is_bot_file(entry.name)]
+            except FileNotFoundError:
+                entries = []
+
+            changed = False
+            seen = set()
+            for entry in entries:
+                pair = entry.name[:-5]
+                seen.add(pair)
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+
+                key = (stat.st_mtime_ns, stat.st_size)
+                cached = self._files.get(pair)
+                if cached is not None and cached[0] == key:
+                    continue
+
+                try:
+                    started, row = self._load(entry.path, pair)
+                except (OSError, JSONDecodeError):
+                    # a bot part way through rewriting its file, keep the last good row and retry next time
+                    continue
+
+                self._files[pair] = (key, started, row)
+                changed = changed or row is not None or (cached is not None and cached[2] is not None)
+
+            for pair in [pair for pair in self._files if pair not in seen]:
+                changed = changed or self._files[pair][2] is not None
+                del self._files[pair]
+
+            if changed:
+                active = sorted((pair, entry) for pair, entry in self._files.items() if entry[2] is not None)
+                # stable sort keeps pairs alphabetical within each action
+                active.sort(key=lambda item: str(item[1][2]["Action"]))
+                self._records = [(started, row) for _, (_, started, row) in active]
+                self.version += 1
+
+            return changed
+
+    def records(self, refresh: bool = True) -> list:
+        """Table rows ready for dash_table.DataTable"""
+
+        if refresh:
+            self.refresh()
+
+        now = datetime.now()
+        rows = []
+        for started, row in self._records:
+            try:
+                uptime = get_date_from_iso8601_str(started, now) if started else ""
+            except ValueError:
+                uptime = ""
+            rows.append({"Uptime": uptime, **row})
+        return rows
@@ -0,0 +1,99 @@
+"""In-memory caches shared between threads"""
+
+import threading
+import time
+
+
+class TTLCache:
+    def __init__(self, ttl: float = 60, clock=time.monotonic) -> None:
+        """Key/value cache where entries expire after `ttl` seconds
+
+        Parameters
+        ----------
+        ttl : float
+            Default lifetime of an entry in seconds
+        clock : callable
+            Time source, replaceable in tests
+        """
+
+        self.ttl = ttl
+        self.clock = clock
+        self._data = {}
+        self._loading = {}  # key -> Event set when the running load finishes
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Returns the cached value or default if missing or expired"""
+
+        with self._lock:
+            return self._lookup(key, default)
+
+    def _lookup(self, key, default):
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+
+        expires, value = entry
+        if expires <= self.clock():
+            del self._data[key]
+            return default
+
+        return value
+
+    def get_or_set(self, key, loader, ttl: float = None):
+        """Returns the cached value, or stores and returns what loader() gives
+
+        Concurrent callers missing the same key wait for a single call of loader
+        instead of each making their own. If that call fails they try again themselves.
+        """
+
+        with self._lock:
+            value = self._lookup(key, self)
+            if value is not self:
+                return value
+
+            loading = self._loading.get(key)
+            if loading is None:
+                self._loading[key] = threading.Event()
+
+        if loading is not None:
+            loading.wait()
+            return self.get_or_set(key, loader, ttl)
+
+        try:
+            value = loader()
+            self.set(key, value, ttl)
+            return value
+        finally:
+            with self._lock:
+                self._loading.pop(key).set()
+
+    def set(self, key, value, ttl: float = None) -> None:
+        """Stores a value for `ttl` seconds (the cache default if not given)"""
+
+        with self._lock:
+            self._data[key] = (self.clock() + (self.ttl if ttl is None else ttl), value)
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, self) is not self
+
+    def __len__(self) -> int:
+        self.purge()
+        return len(self._data)
+
+    def invalidate(self, key=None) -> None:
+        """Removes one key, or everything when no key is given"""
+
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def purge(self) -> None:
+        """Drops expired entries"""
+
+        with self._lock:
+            now = self.clock()
+            for key in [key for key, (expires, _) in self._data.items() if expires <= now]:
+                del self._data[key]
@@ -0,0 +1,82 @@
+"""Append only tables kept as columns until they are read as a DataFrame"""
+
+import numpy as np
+import pandas as pd
+
+INITIAL_CAPACITY = 256
+
+
+class ColumnBuffer:
+    def __init__(self, columns: dict, capacity: int = INITIAL_CAPACITY) -> None:
+        """Rows written into preallocated numpy columns, which double in size when full
+
+        Appending a row is a handful of array writes, the DataFrame is only built when
+        to_frame() is called and is reused until the next append.
+
+        Parameters
+        ----------
+        columns : dict
+            Column name to dtype, float columns default to NaN and any other dtype is kept as objects defaulting to None
+        capacity : int
+            Rows allocated up front
+        """
+
+        self._floats = {name for name, dtype in columns.items() if np.dtype(dtype).kind == "f"}
+        self._data = {name: self._allocate(name, max(capacity, 1)) for name in columns}
+        self._size = 0
+        self._frame = None
+
+    def _allocate(self, name: str, capacity: int) -> np.ndarray:
+        if name in self._floats:
+            return np.full(capacity, np.nan)
+        return np.full(capacity, None, dtype=object)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def columns(self) -> list:
+        return list(self._data)
+
+    def append(self, **row) -> None:
+        """Adds a row, columns left out are NaN or None"""
+
+        unknown = set(row) - set(self._data)
+        if unknown:
+            raise KeyError(f"Unknown columns: {', '.join(sorted(unknown))}")
+
+        capacity = len(next(iter(self._data.values())))
+        if self._size == capacity:
+            for name, values in self._data.items():
+                self._data[name] = np.concatenate([values, self._allocate(name, capacity)])
+
+        for name, value in row.items():
+            self._data[name][self._size] = value
+        self._size += 1
+        self._frame = None
+
+    def row(self, index: int) -> pd.Series:
+        """A single row, without building the DataFrame"""
+
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("Row index out of range")
+
+        return pd.Series({name: values[index] for name, values in self._data.items()}, name=index)
+
+    def to_frame(self) -> pd.DataFrame:
+        if self._frame is None:
+            self._frame = pd.DataFrame({name: values[: self._size].copy() for name, values in self._data.items()})
+        return self._frame
+
+    def to_csv(self, *args, **kwargs):
+        return self.to_frame().to_csv(*args, **kwargs)
+
+    def clear(self) -> None:
+        """Empties the buffer, keeping its capacity"""
+
+        for name, values in self._data.items():
+            values[: self._size] = np.nan if name in self._floats else None
+        self._size = 0
+        self._frame = None
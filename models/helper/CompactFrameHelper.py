@@ -0,0 +1,62 @@
+"""Smaller dtypes for candle and indicator DataFrames"""
+
+import numpy as np
+import pandas as pd
+
+CATEGORY_COLUMNS = ["market", "granularity"]
+# TechnicalAnalysis requires float64 prices, and recalculates every indicator from them
+PRICE_COLUMNS = ["open", "high", "low", "close", "volume"]
+FLOAT32_RTOL = 1e-6
+
+
+def compact_candles(df: pd.DataFrame) -> pd.DataFrame:
+    """Stores the repeated market and granularity strings as categories, in place
+
+    Parameters
+    ----------
+    df : Pandas DataFrame
+        Candles from get_historical_data
+    """
+
+    for column in CATEGORY_COLUMNS:
+        if column in df and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype("category")
+    return df
+
+
+def _fits_float32(values: np.ndarray) -> bool:
+    with np.errstate(over="ignore"):
+        return np.allclose(values.astype(np.float32), values, rtol=FLOAT32_RTOL, atol=0, equal_nan=True)
+
+
+def _is_bool_column(series: pd.Series) -> bool:
+    # only complete columns, a missing value is truthy in bool() and would change a signal
+    return series.dtype == object and series.map(type).isin([bool, np.bool_]).all()
+
+
+def compact_indicators(df: pd.DataFrame, keep: list = PRICE_COLUMNS) -> pd.DataFrame:
+    """Narrows the dtypes of a DataFrame after TechnicalAnalysis.add_all(), in place
+
+    Market and granularity become categories, indicator columns become float32 when every
+    value survives the conversion to within FLOAT32_RTOL, and signal columns left as
+    Python objects become numpy booleans. The signals are calculated before this is called,
+    so the trade decisions read from them are unchanged.
+
+    Parameters
+    ----------
+    df : Pandas DataFrame
+        Candles with their indicators
+    keep : list
+        Float columns that stay float64
+    """
+
+    compact_candles(df)
+
+    for column in df.columns:
+        series = df[column]
+        if series.dtype == np.float64 and column not in keep:
+            if _fits_float32(series.to_numpy()):
+                df[column] = series.astype(np.float32)
+        elif _is_bool_column(series):
+            df[column] = series.astype(bool)
+    return df
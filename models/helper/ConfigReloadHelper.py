@@ -0,0 +1,138 @@
+"""Config changes applied to a running bot between ticks"""
+
+import copy
+import os
+import signal
+from enum import Enum
+
+from views.PyCryptoBot import RichText
+
+# settings the bot's candles, accounts and websocket were opened with, a restart is needed to change them
+RESTART_SETTINGS = [
+    "exchange",
+    "market",
+    "base_currency",
+    "quote_currency",
+    "granularity",
+    "api_url",
+    "api_key",
+    "api_secret",
+    "api_passphrase",
+    "websocket",
+    "is_live",
+    "is_sim",
+    # set up once when the bot starts
+    "logfile",
+    "logformat",
+    "disablelog",
+    "filelog",
+    "fileloglevel",
+    "consolelog",
+    "consoleloglevel",
+    "term_color",
+    "term_width",
+    "enable_pandas_ta",
+    "metricsport",
+    "profile",
+    "userdatastream",
+    "websocketrecord",
+]
+SETTING_TYPES = (bool, int, float, str, list, tuple, dict, Enum, type(None))
+
+
+class ConfigReloader:
+    def __init__(self, app) -> None:
+        """Reloads the config file on SIGHUP, or when it changes with watchconfig, keeping the bot's data and websocket
+
+        The signal handler and the file check only mark a reload as pending, check() applies
+        it from execute_job() between ticks. The new config is parsed into a copy of the bot
+        first, so a config that fails validation changes nothing.
+
+        Parameters
+        ----------
+        app : PyCryptoBot
+            Bot to reload the config of
+        """
+
+        self.app = app
+        self.pending = False
+        self._mtime = self._config_mtime()
+        # compared with what the bot started with, smart switch changes the granularity while running
+        self.started = {name: getattr(app, name) for name in RESTART_SETTINGS if hasattr(app, name)}
+
+        # not available on Windows, and only the main thread may install a handler
+        if hasattr(signal, "SIGHUP"):
+            try:
+                signal.signal(signal.SIGHUP, self._on_signal)
+            except ValueError:
+                pass
+
+    def _on_signal(self, signum, frame) -> None:  # pylint: disable=unused-argument
+        self.pending = True
+
+    def _config_mtime(self):
+        try:
+            return os.stat(self.app.config_file).st_mtime_ns
+        except OSError:
+            return None
+
+    def check(self) -> dict:
+        """Reloads the config if a signal arrived or the file changed, returns the settings applied"""
+
+        if self.app.watchconfig:
+            mtime = self._config_mtime()
+            if mtime != self._mtime:
+                self._mtime = mtime
+                if mtime is not None:  # a config being replaced may be missing for a moment
+                    self.pending = True
+
+        if not self.pending:
+            return {}
+
+        self.pending = False
+        return self.reload()
+
+    def reload(self) -> dict:
+        """Validates the config file and applies the settings that changed, returns them"""
+
+        candidate = copy.copy(self.app)
+        # settings the config file leaves out keep their startup values, not the switched ones
+        vars(candidate).update(self.started)
+        try:
+            candidate.read_config(self.app.exchange)
+        except Exception as err:  # pylint: disable=broad-except
+            RichText.notify(f"Config reload rejected, keeping the current settings: {err}", self.app, "error")
+            return {}
+
+        current = vars(self.app)
+        loaded = {name: value for name, value in vars(candidate).items() if not name.startswith("_") and isinstance(value, SETTING_TYPES)}
+
+        restart = sorted(name for name, value in self.started.items() if getattr(candidate, name, None) != value)
+        if restart:
+            RichText.notify(f"Config reload ignored {', '.join(restart)}, the bot needs a restart to change them", self.app, "warning")
+
+        applied = {
+            name: value
+            for name, value in loaded.items()
+            if name not in RESTART_SETTINGS and (name not in current or current[name] != value)
+        }
+        for name, value in applied.items():
+            setattr(self.app, name, value)
+
+        # read_config builds the Telegram client from the token and client_id, which are not settings of their own
+        if _client_settings(candidate._chat_client) != _client_settings(self.app._chat_client):  # pylint: disable=protected-access
+            self.app._chat_client = candidate._chat_client  # pylint: disable=protected-access
+            applied["telegram"] = candidate.telegram
+
+        settings = ", ".join(name for name in applied if name != "config")
+        RichText.notify(f"Config reloaded: {settings or 'no changes'}", self.app, "normal")
+        if settings:
+            try:
+                self.app.notify_telegram(f"{self.app.market} config reloaded: {settings}")
+            except Exception as err:  # pylint: disable=broad-except
+                RichText.notify(f"Unable to send the config reload to Telegram: {err}", self.app, "warning")
+        return applied
+
+
+def _client_settings(client) -> dict:
+    return None if client is None else vars(client)
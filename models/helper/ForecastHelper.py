@@ -0,0 +1,122 @@
+"""Seasonal ARIMA models cached per market and granularity"""
+
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+ORDER = (0, 1, 0)
+SEASONAL_ORDER = (1, 1, 1, 12)
+
+
+class _Fit:
+    __slots__ = ("close", "results")
+
+    def __init__(self, close: pd.Series, results) -> None:
+        self.close = close
+        self.results = results
+
+
+class SarimaxForecaster:
+    def __init__(self, order: tuple = ORDER, seasonal_order: tuple = SEASONAL_ORDER) -> None:
+        """Fits SARIMAX once per closed candle instead of on every call
+
+        A model is refit only when the candles end on a new timestamp, starting from the
+        previous parameters so the optimiser converges in a few iterations. In between,
+        the last fitted parameters are applied to the current prices, which is a Kalman
+        filter pass rather than a fit. Refits requested with wait=False run on a background
+        thread and the previous parameters are served until they finish.
+
+        Parameters
+        ----------
+        order : tuple
+            (p, d, q) order of the model
+        seasonal_order : tuple
+            (P, D, Q, s) seasonal order of the model
+        """
+
+        self.order = order
+        self.seasonal_order = seasonal_order
+        self._fits = {}  # (market, granularity) -> _Fit
+        self._pending = {}  # (market, granularity) -> Future
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def fit(self, close: pd.Series, start_params=None):
+        """Fits a model to the prices, as a fresh fit when start_params is None"""
+
+        # statsmodels is slow to import and only needed with --predictions
+        from statsmodels.tsa.statespace.sarimax import SARIMAX
+        from statsmodels.tools.sm_exceptions import ConvergenceWarning
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", ConvergenceWarning)
+            model = SARIMAX(close, trend="n", order=self.order, seasonal_order=self.seasonal_order)
+            return model.fit(start_params=start_params, disp=False)
+
+    def results(self, close: pd.Series, market: str, granularity, wait: bool = True):
+        """Fitted results for the prices, None if wait is False and nothing has been fitted yet"""
+
+        key = (market, str(granularity))
+        with self._lock:
+            cached = self._fits.get(key)
+            pending = self._pending.get(key)
+
+        if cached is not None and cached.close.equals(close):
+            return cached.results
+
+        new_candle = cached is None or cached.close.index[-1] != close.index[-1]
+        if new_candle:
+            start_params = None if cached is None else cached.results.params
+            if wait:
+                if pending is not None:
+                    # the running refit may already be for these prices
+                    try:
+                        pending.result()
+                    except Exception:
+                        pass
+                    return self.results(close, market, granularity, wait)
+                return self._store(key, close, start_params)
+            if pending is None:
+                self._submit(key, close, start_params)
+
+        if cached is None:
+            return None
+
+        # same candle with a new price, or a refit still running: the last parameters on the current prices
+        try:
+            return cached.results.apply(close, refit=False)
+        except Exception:
+            return cached.results
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fits.clear()
+
+    def _store(self, key: tuple, close: pd.Series, start_params):
+        results = self.fit(close, start_params)
+        with self._lock:
+            self._fits[key] = _Fit(close.copy(), results)
+        return results
+
+    def _submit(self, key: tuple, close: pd.Series, start_params) -> None:
+        close = close.copy()  # the caller keeps updating its candles
+
+        def refit():
+            try:
+                self._store(key, close, start_params)
+            finally:
+                with self._lock:
+                    self._pending.pop(key, None)
+
+        with self._lock:
+            if key in self._pending:
+                return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sarimax")
+            self._pending[key] = self._executor.submit(refit)
+
+
+# shared by the bot, the graphs and the web service
+forecaster = SarimaxForecaster()
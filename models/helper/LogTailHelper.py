@@ -0,0 +1,126 @@
+"""Tails of log files that are followed as they grow"""
+
+import os
+import threading
+from collections import deque
+
+TAIL_BLOCK = 64 * 1024
+
+
+def _tail_bytes(stream, end: int, count: int, block: int) -> bytes:
+    # one more newline than lines wanted, so the first line is complete
+    position = end
+    data = b""
+    while position > 0 and data.count(b"\n") <= count:
+        step = min(block, position)
+        position -= step
+        stream.seek(position)
+        data = stream.read(step) + data
+    return data
+
+
+def _decode(line: bytes) -> str:
+    return line.decode(errors="replace").rstrip("\r")
+
+
+def tail_lines(filepath: str, count: int, block: int = TAIL_BLOCK) -> list:
+    """Returns the last `count` lines of a file, reading it backwards a block at a time"""
+
+    if count <= 0:
+        return []
+
+    with open(filepath, "rb") as stream:
+        lines = _tail_bytes(stream, stream.seek(0, os.SEEK_END), count, block).split(b"\n")
+
+    if lines[-1] == b"":
+        lines.pop()  # the file ends with a newline
+    return [_decode(line) for line in lines[-count:]]
+
+
+class LogTail:
+    def __init__(self, filepath: str, max_lines: int = 1000, block: int = TAIL_BLOCK) -> None:
+        """The last lines of a log file, kept up to date by reading only what was appended
+
+        The first read tails the file backwards in blocks, later reads carry on from the
+        offset of the previous one. A file that shrank or was replaced (log rotation) is
+        tailed again from the end.
+
+        Parameters
+        ----------
+        filepath : str
+            Log file to follow
+        max_lines : int
+            Number of lines kept
+        block : int
+            Bytes read at a time
+        """
+
+        self.filepath = filepath
+        self.max_lines = max_lines
+        self.block = block
+        self._lines = deque(maxlen=max_lines)
+        self._partial = b""  # last line, until its newline is written
+        self._offset = None
+        self._inode = None
+        self._lock = threading.Lock()
+
+    def read(self) -> list:
+        """Returns the last lines, including an unfinished last line"""
+
+        with self._lock:
+            stat = os.stat(self.filepath)
+            if self._offset is None or stat.st_ino != self._inode or stat.st_size < self._offset:
+                self._reset(stat)
+            elif stat.st_size > self._offset:
+                self._follow()
+
+            lines = list(self._lines)
+            if self._partial:
+                lines.append(_decode(self._partial))
+            return lines[-self.max_lines :]
+
+    def _reset(self, stat) -> None:
+        self._inode = stat.st_ino
+        self._offset = stat.st_size
+        with open(self.filepath, "rb") as stream:
+            # up to the size seen by stat, anything written since is picked up by the next read
+            *complete, self._partial = _tail_bytes(stream, self._offset, self.max_lines, self.block).split(b"\n")
+
+        self._lines.clear()
+        self._lines.extend(_decode(line) for line in complete[-self.max_lines :])
+
+    def _follow(self) -> None:
+        with open(self.filepath, "rb") as stream:
+            stream.seek(self._offset)
+            while True:
+                data = stream.read(self.block)
+                if not data:
+                    break
+                self._offset += len(data)
+
+                *complete, self._partial = (self._partial + data).split(b"\n")
+                self._lines.extend(_decode(line) for line in complete)
+
+
+class LogFollower:
+    def __init__(self, max_lines: int = 1000) -> None:
+        """A LogTail per file, shared by every refresh of the log viewer"""
+
+        self.max_lines = max_lines
+        self._tails = {}
+        self._lock = threading.Lock()
+
+    def lines(self, filepath: str) -> list:
+        with self._lock:
+            tail = self._tails.get(filepath)
+            if tail is None:
+                tail = self._tails[filepath] = LogTail(filepath, self.max_lines)
+
+        return tail.read()
+
+    def forget(self, keep) -> None:
+        """Drops the tails of files that are no longer listed"""
+
+        with self._lock:
+            for filepath in set(self._tails) - set(keep):
+                del self._tails[filepath]
@@ -0,0 +1,217 @@
+"""Counters and latency histograms for the bot's hot paths"""
+
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# seconds, covers in memory work through to slow exchange calls
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "labels", "start")
+
+    def __init__(self, metrics, name: str, labels: tuple) -> None:
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.metrics._observe(self.name, self.labels, time.perf_counter() - self.start)
+        if exc_type is not None:
+            self.metrics._inc(_errors_name(self.name), self.labels, 1)
+
+
+def _errors_name(name: str) -> str:
+    return f"{name[: -len('_seconds')] if name.endswith('_seconds') else name}_errors_total"
+
+
+def _labels(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(labels: tuple, extra: str = "") -> str:
+    parts = [f'{key}="{value}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Metrics:
+    def __init__(self, buckets: tuple = BUCKETS) -> None:
+        """Registry of counters and histograms, cheap enough to leave on in production
+
+        Recording is a dictionary update under a lock, rendering (Prometheus text or JSON)
+        only happens when the metrics are read.
+
+        Parameters
+        ----------
+        buckets : tuple
+            Upper bounds (seconds) of the histogram buckets
+        """
+
+        self.buckets = tuple(buckets)
+        self._counters = {}  # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+        self._server = None
+
+    def _inc(self, name: str, labels: tuple, value: float) -> None:
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def _observe(self, name: str, labels: tuple, seconds: float) -> None:
+        key = (name, labels)
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            histogram[0][index] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """Adds to a counter"""
+
+        self._inc(name, _labels(labels), value)
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        """Records a duration in a histogram"""
+
+        self._observe(name, _labels(labels), seconds)
+
+    def time(self, name: str, **labels) -> _Timer:
+        """Context manager timing a block, exceptions are also counted in <name>_errors_total"""
+
+        return _Timer(self, name, _labels(labels))
+
+    def timed(self, name: str, **labels):
+        """Decorator timing every call of a function"""
+
+        key = _labels(labels)
+
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with _Timer(self, name, key):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def response_hook(self, exchange: str):
+        """requests response hook counting HTTP requests (retries included) by status and bytes received"""
+
+        def hook(response, *args, **kwargs):
+            labels = (("exchange", exchange),)
+            self._inc("pycryptobot_http_requests_total", labels + (("status", str(response.status_code)),), 1)
+            self._inc("pycryptobot_http_received_bytes_total", labels, len(response.content or b""))
+            return response
+
+        return hook
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def to_dict(self) -> dict:
+        """Snapshot of every metric as JSON serialisable data"""
+
+        with self._lock:
+            counters = list(self._counters.items())
+            histograms = [(key, (list(counts), total, count)) for key, (counts, total, count) in self._histograms.items()]
+
+        data = {"time": time.time(), "counters": [], "histograms": []}
+        for (name, labels), value in sorted(counters):
+            data["counters"].append({"name": name, "labels": dict(labels), "value": value})
+        for (name, labels), (counts, total, count) in sorted(histograms):
+            data["histograms"].append(
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": count,
+                    "sum": total,
+                    "buckets": dict(zip([str(bucket) for bucket in self.buckets] + ["+Inf"], counts)),
+                }
+            )
+        return data
+
+    def render_prometheus(self) -> str:
+        """Metrics in the Prometheus text exposition format"""
+
+        data = self.to_dict()
+        lines = []
+        typed = set()
+        for counter in data["counters"]:
+            if counter["name"] not in typed:
+                typed.add(counter["name"])
+                lines.append(f"# TYPE {counter['name']} counter")
+            lines.append(f"{counter['name']}{_format_labels(tuple(counter['labels'].items()))} {counter['value']}")
+
+        for histogram in data["histograms"]:
+            name, labels = histogram["name"], tuple(histogram["labels"].items())
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, count in histogram["buckets"].items():
+                cumulative += count
+                bucket_labels = _format_labels(labels, f'le="{bound}"')
+                lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {histogram['sum']}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram['count']}")
+
+        return "\n".join(lines) + "\n"
+
+    def dump_json(self, filepath: str) -> None:
+        """Writes a snapshot to a JSON file, replaced atomically so readers never see half a file"""
+
+        try:
+            os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+            tmp_filepath = f"{filepath}.{os.getpid()}.tmp"
+            with open(tmp_filepath, "w", encoding="utf8") as json_file:
+                json.dump(self.to_dict(), json_file)
+            os.replace(tmp_filepath, filepath)
+        except OSError:
+            pass
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Serves /metrics in the Prometheus text format from a background thread"""
+
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):  # pylint: disable=invalid-name
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server
+
+
+# shared by the bot, the exchange APIs and the Telegram helper
+metrics = Metrics()
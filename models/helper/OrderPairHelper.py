@@ -0,0 +1,46 @@
+"""Buy and sell order pairing without iterating over rows"""
+
+import numpy as np
+import pandas as pd
+
+
+def pair_orders(df: pd.DataFrame, sums: list = None) -> pd.DataFrame:
+    """Pairs each run of buys with the run of sells that follows it in the same market
+
+    Consecutive orders with the same action in a market form a run (a cumulative sum of
+    action changes gives the run ids). The first order of a buy run is paired with the first
+    order of the next sell run, buy runs still waiting for a sell (open trades) are dropped.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Orders with at least market and action columns, oldest first within each market
+    sums : list, optional
+        Columns totalled over each run instead of taken from its first order
+
+    Returns one row per pair, every input column prefixed with buy_ and sell_ plus the market.
+    """
+
+    if len(df) == 0 or "market" not in df or "action" not in df:
+        return pd.DataFrame()
+
+    # a stable sort keeps the order within each market
+    orders = df.sort_values(by="market", kind="mergesort").reset_index(drop=True)
+    action = orders["action"]
+    market = orders["market"]
+    starts = (action != action.shift()) | (market != market.shift())
+    run = starts.cumsum()
+
+    runs = orders[starts].reset_index(drop=True)
+    for column in sums or []:
+        runs[column] = orders.groupby(run)[column].sum().to_numpy()
+
+    is_pair = (runs["action"] == "buy") & (runs["action"].shift(-1) == "sell") & (runs["market"].shift(-1) == runs["market"])
+
+    positions = np.flatnonzero(is_pair.to_numpy())
+    buys = runs.iloc[positions].reset_index(drop=True)
+    sells = runs.iloc[positions + 1].reset_index(drop=True)
+
+    pairs = pd.concat([buys.add_prefix("buy_"), sells.add_prefix("sell_")], axis=1)
+    pairs.insert(0, "market", buys["market"])
+    return pairs
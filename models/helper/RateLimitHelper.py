@@ -0,0 +1,198 @@
+"""Request rate limiting shared between threads and between processes"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+# one budget file per host, every bot, scanner and Telegram bot run by the user shares it
+BUDGET_FILE = os.path.join(tempfile.gettempdir(), "pycryptobot-ratelimit.sqlite3")
+# seconds spent on the process only budget after the budget file fails, before it is tried again
+SHARED_RETRY_SECONDS = 60
+
+
+class RateLimiter:
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        """Token bucket allowing `rate` requests per second with up to `burst` requests at once
+
+        Parameters
+        ----------
+        rate : float
+            Sustained requests per second
+        burst : int
+            Maximum requests allowed back to back after an idle period
+        """
+
+        if rate <= 0:
+            raise ValueError("Rate must be greater than zero.")
+
+        if burst < 1:
+            raise ValueError("Burst must be at least one.")
+
+        self.rate = float(rate)
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, weight: float = 1) -> float:
+        """Blocks until a request of the weight may be made, returns the seconds waited"""
+
+        weight = min(weight, self.burst)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= weight:
+                    self._tokens -= weight
+                    return waited
+
+                delay = (weight - self._tokens) / self.rate
+
+            time.sleep(delay)
+            waited += delay
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+class SharedRateLimiter:
+    def __init__(self, name: str, rate: float, burst: int = 1, filepath: str = BUDGET_FILE, used_header: str = None) -> None:
+        """Token bucket kept in a SQLite file, so every process on the host draws from the same budget
+
+        Requests are weighted, and when the exchange reports how much of its limit this IP
+        has used (Binance X-MBX-USED-WEIGHT-1M) the bucket is corrected from the response,
+        which also accounts for requests made outside the bot.
+
+        Parameters
+        ----------
+        name : str
+            Budget name, usually the exchange
+        rate : float
+            Sustained weight per second
+        burst : int
+            Maximum weight spent back to back after an idle period
+        filepath : str
+            SQLite file holding the budget
+        used_header : str
+            Response header with the weight the exchange has counted against the current window
+        """
+
+        if rate <= 0:
+            raise ValueError("Rate must be greater than zero.")
+
+        if burst < 1:
+            raise ValueError("Burst must be at least one.")
+
+        self.name = name
+        self.rate = float(rate)
+        self.burst = burst
+        self.filepath = filepath
+        self.used_header = used_header
+        self._conn = None
+        self._local = None  # process only fallback while the budget file can't be used
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.filepath, timeout=10, isolation_level=None, check_same_thread=False)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+            except sqlite3.OperationalError:
+                pass
+            # the budget is only worth anything for the next minute, it does not need to survive a crash
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)")
+            self._conn = conn
+        return self._conn
+
+    def _update(self, weight: float = 0, used: float = None) -> float:
+        """Refills, applies the used weight reported by the exchange and takes weight if available
+
+        Returns 0 if the weight was taken, otherwise the seconds until it will be available.
+        """
+
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT tokens, updated FROM buckets WHERE name = ?", (self.name,)).fetchone()
+                now = time.time()
+                if row is None:
+                    tokens = float(self.burst)
+                else:
+                    tokens = min(self.burst, row[0] + max(0.0, now - row[1]) * self.rate)
+
+                if used is not None:
+                    tokens = min(tokens, self.burst - used)
+
+                delay = 0.0
+                if tokens >= weight:
+                    tokens -= weight
+                else:
+                    delay = (weight - tokens) / self.rate
+
+                conn.execute("INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)", (self.name, tokens, now))
+                conn.execute("COMMIT")
+                return delay
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def acquire(self, weight: float = 1) -> float:
+        """Blocks until the weight may be spent, returns the seconds waited"""
+
+        weight = min(weight, self.burst)
+        if self._use_local():
+            return self._local.acquire(weight)
+
+        waited = 0.0
+        while True:
+            try:
+                delay = self._update(weight)
+            except sqlite3.Error:
+                # e.g. a lock held past the timeout, the budget file is tried again later
+                if self._local is None:
+                    self._local = RateLimiter(self.rate, self.burst)
+                self._retry_at = time.monotonic() + SHARED_RETRY_SECONDS
+                return waited + self._local.acquire(weight)
+
+            if delay <= 0:
+                return waited
+
+            time.sleep(delay)
+            waited += delay
+
+    def _use_local(self) -> bool:
+        return self._local is not None and time.monotonic() < self._retry_at
+
+    def observe(self, resp) -> None:
+        """Corrects the budget from the weight the exchange reports as used"""
+
+        if self.used_header is None or self._use_local():
+            return
+
+        used = resp.headers.get(self.used_header)
+        if used is None:
+            return
+
+        try:
+            self._update(used=float(used))
+        except (ValueError, sqlite3.Error):
+            pass
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
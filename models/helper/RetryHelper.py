@@ -0,0 +1,225 @@
+"""Retry, backoff and circuit breaking for exchange REST calls"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+
+from models.helper.MetricsHelper import metrics
+
+# rejected before being processed (rate limited), safe to retry whatever the method
+REJECTED_STATUSES = (418, 429)
+# the exchange may or may not have processed the request
+SERVER_STATUSES = (500, 502, 503, 504)
+IDEMPOTENT_METHODS = ("GET", "DELETE", "HEAD", "OPTIONS", "PUT")
+DEFAULT_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised without calling the exchange while its host is failing or has asked us to back off"""
+
+
+class _Breaker:
+    __slots__ = ("failures", "open_until", "trial")
+
+    def __init__(self) -> None:
+        self.failures = 0
+        self.open_until = 0.0
+        self.trial = False
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        exchange: str,
+        attempts: int = 4,
+        base_delay: float = 0.25,
+        max_delay: float = 4.0,
+        timeouts: dict = None,
+        default_timeout: tuple = DEFAULT_TIMEOUT,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        max_retry_after: float = 10.0,
+        limiter=None,
+        weights: dict = None,
+    ) -> None:
+        """Exponential backoff with full jitter, per endpoint timeouts and a circuit breaker per host
+
+        Parameters
+        ----------
+        exchange : str
+            Exchange label used in the metrics
+        attempts : int
+            Maximum requests made per call, the first one included
+        base_delay : float
+            Backoff before the first retry, doubled for every later retry
+        max_delay : float
+            Upper bound of a single backoff
+        timeouts : dict
+            URL path prefix -> (connect, read) timeout, the longest matching prefix wins
+        default_timeout : tuple
+            (connect, read) timeout of every other endpoint
+        failure_threshold : int
+            Consecutive failed requests after which the host is not called for reset_timeout seconds
+        reset_timeout : float
+            Seconds before a single trial call is let through to a failing host
+        max_retry_after : float
+            Longest Retry-After waited for within a call, longer ones fail the call and block the host
+        limiter : SharedRateLimiter
+            Request budget every attempt is paid from, and corrected from the responses
+        weights : dict
+            URL path prefix -> request weight charged to the limiter, 1 for every other endpoint
+        """
+
+        if attempts < 1:
+            raise ValueError("Attempts must be at least one.")
+
+        self.exchange = exchange
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeouts = _by_prefix(timeouts)
+        self.default_timeout = default_timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_retry_after = max_retry_after
+        self.limiter = limiter
+        self.weights = _by_prefix(weights)
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def timeout(self, url: str) -> tuple:
+        return _lookup(self.timeouts, url, self.default_timeout)
+
+    def weight(self, url: str) -> float:
+        return _lookup(self.weights, url, 1)
+
+    def backoff(self, retry: int) -> float:
+        """Seconds to wait before retry number `retry` (from 1)"""
+
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (retry - 1)))
+
+    def call(self, method: str, url: str, send) -> requests.Response:
+        """Makes the request with send(timeout) until it succeeds, can't be retried or runs out of attempts
+
+        Non idempotent requests (orders) are only retried when they can't have reached the exchange.
+        The last response is returned even if it is an error, the caller decides what it means.
+        """
+
+        host = urlparse(url).netloc
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        timeout = self.timeout(url)
+        weight = self.weight(url)
+        self._before(host)
+
+        retry = 0
+        while True:
+            retry += 1
+            last = retry >= self.attempts
+            if self.limiter is not None:
+                self.limiter.acquire(weight)
+            try:
+                resp = send(timeout)
+            except requests.exceptions.ConnectTimeout as err:
+                reason, error = "ConnectTimeout", err
+            except (requests.ConnectionError, requests.Timeout) as err:
+                if not idempotent:
+                    self._failed(host)
+                    raise
+                reason, error = type(err).__name__, err
+            except Exception:
+                self._failed(host)
+                raise
+            else:
+                if self.limiter is not None:
+                    self.limiter.observe(resp)
+                status = resp.status_code
+                if status in REJECTED_STATUSES:
+                    wait = retry_after(resp)
+                    if wait is not None and wait > self.max_retry_after:
+                        self._block(host, wait)
+                        return resp
+                    if last:
+                        return resp
+                    self._retry(str(status), max(wait or 0.0, self.backoff(retry)))
+                    continue
+                if status in SERVER_STATUSES and idempotent and not last:
+                    self._failed(host)
+                    self._retry(str(status), self.backoff(retry))
+                    continue
+                if status in SERVER_STATUSES:
+                    self._failed(host)
+                else:
+                    self._succeeded(host)
+                return resp
+
+            self._failed(host)
+            if last:
+                raise error
+            self._retry(reason, self.backoff(retry))
+
+    def _retry(self, reason: str, delay: float) -> None:
+        metrics.inc("pycryptobot_exchange_api_retries_total", exchange=self.exchange, reason=reason)
+        time.sleep(delay)
+
+    def _before(self, host: str) -> None:
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None or breaker.open_until == 0.0:
+                return
+            if time.monotonic() < breaker.open_until or breaker.trial:
+                raise CircuitOpenError(f"{self.exchange} API at {host} is backing off after repeated failures")
+            # half open, let one call through to see if the host has recovered
+            breaker.trial = True
+
+    def _succeeded(self, host: str) -> None:
+        with self._lock:
+            self._breakers[host] = _Breaker()
+
+    def _failed(self, host: str) -> None:
+        with self._lock:
+            breaker = self._breakers.setdefault(host, _Breaker())
+            breaker.failures += 1
+            if breaker.trial or breaker.failures >= self.failure_threshold:
+                self._open(breaker, self.reset_timeout)
+
+    def _block(self, host: str, seconds: float) -> None:
+        with self._lock:
+            self._open(self._breakers.setdefault(host, _Breaker()), seconds)
+
+    def _open(self, breaker: _Breaker, seconds: float) -> None:
+        if breaker.open_until == 0.0 or breaker.trial:
+            metrics.inc("pycryptobot_exchange_circuit_open_total", exchange=self.exchange)
+        breaker.open_until = max(breaker.open_until, time.monotonic() + seconds)
+        breaker.trial = False
+
+
+def _by_prefix(values: dict) -> list:
+    return sorted((values or {}).items(), key=lambda item: len(item[0]), reverse=True)
+
+
+def _lookup(values: list, url: str, default):
+    path = urlparse(url).path
+    for prefix, value in values:
+        if path.startswith(prefix):
+            return value
+    return default
+
+
+def retry_after(resp: requests.Response) -> float:
+    """Seconds from a Retry-After header (delta seconds or HTTP date), None if absent or unreadable"""
+
+    value = resp.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
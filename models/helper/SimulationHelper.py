@@ -0,0 +1,62 @@
+"""Positional windows over simulation data"""
+
+import numpy as np
+import pandas as pd
+
+
+class SimulationWindow:
+    def __init__(self, df: pd.DataFrame) -> None:
+        """Constant time views of the candles up to the simulation date
+
+        Replaces repeated `df[df["date"] <= sim_date]` scans, which copy the whole
+        frame on every iteration, with an integer cursor and `iloc` slices.
+
+        Parameters
+        ----------
+        df : Pandas DataFrame
+            Sorted simulation data with a "date" and "close" column
+        """
+
+        self.df = df
+        self._dates = df["date"].to_numpy()
+        self._high = None
+        self._low = None
+        self.cursor = 0
+
+    def seek(self, date, hint: int = None) -> int:
+        """Moves the cursor past the last candle at or before `date`, returns the number of rows in view
+
+        `hint` is the expected cursor (usually the iteration count), checked in O(1) before
+        falling back to a binary search.
+        """
+
+        date = pd.Timestamp(date).to_datetime64()
+        dates = self._dates
+
+        for cursor in (hint, self.cursor, self.cursor + 1):
+            if cursor is not None and 0 < cursor <= len(dates) and dates[cursor - 1] <= date and (cursor == len(dates) or dates[cursor] > date):
+                self.cursor = cursor
+                return cursor
+
+        self.cursor = int(np.searchsorted(dates, date, side="right"))
+        return self.cursor
+
+    def window(self, periods: int = None) -> pd.DataFrame:
+        """The last `periods` rows up to the cursor, a positional slice rather than a filtered copy"""
+
+        start = 0 if periods is None else max(0, self.cursor - periods)
+        return self.df.iloc[start : self.cursor]
+
+    def high(self) -> float:
+        """Highest close up to the cursor"""
+
+        if self._high is None:
+            self._high = self.df["close"].cummax().to_numpy()
+        return self._high[self.cursor - 1] if self.cursor > 0 else np.nan
+
+    def low(self) -> float:
+        """Lowest close up to the cursor"""
+
+        if self._low is None:
+            self._low = self.df["close"].cummin().to_numpy()
+        return self._low[self.cursor - 1] if self.cursor > 0 else np.nan
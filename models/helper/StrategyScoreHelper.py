@@ -0,0 +1,118 @@
+"""Scores of vectorized custom strategies, calculated for every row of the indicator frame at once"""
+
+import numpy as np
+import pandas as pd
+
+from models.exchange.Granularity import Granularity
+
+# the Strategy_CS attributes read by buySignal(), sellSignal() and the sell trigger override
+SCORE_ATTRIBUTES = [
+    "market_trend",
+    "buy_pts",
+    "sell_pts",
+    "pts_to_buy",
+    "pts_to_sell",
+    "immed_buy_pts",
+    "immed_sell_pts",
+    "sell_override_pts",
+    "pts_sig_required_buy",
+    "pts_sig_required_sell",
+    "sig_required_buy",
+    "sig_required_sell",
+]
+
+
+def _dates(df: pd.DataFrame) -> pd.DatetimeIndex:
+    return pd.DatetimeIndex(df["date"] if "date" in df else df.index).as_unit("ns")
+
+
+def align_timeframe(df: pd.DataFrame, candles: pd.DataFrame, granularity: Granularity) -> pd.DataFrame:
+    """The candles of another granularity as they stood at each row of df
+
+    Every row gets the last candle that had closed by its date, so a simulation never
+    sees a candle before it finished.
+
+    Parameters
+    ----------
+    df : Pandas DataFrame
+        Indicator frame the strategy scores
+    candles : Pandas DataFrame
+        Candles of the other granularity, with any indicators the strategy added
+    granularity : Granularity
+        Granularity of the candles
+    """
+
+    left = pd.DataFrame({"_closed": _dates(df)})
+    right = candles.drop(columns=["date"], errors="ignore").reset_index(drop=True)
+    right["_closed"] = _dates(candles) + pd.Timedelta(seconds=granularity.to_integer)
+
+    aligned = pd.merge_asof(left, right.sort_values("_closed"), on="_closed", direction="backward")
+    aligned.index = df.index
+    return aligned.drop(columns="_closed")
+
+
+class StrategyScores:
+    def __init__(self, strategy) -> None:
+        """Runs the score() of a custom strategy once per indicator frame, instead of once per tick
+
+        A vectorized custom strategy provides score(df, timeframes), returning a DataFrame
+        indexed like df with any of the SCORE_ATTRIBUTES as columns. The extra granularities
+        listed in its `timeframes` are passed through its prepare_timeframe(), if it has one,
+        each time a candle closes, and aligned to the rows of df.
+
+        Parameters
+        ----------
+        strategy : object
+            Custom strategy, a Strategy_CS or Strategy_myCS instance
+        """
+
+        self.strategy = strategy
+        self._key = None
+        self._scores = None
+        self._candles = {}  # short granularity -> (fetch key, candles)
+        self._prepared = {}  # short granularity -> (candles key, prepared candles)
+
+    def scores(self, app, df: pd.DataFrame, websocket=None) -> pd.DataFrame:
+        """Scores of every row of df, recalculated only when df has changed"""
+
+        key = (len(df), df.index[0], df.index[-1], df["close"].iloc[-1])
+        if key != self._key:
+            timeframes = {}
+            for short_granularity in getattr(self.strategy, "timeframes", []):
+                granularity = Granularity.convert_to_enum(short_granularity)
+                candles = self._timeframe(app, short_granularity, granularity, df, websocket)
+                timeframes[short_granularity] = align_timeframe(df, candles, granularity)
+
+            self._scores = self.strategy.score(df, timeframes)
+            self._key = key
+        return self._scores
+
+    def apply(self, app, df: pd.DataFrame, label, websocket=None) -> pd.Series:
+        """Sets the scores of the row at label on the strategy, returns them"""
+
+        row = self.scores(app, df, websocket).loc[label]
+        for name, value in row.items():
+            setattr(self.strategy, name, value.item() if isinstance(value, np.generic) else value)
+        return row
+
+    def _timeframe(self, app, short_granularity: str, granularity: Granularity, df: pd.DataFrame, websocket) -> pd.DataFrame:
+        if app.is_sim:
+            # the whole simulation at once, fetched a single time
+            start, end = _dates(df)[[0, -1]]
+            fetch_key = (start - pd.Timedelta(seconds=granularity.to_integer * app.adjusttotalperiods), end)
+            cached = self._candles.get(short_granularity)
+            if cached is None or cached[0][0] > fetch_key[0] or cached[0][1] < fetch_key[1]:
+                candles = app.get_smart_switch_df(pd.DataFrame(), app.market, granularity, fetch_key[0].isoformat(), fetch_key[1].isoformat())
+                self._candles[short_granularity] = cached = (fetch_key, candles)
+            candles = cached[1]
+        else:
+            # refreshed by the bot at candle close
+            candles = app.get_additional_df(short_granularity, websocket)
+
+        candles_key = (len(candles), candles.index[-1], candles["close"].iloc[-1]) if len(candles) else None
+        prepared = self._prepared.get(short_granularity)
+        if prepared is None or prepared[0] != candles_key:
+            prepare = getattr(self.strategy, "prepare_timeframe", None)
+            prepared = (candles_key, prepare(short_granularity, candles.copy()) if prepare else candles)
+            self._prepared[short_granularity] = prepared
+        return prepared[1]
@@ -0,0 +1,148 @@
+"""Recording of raw websocket frames and their replay into the websocket handlers"""
+
+import atexit
+import json
+import struct
+import threading
+import time
+
+# receive time (unix seconds) and payload length before every frame
+FRAME_HEADER = struct.Struct("<dI")
+# longest a recorded frame waits in the write buffer
+FLUSH_SECONDS = 1.0
+
+
+class FrameRecorder:
+    def __init__(self, filepath: str, flush_seconds: float = FLUSH_SECONDS) -> None:
+        """Appends raw websocket frames to a file with the time each one was received
+
+        Every frame is a 12 byte header, the receive time as a double and the payload
+        length, followed by the UTF-8 payload. The file is only ever appended to, so a
+        recording can be resumed. A background thread flushes the buffer every
+        flush_seconds, also while the stream is quiet, so a crash loses at most the
+        frames of the last flush_seconds, and a frame cut short is skipped by read_frames().
+
+        Parameters
+        ----------
+        filepath : str
+            Recording to append to
+        flush_seconds : float
+            Seconds between flushes, 0 flushes every frame
+        """
+
+        self.filepath = filepath
+        self.flush_seconds = flush_seconds
+        self.frames = 0
+        self._stream = open(filepath, "ab")
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        if flush_seconds > 0:
+            threading.Thread(target=self._flush_periodically, daemon=True).start()
+        atexit.register(self.close)
+
+    def _flush_periodically(self) -> None:
+        while not self._closed.wait(self.flush_seconds):
+            self.flush()
+
+    def record(self, data, received: float = None) -> None:
+        payload = data.encode() if isinstance(data, str) else bytes(data)
+        with self._lock:
+            if self._stream.closed:
+                return
+            self._stream.write(FRAME_HEADER.pack(time.time() if received is None else received, len(payload)) + payload)
+            self.frames += 1
+            if self.flush_seconds <= 0:
+                self._stream.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._stream.closed:
+                self._stream.flush()
+
+    def close(self) -> None:
+        self._closed.set()
+        with self._lock:
+            self._stream.close()
+
+
+def read_frames(filepath: str):
+    """Yields (receive time, payload) of each recorded frame, a frame cut short at the end of the file is skipped"""
+
+    with open(filepath, "rb") as stream:
+        while True:
+            header = stream.read(FRAME_HEADER.size)
+            if len(header) < FRAME_HEADER.size:
+                return
+
+            received, length = FRAME_HEADER.unpack(header)
+            payload = stream.read(length)
+            if len(payload) < length:
+                return
+
+            yield received, payload.decode()
+
+
+def handle_frame(client, data: str) -> None:
+    """Passes a raw frame to a websocket client the way its listener does"""
+
+    try:
+        msg = json.loads(data) if data != "" else {}
+    except ValueError as e:
+        client.on_error(e)
+    else:
+        client.on_message(msg)
+
+
+class FrameReplayer:
+    def __init__(self, filepath: str, speed: float = 1.0, clock=time.monotonic, sleep=time.sleep) -> None:
+        """Replays a recording into the on_message handler of a websocket client
+
+        Parameters
+        ----------
+        filepath : str
+            Recording made by FrameRecorder
+        speed : float
+            1 replays at the recorded pace, 10 ten times faster and 0 as fast as possible
+        clock : callable
+            Time source, replaceable in tests
+        sleep : callable
+            Sleep function, replaceable in tests
+        """
+
+        if speed < 0:
+            raise ValueError("Replay speed can not be negative")
+
+        self.filepath = filepath
+        self.speed = speed
+        self.clock = clock
+        self.sleep = sleep
+
+    def replay(self, client, handler=None) -> dict:
+        """Feeds every frame to the client, returns the number of frames and the messages per second handled
+
+        `handler(client, data)` defaults to handle_frame, the same JSON decoding and on_message call as a live listener.
+        """
+
+        handler = handler or handle_frame
+        client.on_open()
+
+        frames = 0
+        first = None
+        started = self.clock()
+        for received, data in read_frames(self.filepath):
+            if first is None:
+                first = received
+            elif self.speed > 0:
+                delay = (received - first) / self.speed - (self.clock() - started)
+                if delay > 0:
+                    self.sleep(delay)
+
+            handler(client, data)
+            frames += 1
+
+        elapsed = self.clock() - started
+        return {
+            "frames": frames,
+            "seconds": elapsed,
+            "messages_per_second": frames / elapsed if elapsed > 0 else float("inf"),
+        }
@@ -5,6 +5,7 @@ from time import sleep
 from datetime import datetime
 
 from pandas.core.frame import DataFrame
+from models.helper.MetricsHelper import metrics
 from views.PyCryptoBot import RichText
 
 
@@ -86,6 +87,7 @@ class TelegramBotHelper:
         self.data = ds
         self._write_data()
 
+    @metrics.timed("pycryptobot_phase_seconds", phase="state")
     def _read_data(self, name: str = "") -> bool:
         file = self.filename if name == "" else name
 
@@ -114,6 +116,7 @@ class TelegramBotHelper:
                         self.remove_active_bot()
         return read_ok
 
+    @metrics.timed("pycryptobot_phase_seconds", phase="state")
     def _write_data(self, name: str = "") -> bool:
         file = self.filename if name == "" else name
         try:
@@ -1,13 +1,13 @@
 """ Telegram Bot Actions """
 import os
 import json
-import subprocess
 
 # import logging
 import csv
 from datetime import datetime, timedelta
 
 from time import sleep
+import pandas as pd
 from models.telegram.helper import TelegramHelper
 from models.telegram.settings import SettingsEditor
 
@@ -344,7 +344,9 @@ class TelegramActions:
                                         context=context,
                                     )
                                     self.helper.start_process(row["market"], ex, "", "scanner")
-                                    sleep(7)
+                                    # the bots pace their requests from the shared rate budget, this only
+                                    # keeps inside Telegram's one message a second per chat
+                                    sleep(1)
                     except IOError:
                         pass
                 else:
@@ -357,7 +359,15 @@ class TelegramActions:
                 self.helper.send_telegram_message(update, reply, context=context)
             try:
                 self.helper.logger.info("Starting Market Scan")
-                subprocess.getoutput(f"python3 {scanner_script_file}")
+                # run in-process rather than spawning a new interpreter, so caches survive between scans
+                if use_default_scanner is True:
+                    from models.Scanner import run_scanner
+
+                    run_scanner(scanner_config_file, self.helper.config_file)
+                else:
+                    from models.Screener import run_screener
+
+                    run_screener(scanner_config_file, self.helper.config_file)
             except Exception as err:
                 self.helper.send_telegram_message(update, "<b>scanning failed.</b>", context=context)
                 self.helper.logger.error(err)
@@ -526,7 +536,6 @@ class TelegramActions:
                                     if self.helper.start_process(row, ex, "", "scanner"):
                                         total_bots_started += 1
                                         exchange_bots_started += 1
-                                sleep(6)
 
                 if bool(self.helper.settings["notifications"]["enable_screener"]):
                     self.helper.send_telegram_message(update, outputmsg, context=context)
@@ -586,43 +595,33 @@ class TelegramActions:
             now = datetime.now()
             now -= timedelta(days=days)
             trade_count = 0
-
             trade_counter = 0
-            margin_calculation = 0.0
-            margin_positive = 0.0
-            positive_counter = 0
-            margin_negative = 0.0
-            negative_counter = 0
 
             if days == 99:
                 self.helper.send_telegram_message(update, "<i>Getting all trades summary..</i>", new_message=False)
             else:
                 self.helper.send_telegram_message(update, f"<i>Getting summary of trades for last {days} day(s)..</i>", new_message=False)
 
-            for trade_datetime in self.helper.data["trades"]:
-                if datetime.strptime(trade_datetime, "%Y-%m-%d %H:%M:%S").isoformat() < now.isoformat():
-                    continue
-                if days > 0:
-                    trade_counter += 1
-                    margin = float(self.helper.data["trades"][trade_datetime]["margin"][: self.helper.data["trades"][trade_datetime]["margin"].find("%")])
-                    margin_calculation += margin
-                    if margin > 0.0:
-                        positive_counter += 1
-                        margin_positive += margin
-                    else:
-                        negative_counter += 1
-                        margin_negative += margin
-                    if trade_counter == 1:
-                        first_trade_date = trade_datetime
-                    last_trade_date = trade_datetime
-                else:
+            trades = pd.DataFrame.from_dict(self.helper.data["trades"], orient="index", columns=["pair", "price", "margin"])
+            if len(trades) > 0:
+                trades = trades[pd.to_datetime(trades.index, format="%Y-%m-%d %H:%M:%S") >= now]
+
+            if days > 0 and len(trades) > 0:
+                margins = trades["margin"].astype(str).str.partition("%")[0].astype(float)
+                trade_counter = len(margins)
+                margin_calculation = margins.sum()
+                margin_positive = margins[margins > 0.0].sum()
+                positive_counter = int((margins > 0.0).sum())
+                margin_negative = margins[margins <= 0.0].sum()
+                negative_counter = trade_counter - positive_counter
+                first_trade_date = trades.index[0]
+                last_trade_date = trades.index[-1]
+            elif days <= 0:
+                for trade_datetime, trade in trades.iterrows():
                     trade_count += 1
                     output = ""
-                    output = output + f"<b>{self.helper.data['trades'][trade_datetime]['pair']}</b>\n{trade_datetime}"
-                    output = (
-                        output
-                        + f"\n<i>Sold at: {self.helper.data['trades'][trade_datetime]['price']}   Margin: {self.helper.data['trades'][trade_datetime]['margin']}</i>\n"
-                    )
+                    output = output + f"<b>{trade['pair']}</b>\n{trade_datetime}"
+                    output = output + f"\n<i>Sold at: {trade['price']}   Margin: {trade['margin']}</i>\n"
                     if days != 99:
                         if output != "":
                             self.helper.send_telegram_message(update, output)
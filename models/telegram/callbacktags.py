@@ -22,6 +22,7 @@ STOP = ["21", "stop"]
 PAUSE = ["22", "pause"]
 RESUME = ["23", "resume"]
 RESTART = ["24", "restart"]
+PROFILE = ["25", "profile"]
 NOTIFY = ["30"]
 MARGIN = ["31"]
 BUY = ["32", "buy"]
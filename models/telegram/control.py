@@ -244,6 +244,15 @@ class TelegramControl:
         self.action_bot_response(update, "resume", "start", context, "paused", market_override)
         self.helper.send_telegram_message(update, "<b>Resuming bots complete</b>", context=context)
 
+    def ask_profile_bot_list(self, update: Update):
+        """Get profile bot list"""
+        self._ask_bot_list(update, callbacktags.PROFILE, "active")
+
+    def profile_bot_response(self, update: Update, context, market_override=""):
+        """Profile bot list response"""
+        self.action_bot_response(update, "profile", "profile", context, "active", market_override)
+        self.helper.send_telegram_message(update, "<b>Profiling bots started</b>", context=context)
+
     def ask_sell_bot_list(self, update):
         """Manual sell request (asks which coin to sell)"""
         self._ask_bot_list(update, callbacktags.SELL, "active")
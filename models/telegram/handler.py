@@ -71,6 +71,7 @@ class TelegramHandler:
             ],
             [
                 InlineKeyboardButton("\U0000267B Restart active bots", callback_data="restart"),
+                InlineKeyboardButton("Profile bot(s) \U000023F1", callback_data="profile"),
             ],
             [
                 InlineKeyboardButton("\U00002139 Bot Status", callback_data="status"),
@@ -231,6 +232,13 @@ class TelegramHandler:
             update.callback_query.data = callback_json["p"]
             self.control.resume_bot_response(update, context)
 
+        # Profile Bots
+        elif query.data == "profile":
+            self.control.ask_profile_bot_list(update)
+        elif callback_json is not None and callback_json["c"] == callbacktags.PROFILE[0]:
+            update.callback_query.data = callback_json["p"]
+            self.control.profile_bot_response(update, context)
+
         # Restart Bots with Open Orders
         elif query.data == "reopen":
             self.actions.start_open_orders(update, context)
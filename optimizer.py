@@ -0,0 +1,13 @@
+import time
+
+from models.Optimizer import run_optimizer
+
+if __name__ == "__main__":
+    start_time = time.time()
+    print("Optimizing, please wait...")
+    try:
+        run_optimizer("optimizer.json", "config.json")
+    except (IOError, ValueError) as err:
+        print(err)
+
+    print(f"Total elapsed time: {time.time() - start_time:.1f} sec")
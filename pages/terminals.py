@@ -2,6 +2,14 @@ import os
 import dash_bootstrap_components as dbc
 from dash import dcc, html, callback, Output, Input
 
+from models.helper.LogTailHelper import LogFollower, tail_lines
+
+LOG_LINES = 1000
+
+# each refresh only reads what the bots appended since the previous one
+follower = LogFollower(LOG_LINES)
+listings = {}  # folder -> (mtime, dropdown options)
+
 layout = html.Div(
     [
         dbc.Container(
@@ -44,14 +52,7 @@ def read_log_file(n, active_tab):
     """read log file updated"""
     content = html.Div()
     if active_tab is not None:
-        log_entries = (
-            str(get_last_n_lines(active_tab, 1000))
-            .replace("', '", "\n")
-            .replace("['", "")
-            .replace("']", "")
-            .replace("\\r", "")
-        )
-        # .replace("\\r", "\n").replace("'", "").replace(",","").replace("[", "").replace("]", "")
+        log_entries = "\n".join(follower.lines(active_tab))
 
         content = dbc.Card(
             dbc.CardBody(
@@ -103,55 +104,26 @@ def read_log_file(n, active_tab):
 )
 def get_log_content(n):
     """read log files add names to dropdown"""
-    logs = []
-    jsonfiles = sorted(os.listdir(os.path.join("telegram_logs")))
-    for jfile in jsonfiles:
-        logs.append({"label": jfile, "value": os.path.join("telegram_logs", jfile)})
+    logs = list_logs("telegram_logs", "") + list_logs("logs", ".log")
+    follower.forget([log["value"] for log in logs])
+    return logs
 
-    jsonfiles = sorted(os.listdir(os.path.join("logs")))
-    for jfile in jsonfiles:
-        if jfile.__contains__(".log"):
-            logs.append({"label": jfile, "value": os.path.join("logs", jfile)})
 
-    return logs
+def list_logs(folder, contains):
+    """Dropdown options for the logs in a folder, relisted only when the folder changes"""
+    mtime = os.stat(folder).st_mtime_ns
+    listing = listings.get(folder)
+    if listing is None or listing[0] != mtime:
+        logs = [
+            {"label": jfile, "value": os.path.join(folder, jfile)}
+            for jfile in sorted(os.listdir(folder))
+            if contains in jfile
+        ]
+        listing = listings[folder] = (mtime, logs)
+
+    return listing[1]
 
 
 def get_last_n_lines(file_name, N):
     """Get lines in file"""
-    # Create an empty list to keep the track of last N lines
-    list_of_lines = []
-    # Open file for reading in binary mode
-    with open(file_name, "rb") as read_obj:
-        # Move the cursor to the end of the file
-        read_obj.seek(0, os.SEEK_END)
-        # Create a buffer to keep the last read line
-        buffer = bytearray()
-        # Get the current position of pointer i.e eof
-        pointer_location = read_obj.tell()
-        # Loop till pointer reaches the top of the file
-        while pointer_location >= 0:
-            # Move the file pointer to the location pointed by pointer_location
-            read_obj.seek(pointer_location)
-            # Shift pointer location by -1
-            pointer_location = pointer_location - 1
-            # read that byte / character
-            new_byte = read_obj.read(1)
-            # If the read byte is new line character then it means one line is read
-            if new_byte == b"\n":
-                # Save the line in list of lines
-                list_of_lines.append(buffer.decode()[::-1])
-                # If the size of list reaches N, then return the reversed list
-                if len(list_of_lines) == N:
-                    return list(reversed(list_of_lines))
-                # Reinitialize the byte array to save next line
-                buffer = bytearray()
-            else:
-                # If last read character is not eol then add it in buffer
-                buffer.extend(new_byte)
-
-        # As file is read completely, if there is still data in buffer, then its first line.
-        if len(buffer) > 0:
-            list_of_lines.append(buffer.decode()[::-1])
-
-    # return the reversed list
-    return list(reversed(list_of_lines))
+    return tail_lines(file_name, N)
@@ -0,0 +1,161 @@
+import json
+import sys
+import threading
+import time
+
+import pandas as pd
+import pytest
+import responses
+
+sys.path.append('.')
+# pylint: disable=import-error
+from models.AccountCache import AccountCache
+from models.exchange.binance import UserDataStream
+
+BALANCE = pd.DataFrame(
+    [["BTC", 0.5, 0.0, 0.5], ["USDT", 100.0, 0.0, 100.0]],
+    columns=["currency", "balance", "hold", "available"],
+)
+ORDERS = pd.DataFrame(
+    [[pd.Timestamp("2022-01-01", tz="UTC"), "BTCUSDT", "buy", "MARKET", 100.0, 0.005, 0.1, 20000.0, "done"]],
+    columns=["created_at", "market", "action", "type", "size", "filled", "fees", "price", "status"],
+)
+
+
+class Exchange:
+    def __init__(self):
+        self.balance_calls = 0
+        self.order_calls = 0
+
+    def balance(self):
+        self.balance_calls += 1
+        return BALANCE.copy()
+
+    def orders(self, market):
+        self.order_calls += 1
+        return ORDERS[ORDERS["market"] == market].copy()
+
+
+@pytest.fixture
+def clock():
+    return [0.0]
+
+
+@pytest.fixture
+def exchange():
+    return Exchange()
+
+
+@pytest.fixture
+def cache(exchange, clock):
+    return AccountCache(exchange.balance, exchange.orders, resync_interval=900, settle_time=60, clock=lambda: clock[0])
+
+
+def test_polling_is_served_from_the_cache(cache, exchange, clock):
+    for tick in range(100):
+        clock[0] = tick * 5
+        assert cache.get_balance().loc[0, "available"] == 0.5
+        assert len(cache.get_orders("BTCUSDT")) == 1
+
+    assert (exchange.balance_calls, exchange.order_calls) == (1, 1)
+
+    # safety net refresh
+    clock[0] = 900
+    cache.get_balance()
+    cache.get_orders("BTCUSDT")
+    assert (exchange.balance_calls, exchange.order_calls) == (2, 2)
+
+
+def test_own_orders_refresh_until_settled(cache, exchange, clock):
+    cache.get_balance()
+    cache.get_orders("BTCUSDT")
+
+    cache.invalidate()
+    for tick in range(3):
+        clock[0] = tick * 20
+        cache.get_balance()
+        cache.get_orders("BTCUSDT")
+    assert (exchange.balance_calls, exchange.order_calls) == (4, 4)
+
+    clock[0] = 61
+    cache.get_balance()
+    cache.get_orders("BTCUSDT")
+    assert (exchange.balance_calls, exchange.order_calls) == (4, 4)
+
+
+def test_events_update_the_cache(cache, exchange):
+    cache.get_balance()
+    cache.get_orders("BTCUSDT")
+    cache.streaming = True
+
+    cache.apply_balances({"BTC": ("0.0", "0.0"), "ETH": ("1.5", "0.5")})
+    balance = cache.get_balance().set_index("currency")
+    assert balance.loc["BTC", "available"] == 0.0
+    assert balance.loc["ETH", "balance"] == 2.0
+    assert balance.loc["USDT", "available"] == 100.0
+
+    sell = dict(ORDERS.iloc[0], created_at=pd.Timestamp("2022-01-02", tz="UTC"), action="sell")
+    cache.apply_order(sell)
+    cache.apply_order(sell)
+    assert list(cache.get_orders("BTCUSDT")["action"]) == ["buy", "sell"]
+
+    # streaming caches are not invalidated by our own orders
+    cache.invalidate()
+    cache.get_balance()
+    assert exchange.balance_calls == 1
+
+
+def test_user_data_stream_against_mock_server(cache, exchange):
+    server_module = pytest.importorskip("websockets.sync.server")
+    events = [
+        {"e": "outboundAccountPosition", "B": [{"a": "BTC", "f": "0.00000000", "l": "0.00000000"}, {"a": "USDT", "f": "109.95000000", "l": "0.00000000"}]},
+        {"e": "executionReport", "X": "NEW", "s": "BTCUSDT", "S": "SELL", "o": "MARKET", "O": 1641081600000, "z": "0", "Z": "0", "L": "0"},
+        {"e": "executionReport", "X": "FILLED", "s": "BTCUSDT", "S": "SELL", "o": "MARKET", "O": 1641081600000, "z": "0.005", "Z": "110.0", "L": "22000"},
+    ]
+    paths = []
+
+    def handler(websocket):
+        paths.append(websocket.request.path)
+        for event in events:
+            websocket.send(json.dumps(event))
+        websocket.recv()
+
+    with server_module.serve(handler, "127.0.0.1", 0) as server:
+        port = server.socket.getsockname()[1]
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        cache.get_balance()
+        cache.get_orders("BTCUSDT")
+
+        with responses.RequestsMock() as mock:
+            mock.add(responses.POST, "https://api.binance.com/api/v3/userDataStream", json={"listenKey": "abc123"})
+            mock.add(responses.DELETE, "https://api.binance.com/api/v3/userDataStream", json={})
+            stream = UserDataStream("0" * 64, cache, ws_url=f"ws://127.0.0.1:{port}")
+            stream.start()
+
+            deadline = time.monotonic() + 5
+            while len(cache.get_orders("BTCUSDT")) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            stream.close()
+            server.shutdown()
+            released = [call.request.url for call in mock.calls if call.request.method == "DELETE"]
+
+    # the listen key is released when the stream is closed
+    assert len(released) == 1 and "listenKey=abc123" in released[0]
+    assert stream.listen_key is None
+
+    assert paths == ["/ws/abc123"]
+    balance = cache.get_balance().set_index("currency")
+    assert balance.loc["USDT", "available"] == 109.95
+    orders = cache.get_orders("BTCUSDT")
+    assert list(orders["action"]) == ["buy", "sell"]
+    assert orders["price"].iloc[-1] == pytest.approx(22000.0)
+    assert (exchange.balance_calls, exchange.order_calls) == (1, 1)
+    assert cache.streaming is False
+
+
+def test_user_data_stream_host_follows_the_api_url(cache):
+    # pylint: disable=protected-access
+    assert UserDataStream("0" * 64, cache)._ws_url == "wss://stream.binance.com:9443"
+    assert UserDataStream("0" * 64, cache, "https://api.binance.us/")._ws_url == "wss://stream.binance.us:9443"
+    assert UserDataStream("0" * 64, cache, "https://testnet.binance.vision")._ws_url == "wss://testnet.binance.vision"
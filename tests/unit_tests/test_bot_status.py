@@ -0,0 +1,95 @@
+import json
+import math
+import os
+import shutil
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.append('.')
+# pylint: disable=import-error
+from models.helper.BotStatusHelper import BotStatusSnapshot, get_date_from_iso8601_str, status_row, GREEN, RED
+
+SAMPLE = os.path.join("tests", "unit_tests", "data", "telegram_data", "TESTUSDT.json")
+
+
+@pytest.fixture
+def datafolder(tmp_path):
+    os.mkdir(tmp_path / "telegram_data")
+    shutil.copy(SAMPLE, tmp_path / "telegram_data" / "TESTUSDT.json")
+    with open(tmp_path / "telegram_data" / "data.json", "w", encoding="utf8") as f:
+        json.dump({"trades": {}}, f)
+    return tmp_path
+
+
+def _write(datafolder, pair, **changes):
+    with open(SAMPLE, encoding="utf8") as f:
+        data = json.load(f)
+    data.update(changes)
+    path = datafolder / "telegram_data" / f"{pair}.json"
+    with open(path, "w", encoding="utf8") as f:
+        json.dump(data, f)
+    # make sure the change is visible even on file systems with coarse timestamps
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_status_row():
+    with open(SAMPLE, encoding="utf8") as f:
+        row = status_row("TESTUSDT", json.load(f))
+
+    assert row["Margin"] == pytest.approx(0.058735)
+    assert math.isnan(row["From DF High"])
+    assert row["Margincolor"] == GREEN
+    assert row["EMA"] == "True"
+    assert row["OBV"] == ""
+    assert status_row("X", {"exchange": "binance", "price": 1, "margin": "-1%"})["Margincolor"] == RED
+
+
+def test_uptime():
+    assert get_date_from_iso8601_str("2021-12-09T15:20:19.456063", datetime(2021, 12, 10, 17, 25, 0)) == "26h 4m"
+
+
+def test_snapshot_only_reads_changed_files(datafolder, monkeypatch):
+    snapshot = BotStatusSnapshot(str(datafolder), min_interval=0)
+    loads = []
+    load = snapshot._load
+    monkeypatch.setattr(snapshot, "_load", lambda path, pair: loads.append(pair) or load(path, pair))
+
+    assert [row["Trading Pair"] for row in snapshot.records()] == ["TESTUSDT"]
+    assert loads == ["TESTUSDT"]
+
+    # nothing changed, nothing re-read
+    assert snapshot.refresh() is False
+    assert loads == ["TESTUSDT"]
+
+    _write(datafolder, "AAAUSDT", margin="-2%")
+    rows = snapshot.records()
+    assert loads == ["TESTUSDT", "AAAUSDT"]
+    assert [row["Trading Pair"] for row in rows] == ["AAAUSDT", "TESTUSDT"]
+    assert rows[0]["Margin"] == pytest.approx(-0.02)
+
+    # stopped bots drop out and deleted files are forgotten
+    _write(datafolder, "AAAUSDT", botcontrol={"status": "exit", "started": "2021-12-09T15:20:19.456063"})
+    assert [row["Trading Pair"] for row in snapshot.records()] == ["TESTUSDT"]
+    os.remove(datafolder / "telegram_data" / "TESTUSDT.json")
+    assert snapshot.records() == []
+
+
+def test_snapshot_keeps_last_row_while_file_is_rewritten(datafolder):
+    snapshot = BotStatusSnapshot(str(datafolder), min_interval=0)
+    assert len(snapshot.records()) == 1
+
+    path = datafolder / "telegram_data" / "TESTUSDT.json"
+    with open(path, "w", encoding="utf8") as f:
+        f.write('{"botcontrol": ')
+    assert len(snapshot.records()) == 1
+
+
+def test_snapshot_throttles_refresh(datafolder):
+    snapshot = BotStatusSnapshot(str(datafolder), min_interval=60)
+    assert snapshot.refresh() is True
+    _write(datafolder, "AAAUSDT")
+    assert snapshot.refresh() is False
+    assert len(snapshot.records()) == 1
@@ -0,0 +1,80 @@
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append('.')
+# pylint: disable=import-error
+from views.ChartRenderer import ChartRenderer
+
+pytest.importorskip("matplotlib")
+
+
+def trading_df(periods=250):
+    index = pd.date_range("2022-01-01", periods=periods, freq="h")
+    close = 20000 + np.cumsum(np.random.default_rng(1).normal(0, 20, periods))
+    df = pd.DataFrame({"market": "BTC-GBP", "granularity": "1h", "close": close}, index=index)
+    df["ema12"] = df["close"].ewm(span=12).mean()
+    df["ema26"] = df["close"].ewm(span=26).mean()
+    df["macd"] = df["ema12"] - df["ema26"]
+    df["signal"] = df["macd"].ewm(span=9).mean()
+    df["rsi14"] = 50.0  # not needed for the chart
+    return df
+
+
+def test_renders_in_the_background(tmp_path):
+    renderer = ChartRenderer()
+    renderer.submit_ema_and_macd(trading_df(), 200, str(tmp_path / "graphs" / "buy.png"))
+    renderer.submit_ema_and_macd(trading_df(), 100, str(tmp_path / "graphs" / "sell.png"))
+    renderer.flush()
+
+    assert (tmp_path / "graphs" / "buy.png").read_bytes()[:4] == b"\x89PNG"
+    assert (tmp_path / "graphs" / "sell.png").exists()
+    assert renderer.rendered == 2
+
+
+def test_simulations_render_on_flush(tmp_path):
+    renderer = ChartRenderer(background=False)
+    df = trading_df()
+    for i in range(25):
+        renderer.submit_ema_and_macd(df, 200, str(tmp_path / f"{i}.png"))
+        df.loc[df.index[-1], "close"] += 1  # the simulation carries on with its data
+    assert not list(tmp_path.iterdir())
+
+    renderer.flush()
+    assert len(list(tmp_path.iterdir())) == 25
+    assert renderer.dropped == 0
+
+
+def test_drops_the_oldest_when_behind(tmp_path):
+    renderer = ChartRenderer(max_pending=2)
+    renderer._busy = True  # pylint: disable=protected-access
+    renderer._thread = object()  # keep the worker from starting  # pylint: disable=protected-access
+    for name in ("a", "b", "c"):
+        renderer.submit_ema_and_macd(trading_df(), 200, str(tmp_path / f"{name}.png"))
+
+    assert [job[3] for job in renderer._jobs] == [str(tmp_path / "b.png"), str(tmp_path / "c.png")]  # pylint: disable=protected-access
+    assert renderer.dropped == 1
+    assert renderer.flush(0.01) is False
+
+    renderer._jobs.clear()  # pylint: disable=protected-access
+    renderer._busy = False  # pylint: disable=protected-access
+    assert renderer.flush(0.01) is True
+
+
+def test_stale_charts_are_not_rendered(tmp_path):
+    renderer = ChartRenderer(max_age=-1)
+    renderer.submit_ema_and_macd(trading_df(), 200, str(tmp_path / "late.png"))
+    renderer.flush()
+
+    assert not (tmp_path / "late.png").exists()
+    assert renderer.dropped == 1
+
+
+def test_rejects_bad_periods():
+    renderer = ChartRenderer(background=False)
+    with pytest.raises(ValueError):
+        renderer.submit_ema_and_macd(trading_df(), 300, "graphs/x.png")
+    with pytest.raises(TypeError):
+        renderer.submit_ema_and_macd(trading_df(), "200", "graphs/x.png")
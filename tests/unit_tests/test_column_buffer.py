@@ -0,0 +1,58 @@
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+sys.path.append('.')
+# pylint: disable=import-error
+from models.helper.ColumnBufferHelper import ColumnBuffer
+from models.TradingAccount import TradingAccount
+
+
+def test_rows_grow_past_the_initial_capacity():
+    buffer = ColumnBuffer({"Action": object, "Price": float, "Profit": float}, capacity=2)
+    for i in range(5):
+        buffer.append(Action="BUY" if i % 2 == 0 else "SELL", Price=100.0 + i)
+    buffer.append(Action="SELL", Price=110.0, Profit=5.5)
+
+    df = buffer.to_frame()
+    assert list(df.columns) == ["Action", "Price", "Profit"]
+    assert list(df["Price"]) == [100.0, 101.0, 102.0, 103.0, 104.0, 110.0]
+    assert df["Profit"].isna().sum() == 5
+    assert df["Price"].dtype == np.float64
+    assert buffer.to_frame() is df  # reused until the next append
+
+    last = buffer.row(-1)
+    assert last.name == 5 and last["Action"] == "SELL" and last["Profit"] == 5.5
+    with pytest.raises(KeyError):
+        buffer.append(Fee=1.0)
+
+    buffer.clear()
+    assert len(buffer) == 0 and buffer.to_frame().empty
+
+
+def test_dummy_account_trades_on_numeric_balances():
+    app = SimpleNamespace(quote_currency="GBP", base_currency="BTC", is_live=False, exchange="dummy", market="BTC-GBP")
+    account = TradingAccount(app)
+    account.deposit_quote_currency(1000)
+
+    assert account.market_buy("BTC-GBP", 1000, 100, 20000)
+    assert account.get_balance("GBP") == 0.0
+    assert account.get_balance("BTC") == pytest.approx(0.04995)
+    with pytest.raises(ValueError):
+        account.market_buy("BTC-GBP", 1, 100, 20000)
+
+    assert account.market_sell("BTC-GBP", 0.04995, 22000)
+    assert account.get_balance("GBP") == pytest.approx(1097.8011)
+
+    balance = account.get_balance()
+    assert list(balance["currency"]) == ["GBP", "BTC"]
+    assert list(balance.columns) == ["currency", "balance", "hold", "available"]
+
+    orders = account.orders
+    assert list(orders["action"]) == ["buy", "sell"]
+    assert list(orders["price"]) == [20000.0, 22000.0]
+
+    account.market_buy("BTC-GBP", 100, 100, 21000)
+    assert list(account.orders["action"]) == ["buy", "sell", "buy"]
@@ -0,0 +1,176 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append('.')
+# pylint: disable=import-error
+from models.AppState import AppState
+from models.Strategy import Strategy
+from models.exchange.ExchangesEnum import Exchange
+from models.helper.CompactFrameHelper import compact_candles, compact_indicators
+
+
+def candles_with_indicators(n=2000, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    df = pd.DataFrame(
+        {
+            "date": pd.date_range("2022-01-01", periods=n, freq="h"),
+            "market": "BTC-GBP",
+            "granularity": 3600,
+            "low": close * 0.99,
+            "high": close * 1.01,
+            "open": close,
+            "close": close,
+            "volume": rng.uniform(0, 100, n),
+        }
+    )
+
+    # the same crossovers TechnicalAnalysis adds, calculated in float64
+    df["ema12"] = df.close.ewm(span=12, adjust=False).mean()
+    df["ema26"] = df.close.ewm(span=26, adjust=False).mean()
+    df["macd"] = df.ema12 - df.ema26
+    df["signal"] = df.macd.ewm(span=9, adjust=False).mean()
+    df["sma50"] = df.close.rolling(50).mean()
+    df["sma200"] = df.close.rolling(200).mean()
+    df["goldencross"] = df.sma50 > df.sma200
+    df["bb20_mid"] = df.close.rolling(20).mean()
+    df["bb20_upper"] = df.bb20_mid + 2 * df.close.rolling(20).std()
+    df["bb20_lower"] = df.bb20_mid - 2 * df.close.rolling(20).std()
+    obv = (np.sign(df.close.diff()).fillna(0) * df.volume).cumsum()
+    df["obv_pc"] = round((obv.pct_change() * 100).replace([np.inf, -np.inf], np.nan).fillna(0), 2)
+    df["eri_buy"] = df.low < df.ema12
+    for fast, slow in [("ema12", "ema26"), ("macd", "signal"), ("close", "bb20_upper"), ("close", "bb20_lower"), ("close", "bb20_mid")]:
+        above = df[fast] > df[slow]
+        below = df[fast] < df[slow]
+        df[f"{fast}gt{slow}"] = above
+        df[f"{fast}lt{slow}"] = below
+        df[f"{fast}gt{slow}co"] = above & above.ne(above.shift())
+        df[f"{fast}lt{slow}co"] = below & below.ne(below.shift())
+    # candle patterns end up as Python objects
+    df["hammer"] = pd.Series(rng.uniform(size=n) > 0.9, dtype=object)
+    return df
+
+
+def test_compact_candles_uses_categories():
+    df = candles_with_indicators(10)
+    compact_candles(df)
+    assert isinstance(df["market"].dtype, pd.CategoricalDtype)
+    assert isinstance(df["granularity"].dtype, pd.CategoricalDtype)
+    assert df["close"].dtype == np.float64
+
+
+def test_compact_indicators_dtypes_and_memory():
+    df = candles_with_indicators()
+    before = df.memory_usage(deep=True).sum()
+    compact_indicators(df)
+
+    for column in ["open", "high", "low", "close", "volume"]:
+        assert df[column].dtype == np.float64
+    for column in ["ema12", "ema26", "macd", "signal", "sma200"]:
+        assert df[column].dtype == np.float32
+    assert df["hammer"].dtype == bool
+    assert df.memory_usage(deep=True).sum() < before * 0.7
+
+    # a value float32 can't hold stays float64, a missing signal stays an object
+    df = pd.DataFrame({"obv": [1e300, 1.0], "doji": [True, None]})
+    compact_indicators(df)
+    assert df["obv"].dtype == np.float64
+    assert df["doji"].dtype == object
+
+
+class App:
+    """The settings Strategy reads, with the bot's defaults"""
+
+    exchange = Exchange.DUMMY
+    market = "BTC-GBP"
+    is_sim = True
+    simresultonly = True
+    debug = False
+    disabletelegram = True
+    enable_custom_strategy = False
+    enableinsufficientfundslogging = False
+    insufficientfunds = False
+    disablebuynearhigh = False
+    nobuynearhighpcnt = 3
+    disablebullonly = False
+    disablebuyema = False
+    disablebuymacd = False
+    disablebuyobv = True
+    disablebuyelderray = True
+    disablebuybbands_s1 = True
+    disablebuybbands_s2 = True
+    selltriggeroverride = False
+    preventloss = False
+    preventlosstrigger = 1.0
+    preventlossmargin = 0.1
+    sellatloss = True
+    nosellminpcnt = None
+    nosellmaxpcnt = None
+    trailing_stop_loss = None
+    trailing_stop_loss_trigger = 0
+    dynamic_tsl = False
+    disablefailsafelowerpcnt = False
+    sell_lower_pcnt = None
+    disablefailsafefibonaccilow = False
+    disableprofitbankupperpcnt = False
+    sell_upper_pcnt = None
+    sellatresistance = False
+
+    def __init__(self, **settings):
+        for name, value in settings.items():
+            setattr(self, name, value)
+
+    def get_interval(self, df, iterations=0):
+        return df.iloc[iterations - 1 : iterations]
+
+    def notify_telegram(self, msg):
+        pass
+
+
+def decisions(df, settings):
+    """Buys and sells as the bot's loop makes them, with the signals read from the last row of each window"""
+
+    app = App(**settings)
+    state = AppState(app, None)
+    trades, buy_row = [], 0
+    for i in range(250, len(df)):
+        price = float(df["close"].iloc[i])
+        strategy = Strategy(app, state, df.iloc[i - 199 : i + 1], 200)
+        state.action, _ = strategy.get_action(state, price, df["date"].iloc[i], None)
+
+        if state.last_action == "BUY":
+            margin = (price / state.last_buy_price - 1) * 100
+            change_pcnt_high = (price / df["close"].iloc[buy_row : i + 1].max() - 1) * 100
+            if strategy.is_sell_trigger(state, price, price * 1.02, margin, change_pcnt_high):
+                state.action = "SELL"
+        else:
+            margin = 0
+        if state.action != "WAIT" and strategy.is_wait_trigger(margin, bool(df["goldencross"].iloc[i])):
+            state.action = "WAIT"
+
+        if state.action in ["BUY", "SELL"]:
+            trades.append((i, state.action))
+            state.last_action = state.action
+            state.last_buy_price, buy_row = price, i
+    return trades
+
+
+def test_trade_decisions_are_unchanged():
+    original = candles_with_indicators(1500)
+    compact = compact_indicators(original.copy())
+    assert compact["bb20_upper"].dtype == np.float32
+    assert compact["obv_pc"].dtype == np.float32
+
+    settings = [
+        {},
+        dict(disablebullonly=True),
+        dict(disablebuyema=True, disablebuyobv=False, sell_upper_pcnt=3),
+        dict(disablebuybbands_s1=False, disablebuyelderray=False, sellatresistance=True),
+        dict(sellatloss=False, trailing_stop_loss=-1, trailing_stop_loss_trigger=2, sell_lower_pcnt=-4),
+    ]
+    for params in settings:
+        expected = decisions(original, params)
+        assert {action for _, action in expected} == {"BUY", "SELL"}, params
+        assert decisions(compact, params) == expected, params
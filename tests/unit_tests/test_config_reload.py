@@ -0,0 +1,171 @@
+import json
+import os
+import signal
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.append('.')
+# pylint: disable=import-error
+from controllers.PyCryptoBot import PyCryptoBot
+from models.chat import Telegram
+from models.exchange.ExchangesEnum import Exchange
+from models.exchange.Granularity import Granularity
+from models.helper import ConfigReloadHelper
+from models.helper.ConfigReloadHelper import ConfigReloader
+
+KEY = "0" * 64
+
+
+@pytest.fixture
+def bot(tmp_path, monkeypatch):
+    key_file = tmp_path / "binance.key"
+    key_file.write_text(f"{KEY}\n{KEY}\n")
+
+    # the log is written next to the test's config, not over ./pycryptobot.log
+    monkeypatch.setattr(sys, "argv", ["pycryptobot.py", "--logfile", str(tmp_path / "pycryptobot.log")])
+    app = PyCryptoBot(exchange=Exchange.BINANCE)
+    app.config_file = str(tmp_path / "config.json")
+    app.write_config = lambda **config: write_config(app.config_file, str(key_file), **config)
+    app.write_config()
+
+    # ConfigReloader installs a process wide SIGHUP handler
+    previous = signal.getsignal(signal.SIGHUP) if hasattr(signal, "SIGHUP") else None
+    yield app
+    if previous is not None:
+        signal.signal(signal.SIGHUP, previous)
+
+
+@pytest.fixture
+def warnings(monkeypatch):
+    messages = []
+    notify = ConfigReloadHelper.RichText.notify
+
+    def record(msg, app, level="normal"):
+        if level == "warning":
+            messages.append(msg)
+        return notify(msg, app, level)
+
+    monkeypatch.setattr(ConfigReloadHelper.RichText, "notify", record)
+    return messages
+
+
+def write_config(path, key_file, chat=None, **config):
+    settings = {"base_currency": "BTC", "quote_currency": "GBP", "granularity": "1h"}
+    settings.update(config)
+    document = {"binance": {"api_url": "https://api.binance.com", "api_key_file": key_file, "config": settings}}
+    if chat is not None:
+        document["telegram"] = chat
+    with open(path, "w", encoding="utf8") as stream:
+        json.dump(document, stream)
+
+
+def test_reload_applies_changed_settings_in_place(bot):
+    websocket, candles = object(), pd.DataFrame({"close": [1.0, 2.0]})
+    bot.websocket_connection, bot.trading_data = websocket, candles
+    reloader = ConfigReloader(bot)
+    reloader.reload()
+
+    bot.write_config(trailingstoploss=-1.5, trailingstoplosstrigger=2)
+    applied = reloader.reload()
+
+    assert applied["trailing_stop_loss"] == -1.5
+    assert applied["trailing_stop_loss_trigger"] == 2
+    assert bot.trailing_stop_loss == -1.5
+    assert bot.websocket_connection is websocket
+    assert bot.trading_data is candles
+
+    # nothing changed, nothing applied
+    assert set(reloader.reload()) <= {"config"}
+
+
+def test_invalid_or_restart_settings_are_not_applied(bot):
+    reloader = ConfigReloader(bot)
+    bot.write_config(trailingstoploss=-1.5)
+    reloader.reload()
+
+    # out of bounds, the whole file is rejected
+    bot.write_config(trailingstoploss=5, sellatloss=0)
+    assert reloader.reload() == {}
+    assert bot.trailing_stop_loss == -1.5
+    assert bot.sellatloss is True
+
+    # a different market needs a restart, the other settings still apply
+    bot.write_config(base_currency="ETH", trailingstoploss=-3)
+    applied = reloader.reload()
+    assert "market" not in applied and bot.market == "BTCGBP"
+    assert bot.trailing_stop_loss == -3
+
+
+def test_restart_settings_are_compared_with_the_startup_values(bot, warnings):
+    reloader = ConfigReloader(bot)
+
+    # smart switch moved to 15 minute candles, the config still says 1 hour
+    bot.granularity = Granularity.FIFTEEN_MINUTES
+    bot.write_config(trailingstoploss=-2)
+    applied = reloader.reload()
+    assert applied["trailing_stop_loss"] == -2
+    assert bot.granularity == Granularity.FIFTEEN_MINUTES
+    assert warnings == []
+
+    # a new granularity in the config needs a restart
+    bot.write_config(granularity="6h", trailingstoploss=-2)
+    assert "granularity" not in reloader.reload()
+    assert bot.granularity == Granularity.FIFTEEN_MINUTES
+    assert len(warnings) == 1 and "granularity" in warnings[0]
+
+
+def test_startup_only_settings_need_a_restart(bot, warnings):
+    reloader = ConfigReloader(bot)
+    bot.write_config(metricsport=9100, trailingstoploss=-2)
+    applied = reloader.reload()
+
+    assert "metricsport" not in applied and bot.metricsport == 0
+    assert applied["trailing_stop_loss"] == -2
+    assert len(warnings) == 1 and "metricsport" in warnings[0]
+
+
+def test_reload_enabling_telegram_builds_the_client(bot, monkeypatch):
+    sent = []
+    monkeypatch.setattr(Telegram, "send", lambda self, msg: sent.append((self._client_id, msg)))  # pylint: disable=protected-access
+    reloader = ConfigReloader(bot)
+    assert bot._chat_client is None  # pylint: disable=protected-access
+
+    chat = {"token": "1234567890:" + "A" * 35, "client_id": "12345678"}
+    bot.write_config(chat=chat, telegram=1)
+    applied = reloader.reload()
+
+    assert applied["telegram"] is True and bot.telegram is True
+    assert bot._chat_client._client_id == "12345678"  # pylint: disable=protected-access
+    assert len(sent) == 1 and sent[0][0] == "12345678" and "telegram" in sent[0][1]
+
+    # a new client_id replaces the client, a Telegram failure does not stop the bot
+    def fail(self, msg):
+        raise ConnectionError("telegram is down")
+
+    monkeypatch.setattr(Telegram, "send", fail)
+    bot.write_config(chat=dict(chat, client_id="87654321"), telegram=1)
+    assert reloader.reload()["telegram"] is True
+    assert bot._chat_client._client_id == "87654321"  # pylint: disable=protected-access
+
+
+def test_check_reloads_on_change_or_signal(bot):
+    reloader = ConfigReloader(bot)
+    assert reloader.check() == {}
+
+    # without watchconfig a changed file waits for a signal
+    bot.write_config(trailingstoploss=-2)
+    os.utime(bot.config_file, ns=(1, 1))
+    assert reloader.check() == {}
+
+    bot.watchconfig = True
+    os.utime(bot.config_file, ns=(2, 2))
+    assert reloader.check()["trailing_stop_loss"] == -2
+    assert reloader.check() == {}
+
+    if hasattr(signal, "SIGHUP"):
+        bot.write_config(trailingstoploss=-4)
+        os.utime(bot.config_file, ns=(2, 2))
+        os.kill(os.getpid(), signal.SIGHUP)
+        assert reloader.check()["trailing_stop_loss"] == -4
@@ -0,0 +1,95 @@
+import io
+import json
+import sys
+import time
+
+import pytest
+from rich.console import Console
+
+sys.path.append('.')
+# pylint: disable=import-error
+from views.PyCryptoBot import ConsoleOutput, RichText
+
+
+def cells(message="WAIT"):
+    return [
+        RichText.styled_text("Bot1", "magenta"),
+        RichText.styled_text("2022-01-01 00:00:00", "white"),
+        RichText.styled_text("BTC-USDT", "yellow"),
+        RichText.styled_text("1h", "yellow"),
+        None,
+        RichText.styled_text(message, "violet"),
+    ]
+
+
+def consoles():
+    term, log = io.StringIO(), io.StringIO()
+    return term, log, Console(file=term, width=180), Console(file=log, no_color=True, width=180)
+
+
+def test_plain_lines_are_written_in_the_background():
+    term, log, console_term, console_log = consoles()
+    output = ConsoleOutput(console_term, console_log, "plain")
+
+    for tick in range(3):
+        output.row(cells(f"tick {tick}"))
+    output.flush()
+
+    expected = "".join(f"Bot1 2022-01-01 00:00:00 BTC-USDT 1h tick {tick}\n" for tick in range(3))
+    assert term.getvalue() == expected
+    assert log.getvalue() == expected
+
+
+def test_json_records():
+    term, _, console_term, _ = consoles()
+    output = ConsoleOutput(console_term, None, "json")
+
+    output.row(cells("Action: BUY"), "info", price=20000.5, margin="1.5%")
+    output.flush()
+
+    assert json.loads(term.getvalue()) == {
+        "bot": "Bot1",
+        "time": "2022-01-01 00:00:00",
+        "market": "BTC-USDT",
+        "granularity": "1h",
+        "level": "info",
+        "message": "Action: BUY",
+        "price": 20000.5,
+        "margin": "1.5%",
+    }
+
+
+def test_rich_tables_follow_queued_rows():
+    term, _, console_term, _ = consoles()
+    output = ConsoleOutput(console_term, None, "plain")
+
+    output.row(cells("last tick"))
+    output.print("summary")
+
+    assert term.getvalue().splitlines() == ["Bot1 2022-01-01 00:00:00 BTC-USDT 1h last tick", "summary"]
+
+
+def test_auto_format_and_rich_opt_in():
+    _, _, console_term, _ = consoles()
+    assert ConsoleOutput(console_term).log_format == "plain"
+    assert ConsoleOutput(Console(force_terminal=True)).log_format == "rich"
+
+    with pytest.raises(ValueError):
+        ConsoleOutput(console_term, None, "html")
+
+    term, _, console_term, _ = consoles()
+    ConsoleOutput(console_term, None, "rich").row(cells())
+    assert "BTC-USDT" in term.getvalue()
+
+
+def test_plain_is_faster_than_rich():
+    def ticks_per_second(log_format):
+        _, _, console_term, console_log = consoles()
+        output = ConsoleOutput(console_term, console_log, log_format)
+        start = time.perf_counter()
+        for _ in range(100):
+            output.row(cells())
+        output.flush()
+        return 100 / (time.perf_counter() - start)
+
+    assert ticks_per_second("plain") > 5 * ticks_per_second("rich")
@@ -0,0 +1,154 @@
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append('.')
+# pylint: disable=import-error
+from models.CrossSectionalAnalysis import CrossSectionalAnalysis
+
+LENGTHS = {"AAA-USD": 300, "BBB-USD": 150, "CCC-USD": 60}
+
+
+@pytest.fixture(scope="module")
+def frames():
+    rng = np.random.default_rng(42)
+    data = {}
+    for market, periods in LENGTHS.items():
+        close = 100 + rng.standard_normal(periods).cumsum()
+        data[market] = pd.DataFrame(
+            {
+                "open": close + rng.standard_normal(periods) * 0.1,
+                "high": close + rng.random(periods),
+                "low": close - rng.random(periods),
+                "close": close,
+                "volume": rng.random(periods) * 1000,
+            },
+            index=pd.date_range("2022-01-01", periods=periods, freq="h"),
+        )
+    return data
+
+
+@pytest.fixture(scope="module")
+def analysis(frames):
+    engine = CrossSectionalAnalysis.from_dataframes(frames)
+    engine.add_all()
+    return engine
+
+
+def _pta_ema(close: pd.Series, length: int) -> pd.Series:
+    # pandas_ta ema: SMA seed followed by ewm(adjust=False)
+    seeded = close.copy()
+    sma = close.iloc[:length].mean()
+    seeded.iloc[: length - 1] = np.nan
+    seeded.iloc[length - 1] = sma
+    return seeded.ewm(span=length, adjust=False).mean()
+
+
+def _true_range(df: pd.DataFrame) -> pd.Series:
+    high_low = df["high"] - df["low"]
+    high_close = (df["high"] - df["close"].shift()).abs()
+    low_close = (df["low"] - df["close"].shift()).abs()
+    return pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
+
+
+@pytest.mark.parametrize("market", list(LENGTHS))
+def test_moving_averages(analysis, frames, market):
+    df = frames[market]
+    actual = analysis.get_df(market)
+
+    assert len(actual) == len(df)
+    assert (actual.index == df.index).all()
+
+    for period in (8, 12, 26):
+        expected = _pta_ema(df["close"], period).fillna(df["close"])
+        assert np.allclose(actual["ema" + str(period)], expected)
+
+    expected = df["close"].rolling(20).mean().fillna(df["close"])
+    assert np.allclose(actual["sma20"], expected)
+
+
+@pytest.mark.parametrize("market", list(LENGTHS))
+def test_rsi(analysis, frames, market):
+    close = frames[market]["close"]
+    change = close.diff()
+    gain = change.clip(lower=0).ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+    loss = (-change.clip(upper=0)).ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+    expected = (100 * gain / (gain + loss)).fillna(50)
+
+    assert np.allclose(analysis.get_df(market)["rsi14"], expected)
+
+
+@pytest.mark.parametrize("market", list(LENGTHS))
+def test_macd(analysis, frames, market):
+    close = frames[market]["close"]
+    macd = _pta_ema(close, 12) - _pta_ema(close, 26)
+    signal = _pta_ema(macd.loc[macd.first_valid_index():], 9).reindex(macd.index)
+
+    actual = analysis.get_df(market)
+    assert np.allclose(actual["macd"], macd.fillna(0))
+    assert np.allclose(actual["signal"], signal.fillna(0))
+
+
+@pytest.mark.parametrize("market", list(LENGTHS))
+def test_bollinger_bands(analysis, frames, market):
+    close = frames[market]["close"]
+    mid = close.rolling(20).mean()
+    deviation = close.rolling(20).std(ddof=0)
+
+    actual = analysis.get_df(market)
+    assert np.allclose(actual["bb20_mid"], mid.fillna(close))
+    assert np.allclose(actual["bb20_upper"], (mid + 2 * deviation).fillna(close))
+    assert np.allclose(actual["bb20_lower"], (mid - 2 * deviation).fillna(close))
+
+
+@pytest.mark.parametrize("market", list(LENGTHS))
+def test_atr_and_adx(analysis, frames, market):
+    df = frames[market].copy()
+    true_range = _true_range(df)
+
+    atr = true_range.rolling(14).sum() / 14
+    atr = atr.fillna(atr.mean())
+
+    minus_dm = df["low"].shift(1) - df["low"]
+    plus_dm = df["high"] - df["high"].shift(1)
+    plus_dm = pd.Series(np.where((plus_dm > minus_dm) & (plus_dm > 0), plus_dm, 0.0), index=df.index)
+    minus_dm = pd.Series(np.where((minus_dm > plus_dm) & (minus_dm > 0), minus_dm, 0.0), index=df.index)
+    tr14 = true_range.rolling(14).sum()
+    plus_di = plus_dm.rolling(14).sum() / tr14 * 100
+    minus_di = minus_dm.rolling(14).sum() / tr14 * 100
+    dx = (plus_di - minus_di).abs() / (plus_di + minus_di) * 100
+    adx = dx.rolling(14).mean()
+    adx = adx.fillna(adx.mean())
+    plus_di = plus_di.fillna(plus_di.mean())
+    minus_di = minus_di.fillna(minus_di.mean())
+
+    actual = analysis.get_df(market)
+    assert np.allclose(actual["atr14"], atr)
+    assert np.allclose(actual["+di14"], plus_di)
+    assert np.allclose(actual["-di14"], minus_di)
+    assert np.allclose(actual["adx14"], adx)
+    assert list(actual["adx14_trend"]) == list(np.where(plus_di > minus_di, "bull", "bear"))
+
+
+def test_get_last_df(analysis, frames):
+    df_last = analysis.get_last_df(["close", "ema12", "rsi14"])
+
+    assert list(df_last.index) == list(LENGTHS)
+    for market, df in frames.items():
+        assert df_last.loc[market, "close"] == df["close"].iloc[-1]
+
+
+def test_input_validation():
+    with pytest.raises(ValueError):
+        CrossSectionalAnalysis(["A"], np.ones(10))
+
+    with pytest.raises(ValueError):
+        CrossSectionalAnalysis(["A", "B"], np.ones((1, 10)))
+
+    engine = CrossSectionalAnalysis(["A"], np.ones((1, 50)))
+    with pytest.raises(ValueError):
+        engine.add_ema(250)
+    with pytest.raises(AttributeError):
+        engine.add_atr(14)
@@ -0,0 +1,101 @@
+import sys
+import threading
+
+import responses
+
+sys.path.append('.')
+# pylint: disable=import-error
+from models.exchange.MetadataCache import ExchangeMetadata
+from models.exchange.binance import AuthAPI
+
+API_KEY = "0000000000000000000000000000000000000000000000000000000000000000"
+API_SECRET = "0000000000000000000000000000000000000000000000000000000000000000"
+
+
+def test_missing_values_are_fetched_once():
+    metadata = ExchangeMetadata()
+    calls = []
+
+    assert metadata.get("fees", lambda: calls.append(1) or {"maker": 0.001}) == {"maker": 0.001}
+    assert metadata.get("fees", lambda: calls.append(1) or {"maker": 0.002}) == {"maker": 0.001}
+    assert len(calls) == 1
+
+
+def test_failures_are_not_cached():
+    metadata = ExchangeMetadata()
+
+    def failing():
+        raise ConnectionError()
+
+    assert metadata.get("fees", failing) is None
+    assert metadata.get("fees", lambda: []) is None
+    assert "fees" not in metadata
+    assert metadata.get("fees", lambda: 0.0) == 0.0
+
+
+def test_stale_values_refresh_in_the_background():
+    now = [0.0]
+    metadata = ExchangeMetadata(clock=lambda: now[0])
+    metadata.get("filters", lambda: "old", ttl=10)
+
+    release = threading.Event()
+    fetched = threading.Event()
+
+    def slow_loader():
+        release.wait(5)
+        fetched.set()
+        return "new"
+
+    now[0] = 11.0
+    # the caller gets the stale value straight away while the refresh is blocked
+    assert metadata.get("filters", slow_loader, ttl=10) == "old"
+    release.set()
+    assert fetched.wait(5)
+
+    for _ in range(100):
+        if metadata.get("filters", slow_loader, ttl=10) == "new":
+            break
+        threading.Event().wait(0.01)
+    assert metadata.get("filters", slow_loader, ttl=10) == "new"
+
+
+def test_persisted_between_restarts(tmp_path):
+    filepath = str(tmp_path / "binance_metadata.json")
+    ExchangeMetadata(filepath).get("markets", lambda: ["BTCUSDT", "ETHUSDT"])
+
+    restarted = ExchangeMetadata(filepath)
+    assert restarted.get("markets", lambda: None) == ["BTCUSDT", "ETHUSDT"]
+
+
+def test_shared_per_account(tmp_path):
+    first = ExchangeMetadata.for_exchange("binance", "https://api.binance.com", API_KEY, cache_path=str(tmp_path))
+    second = ExchangeMetadata.for_exchange("binance", "https://api.binance.com", API_KEY, cache_path=str(tmp_path))
+    other = ExchangeMetadata.for_exchange("binance", "https://api.binance.us", API_KEY, cache_path=str(tmp_path))
+
+    assert first is second
+    assert first is not other
+    assert API_KEY not in first.filepath
+
+
+@responses.activate
+def test_binance_filters_and_trade_fee_are_cached():
+    api = AuthAPI(API_KEY, API_SECRET)
+    api.metadata = ExchangeMetadata()
+
+    responses.add(
+        responses.GET,
+        "https://api.binance.com/api/v3/exchangeInfo",
+        json={"symbols": [{"symbol": "BTCUSDT", "filters": [{"filterType": "LOT_SIZE", "stepSize": "0.00001000"}]}]},
+    )
+    responses.add(
+        responses.GET,
+        "https://api.binance.com/sapi/v1/asset/tradeFee",
+        json=[{"symbol": "BTCUSDT", "makerCommission": "0.001", "takerCommission": "0.00075"}],
+    )
+
+    for _ in range(3):
+        df = api.get_market_info_filters("BTCUSDT")
+        assert df.loc[df["filterType"] == "LOT_SIZE", "stepSize"].iloc[0] == "0.00001000"
+        assert api.get_trade_fee("BTCUSDT") == 0.00075
+
+    assert len(responses.calls) == 2
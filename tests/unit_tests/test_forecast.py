@@ -0,0 +1,80 @@
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append('.')
+# pylint: disable=import-error
+from models.helper.ForecastHelper import SarimaxForecaster
+
+pytest.importorskip("statsmodels")
+
+
+def candles(periods=200, seed=1):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2022-01-01", periods=periods + 1, freq="h")
+    seasonal = 50 * np.sin(np.arange(periods + 1) * 2 * np.pi / 12)
+    return pd.Series(20000 + np.cumsum(rng.normal(0, 20, periods + 1)) + seasonal, index=index, name="close")
+
+
+class CountingForecaster(SarimaxForecaster):
+    def __init__(self):
+        super().__init__()
+        self.fits = []
+
+    def fit(self, close, start_params=None):
+        self.fits.append(start_params is not None)
+        return super().fit(close, start_params)
+
+
+def forecast(results, close, steps=3):
+    return np.asarray(results.predict(start=len(close), end=len(close) + steps - 1))
+
+
+def test_refit_only_on_a_new_candle():
+    history = candles()
+    forecaster = CountingForecaster()
+
+    close = history.iloc[:-1]
+    results = forecaster.results(close, "BTC-GBP", 3600)
+    assert forecaster.results(close.copy(), "BTC-GBP", 3600) is results
+    # the same candle set gives what a fresh fit gives
+    np.testing.assert_allclose(forecast(results, close), forecast(forecaster.fit(close), close))
+
+    # the open candle moving is a filter pass with the fitted parameters
+    live = close.copy()
+    live.iloc[-1] += 25
+    moved = forecaster.results(live, "BTC-GBP", 3600)
+    np.testing.assert_array_equal(moved.params, results.params)
+    assert forecast(moved, live)[0] != forecast(results, close)[0]
+    assert forecaster.fits == [False, False]
+
+    # a new candle is refit from the previous parameters
+    close = history.iloc[1:]
+    refit = forecaster.results(close, "BTC-GBP", 3600)
+    assert forecaster.fits == [False, False, True]
+    np.testing.assert_allclose(forecast(refit, close), forecast(SarimaxForecaster().fit(close), close), rtol=1e-4)
+
+    # markets and granularities are cached separately
+    forecaster.results(close, "BTC-GBP", 900)
+    assert forecaster.fits == [False, False, True, False]
+
+
+def test_background_refit():
+    history = candles()
+    forecaster = CountingForecaster()
+
+    assert forecaster.results(history.iloc[:-1], "ETH-GBP", 3600, wait=False) is None
+    deadline = time.time() + 30
+    while forecaster.results(history.iloc[:-1], "ETH-GBP", 3600, wait=False) is None and time.time() < deadline:
+        time.sleep(0.05)
+    first = forecaster.results(history.iloc[:-1], "ETH-GBP", 3600, wait=False)
+    assert first is not None
+
+    # served from the previous parameters while the new candle is refit
+    stale = forecaster.results(history.iloc[1:], "ETH-GBP", 3600, wait=False)
+    np.testing.assert_array_equal(stale.params, first.params)
+    assert forecaster.results(history.iloc[1:], "ETH-GBP", 3600) is not stale
+    assert forecaster.fits == [False, True]
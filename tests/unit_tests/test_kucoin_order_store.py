@@ -0,0 +1,136 @@
+import re
+import sys
+import time
+
+import pytest
+import responses
+
+sys.path.append('.')
+# pylint: disable=import-error
+from models.exchange.OrderStore import OrderStore
+from models.exchange.kucoin import AuthAPI
+
+API_KEY = "0" * 24
+API_SECRET = "00000000-0000-0000-0000-000000000000"
+API_PASSPHRASE = "passphrase"
+DAY = 24 * 3600 * 1000
+
+
+def order(id, symbol, created_at, side="buy"):
+    return {
+        "id": id,
+        "symbol": symbol,
+        "createdAt": created_at,
+        "side": side,
+        "type": "market",
+        "size": "0.1",
+        "funds": "0",
+        "dealSize": "0.1",
+        "dealFunds": "2000",
+        "fee": "2",
+        "isActive": False,
+        "price": "0",
+    }
+
+
+def test_append_is_idempotent_and_indexed_by_symbol(tmp_path):
+    store = OrderStore(str(tmp_path / "orders.sqlite3"))
+
+    assert store.append([order("1", "BTC-USDT", 2000), order("2", "ETH-USDT", 1000), order("3", "BTC-USDT", 1000)]) == 3
+    assert store.append([order("1", "BTC-USDT", 2000), order("4", "BTC-USDT", 3000)]) == 1
+
+    btc = store.query("BTC-USDT")
+    assert list(btc["id"]) == ["3", "1", "4"]
+    assert list(store.query("BTC-USDT", since=2000)["id"]) == ["1", "4"]
+    assert list(store.query("ETH-USDT")["id"]) == ["2"]
+    assert store.query("XRP-USDT").empty
+
+    assert store.purge(1500) == 2
+    assert list(store.query()["id"]) == ["1", "4"]
+
+
+def test_append_updates_orders_that_changed(tmp_path):
+    store = OrderStore(str(tmp_path / "orders.sqlite3"))
+    active = dict(order("1", "BTC-USDT", 1000), isActive=True, dealSize="0", dealFunds="0", fee="0")
+
+    assert store.append([active]) == 1
+    assert bool(store.query("BTC-USDT")["isActive"].iloc[0]) is True
+
+    # filled since it was first stored
+    assert store.append([order("1", "BTC-USDT", 1000)]) == 1
+    done = store.query("BTC-USDT")
+    assert len(done) == 1
+    assert bool(done["isActive"].iloc[0]) is False
+    assert list(done[["dealSize", "dealFunds", "fee"]].iloc[0]) == ["0.1", "2000", "2"]
+
+    # the same snapshot again is not a change
+    assert store.append([order("1", "BTC-USDT", 1000)]) == 0
+
+
+def test_sync_resumes_from_the_cursor(tmp_path):
+    store = OrderStore(str(tmp_path / "orders.sqlite3"))
+    windows = []
+
+    def fetch(start, end):
+        windows.append((start, end))
+        return [order(f"{start}", "BTC-USDT", start)]
+
+    assert store.sync(fetch, start=0, now=10, window=4) == 3
+    assert windows == [(0, 4), (4, 8), (8, 10)]
+
+    windows.clear()
+    assert store.sync(fetch, start=0, now=12, window=4) == 1
+    assert windows == [(10, 12)]
+
+
+def test_failed_window_is_fetched_again(tmp_path):
+    store = OrderStore(str(tmp_path / "orders.sqlite3"))
+
+    def failing(start, end):
+        if start == 4:
+            raise ConnectionError()
+        return [order(f"{start}", "BTC-USDT", start)]
+
+    with pytest.raises(ConnectionError):
+        store.sync(failing, start=0, now=10, window=4)
+
+    windows = []
+    store.sync(lambda start, end: windows.append((start, end)) or [], start=0, now=10, window=4)
+    assert windows == [(4, 8), (8, 10)]
+
+
+def test_only_one_process_syncs(tmp_path):
+    filepath = str(tmp_path / "orders.sqlite3")
+    first, second = OrderStore(filepath), OrderStore(filepath)
+
+    assert first.acquire_lease()
+    assert second.sync(lambda start, end: [], start=0, now=10, window=4) == -1
+    first.release_lease()
+    assert second.sync(lambda start, end: [], start=0, now=10, window=4) == 0
+
+
+@responses.activate
+def test_kucoin_orders_come_from_the_store(tmp_path):
+    api = AuthAPI(API_KEY, API_SECRET, API_PASSPHRASE, cache_path=str(tmp_path), use_cache=True)
+    now = int(time.time() * 1000)
+
+    def page(items):
+        return {"code": "200000", "data": {"currentPage": 1, "pageSize": 500, "totalNum": len(items), "totalPage": 1, "items": items}}
+
+    history = [order("a", "BTC-USDT", now - 2 * DAY), order("b", "ETH-USDT", now - DAY, "sell")]
+    responses.add(responses.GET, re.compile(rf"https://api\.kucoin\.com/api/v1/orders\?startAt={now - 3 * DAY}&.*"), json=page(history))
+    responses.add(responses.GET, re.compile(r"https://api\.kucoin\.com/api/v1/orders\?startAt=.*"), json=page([]))
+    responses.add(responses.GET, re.compile(r"https://api\.kucoin\.com/api/v1/orders\?symbol=BTC-USDT.*"), json=page([order("c", "BTC-USDT", now)]))
+
+    api.order_store.set_meta("cursor:sync", now - 3 * DAY)
+    df = api.get_orders("BTC-USDT")
+    assert list(df["action"]) == ["buy", "buy"]
+    assert len(df[df["market"] != "BTC-USDT"]) == 0
+
+    history_calls = [call for call in responses.calls if "startAt" in call.request.url]
+    assert len(history_calls) == 1
+
+    # the history is not synced again within the sync interval
+    api.get_orders("BTC-USDT")
+    assert len([call for call in responses.calls if "startAt" in call.request.url]) == 1
+    assert list(api.order_store.query("ETH-USDT")["id"]) == ["b"]
@@ -0,0 +1,62 @@
+import os
+import sys
+
+sys.path.append('.')
+# pylint: disable=import-error
+from models.helper.LogTailHelper import LogTail, tail_lines
+
+
+def write(path, text, mode="a"):
+    with open(path, mode, encoding="utf8") as stream:
+        stream.write(text)
+
+
+def test_tail_reads_blocks_from_the_end(tmp_path):
+    path = tmp_path / "bot.log"
+    write(path, "".join(f"line {i}\r\n" for i in range(5000)), "w")
+
+    assert tail_lines(str(path), 3, block=16) == ["line 4997", "line 4998", "line 4999"]
+    assert tail_lines(str(path), 10000, block=16)[0] == "line 0"
+    assert len(tail_lines(str(path), 1000)) == 1000
+
+    write(path, "no newline yet")
+    assert tail_lines(str(path), 2) == ["line 4999", "no newline yet"]
+
+
+def test_follow_reads_only_appended_bytes(tmp_path, monkeypatch):
+    path = tmp_path / "bot.log"
+    write(path, "".join(f"line {i}\n" for i in range(100)), "w")
+    tail = LogTail(str(path), max_lines=5, block=32)
+    assert tail.read() == [f"line {i}" for i in range(95, 100)]
+
+    write(path, "line 100\nline 1")
+    reads = []
+    seek = []
+    real_open = open
+
+    def counting_open(*args, **kwargs):
+        stream = real_open(*args, **kwargs)
+        real_read, real_seek = stream.read, stream.seek
+        stream.read = lambda size=-1: reads.append(size) or real_read(size)
+        stream.seek = lambda offset, whence=0: seek.append(offset) or real_seek(offset, whence)
+        return stream
+
+    monkeypatch.setattr("builtins.open", counting_open)
+    assert tail.read() == ["line 97", "line 98", "line 99", "line 100", "line 1"]
+    assert seek == [os.path.getsize(path) - len("line 100\nline 1")]
+    monkeypatch.undo()
+
+    # the unfinished line is completed rather than repeated
+    write(path, "01\n")
+    assert tail.read()[-2:] == ["line 100", "line 101"]
+    assert tail.read()[-1] == "line 101"
+
+
+def test_rotated_log_is_tailed_again(tmp_path):
+    path = tmp_path / "bot.log"
+    write(path, "".join(f"old {i}\n" for i in range(50)), "w")
+    tail = LogTail(str(path), max_lines=3)
+    assert tail.read() == ["old 47", "old 48", "old 49"]
+
+    write(path, "new 0\n", "w")
+    assert tail.read() == ["new 0"]
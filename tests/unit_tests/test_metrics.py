@@ -0,0 +1,110 @@
+import json
+import sys
+import time
+import urllib.request
+
+import pytest
+import responses
+
+sys.path.append('.')
+# pylint: disable=import-error
+from models.exchange.MetadataCache import ExchangeMetadata
+from models.exchange.binance import AuthAPI
+from models.helper.MetricsHelper import Metrics, metrics
+
+API_KEY = "0000000000000000000000000000000000000000000000000000000000000000"
+API_SECRET = "0000000000000000000000000000000000000000000000000000000000000000"
+
+
+def histogram(data, name, **labels):
+    return next(item for item in data["histograms"] if item["name"] == name and item["labels"] == labels)
+
+
+def counter(data, name, **labels):
+    return next((item["value"] for item in data["counters"] if item["name"] == name and item["labels"] == labels), 0)
+
+
+def test_timers_and_errors():
+    registry = Metrics(buckets=(0.1, 1.0))
+
+    with registry.time("phase_seconds", phase="strategy"):
+        pass
+    with pytest.raises(ValueError):
+        with registry.time("phase_seconds", phase="strategy"):
+            raise ValueError()
+    registry.observe("phase_seconds", 5.0, phase="strategy")
+
+    @registry.timed("phase_seconds", phase="orders")
+    def order():
+        return "done"
+
+    assert order() == "done"
+
+    data = registry.to_dict()
+    strategy = histogram(data, "phase_seconds", phase="strategy")
+    assert strategy["count"] == 3
+    assert strategy["buckets"] == {"0.1": 2, "1.0": 0, "+Inf": 1}
+    assert histogram(data, "phase_seconds", phase="orders")["count"] == 1
+    assert counter(data, "phase_errors_total", phase="strategy") == 1
+
+
+def test_prometheus_text_and_json_dump(tmp_path):
+    registry = Metrics(buckets=(0.1, 1.0))
+    registry.inc("requests_total", exchange="binance", status="200")
+    registry.inc("requests_total", 2, exchange="binance", status="200")
+    registry.observe("tick_seconds", 0.5)
+
+    text = registry.render_prometheus()
+    assert '# TYPE requests_total counter\nrequests_total{exchange="binance",status="200"} 3' in text
+    assert 'tick_seconds_bucket{le="0.1"} 0\ntick_seconds_bucket{le="1.0"} 1\ntick_seconds_bucket{le="+Inf"} 1' in text
+    assert "tick_seconds_count 1" in text
+
+    filepath = str(tmp_path / "metrics" / "BTCUSDT.json")
+    registry.dump_json(filepath)
+    with open(filepath, encoding="utf8") as json_file:
+        assert counter(json.load(json_file), "requests_total", exchange="binance", status="200") == 3
+
+
+def test_metrics_endpoint():
+    registry = Metrics()
+    registry.inc("ticks_total")
+    server = registry.serve(0)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics", timeout=5) as resp:
+            assert "ticks_total 1" in resp.read().decode("utf-8")
+    finally:
+        server.shutdown()
+
+
+def test_recording_is_cheap():
+    registry = Metrics()
+    start = time.perf_counter()
+    for _ in range(10000):
+        with registry.time("phase_seconds", phase="render"):
+            pass
+    assert (time.perf_counter() - start) / 10000 < 50e-6
+
+
+@responses.activate
+def test_exchange_calls_are_recorded():
+    api = AuthAPI(API_KEY, API_SECRET)
+    api.metadata = ExchangeMetadata()
+    responses.add(responses.GET, "https://api.binance.com/api/v3/exchangeInfo", json={"symbols": []})
+
+    before = metrics.to_dict()
+    api.auth_api("GET", "/api/v3/exchangeInfo", {"symbol": "BTCUSDT"})
+    after = metrics.to_dict()
+
+    def calls(data):
+        try:
+            return histogram(data, "pycryptobot_exchange_api_seconds", exchange="binance", api="private")["count"]
+        except StopIteration:
+            return 0
+
+    assert calls(after) - calls(before) == 1
+    assert counter(after, "pycryptobot_http_requests_total", exchange="binance", status="200") - counter(
+        before, "pycryptobot_http_requests_total", exchange="binance", status="200"
+    ) == 1
+    assert counter(after, "pycryptobot_http_received_bytes_total", exchange="binance") - counter(
+        before, "pycryptobot_http_received_bytes_total", exchange="binance"
+    ) == len(b'{"symbols": []}')
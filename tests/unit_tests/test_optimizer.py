@@ -0,0 +1,177 @@
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append('.')
+# pylint: disable=import-error
+from models.AppState import AppState
+from models.Optimizer import BUY_SETTINGS, DEFAULTS, SIGNAL_COLUMNS, Evaluator, Signals, backtest, grid, parameter_space, summarise, walk_forward
+from models.Strategy import Strategy
+from models.exchange.ExchangesEnum import Exchange
+
+# buy on the crossovers only, with bbands_s2 disabled the bot buys on every bull market candle
+CROSSOVERS = {"disablebuybbands_s2": False}
+
+
+def candles(close, buys=(), sells=(), golden=True):
+    n = len(close)
+    df = pd.DataFrame({"date": pd.date_range("2022-01-01", periods=n, freq="h"), "close": np.asarray(close, dtype=float)})
+    for column in [column for column in SIGNAL_COLUMNS if column != "goldencross"]:
+        df[column] = False
+    df.loc[list(buys), ["ema12gtema26co", "macdgtsignal", "closegtbb20_upperco"]] = True
+    df.loc[list(sells), ["ema12ltema26co", "macdltsignal", "closeltbb20_midco"]] = True
+    df["goldencross"] = golden
+    return df
+
+
+def test_sell_signal_and_triggers():
+    close = [100, 100, 102, 104, 108, 112, 109, 100]
+    signals = Signals(candles(close, buys=[1], sells=[6]))
+
+    result = backtest(signals, CROSSOVERS, fee=0)
+    assert result["trades"] == 1
+    assert result["profit"] == pytest.approx(9.0)
+
+    # profit bank at sell_upper_pcnt sells on the first candle above it
+    assert backtest(signals, {**CROSSOVERS, "sell_upper_pcnt": 5}, fee=0)["profit"] == pytest.approx(8.0)
+
+    # trailing stop loss, armed once the margin passed the trigger
+    result = backtest(signals, {**CROSSOVERS, "trailing_stop_loss": -2, "trailing_stop_loss_trigger": 10}, fee=0)
+    assert result["profit"] == pytest.approx(9.0)
+
+    # bull only without a golden cross never buys, fees come off both sides
+    assert backtest(Signals(candles(close, buys=[1], sells=[6], golden=False)), CROSSOVERS, fee=0)["trades"] == 0
+    assert backtest(signals, CROSSOVERS, fee=0.005)["profit"] == pytest.approx((1.09 * 0.995**2 - 1) * 100)
+
+
+def test_default_settings_buy_on_every_bull_market_candle():
+    close = [100, 100, 102, 104, 108, 112, 109, 100, 104, 106]
+    signals = Signals(candles(close, buys=[1], sells=[6]))
+
+    # buy signal 2 is met whenever bbands_s2 is disabled, the bot buys on the first candle and again after selling
+    assert list(signals.entries(DEFAULTS)) == list(range(10))
+    result = backtest(signals, {}, fee=0)
+    assert result["trades"] == 2
+    assert result["profit"] == pytest.approx((1.09 * 1.06 - 1) * 100)
+
+
+def test_no_loss_sells_and_open_positions_close_at_the_window_end():
+    close = [100, 100, 95, 90, 96, 101, 103]
+    signals = Signals(candles(close, buys=[1], sells=[3]))
+
+    assert backtest(signals, {**CROSSOVERS, "sellatloss": 1}, fee=0)["profit"] == pytest.approx(-10.0)
+    # without sellatloss the sell signal at a loss is ignored, the window end closes the trade
+    assert backtest(signals, {**CROSSOVERS, "sellatloss": 0}, fee=0)["profit"] == pytest.approx(3.0)
+    result = backtest(signals, {**CROSSOVERS, "sellatloss": 0}, 0, 6, fee=0)
+    assert result["profit"] == pytest.approx(1.0)
+    assert result["max_drawdown"] == 0
+
+
+def test_parameter_space():
+    space = parameter_space({"sell_upper_pcnt": {"min": 1, "max": 2, "step": 0.5}, "sellatloss": 1})
+    assert space == {"sell_upper_pcnt": [1, 1.5, 2], "sellatloss": [1]}
+    assert len(grid(space)) == 3
+
+    with pytest.raises(ValueError):
+        parameter_space({"ema26": [1, 2]})
+
+
+def trending(periods=600, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.01, periods)))
+    buys = np.flatnonzero(rng.random(periods) < 0.05)
+    sells = np.flatnonzero(rng.random(periods) < 0.05)
+    return Signals(candles(close, buys=buys, sells=sells))
+
+
+SPACE = {
+    "disablebuybbands_s2": [False],
+    "sell_upper_pcnt": [None, 1, 2, 4],
+    "sell_lower_pcnt": [None, -1, -2],
+    "trailing_stop_loss": [None, -1, -2],
+    "trailing_stop_loss_trigger": [0, 1],
+    "disablebuymacd": [False, True],
+}
+
+
+@pytest.mark.parametrize("method", ["grid", "random", "halving"])
+def test_walk_forward_reports_out_of_sample(method):
+    signals = trending()
+    df = walk_forward(signals, SPACE, train_periods=200, test_periods=100, method=method, trials=40, fee=0.001, seed=1)
+
+    assert len(df) == 4
+    assert list(df["test_start"]) == list(signals.dates[[200, 300, 400, 500]])
+    for row in df.to_dict("records"):
+        params = {name: row[name] for name in SPACE}
+        # the reported result is the chosen settings traded on the unseen window
+        assert row["profit"] == pytest.approx(backtest(signals, params, signals.dates.get_loc(row["test_start"]), signals.dates.get_loc(row["test_end"]) + 1, 0.001)["profit"])
+
+    summary = summarise(df)
+    assert summary["windows"] == 4
+    if method == "grid":
+        assert summary["trials"] == 4 * len(grid(SPACE))
+    elif method == "halving":
+        assert summary["trials"] < 4 * 40 * 2
+
+
+def test_grid_picks_the_best_training_result():
+    signals = trending()
+    df = walk_forward(signals, SPACE, train_periods=400, test_periods=200, method="grid", fee=0.001)
+    best = max(backtest(signals, params, 0, 400, 0.001)["profit"] for params in grid(parameter_space(SPACE)))
+    assert df.loc[0, "in_sample_profit"] == pytest.approx(best)
+
+
+def test_worker_processes_match_a_serial_run():
+    signals = trending()
+    candidates = grid(parameter_space(SPACE))
+    evaluator = Evaluator(signals, 0.001, max_workers=2)
+    try:
+        assert evaluator.run(candidates, 0, 300) == Evaluator(signals, 0.001).run(candidates, 0, 300)
+    finally:
+        evaluator.close()
+
+
+class App:
+    """The settings Strategy reads for its buy and sell signals"""
+
+    exchange = Exchange.DUMMY
+    is_sim = True
+    simresultonly = True
+    debug = False
+    enable_custom_strategy = False
+    enableinsufficientfundslogging = False
+    disablebuynearhigh = False
+    disablebuyobv = True
+    disablebuyelderray = True
+    trailing_stop_loss = None
+    trailing_stop_loss_trigger = 0
+
+    def __init__(self, params):
+        for name, value in params.items():
+            setattr(self, name, value)
+
+    def get_interval(self, df, iterations=0):
+        return df.iloc[iterations - 1 : iterations]
+
+
+def test_signals_match_strategy():
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame({column: rng.random(200) < 0.3 for column in SIGNAL_COLUMNS})
+    df["close"], df["obv_pc"], df["eri_buy"] = 100.0, 0.0, False
+    signals = Signals(df)
+
+    for values in grid({name: [False, True] for name in BUY_SETTINGS}):
+        entries, exits = set(signals.entries(values)), signals.exits(values)
+        if all(values[name] for name in BUY_SETTINGS if name != "disablebullonly"):
+            # no strategy, the bot warns and never trades
+            assert len(entries) == 0 and not exits.any()
+            continue
+
+        app = App(values)
+        flat = AppState(app, None)
+        for i in range(len(df)):
+            strategy = Strategy(app, flat, df, i + 1)
+            assert strategy.is_buy_signal(flat, 100.0) == (i in entries), (values, i)
+            assert strategy.is_sell_signal() == exits[i], (values, i)
@@ -0,0 +1,71 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import pandas as pd
+
+sys.path.append('.')
+# pylint: disable=import-error
+from models.exchange.ExchangesEnum import Exchange
+from models.helper.OrderPairHelper import pair_orders
+from models.TradingAccount import TradingAccount
+
+COLUMNS = ["created_at", "market", "action", "type", "size", "value", "fees", "price", "status"]
+
+
+def orders(rows):
+    df = pd.DataFrame(
+        [[pd.Timestamp(f"2022-01-{day:02d}", tz="UTC"), market, action, "market", 1.0, value, 0.1, value, "done"] for day, market, action, value in rows],
+        columns=COLUMNS,
+    )
+    return df
+
+
+def test_consecutive_actions_are_paired_by_run():
+    df = orders(
+        [
+            (1, "BTCUSDT", "sell", 90.0),  # sell before any buy is not a trade
+            (2, "BTCUSDT", "buy", 100.0),
+            (3, "BTCUSDT", "buy", 101.0),
+            (4, "BTCUSDT", "sell", 110.0),
+            (5, "BTCUSDT", "sell", 111.0),
+            (6, "BTCUSDT", "buy", 120.0),  # still open
+            (2, "ETHUSDT", "buy", 10.0),
+            (3, "ETHUSDT", "sell", 12.0),
+        ]
+    )
+
+    pairs = pair_orders(df)
+    assert list(pairs["market"]) == ["BTCUSDT", "ETHUSDT"]
+    assert list(pairs["buy_value"]) == [100.0, 10.0]
+    assert list(pairs["sell_value"]) == [110.0, 12.0]
+    assert list(pairs["sell_created_at"].dt.day) == [4, 3]
+
+    totals = pair_orders(df, sums=["value"])
+    assert list(totals["buy_value"]) == [201.0, 10.0]
+    assert list(totals["sell_value"]) == [221.0, 12.0]
+
+
+def test_no_pairs():
+    assert pair_orders(pd.DataFrame()).empty
+    assert pair_orders(orders([(1, "BTCUSDT", "buy", 100.0)])).empty
+
+
+def test_tracker_is_only_written_when_orders_change(tmp_path):
+    app = SimpleNamespace(quote_currency="USDT", base_currency="BTC", is_live=False, exchange=Exchange.BINANCE)
+    account = TradingAccount(app)
+    account.orders = orders([(2, "BTCUSDT", "buy", 100.0), (4, "BTCUSDT", "sell", 110.0)])
+    save_file = str(tmp_path / "tracker.csv")
+
+    assert account.save_tracker_csv("BTCUSDT", save_file=save_file)
+    tracker = pd.read_csv(save_file)
+    assert list(tracker["profit"].round(2)) == [9.8]
+    assert list(tracker["margin"].round(1)) == [9.8]
+
+    os.utime(save_file, (0, 0))
+    assert account.save_tracker_csv("BTCUSDT", save_file=save_file)
+    assert os.path.getmtime(save_file) == 0
+
+    account.orders = pd.concat([account.orders, orders([(5, "BTCUSDT", "buy", 120.0), (6, "BTCUSDT", "sell", 100.0)])])
+    assert account.save_tracker_csv("BTCUSDT", save_file=save_file)
+    assert len(pd.read_csv(save_file)) == 2
@@ -0,0 +1,52 @@
+import sys
+import threading
+import time
+
+sys.path.append('.')
+# pylint: disable=import-error
+from models.helper.ProfileHelper import SamplingProfiler
+
+
+def busy_strategy(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_collapsed_stacks_are_written(tmp_path):
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_strategy, args=(stop,), name="bot main")
+    worker.start()
+
+    completed = []
+    profiler = SamplingProfiler(folder=str(tmp_path), interval=0.001)
+    try:
+        assert profiler.start("BTCUSDT", 0.2, completed.append)
+        assert not profiler.start("BTCUSDT", 0.2)
+        time.sleep(0.5)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert not profiler.running
+    assert completed == [profiler.filepath]
+    assert profiler.filepath.startswith(str(tmp_path / "BTCUSDT-"))
+    assert profiler.filepath.endswith(".collapsed")
+
+    with open(profiler.filepath, encoding="utf8") as profile_file:
+        lines = profile_file.read().splitlines()
+    stacks = [line.rsplit(" ", 1) for line in lines]
+    assert all(count.isdigit() for _, count in stacks)
+    busy = [stack for stack, _ in stacks if "busy_strategy (test_profiler.py:" in stack]
+    assert busy and all(stack.startswith("bot_main;") for stack in busy)
+    assert not any("_run (ProfileHelper.py:" in stack for stack, _ in stacks)
+
+
+def test_stop_writes_early(tmp_path):
+    profiler = SamplingProfiler(folder=str(tmp_path), interval=0.001)
+    start = time.perf_counter()
+    assert profiler.start("ETHUSDT", 60)
+    time.sleep(0.05)
+    filepath = profiler.stop()
+    assert time.perf_counter() - start < 5
+    assert filepath is not None and filepath.startswith(str(tmp_path / "ETHUSDT-"))
+    assert profiler.start("ETHUSDT", 0.01)
@@ -0,0 +1,79 @@
+import multiprocessing
+import sys
+import time
+
+import requests
+import responses
+
+sys.path.append('.')
+# pylint: disable=import-error
+from models.helper.RateLimitHelper import SharedRateLimiter
+from models.helper.RetryHelper import RetryPolicy
+
+
+def spend(filepath, weight, queue):
+    limiter = SharedRateLimiter("test", rate=1000, burst=10, filepath=filepath)
+    queue.put(limiter.acquire(weight))
+
+
+def test_budget_is_shared_between_processes(tmp_path):
+    filepath = str(tmp_path / "budget.sqlite3")
+    limiter = SharedRateLimiter("test", rate=1000, burst=10, filepath=filepath)
+    assert limiter.acquire(8) == 0
+
+    # another process only has what is left of the burst, plus the refill
+    queue = multiprocessing.get_context("spawn").Queue()
+    process = multiprocessing.get_context("spawn").Process(target=spend, args=(filepath, 2, queue))
+    process.start()
+    process.join(30)
+    assert queue.get(timeout=5) == 0
+
+    start = time.perf_counter()
+    limiter.acquire(10)
+    assert time.perf_counter() - start < 0.1
+
+
+def test_waits_for_refill(tmp_path):
+    limiter = SharedRateLimiter("test", rate=50, burst=5, filepath=str(tmp_path / "budget.sqlite3"))
+    for _ in range(5):
+        assert limiter.acquire() == 0
+    waited = limiter.acquire()
+    assert 0.01 < waited < 0.1
+
+    # budgets are kept per name in the same file
+    assert SharedRateLimiter("other", rate=50, burst=5, filepath=limiter.filepath).acquire() == 0
+
+
+@responses.activate
+def test_used_weight_header_corrects_the_budget(tmp_path):
+    limiter = SharedRateLimiter("binance", rate=20, burst=1200, filepath=str(tmp_path / "budget.sqlite3"), used_header="X-MBX-USED-WEIGHT-1M")
+    policy = RetryPolicy("test", limiter=limiter, weights={"/api/v3/klines": 2})
+    url = "https://api.binance.com/api/v3/klines"
+    responses.add(responses.GET, url, json=[], headers={"X-MBX-USED-WEIGHT-1M": "1190"})
+
+    policy.call("GET", url, lambda timeout: requests.get(url, timeout=timeout))
+
+    # the exchange has counted requests from other tools, the 10 left are what we may still spend
+    assert limiter.acquire(10) == 0
+    assert 0.05 < limiter._update(2) <= 0.1  # pylint: disable=protected-access
+
+
+def test_falls_back_to_a_process_budget(tmp_path):
+    filepath = tmp_path / "missing" / "budget.sqlite3"
+    limiter = SharedRateLimiter("test", rate=100, burst=4, filepath=str(filepath))
+    assert limiter.acquire() == 0
+    assert limiter._local is not None  # pylint: disable=protected-access
+
+    # the process budget is drawn from by weight
+    assert limiter.acquire(3) == 0
+    assert 0.01 < limiter.acquire(2) < 0.05
+
+    # the budget file is only tried again once the retry time has passed
+    filepath.parent.mkdir()
+    limiter.acquire()
+    assert not filepath.exists()
+
+    limiter._retry_at = 0  # pylint: disable=protected-access
+    limiter.acquire()
+    assert filepath.exists()
+    assert SharedRateLimiter("test", rate=100, burst=4, filepath=str(filepath))._update(4) > 0  # pylint: disable=protected-access
@@ -0,0 +1,125 @@
+import sys
+
+import pytest
+import requests
+import responses
+
+sys.path.append('.')
+# pylint: disable=import-error
+from models.exchange.coinbase_pro import PublicAPI
+from models.helper.MetricsHelper import metrics
+from models.helper import RetryHelper
+from models.helper.RetryHelper import CircuitOpenError, RetryPolicy
+
+URL = "https://api.example.com/api/v3/ticker"
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(RetryHelper.time, "sleep", delays.append)
+    return delays
+
+
+def get(url=URL, method="GET"):
+    return lambda timeout: requests.request(method, url, timeout=timeout)
+
+
+def retries(reason):
+    return next(
+        (item["value"] for item in metrics.to_dict()["counters"] if item["name"] == "pycryptobot_exchange_api_retries_total" and item["labels"] == {"exchange": "test", "reason": reason}),
+        0,
+    )
+
+
+@responses.activate
+def test_transient_errors_are_retried_with_short_backoff(sleeps):
+    policy = RetryPolicy("test", attempts=4, base_delay=0.25, max_delay=4.0)
+    responses.add(responses.GET, URL, status=503)
+    responses.add(responses.GET, URL, body=requests.ConnectionError("reset"))
+    responses.add(responses.GET, URL, json={"price": "1"})
+
+    before = retries("503")
+    resp = policy.call("GET", URL, get())
+
+    assert resp.status_code == 200
+    assert len(responses.calls) == 3
+    assert len(sleeps) == 2
+    assert 0 <= sleeps[0] <= 0.25 and 0 <= sleeps[1] <= 0.5
+    assert retries("503") - before == 1
+
+
+@responses.activate
+def test_orders_are_not_resent_once_they_may_have_arrived(sleeps):
+    policy = RetryPolicy("test")
+    responses.add(responses.POST, URL, status=502)
+    assert policy.call("POST", URL, get(method="POST")).status_code == 502
+
+    responses.replace(responses.POST, URL, body=requests.exceptions.ReadTimeout("slow"))
+    with pytest.raises(requests.Timeout):
+        policy.call("POST", URL, get(method="POST"))
+
+    assert len(responses.calls) == 2
+    assert sleeps == []
+
+
+@responses.activate
+def test_retry_after_is_honoured(sleeps):
+    policy = RetryPolicy("test", max_retry_after=10)
+    responses.add(responses.GET, URL, status=429, headers={"Retry-After": "3"})
+    responses.add(responses.GET, URL, json={})
+    assert policy.call("GET", URL, get()).status_code == 200
+    assert sleeps == [3.0]
+
+    # a ban longer than we are willing to wait fails fast and keeps us away from the host
+    responses.add(responses.GET, URL, status=418, headers={"Retry-After": "120"})
+    assert policy.call("GET", URL, get()).status_code == 418
+    with pytest.raises(CircuitOpenError):
+        policy.call("GET", "https://api.example.com/api/v3/depth", get())
+    assert len(responses.calls) == 3
+
+
+@responses.activate
+def test_circuit_breaker_per_host(sleeps, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(RetryHelper.time, "monotonic", lambda: now[0])
+    policy = RetryPolicy("test", attempts=2, failure_threshold=4, reset_timeout=30)
+    responses.add(responses.GET, URL, body=requests.ConnectionError("down"))
+    responses.add(responses.GET, "https://other.example.com/", json={})
+
+    for _ in range(2):
+        with pytest.raises(requests.ConnectionError):
+            policy.call("GET", URL, get())
+    with pytest.raises(CircuitOpenError):
+        policy.call("GET", URL, get())
+    assert len(responses.calls) == 4
+    assert policy.call("GET", "https://other.example.com/", get("https://other.example.com/")).status_code == 200
+
+    # half open after the reset timeout, a success closes the circuit again
+    now[0] += 31
+    responses.replace(responses.GET, URL, json={})
+    assert policy.call("GET", URL, get()).status_code == 200
+    assert policy.call("GET", URL, get()).status_code == 200
+
+
+def test_per_endpoint_timeouts():
+    policy = RetryPolicy("test", timeouts={"/api/v3": (1, 5), "/api/v3/order": (1, 30)}, default_timeout=(2, 10))
+    seen = []
+
+    class Response:
+        status_code = 200
+
+    for url in ("https://api.example.com/api/v3/order?symbol=BTCUSDT", URL, "https://api.example.com/sapi/v1/asset"):
+        policy.call("GET", url, lambda timeout: seen.append(timeout) or Response())
+    assert seen == [(1, 30), (1, 5), (2, 10)]
+
+
+@responses.activate
+def test_public_api_retries_without_stalling(sleeps):
+    api = PublicAPI()
+    url = "https://api.exchange.coinbase.com/products/BTC-GBP/ticker"
+    responses.add(responses.GET, url, status=502)
+    responses.add(responses.GET, url, json={"price": "20000.0"})
+
+    assert api.auth_api("GET", "products/BTC-GBP/ticker") == {"price": "20000.0"}
+    assert len(sleeps) == 1 and sleeps[0] < 1
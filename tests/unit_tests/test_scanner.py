@@ -0,0 +1,105 @@
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append('.')
+# pylint: disable=import-error
+from models.exchange.ExchangesEnum import Exchange
+from models.helper.RateLimitHelper import RateLimiter
+from models.Scanner import rank_markets, scan_markets
+
+
+def _candles(market: str, periods: int, trend: float) -> pd.DataFrame:
+    rng = np.random.default_rng(len(market))
+    close = 100 + np.arange(periods) * trend + rng.random(periods)
+    return pd.DataFrame(
+        {
+            "market": market,
+            "open": close,
+            "high": close + 1,
+            "low": close - 1,
+            "close": close,
+            "volume": 1.0,
+        }
+    )
+
+
+class FakePublicAPI:
+    def __init__(self) -> None:
+        self.frames = {
+            "AAAUSDT": _candles("AAAUSDT", 300, -0.5),
+            "BBBUSDT": _candles("BBBUSDT", 300, 0.5),
+            "CCCUSDT": _candles("CCCUSDT", 50, 0.5),
+        }
+        self.calls = []
+
+    def get_markets_24hr_stats(self):
+        return [
+            {"symbol": "AAAUSDT", "lastPrice": "50", "quoteVolume": "1000"},
+            {"symbol": "BBBUSDT", "lastPrice": "250", "quoteVolume": "2000"},
+            {"symbol": "CCCUSDT", "lastPrice": "125", "quoteVolume": "3000"},
+            {"symbol": "DDDUSDT", "lastPrice": "1", "quoteVolume": "0"},
+            {"symbol": "EEEBTC", "lastPrice": "1", "quoteVolume": "10"},
+        ]
+
+    def get_historical_data(self, market, granularity, websocket):
+        self.calls.append(market)
+        return self.frames[market]
+
+
+def test_scan_markets_ranks_all_markets():
+    api = FakePublicAPI()
+    df = scan_markets(Exchange.BINANCE, "USDT", api=api, limiter=RateLimiter(1000, burst=10))
+
+    assert list(df.index) == ["AAAUSDT", "BBBUSDT", "CCCUSDT", "DDDUSDT"]
+    # zero volume markets are never fetched
+    assert sorted(api.calls) == ["AAAUSDT", "BBBUSDT", "CCCUSDT"]
+
+    # falling market has EMA12 below EMA26
+    assert bool(df.loc["AAAUSDT", "buy_next"]) is True
+    assert bool(df.loc["BBBUSDT", "buy_next"]) is False
+
+    # too few candles for ATR72
+    assert np.isnan(df.loc["CCCUSDT", "atr72"])
+    assert df.loc["AAAUSDT", "atr72_pcnt"] == round(df.loc["AAAUSDT", "atr72"] / 50 * 100, 2)
+
+
+def test_rank_markets_matches_per_market_atr():
+    frame = _candles("AAAUSDT", 300, 0.1)
+    df_markets = pd.DataFrame({"price": [frame["close"].iloc[-1]], "volume": [1]}, index=["AAAUSDT"])
+
+    df = rank_markets(df_markets, {"AAAUSDT": frame})
+
+    high_low = frame["high"] - frame["low"]
+    high_close = (frame["high"] - frame["close"].shift()).abs()
+    low_close = (frame["low"] - frame["close"].shift()).abs()
+    true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
+    expected = (true_range.rolling(72).sum() / 72).iloc[-1]
+
+    assert df.loc["AAAUSDT", "atr72"] == pytest.approx(expected)
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(20)
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.acquire()
+
+    # first request is free, the next four wait 1/20s each
+    assert time.monotonic() - start >= 0.19
+
+
+def test_rate_limiter_weighs_requests():
+    limiter = RateLimiter(20, burst=5)
+    assert limiter.acquire(5) == 0
+
+    # the bucket is empty, a request of weight 2 waits for 2/20s
+    assert 0.09 <= limiter.acquire(2) < 0.2
+
+
+def test_rate_limiter_rejects_invalid_rate():
+    with pytest.raises(ValueError):
+        RateLimiter(0)
@@ -0,0 +1,164 @@
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append('.')
+# pylint: disable=import-error
+from models import Screener
+from models.exchange.ExchangesEnum import Exchange
+from models.exchange.Granularity import Granularity
+from models.helper.CacheHelper import TTLCache
+
+INDICATORS = {
+    "Recommend.All": 0.6,
+    "ADX": 40.0,
+    "ADX+DI": 45.0,
+    "ADX-DI": 10.0,
+    "high": 1.1,
+    "low": 1.0,
+    "close": 1.05,
+    "ATR": 0.021,
+    "volume": 50000.0,
+    "MACD.macd": 0.5,
+    "MACD.signal": 0.2,
+    "BB.upper": 1.2,
+    "BB.lower": 1.0,
+    "KltChnl.upper": 1.15,
+    "KltChnl.lower": 1.0,
+    "RSI": 25.0,
+    "Stoch.D": 25.0,
+    "Stoch.K": 30.0,
+    "W.R": -50.0,
+}
+
+
+def _analysis(symbol: str, rating: str = "STRONG_BUY", **overrides):
+    # tradingview_ta keys results by EXCHANGE:SYMBOL but Analysis.symbol has no exchange prefix
+    return SimpleNamespace(symbol=symbol.split(":")[1], summary={"RECOMMENDATION": rating}, indicators={**INDICATORS, **overrides})
+
+
+def _app(exchange: Exchange = Exchange.COINBASEPRO, **overrides):
+    settings = dict(
+        exchange=exchange,
+        granularity=Granularity.ONE_HOUR,
+        adx_threshold=35,
+        volatility_threshold=9,
+        minimum_volatility=5,
+        minimum_volume=15000,
+        volume_threshold=15000,
+        minimum_quote_price=0.00000001,
+        selection_score=7,
+        tv_screener_ratings=["STRONG_BUY", "BUY"],
+    )
+    settings.update(overrides)
+    return SimpleNamespace(**settings)
+
+
+def test_volatility_calculator():
+    # (20% + 15%) / 2 channel spread and 10% high/low spread
+    assert Screener.volatility_calculator(1.2, 1.0, 1.15, 1.0, 1.1, 1.0) == pytest.approx(13.75)
+
+
+def test_score_markets():
+    app = _app()
+    df = Screener.analysis_frame(
+        [
+            _analysis("COINBASE:AAAGBP"),
+            _analysis("COINBASE:BBBGBP", "SELL", volume=100.0),
+            _analysis("COINBASE:CCCGBP", ADX=None),
+            _analysis("COINBASE:DDDGBP", **{"BB.lower": 0.0}),
+        ]
+    )
+    # incomplete analysis is dropped before scoring
+    assert list(df["symbol"]) == ["AAAGBP", "BBBGBP", "DDDGBP"]
+
+    df = Screener.score_markets(app, df).set_index("symbol")
+
+    # zero lower band can't be scored
+    assert "DDDGBP" not in df.index
+
+    # rating 5 + adx 1 + volume 1 + macd 1 + volatility 1 + rsi 1 + stoch_d 1 + stoch_k 1 + williamsr 1
+    assert df.loc["AAAGBP", "score"] == 13
+    assert df.loc["AAAGBP", "atr72_pcnt"] == 2.0
+    # rating -2.5 and below minimum volume
+    assert df.loc["BBBGBP", "score"] == -2.5 + 1 + 1 + 1 + 1 + 1 + 1 + 1 - 100
+
+
+def test_process_screener_data_uses_prefetched_analysis():
+    app = _app()
+    markets = ["AAA-GBP", "BBB-GBP"]
+    analysis = {
+        ("COINBASE:AAAGBP", "1h"): _analysis("COINBASE:AAAGBP"),
+        ("COINBASE:BBBGBP", "1h"): _analysis("COINBASE:BBBGBP", "NEUTRAL"),
+    }
+
+    df = Screener.process_screener_data(app, markets, "GBP", "COINBASEPRO", analysis=analysis, save=False)
+
+    assert list(df.index) == ["AAA-GBP"]
+    assert list(df.columns) == Screener.OUTPUT_COLUMNS[1:]
+    assert df.loc["AAA-GBP", "buy_next"] == "SEND IT!"
+    assert df.loc["AAA-GBP", "volume"] == 50000
+
+
+def test_fetch_analysis_chunks_and_caches(monkeypatch):
+    calls = []
+
+    def fake_get_multiple_analysis(screener, interval, symbols, additional_indicators):
+        calls.append(list(symbols))
+        return {symbol: _analysis(symbol) for symbol in symbols}
+
+    monkeypatch.setattr(Screener, "get_multiple_analysis", fake_get_multiple_analysis)
+    cache = TTLCache()
+    symbols = [f"BINANCE:S{i}USDT" for i in range(250)]
+
+    first = Screener.fetch_analysis([(symbols, "1h", 3600)], cache=cache)
+    assert len(first) == 250
+    assert sorted(len(chunk) for chunk in calls) == [50, 100, 100]
+
+    # a second scan inside the interval is served from the cache
+    calls.clear()
+    second = Screener.fetch_analysis([(symbols + ["BINANCE:NEWUSDT"], "1h", 3600)], cache=cache)
+    assert len(second) == 251
+    assert calls == [["BINANCE:NEWUSDT"]]
+
+
+def test_ttl_cache_expires():
+    now = [0.0]
+    cache = TTLCache(ttl=10, clock=lambda: now[0])
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+
+    now[0] = 10.0
+    assert cache.get("key") is None
+    assert "key" not in cache
+
+
+def test_ttl_cache_collapses_concurrent_loads():
+    cache = TTLCache(ttl=10)
+    calls = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.1)
+        return "page"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_set("BTC-GBP", load))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["page"] * 8
+    assert len(calls) == 1
+
+    # a failed load is not cached, the next caller tries again
+    def fail():
+        raise ConnectionError("rate limited")
+
+    with pytest.raises(ConnectionError):
+        cache.get_or_set("ETH-GBP", fail)
+    assert cache.get_or_set("ETH-GBP", lambda: "retried") == "retried"
@@ -0,0 +1,43 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append('.')
+# pylint: disable=import-error
+from models.helper.SimulationHelper import SimulationWindow
+
+
+def _candles(periods: int = 500) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    dates = pd.date_range("2022-01-01", periods=periods, freq="h")
+    df = pd.DataFrame({"date": dates, "close": 100 + rng.standard_normal(periods).cumsum()}, index=dates)
+    df.index.name = "ts"
+    return df
+
+
+def test_window_matches_date_filter():
+    df = _candles()
+    sim_window = SimulationWindow(df)
+
+    for iterations in range(1, len(df) + 1):
+        sim_date = str(df.index[iterations - 1])
+        assert sim_window.seek(sim_date, iterations) == iterations
+
+        expected = df[df["date"] <= sim_date]
+        assert sim_window.window(300).equals(expected.tail(300))
+        assert sim_window.high() == expected["close"].max()
+        assert sim_window.low() == expected["close"].min()
+
+
+def test_seek_without_hint():
+    df = _candles()
+    sim_window = SimulationWindow(df)
+
+    # a wrong hint falls back to a binary search
+    assert sim_window.seek("2022-01-02 00:00:00", 3) == 25
+    assert sim_window.seek("2022-01-02 00:30:00") == 25
+    assert sim_window.seek("2021-12-31") == 0
+    assert sim_window.window(10).empty
+    assert np.isnan(sim_window.high())
+    assert sim_window.seek("2030-01-01") == len(df)
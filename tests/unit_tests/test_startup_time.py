@@ -0,0 +1,57 @@
+import subprocess
+import sys
+
+import pytest
+
+sys.path.append('.')
+from models.exchange.LazyImport import LazyExchangeAPI
+
+# seconds allowed for "import controllers.PyCryptoBot" in a fresh interpreter
+STARTUP_BUDGET = 3.0
+
+STARTUP_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import controllers.PyCryptoBot
+elapsed = time.perf_counter() - start
+heavy = sorted({m.split('.')[0] for m in sys.modules if m.split('.')[0] in ('statsmodels', 'matplotlib')})
+exchanges = sorted(m for m in ('binance', 'coinbase_pro', 'kucoin') if 'models.exchange.' + m in sys.modules)
+print(elapsed)
+print(','.join(heavy))
+print(','.join(exchanges))
+"""
+
+
+def _run(script: str) -> list:
+    out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True, cwd=".")
+    return out.stdout.splitlines()
+
+
+def test_pycryptobot_import_is_within_budget():
+    pytest.importorskip("pandas_ta")
+
+    elapsed, heavy, exchanges = _run(STARTUP_SCRIPT)
+
+    assert heavy == ""
+    assert exchanges == ""
+    assert float(elapsed) < STARTUP_BUDGET
+
+
+def test_lazy_exchange_api_defers_import():
+    script = (
+        "import sys\n"
+        "from models.exchange.LazyImport import LazyExchangeAPI\n"
+        "api = LazyExchangeAPI('kucoin', 'PublicAPI')\n"
+        "print('models.exchange.kucoin' in sys.modules)\n"
+        "api.resolve()\n"
+        "print('models.exchange.kucoin' in sys.modules)\n"
+    )
+    assert _run(script) == ["False", "True"]
+
+
+def test_lazy_exchange_api_resolves_class():
+    from models.exchange.binance import PublicAPI
+
+    api = LazyExchangeAPI("binance", "PublicAPI")
+    assert api.resolve() is PublicAPI
+    assert isinstance(api(), PublicAPI)
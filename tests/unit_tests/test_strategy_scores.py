@@ -0,0 +1,195 @@
+import sys
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append('.')
+# pylint: disable=import-error
+from models.AppState import AppState
+from models.Strategy import Strategy
+from models.Strategy_CS import Strategy_CS
+from models.exchange.Granularity import Granularity
+from models.helper.StrategyScoreHelper import SCORE_ATTRIBUTES, StrategyScores, align_timeframe
+
+
+class TechnicalAnalysis:
+    """Strategy_myCS style technical analysis, Strategy_CS only needs add_ema(period, True)"""
+
+    def __init__(self, df, total_periods=300):
+        self.df = df
+
+    def add_ema(self, period, pc=False):
+        self.df[f"ema{period}"] = self.df["close"].ewm(span=period, adjust=False).mean()
+        if pc:
+            self.df[f"ema{period}_pc"] = self.df[f"ema{period}"].pct_change() * 100
+
+    def get_df(self):
+        return self.df
+
+
+@pytest.fixture
+def trading_my_pta(monkeypatch):
+    module = types.ModuleType("models.Trading_myPta")
+    module.TechnicalAnalysis = TechnicalAnalysis
+    monkeypatch.setitem(sys.modules, "models.Trading_myPta", module)
+
+
+def candles(freq, n, seed, start="2022-01-01"):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start, periods=n, freq=freq)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.001, 0.01, n)))
+    return pd.DataFrame({"date": dates, "close": close}, index=pd.DatetimeIndex(dates, name="ts"))
+
+
+def indicators(n=400, seed=3):
+    rng = np.random.default_rng(seed)
+    df = candles("15min", n, seed)
+    # a regime per block of rows, so whole market trends line up often enough to be scored
+    regime = np.repeat(rng.choice([-1.0, 1.0], n // 20 + 1), 20)[:n]
+
+    def around(base, spread):
+        return base * (1 + regime * np.abs(rng.normal(0, spread, n)) + rng.normal(0, spread / 4, n))
+
+    def pc(scale):
+        return regime * np.abs(rng.normal(0, scale, n)) + rng.normal(0, scale / 3, n)
+
+    df["sma100"] = rng.uniform(90, 110, n)
+    df["sma50"] = df["sma100"] * rng.uniform(0.98, 1.02, n)
+    df["sma10"] = around(df["sma50"].to_numpy(), 0.02)
+    df["sma5"] = around(df["sma10"].to_numpy(), 0.02)
+    for column in ["sma5_pc", "sma10_pc", "sma50_pc"]:
+        df[column] = pc(0.5)
+    df["sma100_pc"] = rng.normal(0, 0.5, n)
+    df["rsima14"] = rng.uniform(30, 70, n)
+    df["rsi14"] = around(df["rsima14"].to_numpy(), 0.1)
+    df["rsi14_pc"], df["rsima14_pc"] = pc(4), pc(4)
+    df["-di14"] = rng.uniform(10, 40, n)
+    df["+di14"] = around(df["-di14"].to_numpy(), 0.4)
+    df["+di_pc"], df["adx14"] = pc(5), rng.uniform(10, 40, n)
+    df["signal"] = rng.uniform(0.5, 2, n)
+    df["macd"] = around(df["signal"].to_numpy(), 0.4)
+    df["macd_pc"] = pc(10)
+    df["obvsm"] = rng.uniform(1000, 2000, n)
+    df["obv"] = around(df["obvsm"].to_numpy(), 0.02)
+    df["obvsm_pc"] = pc(1)
+    df["macdl_sig"] = rng.uniform(0.5, 2, n)
+    df["macdlead"] = around(df["macdl_sig"].to_numpy(), 0.4)
+    df["macdlead_pc"] = pc(10)
+    df["ema5_wma5"] = rng.uniform(90, 110, n)
+    df["ema5"] = around(df["ema5_wma5"].to_numpy(), 0.01)
+    df["ema5_pc"] = pc(4)
+    return df
+
+
+class App:
+    def __init__(self, timeframes):
+        self.timeframes = timeframes
+        self.is_sim = True
+        self.debug = False
+        self.market = "BTC-GBP"
+        self.adjusttotalperiods = 300
+        self.enable_custom_strategy = True
+        self.trailingbuyimmediatepcnt = None
+        self.trailingsellimmediatepcnt = None
+        self.custom_strategy = None
+        self.strategy_scores = None
+        self.now = None
+        self.fetches = 0
+
+    def get_smart_switch_df(self, df, market, granularity, simstart, simend):
+        self.fetches += 1
+        return self.timeframes[granularity.to_short].copy()
+
+    def get_additional_df(self, short_granularity, websocket):
+        # the candles closed by the row being traded, as the bot has them
+        df = self.timeframes[short_granularity]
+        closed = df["date"] + pd.Timedelta(seconds=Granularity.convert_to_enum(short_granularity).to_integer)
+        return df[closed <= self.now]
+
+    def get_interval(self, df, iterations=0):
+        if self.is_sim and iterations > 0:
+            return df.iloc[iterations - 1 : iterations]
+        return df.tail(1)
+
+
+class ScalarApp(App):
+    def get_interval(self, df, iterations=0):
+        # tradeSignals() reads the last row as data["column"][0]
+        return df.tail(1).reset_index(drop=True)
+
+
+def state():
+    state = AppState.__new__(AppState)
+    state.pandas_ta_enabled = True
+    state.trading_myPta = True
+    return state
+
+
+def test_align_timeframe_only_sees_closed_candles():
+    df = candles("15min", 12, 1)
+    hourly = candles("h", 4, 2, start="2021-12-31 23:00")
+    aligned = align_timeframe(df, hourly, Granularity.ONE_HOUR)
+
+    assert aligned.index.equals(df.index)
+    # the 23:00 candle closes at 00:00, the 00:00 candle at 01:00
+    assert aligned["close"].iloc[0] == hourly["close"].iloc[0]
+    assert aligned["close"].iloc[3] == hourly["close"].iloc[0]
+    assert aligned["close"].iloc[4] == hourly["close"].iloc[1]
+    assert np.isnan(align_timeframe(df, hourly.iloc[2:], Granularity.ONE_HOUR)["close"].iloc[0])
+
+
+def test_scores_match_trade_signals(trading_my_pta):
+    df = indicators()
+    app = ScalarApp({"1h": candles("h", 200, 5, start="2021-12-28"), "6h": candles("6h", 60, 6, start="2021-12-20")})
+    vectorized = Strategy_CS(app, state())
+    scalar = Strategy_CS(app, state())
+
+    scores = StrategyScores(vectorized).scores(app, df)
+    assert set(scores["market_trend"]) == {
+        "High risk, no buying, Sell NOW!",
+        "Low risk, buy! buy! buy!",
+        "Less risk, buy medium points",
+        "Risky, don't buy yet",
+        "Too risky, don't buy yet",
+    }
+
+    for i in range(len(df)):
+        app.now = df["date"].iloc[i]
+        scalar.tradeSignals(df.iloc[i : i + 1].reset_index(drop=True), df, None, None)
+        row = scores.iloc[i]
+        for name in SCORE_ATTRIBUTES:
+            assert row[name] == getattr(scalar, name), (i, name)
+
+
+def test_strategy_scores_once_and_reuses_the_custom_strategy(trading_my_pta, monkeypatch):
+    df = indicators(200)
+    app = App({"1h": candles("h", 80, 5, start="2021-12-28"), "6h": candles("6h", 30, 6, start="2021-12-20")})
+    app_state = state()
+    # with a custom strategy, a bought bot only asks it for a sell signal
+    app_state.last_action = "BUY"
+
+    scored = []
+    original = Strategy_CS.score
+
+    def score(self, df, timeframes):
+        scored.append(len(df))
+        return original(self, df, timeframes)
+
+    monkeypatch.setattr(Strategy_CS, "score", score)
+
+    for i in range(150, 200):
+        window = df.iloc[i - 100 : i + 1]
+        strategy = Strategy(app, app_state, window, len(window), history=df)
+        action, _ = strategy.get_action(app_state, df["close"].iloc[i], df["date"].iloc[i], None)
+
+        assert strategy.CS is app.custom_strategy
+        expected = app.strategy_scores.scores(app, df).iloc[i]
+        assert strategy.CS.sell_pts == expected["sell_pts"]
+        assert strategy.CS.market_trend == expected["market_trend"]
+        assert action == ("SELL" if expected["sell_pts"] >= expected["pts_to_sell"] else "WAIT")
+
+    # a simulation is scored once, its extra timeframes fetched once each
+    assert scored == [len(df)]
+    assert app.fetches == 2
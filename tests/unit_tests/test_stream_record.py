@@ -0,0 +1,161 @@
+import json
+import sys
+import threading
+import time
+
+sys.path.append('.')
+# pylint: disable=import-error
+from models.exchange.Granularity import Granularity
+from models.exchange.binance.api import WebSocketClient
+from models.helper.StreamRecordHelper import FrameRecorder, FrameReplayer, read_frames
+
+
+def mini_ticker(i):
+    return json.dumps({"e": "24hrMiniTicker", "E": 1650000000000 + i * 1000, "s": "BTCGBP", "c": str(30000 + i)})
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 6))
+        self.now += seconds
+
+
+class RecordingClient:
+    def __init__(self):
+        self.messages = []
+        self.errors = []
+
+    def on_open(self):
+        pass
+
+    def on_message(self, msg):
+        self.messages.append(msg)
+
+    def on_error(self, e):
+        self.errors.append(e)
+
+
+def test_frames_round_trip_and_truncated_tail(tmp_path):
+    path = str(tmp_path / "stream.frames")
+    recorder = FrameRecorder(path)
+    recorder.record('{"a": 1}', received=10.0)
+    recorder.record("", received=10.5)
+    recorder.record("£ unicode", received=11.0)
+    recorder.close()
+
+    assert list(read_frames(path)) == [(10.0, '{"a": 1}'), (10.5, ""), (11.0, "£ unicode")]
+
+    # appending resumes the recording, a frame cut short by a crash is ignored
+    recorder = FrameRecorder(path)
+    recorder.record('{"b": 2}', received=12.0)
+    recorder.close()
+    with open(path, "ab") as stream:
+        stream.write(b"\x00\x01\x02")
+
+    assert [data for _, data in read_frames(path)] == ['{"a": 1}', "", "£ unicode", '{"b": 2}']
+
+
+def test_recorder_flushes_on_an_interval(tmp_path):
+    path = str(tmp_path / "stream.frames")
+    recorder = FrameRecorder(path, flush_seconds=0)
+    recorder.record('{"a": 1}', received=10.0)
+    # readable before the recorder is closed
+    assert list(read_frames(path)) == [(10.0, '{"a": 1}')]
+    recorder.close()
+
+    # a frame followed by a quiet stream is still flushed
+    recorder = FrameRecorder(path, flush_seconds=0.05)
+    recorder.record('{"b": 2}', received=11.0)
+    deadline = time.monotonic() + 5
+    while len(list(read_frames(path))) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(list(read_frames(path))) == 2
+    recorder.close()
+
+
+def test_replay_paces_frames_by_speed(tmp_path):
+    path = str(tmp_path / "stream.frames")
+    recorder = FrameRecorder(path)
+    for received in [100.0, 101.0, 103.0]:
+        recorder.record("{}", received=received)
+    recorder.close()
+
+    fake = FakeClock()
+    FrameReplayer(path, speed=1, clock=fake.clock, sleep=fake.sleep).replay(RecordingClient())
+    assert fake.sleeps == [1.0, 2.0]
+
+    fake = FakeClock()
+    FrameReplayer(path, speed=4, clock=fake.clock, sleep=fake.sleep).replay(RecordingClient())
+    assert fake.sleeps == [0.25, 0.5]
+
+    fake = FakeClock()
+    stats = FrameReplayer(path, speed=0, clock=fake.clock, sleep=fake.sleep).replay(RecordingClient())
+    assert fake.sleeps == []
+    assert stats["frames"] == 3
+
+
+def test_replay_decodes_like_the_listener(tmp_path):
+    path = str(tmp_path / "stream.frames")
+    recorder = FrameRecorder(path)
+    for data in ['{"x": 1}', "", "not json"]:
+        recorder.record(data)
+    recorder.close()
+
+    client = RecordingClient()
+    FrameReplayer(path, speed=0).replay(client)
+    assert client.messages == [{"x": 1}, {}]
+    assert len(client.errors) == 1 and isinstance(client.errors[0], ValueError)
+
+
+def test_listener_records_and_replay_rebuilds_tickers(tmp_path):
+    path = str(tmp_path / "binance.frames")
+    frames = [mini_ticker(i) for i in range(5)]
+
+    class FakeConnection:
+        def __init__(self, client):
+            self.client = client
+            self.pending = list(frames)
+
+        def recv(self):
+            data = self.pending.pop(0)
+            if not self.pending:
+                self.client.stop = True
+            return data
+
+    live = WebSocketClient(["BTCGBP"], Granularity.ONE_DAY)
+    live.recorder = FrameRecorder(path)
+    live.ws = FakeConnection(live)
+    live.keepalive = threading.Thread(target=lambda: None)
+    live.stop = False
+    live.on_open()
+    live._listen()
+    live.recorder.close()
+
+    assert [data for _, data in read_frames(path)] == frames
+
+    replayed = WebSocketClient(["BTCGBP"], Granularity.ONE_DAY)
+    stats = FrameReplayer(path, speed=0).replay(replayed)
+
+    assert stats["frames"] == 5
+    assert replayed.tickers["price"].tolist() == live.tickers["price"].tolist() == [30004.0]
+    assert replayed.tickers["market"].tolist() == ["BTCGBP"]
+
+
+def test_replay_throughput(tmp_path):
+    path = str(tmp_path / "throughput.frames")
+    recorder = FrameRecorder(path)
+    for i in range(2000):
+        recorder.record(mini_ticker(i), received=i / 10)
+    recorder.close()
+
+    stats = FrameReplayer(path, speed=0).replay(RecordingClient())
+    print(f"replayed {stats['frames']} frames at {stats['messages_per_second']:.0f} messages/s")
+    assert stats["frames"] == 2000
+    assert stats["messages_per_second"] > 0
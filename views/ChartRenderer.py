@@ -0,0 +1,154 @@
+"""Trade charts rendered away from the trading loop"""
+
+import atexit
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+EMA_MACD_COLUMNS = ["market", "granularity", "close", "ema12", "ema26", "macd", "signal"]
+MAX_PENDING = 20
+MAX_AGE = 300  # seconds, a live chart older than this is of no use to anyone
+EXIT_TIMEOUT = 30  # seconds the bot waits on exit for the charts still queued
+
+
+def draw_ema_and_macd(fig, df_subset: pd.DataFrame) -> None:
+    """Draws the price, EMA12, EMA26 and MACD on a figure"""
+
+    date = pd.to_datetime(df_subset.index).to_pydatetime()
+    length = len(df_subset)
+    indices = np.arange(length)  # the evenly spaced plot indices
+
+    def format_date(x, pos=None):  # pylint: disable=unused-argument
+        thisind = np.clip(int(x + 0.5), 0, length - 1)
+        return date[thisind].strftime("%Y-%m-%d %H:%M:%S")
+
+    from matplotlib.ticker import FuncFormatter
+
+    ax1, ax2 = fig.subplots(nrows=2)
+    fig.suptitle(f"{df_subset.iloc[0]['market']} | {df_subset.iloc[0]['granularity']}", fontsize=16)
+
+    ax1.plot(indices, df_subset["close"], label="price", color="royalblue")
+    ax1.plot(indices, df_subset["ema12"], label="ema12", color="orange")
+    ax1.plot(indices, df_subset["ema26"], label="ema26", color="purple")
+    ax1.xaxis.set_major_formatter(FuncFormatter(format_date))
+    ax1.set_title("Price, EMA12 and EMA26")
+    ax1.set_ylabel("Price")
+    ax1.legend()
+
+    ax2.plot(indices, df_subset["macd"], label="macd")
+    ax2.plot(indices, df_subset["signal"], label="signal")
+    ax2.xaxis.set_major_formatter(FuncFormatter(format_date))
+    ax2.set_title("MACD")
+    ax2.set_ylabel("Divergence")
+    ax2.legend()
+
+    for label in ax2.get_xticklabels():
+        label.set_rotation(90)
+    fig.autofmt_xdate()
+
+
+class ChartRenderer:
+    def __init__(self, background: bool = True, max_pending: int = MAX_PENDING, max_age: float = MAX_AGE) -> None:
+        """Renders trade charts on a worker thread with the Agg backend and a single reused figure
+
+        The trading loop only copies the few columns a chart needs, and never waits for
+        matplotlib. With background=False (simulations) the charts are collected and
+        rendered together by flush().
+
+        Parameters
+        ----------
+        background : bool
+            Render on a worker thread as charts are submitted, otherwise wait for flush()
+        max_pending : int
+            Charts waiting to be rendered, the oldest is dropped when a new one doesn't fit
+        max_age : float
+            Seconds after which a waiting live chart is dropped instead of rendered
+        """
+
+        self.background = background
+        self.max_pending = max_pending
+        self.max_age = max_age
+        self.rendered = 0
+        self.dropped = 0
+        self._jobs = deque()
+        self._cond = threading.Condition()
+        self._busy = False
+        self._figure = None
+        self._thread = None
+        atexit.register(self.flush, EXIT_TIMEOUT)
+
+    def submit_ema_and_macd(self, df: pd.DataFrame, period: int, filepath: str) -> None:
+        """Queues the price, EMA and MACD chart of the last `period` candles"""
+
+        if not isinstance(period, int):
+            raise TypeError("Period parameter is not perioderic.")
+
+        if period < 1 or period > len(df):
+            raise ValueError("Period is out of range")
+
+        self._submit(draw_ema_and_macd, df[EMA_MACD_COLUMNS].iloc[-period:].copy(), filepath)
+
+    def _submit(self, draw, data, filepath: str) -> None:
+        with self._cond:
+            if self.background and len(self._jobs) >= self.max_pending:
+                self._jobs.popleft()
+                self.dropped += 1
+            self._jobs.append((time.monotonic(), draw, data, filepath))
+            self._cond.notify()
+
+        if self.background and self._thread is None:
+            self._thread = threading.Thread(target=self._worker, name="chart-renderer", daemon=True)
+            self._thread.start()
+
+    def flush(self, timeout: float = None) -> bool:
+        """Renders every waiting chart, or waits up to timeout seconds for the worker to finish them"""
+
+        if not self.background:
+            while self._jobs:
+                _, draw, data, filepath = self._jobs.popleft()
+                self._render(draw, data, filepath)
+            return True
+
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._jobs and not self._busy, timeout)
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                while not self._jobs:
+                    self._cond.wait()
+                created, draw, data, filepath = self._jobs.popleft()
+                self._busy = True
+
+            try:
+                if time.monotonic() - created > self.max_age:
+                    self.dropped += 1
+                else:
+                    self._render(draw, data, filepath)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _render(self, draw, data, filepath: str) -> None:
+        # the object oriented API with the Agg canvas, pyplot's global state is not thread safe
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        if self._figure is None:
+            self._figure = Figure(figsize=(12, 6))
+            FigureCanvasAgg(self._figure)
+
+        self._figure.clear()
+        try:
+            draw(self._figure, data)
+            if os.path.dirname(filepath):
+                os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            self._figure.savefig(filepath)
+            self.rendered += 1
+        except (OSError, ValueError, KeyError, IndexError):
+            self.dropped += 1
@@ -1,10 +1,122 @@
+import atexit
+import json
+import queue
+import threading
 from rich.table import Text
 from rich.table import Table
 from rich.console import Console
 from datetime import datetime
+from models.helper.MetricsHelper import metrics
+
+LOG_FORMATS = ["auto", "rich", "plain", "json"]
+
+
+class ConsoleOutput:
+    def __init__(self, console_term: Console, console_log: Console = None, log_format: str = "auto") -> None:
+        """Writes status rows to the terminal and log file
+
+        Rows are rendered as rich tables, or in the plain and json formats as one line of text
+        handed to a background writer thread, so a tick never waits on table layout or I/O.
+
+        Parameters
+        ----------
+        console_term : Console
+            Terminal console
+        console_log : Console
+            Log file console, None if logging is disabled
+        log_format : str
+            'rich', 'plain', 'json' or 'auto' (rich for interactive terminals, plain otherwise)
+        """
+
+        if log_format not in LOG_FORMATS:
+            raise ValueError(f"Log format, '{log_format}' is not valid!")
+
+        if log_format == "auto":
+            log_format = "rich" if console_term.is_terminal else "plain"
+
+        self.console_term = console_term
+        self.console_log = console_log
+        self.log_format = log_format
+
+        self._encode = json.JSONEncoder(separators=(",", ":"), default=str).encode
+        self._queue = queue.Queue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+
+    def _start_writer(self) -> None:
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_lines, daemon=True)
+                self._writer.start()
+                atexit.register(self.flush)
+
+    def _write_lines(self) -> None:
+        while True:
+            lines = [self._queue.get()]
+            # write everything queued in one go
+            while True:
+                try:
+                    lines.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            text = "".join(lines)
+            try:
+                for stream in (self.console_term.file, self.console_log.file if self.console_log is not None else None):
+                    if stream is not None:
+                        stream.write(text)
+                        stream.flush()
+            except (OSError, ValueError):
+                pass  # closed stream, nothing else to write to
+            finally:
+                for _ in lines:
+                    self._queue.task_done()
+
+    @metrics.timed("pycryptobot_phase_seconds", phase="render")
+    def row(self, cells: list, level: str = "normal", **fields) -> None:
+        """Outputs a row of Text cells, the first four being bot, time, market and granularity
+
+        Keyword arguments are added as fields to json records.
+        """
+
+        cells = [cell for cell in cells if cell]
+        if self.log_format == "rich":
+            table = Table(title=None, box=None, show_header=False, show_footer=False)
+            table.add_row(*cells)
+            self.console_term.print(table)
+            if self.console_log is not None:
+                self.console_log.print(table)
+            return
+
+        text = [cell.plain if isinstance(cell, Text) else str(cell) for cell in cells]
+        if self.log_format == "json":
+            record = dict(zip(("bot", "time", "market", "granularity"), text[:4]))
+            record.update(level=level, message=" ".join(text[4:]), **fields)
+            line = self._encode(record)
+        else:
+            line = " ".join(text)
+
+        self._start_writer()
+        self._queue.put(line + "\n")
+
+    def print(self, renderable) -> None:
+        """Prints a rich renderable (e.g. a summary table) after any queued rows"""
+
+        self.flush()
+        self.console_term.print(renderable)
+        if self.console_log is not None:
+            self.console_log.print(renderable)
+
+    def flush(self) -> None:
+        """Waits for the writer to catch up"""
+
+        if self._writer is not None:
+            self._queue.join()
 
 
 class RichText:
+    _outputs = {}
+
     @staticmethod
     def notify(_notification, app: object = None, level: str = "normal") -> None:
         # if notification is not a string, convert it to a string
@@ -42,18 +154,24 @@ class RichText:
         else:
             color = "violet"
 
-        table_console = Table(title=None, box=None, show_header=False, show_footer=False)
-        table_console.add_row(
+        cells = [
             RichText.styled_text("Bot1", "magenta"),
             RichText.styled_text(datetime.today().strftime("%Y-%m-%d %H:%M:%S"), "white"),
             RichText.styled_text(app.market, "yellow"),
             RichText.styled_text(app.print_granularity(), "yellow"),
             RichText.styled_text(notification, color),
-        )
-        console_term = Console(no_color=(not app.term_color), width=app.term_width)
-        console_term.print(table_console)
-        if app.disablelog is False:
-            app.console_log.print(table_console)
+        ]
+
+        output = getattr(app, "output", None)
+        if output is None:
+            # callers without an output (e.g. scripts) share one per terminal setting
+            console_log = None if app.disablelog else app.console_log
+            key = (app.term_color, app.term_width, id(console_log))
+            output = RichText._outputs.get(key)
+            if output is None:
+                console_term = Console(no_color=(not app.term_color), width=app.term_width)
+                output = RichText._outputs[key] = ConsoleOutput(console_term, console_log, "rich")
+        output.row(cells, level)
 
     @staticmethod
     def action_text(action: str = "WAIT") -> Text:
@@ -7,6 +7,7 @@ import matplotlib.ticker as ticker
 from datetime import datetime, timedelta
 
 from models.Trading import TechnicalAnalysis
+from views.ChartRenderer import draw_ema_and_macd
 from views.PyCryptoBot import RichText
 
 
@@ -257,41 +258,7 @@ class TradingGraphs:
 
         df_subset = self.df.iloc[-period::]
 
-        date = pd.to_datetime(df_subset.index).to_pydatetime()
-
-        df_subset_length = len(df_subset)
-        indices = np.arange(df_subset_length)  # the evenly spaced plot indices
-
-        def format_date(x, pos=None):  # pylint: disable=unused-argument
-            thisind = np.clip(int(x + 0.5), 0, df_subset_length - 1)
-            return date[thisind].strftime("%Y-%m-%d %H:%M:%S")
-
-        fig, (ax1, ax2) = plt.subplots(nrows=2, figsize=(12, 6))
-        fig.suptitle(
-            df_subset.iloc[0]["market"] + " | " + str(df_subset.iloc[0]["granularity"]),
-            fontsize=16,
-        )
-        plt.xticks(rotation=90)
-        # plt.tight_layout()
-
-        indices = np.arange(len(df_subset))
-
-        ax1.plot(indices, df_subset["close"], label="price", color="royalblue")
-        ax1.plot(indices, df_subset["ema12"], label="ema12", color="orange")
-        ax1.plot(indices, df_subset["ema26"], label="ema26", color="purple")
-        ax1.xaxis.set_major_formatter(ticker.FuncFormatter(format_date))
-        ax1.set_title("Price, EMA12 and EMA26")
-        ax1.set_ylabel("Price")
-        ax1.legend()
-        fig.autofmt_xdate()
-
-        ax2.plot(indices, df_subset.macd, label="macd")
-        ax2.plot(indices, df_subset.signal, label="signal")
-        ax2.xaxis.set_major_formatter(ticker.FuncFormatter(format_date))
-        ax2.set_title("MACD")
-        ax2.set_ylabel("Divergence")
-        ax2.legend()
-        fig.autofmt_xdate()
+        draw_ema_and_macd(plt.figure(figsize=(12, 6)), df_subset)
 
         try:
             if saveFile != "":
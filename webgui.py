@@ -1,7 +1,5 @@
 """ Web Gui Dashboard page """
 
-import json
-import os
 from datetime import datetime, timedelta
 import pandas as pd
 import dash_bootstrap_components as dbc
@@ -18,6 +16,7 @@ from dash import (
     dash_table,
 )
 
+from models.helper.BotStatusHelper import BotStatusSnapshot
 from pages import controls, config, terminals, telegramconfig
 
 external_stylesheets = [dbc.themes.DARKLY]
@@ -28,6 +27,7 @@ external_stylesheets = [dbc.themes.DARKLY]
 
 tg_wrapper = controls.tg_wrapper
 json_dir = tg_wrapper.helper.datafolder
+bot_status = BotStatusSnapshot(json_dir)
 df = []
 dff = []
 
@@ -415,35 +415,6 @@ def display_page(pathname):
         return dashboard_layout
 
 
-# Bot instance uptime tracking
-def get_date_from_iso8601_str(date: str):  # pylint: disable=invalid-name
-    """Bot instance uptime tracking"""
-    now = str(datetime.now())
-    # If date passed from datetime.now() remove milliseconds
-    if date.find(".") != -1:
-        dt = date.split(".")[0]
-        date = dt
-    if now.find(".") != -1:
-        dt = now.split(".")[0]
-        now = dt
-
-    now = now.replace("T", " ")
-    now = f"{now}"
-    # Add time in case only a date is passed in
-    date = date.replace("T", " ") if date.find("T") != -1 else date
-    # Add time in case only a date is passed in
-    new_date_str = f"{date} 00:00:00" if len(date) == 10 else date
-
-    started = datetime.strptime(new_date_str, "%Y-%m-%d %H:%M:%S")
-    now = datetime.strptime(now, "%Y-%m-%d %H:%M:%S")
-    duration = now - started
-    duration_in_s = duration.total_seconds()
-    hours = divmod(duration_in_s, 3600)[0]
-    duration_in_s -= 3600 * hours
-    minutes = divmod(duration_in_s, 60)[0]
-    return f"{round(hours)}h {round(minutes)}m"
-
-
 @callback(
     Output("table-paging-and-sorting", "data"),
     Input("interval-container", "n_intervals"),
@@ -451,138 +422,8 @@ def get_date_from_iso8601_str(date: str):  # pylint: disable=invalid-name
 def update_table(n):
     """Update all data"""
 
-    pairs_list = tg_wrapper.helper.get_active_bot_list()  # glob.glob(json_pattern)
-    df = pd.DataFrame(
-        columns=[
-            "Uptime",
-            "Trading Pair",
-            "Exchange",
-            "Action",
-            "Current self.price",
-            "From DF High",
-            "DF High",
-            "Margin",
-            "Delta",
-            "TSLT",
-            "PVLT",
-            "ERI",
-            "BULL",
-            "EMA",
-            "MACD",
-            "OBV",
-        ],
-    )
-    for pair in pairs_list:
-        if (
-            "data.json" not in pair
-            and not pair.__contains__("output.json")
-            and "settings.json" not in pair
-        ):
-            try:
-                with open(
-                    os.path.join(
-                        tg_wrapper.helper.datafolder, "telegram_data", f"{pair}.json"
-                    ),
-                    encoding="utf8",
-                ) as f:
-                    json_data = pd.json_normalize(json.loads(f.read()))
-                    json_data["pair"] = pair
-                    uptime = get_date_from_iso8601_str(json_data["botcontrol.started"][0])
-                    if (
-                        isinstance(json_data["margin"][0], str)
-                        and "%" in json_data["margin"][0]
-                        and "-" in json_data["margin"][0]
-                    ):
-                        margincolor = "#99413d"
-                    elif (
-                        isinstance(json_data["margin"][0], str)
-                        and "%" in json_data["margin"][0]
-                        and "-" not in json_data["margin"][0]
-                    ):
-                        margincolor = "#3D9970"
-                    elif (
-                        isinstance(json_data["from_df_high"][0], str)
-                        and "%" in json_data["from_df_high"][0]
-                        and "-" in json_data["from_df_high"][0]
-                    ):
-                        margincolor = "#99413d"
-                    elif (
-                        isinstance(json_data["from_df_high"][0], str)
-                        and "%" in json_data["from_df_high"][0]
-                        and "-" not in json_data["from_df_high"][0]
-                    ):
-                        margincolor = "#3D9970"
-                    data = pd.DataFrame(
-                        {
-                            "Uptime": uptime,
-                            "Trading Pair": json_data["pair"],
-                            "Exchange": json_data["exchange"],
-                            "Action": json_data["signal"],
-                            # if "margin" in json_data and json_data["margin"][0] == " "
-                            # else "BUY",
-                            "Current self.price": json_data["price"],
-                            "Margin": json_data["margin"]
-                            if "margin" in json_data and json_data["margin"][0] != " "
-                            else "NaN",
-                            "TSLT": json_data["trailingstoplosstriggered"]
-                            if "trailingstoplosstriggered" in json_data
-                            else "",
-                            "PVLT": json_data["preventlosstriggered"]
-                            if "preventlosstriggered" in json_data
-                            else "",
-                            "From DF High": json_data["from_df_high"]
-                            if "from_df_high" in json_data
-                            and json_data["from_df_high"][0] != " "
-                            else "NaN",
-                            "DF High": json_data["df_high"]
-                            if "df_high" in json_data
-                            else "",
-                            "BULL": json_data["indicators.BULL"]
-                            if "indicators.BULL" in json_data
-                            else "",
-                            "ERI": json_data["indicators.ERI"]
-                            if "indicators.ERI" in json_data
-                            else "",
-                            "EMA": json_data["indicators.EMA"]
-                            if "indicators.EMA" in json_data
-                            else "",
-                            "MACD": json_data["indicators.MACD"]
-                            if "indicators.MACD" in json_data
-                            else "",
-                            "OBV": json_data["indicators.OBV"]
-                            if "indicators.OBV" in json_data
-                            else "",
-                            "Margincolor": margincolor,
-                        }
-                    )
-                # df = df.append(data, ignore_index=True)
-                df = pd.concat([df, data])
-            except KeyError:
-                print("oops")
-            except Exception as err:
-                print(err)
-
-    # change data types of dataframe for conditional statements
-    if len(pairs_list) > 0:
-        df["Margin"] = df["Margin"].map(lambda x: x.rstrip("%"))
-        df["Margin"] = df["Margin"].fillna(0)
-        df["Margin"] = df["Margin"].astype(float, errors="ignore")
-        df["Margin"] = df["Margin"] * 0.01
-        # df_margin = (df['Margin'].mean())*100
-        df["From DF High"] = df["From DF High"].map(lambda x: x.rstrip("%"))
-        df["From DF High"] = df["From DF High"].fillna(0)
-        df["From DF High"] = df["From DF High"].astype(float, errors="ignore")
-        df["From DF High"] = df["From DF High"] * 0.01
-        df["TSLT"] = df["TSLT"].astype(str)
-        df["PVLT"] = df["PVLT"].astype(str)
-        df["BULL"] = df["BULL"].astype(str)
-        df["ERI"] = df["ERI"].astype(str)
-        df["EMA"] = df["EMA"].astype(str)
-        df["MACD"] = df["MACD"].astype(str)
-        df["OBV"] = df["OBV"].astype(str)
-        df = df.sort_values(by="Action", ascending=[True], inplace=False)
-
-    return df.to_dict(orient="records")
+    # only bot files modified since the last tick are re-read
+    return bot_status.records()
 
 
 # create graphs
@@ -1,12 +1,22 @@
 import re
 import sys
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 # sys.path.append(".")
 # pylint: disable=import-error
 from models.Trading import TechnicalAnalysis
 from models.exchange.binance import PublicAPI as BPublicAPI
 from models.exchange.coinbase_pro import PublicAPI as CPublicAPI
+from models.helper.CacheHelper import TTLCache
+
+DATA_TTL = 60  # seconds candles and indicators are shared between visitors
+PAGE_TTL = 15  # seconds a rendered page is served to everyone refreshing it
+
+# identical requests arriving together share one download and one render
+data_cache = TTLCache(ttl=DATA_TTL)
+page_cache = TTLCache(ttl=PAGE_TTL)
+fetcher = ThreadPoolExecutor(max_workers=8, thread_name_prefix="websvc")
 
 
 def header() -> str:
@@ -42,6 +52,23 @@ def footer() -> str:
     """
 
 
+def public_api(exchange: str):
+    if exchange == "binance":
+        return BPublicAPI()
+    return CPublicAPI()
+
+
+def technical_analysis(exchange: str, market: str, granularity) -> TechnicalAnalysis:
+    """Candles with all indicators added, cached per market and granularity"""
+
+    def load() -> TechnicalAnalysis:
+        ta = TechnicalAnalysis(public_api(exchange).get_historical_data(market, granularity, None))
+        ta.add_all()
+        return ta
+
+    return data_cache.get_or_set((exchange, market, str(granularity)), load)
+
+
 def is_binance_market_valid(market: str) -> bool:
     p = re.compile(r"^[A-Z0-9]{5,12}$")
     if p.match(market):
@@ -92,14 +119,18 @@ class Pages:
 
     @staticmethod
     def binance_markets() -> str:
+        return page_cache.get_or_set(("binance_markets",), Pages._binance_markets)
+
+    @staticmethod
+    def _binance_markets() -> str:
         def markets():
-            html = ""
+            rows = []
 
             api = BPublicAPI()
             resp = api.get_markets_24hr_stats()
             for market in resp:
                 if market["lastPrice"] > market["openPrice"]:
-                    html += f"""
+                    rows.append(f"""
                     <tr>
                         <th class="table-success" scope="row"><a class="text-dark" href="/binance/{market['symbol']}">{market['symbol']}</a></th>
                         <td class="table-success" style="border-left: 1px solid #000;">{market['priceChangePercent']}%</td>
@@ -109,9 +140,9 @@ class Pages:
                         <td class="table-success">{market['lastPrice']}</td>
                         <td class="table-success">{market['quoteVolume']}</td>
                     </tr>
-                    """
+                    """)
                 elif market["lastPrice"] < market["openPrice"]:
-                    html += f"""
+                    rows.append(f"""
                     <tr>
                         <th class="table-danger" scope="row"><a class="text-dark" href="/binance/{market['symbol']}">{market['symbol']}</a></th>
                         <td class="table-danger" style="border-left: 1px solid #000;">{market['priceChangePercent']}%</td>
@@ -121,9 +152,9 @@ class Pages:
                         <td class="table-danger">{market['lastPrice']}</td>
                         <td class="table-danger">{market['quoteVolume']}</td>
                     </tr>
-                    """
+                    """)
                 else:
-                    html += f"""
+                    rows.append(f"""
                     <tr>
                         <th scope="row"><a class="text-dark" href="/binance/{market['symbol']}">{market['symbol']}</a></th>
                         <td style="border-left: 1px solid #000;">{market['priceChangePercent']}%</td>
@@ -133,9 +164,9 @@ class Pages:
                         <td>{market['lastPrice']}</td>
                         <td>{market['quoteVolume']}</td>
                     </tr>
-                    """
+                    """)
 
-            return html
+            return "".join(rows)
 
         return f"""
         {header()}
@@ -167,8 +198,12 @@ class Pages:
 
     @staticmethod
     def coinbasepro_markets() -> str:
+        return page_cache.get_or_set(("coinbasepro_markets",), Pages._coinbasepro_markets)
+
+    @staticmethod
+    def _coinbasepro_markets() -> str:
         def markets():
-            html = ""
+            rows = []
 
             api = CPublicAPI()
             resp = api.get_markets_24hr_stats()
@@ -196,7 +231,7 @@ class Pages:
                         stats_24hour_volume = resp[market]["stats_24hour"]["volume"]
 
                 if stats_24hour_close > stats_24hour_open:
-                    html += f"""
+                    rows.append(f"""
                     <tr>
                         <th class="table-success" scope="row"><a class="text-dark" href="/coinbasepro/{market}">{market}</a></th>
                         <td class="table-success" style="border-left: 1px solid #000;">{stats_30day_volume}</td>
@@ -206,9 +241,9 @@ class Pages:
                         <td class="table-success">{stats_24hour_low}</td>
                         <td class="table-success">{stats_24hour_volume}</td>
                     </tr>
-                    """
+                    """)
                 elif stats_24hour_close < stats_24hour_open:
-                    html += f"""
+                    rows.append(f"""
                     <tr>
                         <th class="table-danger" scope="row"><a class="text-dark" href="/coinbasepro/{market}">{market}</a></th>
                         <td class="table-danger" style="border-left: 1px solid #000;">{stats_30day_volume}</td>
@@ -218,9 +253,9 @@ class Pages:
                         <td class="table-danger">{stats_24hour_low}</td>
                         <td class="table-danger">{stats_24hour_volume}</td>
                     </tr>
-                    """
+                    """)
                 else:
-                    html += f"""
+                    rows.append(f"""
                     <tr>
                         <th scope="row"><a class="text-dark" href="/coinbasepro/{market}">{market}</a></th>
                         <td style="border-left: 1px solid #000;">{stats_30day_volume}</td>
@@ -230,9 +265,9 @@ class Pages:
                         <td>{stats_24hour_low}</td>
                         <td>{stats_24hour_volume}</td>
                     </tr>
-                    """
+                    """)
 
-            return html
+            return "".join(rows)
 
         return f"""
         {header()}
@@ -289,24 +324,25 @@ class Pages:
         else:
             return "Invalid Exchange!"
 
-        if exchange == "binance":
-            api = BPublicAPI()
-        if exchange == "coinbasepro":
-            api = CPublicAPI()
-        ticker = api.get_ticker(market)
+        return page_cache.get_or_set(
+            ("technical_analysis", exchange, market, str(g1), str(g2), str(g3)),
+            lambda: Pages._technical_analysis(exchange, market, g1, g2, g3),
+        )
 
-        ta = TechnicalAnalysis(api.get_historical_data(market, g1, None))
-        ta.add_all()
-        df_15m = ta.get_df()
+    @staticmethod
+    def _technical_analysis(exchange: str, market: str, g1, g2, g3) -> str:
+        # the ticker and the three granularities are downloaded at the same time
+        ticker = fetcher.submit(public_api(exchange).get_ticker, market)
+        analyses = [fetcher.submit(technical_analysis, exchange, market, granularity) for granularity in (g1, g2, g3)]
+        ticker = ticker.result()
+        ta_15m, ta_1h, ta = [future.result() for future in analyses]
+
+        df_15m = ta_15m.get_df()
         df_15m_last = df_15m.tail(1)
 
-        ta = TechnicalAnalysis(api.get_historical_data(market, g2, None))
-        ta.add_all()
-        df_1h = ta.get_df()
+        df_1h = ta_1h.get_df()
         df_1h_last = df_1h.tail(1)
 
-        ta = TechnicalAnalysis(api.get_historical_data(market, g3, None))
-        ta.add_all()
         df_6h = ta.get_df()
         df_6h_last = df_6h.tail(1)
 